@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+import os
+import random
+
+from life_game.models.game import Game
+from life_game.models.state import State
+from life_game.models.organism_store import OrganismStore
+from life_game.io_handlers.xml_handler import XMLHandlerMixin
+
+
+class BenchmarkCase(object):
+    """Single benchmark - one engine evolving one initial state.
+
+    The initial state is either generated (random organisms of the density, the same for
+    the same seed) or read from the sample file and truncated to the amount of iterations.
+
+    Attributes:
+        engine (str): Name of the engine (one of `Game.ENGINE_*` except the auto one).
+        cells_cnt (int): Amount of cells of the grid side.
+        species_cnt (int): Amount of species in the game.
+        density (float): Ratio of the cells with organisms in the initial state.
+        iterations_cnt (int): Amount of iterations to be measured.
+        sample_file (str): Path to the sample XML file the state is read from, else None.
+        seed (int): Seed of the generated state.
+        workers_cnt (int): Amount of worker processes of the tiles engine, None for
+            the default one.
+    """
+    SEED = 1
+
+    def __init__(self, engine, cells_cnt, species_cnt, density, iterations_cnt,
+                 sample_file=None, seed=SEED, workers_cnt=None):
+        self.engine = engine
+        self.cells_cnt = cells_cnt
+        self.species_cnt = species_cnt
+        self.density = density
+        self.iterations_cnt = iterations_cnt
+        self.sample_file = sample_file
+        self.seed = seed
+        self.workers_cnt = workers_cnt
+
+    @classmethod
+    def from_sample(cls, engine, sample_file, iterations_cnt, workers_cnt=None):
+        """Builds the case of the sample file.
+
+        Attributes:
+            engine (str): Name of the engine.
+            sample_file (str): Path to the sample XML file.
+            iterations_cnt (int): Amount of iterations the sample is truncated to.
+            workers_cnt (int, optional): Amount of worker processes of the tiles engine.
+
+        Returns:
+            case (BenchmarkCase): Case with the size, species and density of the sample.
+        """
+        state = XMLHandlerMixin().read_state_from_xml(sample_file)
+        density = float(len(state.organism_l)) / state.cells_cnt ** 2
+
+        return cls(engine, state.cells_cnt, state.species_cnt, round(density, 4),
+                   iterations_cnt, sample_file=sample_file, workers_cnt=workers_cnt)
+
+    @property
+    def name(self):
+        """str: Unique name of the case, results are compared by it."""
+        engine = self.engine
+        if self.workers_cnt:
+            engine = '%s-w%d' % (engine, self.workers_cnt)
+
+        if self.sample_file:
+            return '%s/sample-%s/i%d' % (engine, os.path.basename(self.sample_file),
+                                         self.iterations_cnt)
+
+        return '%s/c%d/s%d/d%s/i%d' % (engine, self.cells_cnt, self.species_cnt,
+                                       self.density, self.iterations_cnt)
+
+    @property
+    def world_kwargs(self):
+        """dict: Keyword arguments of the world of the engine."""
+        if self.engine == Game.ENGINE_TILES and self.workers_cnt:
+            return {'workers_cnt': self.workers_cnt}
+
+        return {}
+
+    def build_state(self):
+        """Builds the initial state of the case.
+
+        Returns:
+            state (State): Initial state with `iterations_cnt` iterations.
+        """
+        if self.sample_file:
+            state = XMLHandlerMixin().read_state_from_xml(self.sample_file)
+            state.iterations_cnt = self.iterations_cnt
+            return state
+
+        cells_cnt = self.cells_cnt
+        generator = random.Random(self.seed)
+
+        # unique cells, so there are no initial conflicts
+        index_l = generator.sample(xrange(cells_cnt * cells_cnt),
+                                   int(cells_cnt * cells_cnt * self.density))
+        index_l.sort()
+
+        organism_l = OrganismStore.from_cells(
+            (index // cells_cnt, index % cells_cnt, generator.randint(1, self.species_cnt))
+            for index in index_l)
+
+        return State(cells_cnt, self.species_cnt, self.iterations_cnt, organism_l)
+
+
+class BenchmarkMatrix(object):
+    """Cases of the benchmark profile - engines x grid sizes x densities x species.
+
+    The amount of iterations of the generated cases shrinks with the size of the grid,
+    so every case evolves roughly `CELL_ITERATIONS_CNT` cells. Engines of a single species
+    are measured only with one species.
+
+    Attributes:
+        profile (str): Name of the profile (one of `PROFILE_*`).
+    """
+    PROFILE_QUICK = 'quick'
+    PROFILE_FULL = 'full'
+
+    CELLS_CNT_BY_PROFILE_D = {
+        PROFILE_QUICK: (57, 256),
+        PROFILE_FULL: (57, 256, 1024, 4096)
+    }
+    DENSITY_L = (0.05, 0.3)
+    SPECIES_CNT_L = (1, 3)
+    ENGINE_L = (Game.ENGINE_PYTHON, Game.ENGINE_NUMPY, Game.ENGINE_BITBOARD,
+                Game.ENGINE_HASHLIFE, Game.ENGINE_TILES)
+    SINGLE_SPECIES_ENGINE_S = set([Game.ENGINE_BITBOARD, Game.ENGINE_HASHLIFE])
+
+    CELL_ITERATIONS_CNT = 4 * 10 ** 6
+    MIN_ITERATIONS_CNT = 2
+    MAX_ITERATIONS_CNT = 200
+
+    # samples are truncated to the fixed amount of iterations
+    SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'samples')
+    SAMPLE_ITERATIONS_D = {
+        'small.xml': 100,
+        'big.xml': 1000
+    }
+
+    def __init__(self, profile=PROFILE_QUICK):
+        if profile not in self.CELLS_CNT_BY_PROFILE_D:
+            raise BenchmarkCaseError('Profile is not known: %s' % profile)
+
+        self.profile = profile
+
+    def get_cases(self, engine_l=ENGINE_L, cells_cnt_l=None, workers_cnt_l=(None,)):
+        """Builds the cases of the profile.
+
+        Attributes:
+            engine_l (iterable): Names of the engines to be measured.
+            cells_cnt_l (iterable): Grid sizes to be measured, the ones of the profile if None.
+            workers_cnt_l (iterable): Amounts of worker processes the tiles engine is measured
+                with (None for the default one), e.g. to measure its scaling.
+
+        Returns:
+            case_l (list): Cases of the generated states and of the samples.
+
+        Raises:
+            BenchmarkCaseError: If some engine is not known.
+        """
+        unknown_engine_l = [engine for engine in engine_l if engine not in self.ENGINE_L]
+        if unknown_engine_l:
+            raise BenchmarkCaseError('Engine is not known: %s' % ', '.join(unknown_engine_l))
+
+        if cells_cnt_l is None:
+            cells_cnt_l = self.CELLS_CNT_BY_PROFILE_D[self.profile]
+
+        case_l = []
+
+        for engine in engine_l:
+            engine_workers_cnt_l = workers_cnt_l if engine == Game.ENGINE_TILES else (None,)
+
+            for cells_cnt in cells_cnt_l:
+                for species_cnt in self.SPECIES_CNT_L:
+                    if species_cnt > 1 and engine in self.SINGLE_SPECIES_ENGINE_S:
+                        continue
+
+                    for density in self.DENSITY_L:
+                        for workers_cnt in engine_workers_cnt_l:
+                            case_l.append(BenchmarkCase(
+                                engine, cells_cnt, species_cnt, density,
+                                self.get_iterations_cnt(cells_cnt), workers_cnt=workers_cnt))
+
+            for sample_name, iterations_cnt in sorted(self.SAMPLE_ITERATIONS_D.iteritems()):
+                for workers_cnt in engine_workers_cnt_l:
+                    case = BenchmarkCase.from_sample(
+                        engine, os.path.join(self.SAMPLES_DIR, sample_name), iterations_cnt,
+                        workers_cnt=workers_cnt)
+                    if case.species_cnt == 1 or engine not in self.SINGLE_SPECIES_ENGINE_S:
+                        case_l.append(case)
+
+        return case_l
+
+    def get_iterations_cnt(self, cells_cnt):
+        """Finds out the amount of iterations of the generated case.
+
+        Attributes:
+            cells_cnt (int): Amount of cells of the grid side.
+
+        Returns:
+            iterations_cnt (int): Amount of iterations to be measured.
+        """
+        iterations_cnt = self.CELL_ITERATIONS_CNT // (cells_cnt * cells_cnt)
+
+        return max(self.MIN_ITERATIONS_CNT, min(self.MAX_ITERATIONS_CNT, iterations_cnt))
+
+
+class BenchmarkCaseError(Exception):
+    pass
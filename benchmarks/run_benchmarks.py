@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+import sys
+import argparse
+
+from benchmarks.cases import BenchmarkMatrix, BenchmarkCaseError
+from benchmarks.suite import BenchmarkRunner, compare_results, read_results, write_results
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+
+
+def parse_arguments(arguments):
+    """Parses the arguments of the benchmarks.
+
+    Attributes:
+        arguments (list): Arguments provided to the benchmarks (without the script name).
+
+    Returns:
+        (argparse.Namespace): Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run_benchmarks')
+    parser.add_argument('--profile', default=BenchmarkMatrix.PROFILE_QUICK,
+                        choices=sorted(BenchmarkMatrix.CELLS_CNT_BY_PROFILE_D),
+                        help='grid sizes to be measured (the full one goes up to 4096)')
+    parser.add_argument('--engine', dest='engine_l', action='append', metavar='ENGINE',
+                        choices=BenchmarkMatrix.ENGINE_L,
+                        help='engine to be measured (all of them by default), repeatable')
+    parser.add_argument('--cells', dest='cells_cnt_l', action='append', type=int, metavar='N',
+                        help='grid size to be measured instead of the profile, repeatable')
+    parser.add_argument('--workers', dest='workers_cnt_l', action='append', type=int,
+                        metavar='N', help='amount of worker processes of the tiles engine '
+                                          '(CPU count by default), repeatable to measure scaling')
+    parser.add_argument('--repeat', type=int, default=1, metavar='N',
+                        help='run every case N times and keep the best times')
+    parser.add_argument('--output-file', default='benchmarks.json',
+                        help='path to the JSON file with the results')
+    parser.add_argument('--baseline-file',
+                        help='path to the JSON file with the results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown against the baseline (0.2 is 20%%)')
+
+    return parser.parse_args(arguments)
+
+
+def print_result(result):
+    """Prints the result of one case."""
+    phase_l = ['%s %.3fs' % phase_seconds
+               for phase_seconds in sorted(result['phase_seconds'].iteritems())]
+    print '%-40s %10.1f generations/s  %s' % (result['name'], result['generations_per_second'],
+                                               ', '.join(phase_l))
+
+
+if __name__ == '__main__':
+    """Runs the benchmarks, writes the results and compares them with the baseline.
+
+    Exits with failure status if some case regressed against the baseline.
+
+    Example:
+        $ python -m benchmarks.run_benchmarks
+        $ python -m benchmarks.run_benchmarks --profile full --output-file new.json \\
+            --baseline-file baseline.json --threshold 0.1
+    """
+    parsed_arguments = parse_arguments(sys.argv[1:])
+
+    try:
+        case_l = BenchmarkMatrix(parsed_arguments.profile).get_cases(
+            parsed_arguments.engine_l or BenchmarkMatrix.ENGINE_L,
+            parsed_arguments.cells_cnt_l, parsed_arguments.workers_cnt_l or (None,))
+    except BenchmarkCaseError as err:
+        print err.message
+        sys.exit(EXIT_FAILURE)
+
+    # the baseline is read first, so a wrong path does not waste the whole run
+    baseline_d = None
+    if parsed_arguments.baseline_file:
+        baseline_d = read_results(parsed_arguments.baseline_file)
+
+    result_d = BenchmarkRunner(parsed_arguments.repeat).run(case_l, log=print_result)
+    result_d['profile'] = parsed_arguments.profile
+    write_results(parsed_arguments.output_file, result_d)
+    print '* The results have been written to %s.' % parsed_arguments.output_file
+
+    if baseline_d is None:
+        sys.exit(EXIT_SUCCESS)
+
+    regression_l = compare_results(result_d, baseline_d, parsed_arguments.threshold)
+    for regression in regression_l:
+        print '* Regression: %s' % regression
+
+    sys.exit(EXIT_FAILURE if regression_l else EXIT_SUCCESS)
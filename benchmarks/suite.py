@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+import os
+import json
+import time
+import platform
+import tempfile
+
+from life_game.models.game import Game
+from life_game.models.state import State
+from life_game.models.metrics import GameMetrics
+from life_game.models.world_grid import WorldGrid
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+from life_game.io_handlers.xml_handler import XMLHandlerMixin
+
+
+class BenchmarkRunner(object):
+    """Runs the benchmark cases and measures them.
+
+    The whole run gives generations per second of `World.advance`, the phases are timed
+    separately:
+        - `populate`: population of the initial organisms,
+        - `neighbours`: gathering of the cells to evaluate (python engine only),
+        - `rules`: evaluation of the rules (python engine only),
+        - `update`: update of the grid by births and deaths (python engine only),
+        - `rebuild`: emptying of the grid,
+        - `write_xml` and `read_xml`: the final state written to and read from XML.
+
+    The phases of the python engine are the ones measured by the world (see `GameMetrics`).
+
+    Attributes:
+        repeat_cnt (int): Every case is run this many times, the best times are kept.
+    """
+    def __init__(self, repeat_cnt=1):
+        self.repeat_cnt = repeat_cnt
+
+    def run(self, case_l, log=None):
+        """Runs the cases.
+
+        Attributes:
+            case_l (list): Cases to be run.
+            log (callable, optional): Called with the result of every case once it is run.
+
+        Returns:
+            result_d (dict): Results of the cases with details of the environment
+                (JSON serializable).
+        """
+        result_l = []
+
+        for case in case_l:
+            result = self.run_case(case)
+            result_l.append(result)
+            if log:
+                log(result)
+
+        return {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': result_l
+        }
+
+    def run_case(self, case):
+        """Runs the case `repeat_cnt` times.
+
+        Attributes:
+            case (BenchmarkCase): Case to be run.
+
+        Returns:
+            result (dict): Result of the case with the best times of the runs.
+        """
+        state = case.build_state()
+        result = None
+
+        for _ in xrange(self.repeat_cnt):
+            run_result = self._run_once(case, state)
+            if result is None:
+                result = run_result
+                continue
+
+            result['seconds'] = min(result['seconds'], run_result['seconds'])
+            for phase, seconds in run_result['phase_seconds'].iteritems():
+                result['phase_seconds'][phase] = min(result['phase_seconds'][phase], seconds)
+
+        result['generations_per_second'] = case.iterations_cnt / max(result['seconds'], 1e-9)
+
+        return result
+
+    def _run_once(self, case, state):
+        """Runs the case once.
+
+        Attributes:
+            case (BenchmarkCase): Case to be run.
+            state (State): Initial state of the case.
+
+        Returns:
+            result (dict): Result of the case.
+        """
+        world_grid = WorldGrid(state.cells_cnt, state.cells_cnt)
+        world = Game.WORLD_BY_ENGINE_D[case.engine](world_grid, state.organism_l,
+                                                    EvolutionRulesEngine(), **case.world_kwargs)
+
+        start = time.time()
+        world.populate_initial_organisms()
+        phase_seconds_d = {'populate': time.time() - start}
+
+        world.metrics = GameMetrics()
+        try:
+            start = time.time()
+            world.advance(case.iterations_cnt)
+            seconds = time.time() - start
+        finally:
+            world.close()
+        phase_seconds_d.update(world.metrics.phase_seconds_d)
+
+        organism_l = world.organism_l
+        phase_seconds_d['write_xml'], phase_seconds_d['read_xml'] = self._time_xml(
+            state, organism_l)
+
+        start = time.time()
+        world_grid.rebuild()
+        phase_seconds_d['rebuild'] = time.time() - start
+
+        return {
+            'name': case.name,
+            'engine': case.engine,
+            'cells_cnt': case.cells_cnt,
+            'species_cnt': case.species_cnt,
+            'density': case.density,
+            'iterations_cnt': case.iterations_cnt,
+            'workers_cnt': case.workers_cnt,
+            'initial_organisms_cnt': len(state.organism_l),
+            'final_organisms_cnt': len(organism_l),
+            'seconds': seconds,
+            'phase_seconds': phase_seconds_d
+        }
+
+    def _time_xml(self, state, organism_l):
+        """Measures writing of the state to XML and reading it back.
+
+        Attributes:
+            state (State): State to be written (with the final organisms).
+            organism_l (list): Organisms to be written.
+
+        Returns:
+            write_seconds (float): Seconds spent by writing.
+            read_seconds (float): Seconds spent by reading.
+        """
+        xml_handler = XMLHandlerMixin()
+        state = State(state.cells_cnt, state.species_cnt, state.iterations_cnt, organism_l)
+
+        file_descriptor, xml_file = tempfile.mkstemp(suffix='.xml')
+        os.close(file_descriptor)
+        try:
+            start = time.time()
+            xml_handler.write_state_to_xml(xml_file, state, 0)
+            write_seconds = time.time() - start
+
+            start = time.time()
+            xml_handler.read_state_from_xml(xml_file)
+            read_seconds = time.time() - start
+        finally:
+            os.remove(xml_file)
+
+        return write_seconds, read_seconds
+
+
+def compare_results(result_d, baseline_d, threshold, min_seconds=0.01):
+    """Compares the results with the baseline ones.
+
+    Case regresses if its generations per second drop, or its phase takes longer, by more
+    than the threshold. Phases shorter than `min_seconds` in both results are too noisy
+    to be compared. Cases missing in any of the results are skipped.
+
+    Attributes:
+        result_d (dict): Results of `BenchmarkRunner.run`.
+        baseline_d (dict): Baseline results of `BenchmarkRunner.run`.
+        threshold (float): Allowed relative slowdown (0.1 is 10%).
+        min_seconds (float, optional): The shortest phase which is compared.
+
+    Returns:
+        regression_l (list): Messages describing the regressions.
+    """
+    baseline_by_name_d = dict((result['name'], result) for result in baseline_d['results'])
+    regression_l = []
+
+    for result in result_d['results']:
+        baseline = baseline_by_name_d.get(result['name'])
+        if baseline is None:
+            continue
+
+        speed, baseline_speed = (result['generations_per_second'],
+                                 baseline['generations_per_second'])
+        if speed < baseline_speed * (1 - threshold):
+            regression_l.append('%s: %.1f generations/s (baseline %.1f)'
+                                % (result['name'], speed, baseline_speed))
+
+        for phase, seconds in sorted(result['phase_seconds'].iteritems()):
+            baseline_seconds = baseline['phase_seconds'].get(phase)
+            if baseline_seconds is None or max(seconds, baseline_seconds) < min_seconds:
+                continue
+
+            if seconds > baseline_seconds * (1 + threshold):
+                regression_l.append('%s: %s %.3fs (baseline %.3fs)'
+                                    % (result['name'], phase, seconds, baseline_seconds))
+
+    return regression_l
+
+
+def read_results(results_file):
+    """Reads the results from JSON file.
+
+    Attributes:
+        results_file (str): Path to the JSON file.
+
+    Returns:
+        result_d (dict): Results of `BenchmarkRunner.run`.
+    """
+    with open(results_file) as opened_file:
+        return json.load(opened_file)
+
+
+def write_results(results_file, result_d):
+    """Writes the results to JSON file.
+
+    Attributes:
+        results_file (str): Path to the JSON file.
+        result_d (dict): Results of `BenchmarkRunner.run`.
+    """
+    with open(results_file, 'w') as opened_file:
+        json.dump(result_d, opened_file, indent=2, sort_keys=True)
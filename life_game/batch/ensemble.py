@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+import time
+import multiprocessing
+
+import numpy as np
+
+from life_game.models.game import Game
+from life_game.models.world_grid import WorldGrid
+from life_game.models.organism_store import iter_cells
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+from life_game.io_handlers.metrics_writer import MetricsWriter
+
+
+class PopulationStatistics(object):
+    """Streaming statistics of the populations of one generation across the runs.
+
+    Mean and variance are updated run by run by the Welford's algorithm and the statistics
+    of disjoint groups of runs are merged by its parallel form, so only the counts, the means
+    and the sums of squared differences are kept, never the populations of the runs.
+
+    Attributes:
+        species_l (list): Species identifiers the populations are counted for.
+        runs_cnt (int): Amount of runs added.
+        mean_a (numpy.ndarray): Mean population by species.
+        m2_a (numpy.ndarray): Sum of squared differences from the mean by species.
+        extinct_cnt_a (numpy.ndarray): Amount of runs without the species by species.
+        empty_cnt (int): Amount of runs without any organism.
+    """
+    def __init__(self, species_l):
+        self.species_l = list(species_l)
+        self.runs_cnt = 0
+        self.mean_a = np.zeros(len(self.species_l))
+        self.m2_a = np.zeros(len(self.species_l))
+        self.extinct_cnt_a = np.zeros(len(self.species_l), dtype=np.int64)
+        self.empty_cnt = 0
+
+    @property
+    def variance_a(self):
+        """numpy.ndarray: Sample variance of the population by species (0 for a single run)."""
+        if self.runs_cnt < 2:
+            return np.zeros_like(self.m2_a)
+        return self.m2_a / (self.runs_cnt - 1)
+
+    def add(self, population_a):
+        """Adds the populations of one run.
+
+        Attributes:
+            population_a (numpy.ndarray): Amount of organisms by species (as `species_l`).
+        """
+        self.runs_cnt += 1
+        delta_a = population_a - self.mean_a
+        self.mean_a += delta_a / self.runs_cnt
+        self.m2_a += delta_a * (population_a - self.mean_a)
+        self.extinct_cnt_a += population_a == 0
+        self.empty_cnt += not population_a.any()
+
+    def merge(self, other):
+        """Adds the statistics of other (disjoint) runs of the same generation.
+
+        Attributes:
+            other (PopulationStatistics): Statistics of the other runs.
+        """
+        if not other.runs_cnt:
+            return
+
+        runs_cnt = self.runs_cnt + other.runs_cnt
+        delta_a = other.mean_a - self.mean_a
+
+        self.mean_a = self.mean_a + delta_a * other.runs_cnt / runs_cnt
+        self.m2_a = self.m2_a + other.m2_a + \
+            delta_a ** 2 * self.runs_cnt * other.runs_cnt / runs_cnt
+        self.extinct_cnt_a = self.extinct_cnt_a + other.extinct_cnt_a
+        self.empty_cnt += other.empty_cnt
+        self.runs_cnt = runs_cnt
+
+    def get_record(self, generation):
+        """Builds the record of the generation.
+
+        Attributes:
+            generation (int): Generation of the statistics.
+
+        Returns:
+            record (dict): Mean, variance and extinction probability of the population
+                by species, probability that no organism is left (JSON serializable).
+        """
+        runs_cnt = float(self.runs_cnt or 1)
+
+        return {
+            'record': EnsembleRunner.RECORD_GENERATION,
+            'generation': generation,
+            'runs': self.runs_cnt,
+            'species': dict(
+                (str(species), {'mean': mean, 'variance': variance,
+                                'extinction_probability': extinct_cnt / runs_cnt})
+                for species, mean, variance, extinct_cnt in zip(
+                    self.species_l, self.mean_a.tolist(), self.variance_a.tolist(),
+                    self.extinct_cnt_a.tolist())),
+            'extinction_probability': self.empty_cnt / runs_cnt
+        }
+
+
+class EnsembleRunner(object):
+    """Runs one state under many seeds on worker processes and aggregates the populations.
+
+    The seeds are split among the worker processes, every worker evolves the worlds of its
+    seeds generation by generation and sends the statistics of each generation (see
+    `PopulationStatistics`). The statistics of the workers are merged and written as soon
+    as all the workers finish the generation, so nothing is kept for the generations which
+    were written. The workers wait for the pipes to be read, so they do not run ahead.
+
+    The aggregates are written to the output file as JSON lines - the ensemble record
+    (seeds, species, engine), one record per generation (0 is the populated initial state)
+    and the summary. No state of the runs is written.
+
+    Attributes:
+        pool_size (int): Amount of worker processes (CPU count by default).
+        engine (str): Engine of the runs (one of `ENGINE_L`), numpy for the auto one.
+    """
+    RECORD_ENSEMBLE = 'ensemble'
+    RECORD_GENERATION = 'generation'
+    RECORD_SUMMARY = 'summary'
+
+    # engines which do not start their own processes
+    ENGINE_L = (Game.ENGINE_PYTHON, Game.ENGINE_NUMPY, Game.ENGINE_BITBOARD,
+                Game.ENGINE_HASHLIFE)
+
+    def __init__(self, pool_size=None, engine=Game.ENGINE_AUTO):
+        self.pool_size = pool_size or multiprocessing.cpu_count()
+        self.engine = Game.ENGINE_NUMPY if engine == Game.ENGINE_AUTO else engine
+
+        if self.engine not in self.ENGINE_L:
+            raise EnsembleError('Engine is not supported by the ensemble: %s' % engine)
+
+    def run(self, state, seed_l, output_file, log=None):
+        """Runs the state under the seeds and writes the aggregates to the output file.
+
+        Attributes:
+            state (State): Initial state of all the runs, its iterations are evolved.
+            seed_l (list): Seeds of the runs.
+            output_file (str): Path to the output file (JSON lines).
+            log (callable, optional): Called with the record of every generation.
+
+        Returns:
+            summary (dict): Amount of runs and generations, runtime (JSON serializable).
+
+        Raises:
+            EnsembleError: If some run fails or the output file can not be written.
+        """
+        start = time.time()
+        species_l = sorted(set(species for _, _, species in iter_cells(state.organism_l)))
+        workers_cnt = min(self.pool_size, len(seed_l)) or 1
+
+        try:
+            writer = MetricsWriter(output_file)
+        except (OSError, IOError) as err:
+            raise EnsembleError('Can not write to the ensemble file. %s' % err)
+
+        process_l, connection_l = [], []
+        try:
+            for index in xrange(workers_cnt):
+                connection, worker_connection = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(
+                    target=_run_seeds,
+                    args=(worker_connection, state, seed_l[index::workers_cnt], self.engine,
+                          species_l))
+                process.daemon = True
+                process.start()
+                worker_connection.close()
+
+                process_l.append(process)
+                connection_l.append(connection)
+
+            writer.write_record({
+                'record': self.RECORD_ENSEMBLE,
+                'engine': self.engine,
+                'seeds': list(seed_l),
+                'species': species_l,
+                'generations': state.iterations_cnt,
+                'pool_size': workers_cnt
+            })
+
+            for generation in xrange(state.iterations_cnt + 1):
+                statistics = PopulationStatistics(species_l)
+                for connection in connection_l:
+                    statistics.merge(self._receive(connection))
+
+                record = statistics.get_record(generation)
+                writer.write_record(record)
+                if log:
+                    log(record)
+
+            seconds = time.time() - start
+            generations_cnt = len(seed_l) * state.iterations_cnt
+            summary = {
+                'record': self.RECORD_SUMMARY,
+                'runs': len(seed_l),
+                'generations': state.iterations_cnt,
+                'seconds': seconds,
+                'generations_per_second': generations_cnt / seconds if seconds else None
+            }
+            writer.write_record(summary)
+        except (OSError, IOError) as err:
+            raise EnsembleError('Can not write to the ensemble file. %s' % err)
+        finally:
+            writer.close()
+            for connection in connection_l:
+                connection.close()
+            for process in process_l:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+        return summary
+
+    @staticmethod
+    def _receive(connection):
+        """Receives the statistics of the next generation from the worker.
+
+        Raises:
+            EnsembleError: If the worker failed or stopped.
+        """
+        try:
+            error, statistics = connection.recv()
+        except EOFError:
+            raise EnsembleError('Worker of the ensemble has stopped.')
+
+        if error:
+            raise EnsembleError('Run of the ensemble failed: %s' % error)
+
+        return statistics
+
+
+def _run_seeds(connection, state, seed_l, engine, species_l):
+    """Evolves the worlds of the seeds in the worker process, generation by generation.
+
+    The statistics of every generation are sent to the runner, the error (repr) is sent
+    instead if some run fails.
+
+    Attributes:
+        connection (Connection): Connection to the runner.
+        state (State): Initial state of the runs.
+        seed_l (list): Seeds of the runs of the worker.
+        engine (str): Engine of the runs.
+        species_l (list): Species the populations are counted for.
+    """
+    try:
+        species_index_d = dict((species, index) for index, species in enumerate(species_l))
+        world_l = []
+        population_a_l = []
+
+        for seed in seed_l:
+            world = Game.WORLD_BY_ENGINE_D[engine](
+                WorldGrid(state.cells_cnt, state.cells_cnt), list(state.organism_l),
+                EvolutionRulesEngine(seed=seed))
+            world.populate_initial_organisms()
+            world_l.append(world)
+            population_a_l.append(_count_population(world.organism_l, species_index_d))
+
+        for generation in xrange(state.iterations_cnt + 1):
+            if generation:
+                for world, population_a in zip(world_l, population_a_l):
+                    world.iterate()
+                    _update_population(world, population_a, species_index_d)
+
+            statistics = PopulationStatistics(species_l)
+            for population_a in population_a_l:
+                statistics.add(population_a)
+            connection.send((None, statistics))
+    except Exception as err:
+        connection.send((repr(err), None))
+    finally:
+        connection.close()
+
+
+def _count_population(organism_l, species_index_d):
+    """Counts the organisms by species.
+
+    Returns:
+        population_a (numpy.ndarray): Amount of organisms by species (index of the species).
+    """
+    population_a = np.zeros(len(species_index_d))
+    for _, _, species in iter_cells(organism_l):
+        population_a[species_index_d[species]] += 1
+
+    return population_a
+
+
+def _update_population(world, population_a, species_index_d):
+    """Updates the population by the births and deaths of the last iteration (in place).
+
+    The organisms are counted again if the changes are not known.
+    """
+    born_organism_l, dead_organism_l = world.born_organism_l, world.dead_organism_l
+
+    if born_organism_l is None or dead_organism_l is None:
+        population_a[:] = _count_population(world.organism_l, species_index_d)
+        return
+
+    for _, _, species in iter_cells(born_organism_l):
+        population_a[species_index_d[species]] += 1
+    for _, _, species in iter_cells(dead_organism_l):
+        population_a[species_index_d[species]] -= 1
+
+
+class EnsembleError(Exception):
+    pass
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+import os
+
+from life_game.models.game import Game
+from life_game.io_handlers.game_io_handler import GameIOHandler
+from life_game.io_handlers.write_policy import EveryIterationWritePolicy
+
+
+class BatchJob(object):
+    """Single game of the batch - one input file evolved to its own output file.
+
+    Attributes:
+        input_file (str): Path to the input file.
+        output_file (str): Path to the output file (.xml or .life).
+        engine (str): Name of the engine (one of `Game.ENGINE_*`).
+        seed (int): Seed of the random choices, the seed of the input if None.
+        detect_cycles (bool): True if the remaining iterations are skipped once the world
+            settles into a cycle, False otherwise.
+        write_policy (WritePolicy): Decides after which iterations the state is written.
+        pretty_print (bool): True if the output XML is indented, False otherwise.
+    """
+    # engines which do not start their own processes, the daemonic workers of the pool
+    # are not allowed to have children
+    ENGINE_L = (Game.ENGINE_AUTO, Game.ENGINE_PYTHON, Game.ENGINE_NUMPY, Game.ENGINE_BITBOARD,
+                Game.ENGINE_HASHLIFE)
+
+    def __init__(self, input_file, output_file, engine=Game.ENGINE_AUTO, seed=None,
+                 detect_cycles=False, write_policy=None, pretty_print=True):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.engine = engine
+        self.seed = seed
+        self.detect_cycles = detect_cycles
+        self.write_policy = write_policy if write_policy else EveryIterationWritePolicy()
+        self.pretty_print = pretty_print
+
+    @property
+    def name(self):
+        """str: Name of the job (its input file)."""
+        return self.input_file
+
+
+def read_jobs(batch_input, output_dir, output_format=GameIOHandler.FORMAT_XML, **job_kwargs):
+    """Builds the jobs of the batch from the directory or the manifest.
+
+    Every XML and binary (.life) file of the directory is a job. The manifest is a text file
+    with one job per line - the input file optionally followed by the output file, relative
+    paths are relative to the manifest. Empty lines and lines starting with # are skipped.
+
+    Jobs without the output file are written to the output directory, the output file is
+    named by the input one (with the extension of the output format).
+
+    Attributes:
+        batch_input (str): Path to the directory or the manifest.
+        output_dir (str): Path to the directory of the output files.
+        output_format (str, optional): Format of the output files (one of
+            `GameIOHandler.FORMAT_*`).
+        **job_kwargs: Keyword arguments of every job (see `BatchJob`).
+
+    Returns:
+        job_l (list): Jobs of the batch in the order of the directory (sorted) or manifest.
+
+    Raises:
+        BatchJobError: If the engine is not supported by the batch, some input file does not
+            exist or is not known, or more jobs are written to the same output file.
+    """
+    engine = job_kwargs.get('engine', Game.ENGINE_AUTO)
+    if engine not in BatchJob.ENGINE_L:
+        raise BatchJobError('Engine is not supported by the batch: %s' % engine)
+
+    if os.path.isdir(batch_input):
+        file_l = [(os.path.join(batch_input, file_name), None)
+                  for file_name in sorted(os.listdir(batch_input))
+                  if GameIOHandler.get_file_format(file_name)]
+    else:
+        file_l = _read_manifest(batch_input)
+
+    extension = dict((file_format, extension) for extension, file_format
+                     in GameIOHandler.FORMAT_BY_EXTENSION_D.iteritems())[output_format]
+    job_l = []
+    output_file_s = set()
+
+    for input_file, output_file in file_l:
+        if not os.path.isfile(input_file):
+            raise BatchJobError('The input file does not exist: %s' % input_file)
+
+        if not GameIOHandler.get_file_format(input_file):
+            raise BatchJobError('The input file must be a XML or binary (.life) file: %s'
+                                % input_file)
+
+        if output_file is None:
+            output_file = os.path.join(
+                output_dir, os.path.splitext(os.path.basename(input_file))[0] + extension)
+        elif not GameIOHandler.get_file_format(output_file):
+            raise BatchJobError('The output file must be a XML or binary (.life) file: %s'
+                                % output_file)
+
+        if os.path.abspath(output_file) in output_file_s:
+            raise BatchJobError('More jobs are written to the same output file: %s'
+                                % output_file)
+        output_file_s.add(os.path.abspath(output_file))
+
+        job_l.append(BatchJob(input_file, output_file, **job_kwargs))
+
+    if not job_l:
+        raise BatchJobError('There are no input files in the batch: %s' % batch_input)
+
+    return job_l
+
+
+def _read_manifest(manifest_file):
+    """Reads the input and output files of the jobs from the manifest.
+
+    Attributes:
+        manifest_file (str): Path to the manifest.
+
+    Returns:
+        file_l (list): Input file and output file (None if not given) of every job.
+
+    Raises:
+        BatchJobError: If the manifest can not be read or its line is not valid.
+    """
+    manifest_dir = os.path.dirname(manifest_file)
+    file_l = []
+
+    try:
+        with open(manifest_file) as opened_file:
+            line_l = opened_file.readlines()
+    except (OSError, IOError) as err:
+        raise BatchJobError('The manifest can not be read: %s' % err)
+
+    for line_number, line in enumerate(line_l, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        path_l = [os.path.join(manifest_dir, path) for path in line.split()]
+        if len(path_l) > 2:
+            raise BatchJobError('The line %d of the manifest must be the input file '
+                                'optionally followed by the output file.' % line_number)
+
+        file_l.append((path_l[0], path_l[1] if len(path_l) > 1 else None))
+
+    return file_l
+
+
+class BatchJobError(Exception):
+    pass
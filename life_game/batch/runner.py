@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+import multiprocessing
+
+from life_game.models.game import Game, GameRuntimeError
+from life_game.io_handlers.game_io_handler import GameIOHandler, IOValidationError, \
+    ReadStateError, WriteStateError
+
+
+class BatchRunner(object):
+    """Runs the jobs of the batch on a pool of worker processes.
+
+    Every worker process runs many jobs one after another, so the interpreter and
+    the modules are loaded once per worker, not once per job. Messages of the games are
+    not printed by the workers. The failed job does not stop the batch, its error is
+    reported in its result.
+
+    Attributes:
+        pool_size (int): Amount of worker processes (CPU count by default).
+    """
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILURE = 'failure'
+
+    def __init__(self, pool_size=None):
+        self.pool_size = pool_size or multiprocessing.cpu_count()
+
+    def run(self, job_l, log=None):
+        """Runs the jobs.
+
+        Attributes:
+            job_l (list): Jobs to be run.
+            log (callable, optional): Called with the result of every job once it is run
+                (in the order the jobs finish).
+
+        Returns:
+            summary (dict): Results of the jobs in the order of the jobs with the totals
+                of the batch (JSON serializable).
+        """
+        start = time.time()
+        result_l = [None] * len(job_l)
+
+        pool = multiprocessing.Pool(min(self.pool_size, len(job_l)) or 1,
+                                    initializer=_silence_output)
+        try:
+            for index, result in pool.imap_unordered(_run_indexed_job, enumerate(job_l)):
+                result_l[index] = result
+                if log:
+                    log(result)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+        seconds = time.time() - start
+        iterations_cnt = sum(result['iterations_cnt'] for result in result_l)
+
+        return {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'pool_size': self.pool_size,
+            'jobs_cnt': len(job_l),
+            'failed_jobs_cnt': sum(result['status'] == self.STATUS_FAILURE
+                                   for result in result_l),
+            'seconds': seconds,
+            'iterations_cnt': iterations_cnt,
+            'iterations_per_second': iterations_cnt / seconds if seconds else None,
+            'results': result_l
+        }
+
+
+def run_job(job):
+    """Runs the game of the job.
+
+    Attributes:
+        job (BatchJob): Job to be run.
+
+    Any error of the job is recorded in the result, so it does not abort the whole batch.
+    The IO handler is cleaned in any case, as the worker process runs the next jobs,
+    and the output file of the failed job is removed.
+
+    Returns:
+        result (dict): Status, runtime and iterations per second of the job, the error
+            message if it failed (JSON serializable). Iterations skipped by the cycle
+            detection or jumped by the hashlife engine are counted as well, so the rate is
+            not the rate of the simulated generations.
+    """
+    start = time.time()
+    iterations_cnt = 0
+    error = None
+    io_handler = None
+
+    try:
+        output_dir = os.path.dirname(job.output_file)
+        if output_dir and not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+
+        io_handler = GameIOHandler(job.input_file, job.output_file,
+                                   write_policy=job.write_policy,
+                                   pretty_print=job.pretty_print)
+        state = io_handler.read_state()
+        Game(io_handler, state, engine=job.engine, detect_cycles=job.detect_cycles,
+             seed=job.seed).start()
+        iterations_cnt = state.iterations_cnt
+    except (IOValidationError, ReadStateError, WriteStateError, GameRuntimeError) as err:
+        error = err.message
+    except (OSError, IOError) as err:
+        error = str(err)
+    except Exception as err:
+        # unexpected error of the game, the name of the error is kept as its message may be empty
+        error = '%s: %s' % (type(err).__name__, err)
+    finally:
+        if io_handler:
+            _clean_io_handler(io_handler)
+
+    if error and io_handler:
+        # the output file is partly written
+        _remove_output_file(job.output_file)
+
+    seconds = time.time() - start
+
+    return {
+        'name': job.name,
+        'input_file': job.input_file,
+        'output_file': job.output_file,
+        'status': BatchRunner.STATUS_FAILURE if error else BatchRunner.STATUS_SUCCESS,
+        'error': error,
+        'seconds': seconds,
+        'iterations_cnt': iterations_cnt,
+        'iterations_per_second': iterations_cnt / seconds if seconds else None
+    }
+
+
+def _clean_io_handler(io_handler):
+    """Closes the output file and stops the background writer of the job.
+
+    The handler is cleaned by the game once it finishes, then nothing is left to be closed.
+    Errors are not raised, the error of the job (if any) is already recorded.
+
+    Attributes:
+        io_handler (GameIOHandler): IO handler of the job.
+    """
+    try:
+        io_handler.clean()
+    except Exception:
+        pass
+
+
+def _remove_output_file(output_file):
+    """Removes the output file of the failed job (if it exists)."""
+    try:
+        os.remove(output_file)
+    except (OSError, IOError):
+        pass
+
+
+def _run_indexed_job(indexed_job):
+    """Runs the job in the worker process, the index of the job is kept with the result."""
+    index, job = indexed_job
+
+    return index, run_job(job)
+
+
+def _silence_output():
+    """Drops the messages of the games printed by the worker process."""
+    sys.stdout = open(os.devnull, 'w')
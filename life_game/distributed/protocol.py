@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""Binary framing of the messages between the coordinator and the workers.
+
+Every message is a header (message type, payload length) followed by the payload. Rows
+of species labels are sent as unsigned shorts, other values as unsigned ints, everything
+in the network byte order.
+
+Requests of the coordinator and the replies of the worker:
+    - `MESSAGE_LOAD` (stripe) -> `MESSAGE_ACK`,
+    - `MESSAGE_STEP` (settlement, halo rows) -> `MESSAGE_RESULT`,
+    - `MESSAGE_SNAPSHOT` (settlement) -> `MESSAGE_STRIPE`,
+    - any request -> `MESSAGE_ERROR` (message) if the worker fails.
+
+Settlement finishes the previous step of the worker before the request is handled, either
+by the species chosen for the births of more species or by reverting the step (nothing
+would evolve in the whole world).
+"""
+import struct
+
+import numpy as np
+
+# message type, payload length
+HEADER_STRUCT = struct.Struct('!BI')
+MESSAGE_LOAD = 1
+MESSAGE_STEP = 2
+MESSAGE_SNAPSHOT = 3
+MESSAGE_ACK = 4
+MESSAGE_RESULT = 5
+MESSAGE_STRIPE = 6
+MESSAGE_ERROR = 7
+
+# amount of rows, height of the rows, amount of labels (including the empty one)
+LOAD_STRUCT = struct.Struct('!III')
+# revert the step, amount of choices (x, y, label)
+SETTLE_STRUCT = struct.Struct('!BI')
+# top halo row is sent, bottom halo row is sent
+HALO_STRUCT = struct.Struct('!BB')
+# anything alive, amount of labels, amount of tie values (x, y, amount of labels, labels)
+RESULT_STRUCT = struct.Struct('!BII')
+
+LABEL_DTYPE = np.dtype('>u2')
+VALUE_DTYPE = np.dtype('>u4')
+
+
+def send_message(connection, message_type, payload=''):
+    """Sends the message framed by the header.
+
+    Attributes:
+        connection (socket.socket): Connected socket.
+        message_type (int): Type of the message (one of `MESSAGE_*`).
+        payload (str, optional): Payload of the message.
+    """
+    connection.sendall(HEADER_STRUCT.pack(message_type, len(payload)) + payload)
+
+
+def receive_message(connection):
+    """Receives the whole message.
+
+    Attributes:
+        connection (socket.socket): Connected socket.
+
+    Returns:
+        message_type (int): Type of the message, None if the connection was closed.
+        payload (str): Payload of the message, None if the connection was closed.
+
+    Raises:
+        ProtocolError: If the connection is closed in the middle of the message.
+    """
+    header = _receive_exactly(connection, HEADER_STRUCT.size, allow_closed=True)
+    if header is None:
+        return None, None
+
+    message_type, payload_size = HEADER_STRUCT.unpack(header)
+
+    return message_type, _receive_exactly(connection, payload_size)
+
+
+def encode_load(label_grid, label_cnt):
+    """Encodes the stripe which is loaded by the worker."""
+    rows_cnt, height = label_grid.shape
+
+    return LOAD_STRUCT.pack(rows_cnt, height, label_cnt) + _pack(label_grid, LABEL_DTYPE)
+
+
+def decode_load(payload):
+    """Decodes the stripe which is loaded by the worker.
+
+    Returns:
+        label_grid (numpy.ndarray): Species labels of the stripe.
+        label_cnt (int): Amount of labels including the empty one.
+    """
+    rows_cnt, height, label_cnt = LOAD_STRUCT.unpack_from(payload)
+    label_grid = _unpack(payload, LOAD_STRUCT.size, LABEL_DTYPE, rows_cnt * height)
+
+    return label_grid.reshape(rows_cnt, height), label_cnt
+
+
+def encode_settle(revert, choice_l):
+    """Encodes the settlement of the previous step.
+
+    Attributes:
+        revert (bool): True if the previous step is to be reverted.
+        choice_l (list): Chosen labels of the births of more species as x|y|label.
+    """
+    return SETTLE_STRUCT.pack(revert, len(choice_l)) + _pack(choice_l, VALUE_DTYPE)
+
+
+def decode_settle(payload, offset=0):
+    """Decodes the settlement of the previous step.
+
+    Returns:
+        revert (bool): True if the previous step is to be reverted.
+        choice_a (numpy.ndarray): Chosen labels as rows of x|y|label.
+        offset (int): Offset of the rest of the payload.
+    """
+    revert, choice_cnt = SETTLE_STRUCT.unpack_from(payload, offset)
+    offset += SETTLE_STRUCT.size
+    choice_a = _unpack(payload, offset, VALUE_DTYPE, choice_cnt)
+
+    return bool(revert), choice_a.reshape(-1, 3), offset + choice_cnt * VALUE_DTYPE.itemsize
+
+
+def encode_step(revert, choice_l, top_row, bottom_row):
+    """Encodes the step with the settlement and halo rows (None if out of the grid)."""
+    payload = encode_settle(revert, choice_l) + \
+        HALO_STRUCT.pack(top_row is not None, bottom_row is not None)
+
+    for row in (top_row, bottom_row):
+        if row is not None:
+            payload += _pack(row, LABEL_DTYPE)
+
+    return payload
+
+
+def decode_step(payload, height):
+    """Decodes the step.
+
+    Returns:
+        revert (bool): True if the previous step is to be reverted.
+        choice_a (numpy.ndarray): Chosen labels as rows of x|y|label.
+        top_row (numpy.ndarray): Halo row above the stripe, None if out of the grid.
+        bottom_row (numpy.ndarray): Halo row below the stripe, None if out of the grid.
+    """
+    revert, choice_a, offset = decode_settle(payload)
+    has_top_row, has_bottom_row = HALO_STRUCT.unpack_from(payload, offset)
+    offset += HALO_STRUCT.size
+
+    row_l = []
+    for has_row in (has_top_row, has_bottom_row):
+        row = None
+        if has_row:
+            row = _unpack(payload, offset, LABEL_DTYPE, height)
+            offset += height * LABEL_DTYPE.itemsize
+        row_l.append(row)
+
+    return revert, choice_a, row_l[0], row_l[1]
+
+
+def encode_result(alive, population_a, first_row, last_row, tie_l):
+    """Encodes the result of the step.
+
+    Attributes:
+        alive (bool): True if there is any organism in the evolved stripe.
+        population_a (numpy.ndarray): Amount of cells by label.
+        first_row (numpy.ndarray): The first row of the evolved stripe.
+        last_row (numpy.ndarray): The last row of the evolved stripe.
+        tie_l (list): Births of more species (x|y|labels) ordered by x and then by y.
+    """
+    tie_value_l = []
+    for x, y, label_l in tie_l:
+        tie_value_l.extend([x, y, len(label_l)])
+        tie_value_l.extend(label_l)
+
+    return RESULT_STRUCT.pack(alive, len(population_a), len(tie_value_l)) + \
+        _pack(population_a, VALUE_DTYPE) + _pack(first_row, LABEL_DTYPE) + \
+        _pack(last_row, LABEL_DTYPE) + _pack(tie_value_l, VALUE_DTYPE)
+
+
+def decode_result(payload, height):
+    """Decodes the result of the step.
+
+    Returns:
+        Values encoded by `encode_result`.
+    """
+    alive, label_cnt, tie_value_cnt = RESULT_STRUCT.unpack_from(payload)
+    offset = RESULT_STRUCT.size
+
+    population_a = _unpack(payload, offset, VALUE_DTYPE, label_cnt)
+    offset += label_cnt * VALUE_DTYPE.itemsize
+
+    first_row = _unpack(payload, offset, LABEL_DTYPE, height)
+    offset += height * LABEL_DTYPE.itemsize
+    last_row = _unpack(payload, offset, LABEL_DTYPE, height)
+    offset += height * LABEL_DTYPE.itemsize
+
+    tie_value_l = _unpack(payload, offset, VALUE_DTYPE, tie_value_cnt).tolist()
+    tie_l = []
+    index = 0
+    while index < tie_value_cnt:
+        x, y, tie_label_cnt = tie_value_l[index:index + 3]
+        tie_l.append((x, y, tie_value_l[index + 3:index + 3 + tie_label_cnt]))
+        index += 3 + tie_label_cnt
+
+    return bool(alive), population_a, first_row, last_row, tie_l
+
+
+def encode_stripe(label_grid):
+    """Encodes the rows of the stripe."""
+    return _pack(label_grid, LABEL_DTYPE)
+
+
+def decode_stripe(payload, height):
+    """Decodes the rows of the stripe."""
+    label_grid = _unpack(payload, 0, LABEL_DTYPE, len(payload) // LABEL_DTYPE.itemsize)
+
+    return label_grid.reshape(-1, height)
+
+
+def _pack(values, dtype):
+    """Packs the values (array or list) to bytes of the dtype."""
+    return np.asarray(values).astype(dtype).tostring()
+
+
+def _unpack(payload, offset, dtype, count):
+    """Unpacks the values of the dtype from the payload to the native array."""
+    return np.frombuffer(payload, dtype=dtype, count=count, offset=offset).astype(
+        dtype.newbyteorder('='))
+
+
+def _receive_exactly(connection, size, allow_closed=False):
+    """Receives exactly the amount of bytes.
+
+    Attributes:
+        connection (socket.socket): Connected socket.
+        size (int): Amount of bytes to be received.
+        allow_closed (bool, optional): True if the connection may be closed before the first
+            byte is received.
+
+    Returns:
+        (str): Received bytes, None if the connection was closed (and it is allowed).
+
+    Raises:
+        ProtocolError: If the connection is closed before all the bytes are received.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received_size = 0
+
+    while received_size < size:
+        chunk_size = connection.recv_into(view[received_size:], size - received_size)
+        if not chunk_size:
+            if allow_closed and not received_size:
+                return None
+            raise ProtocolError('Connection closed after %d of %d bytes.'
+                                % (received_size, size))
+        received_size += chunk_size
+
+    return str(buffer)
+
+
+class ProtocolError(Exception):
+    pass
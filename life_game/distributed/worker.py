@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+import os
+import sys
+import socket
+import argparse
+import subprocess
+
+import numpy as np
+
+from life_game.engines.numpy_world import apply_rules
+from life_game.distributed.protocol import send_message, receive_message, decode_load, \
+    decode_settle, decode_step, encode_result, encode_stripe, MESSAGE_LOAD, MESSAGE_STEP, \
+    MESSAGE_SNAPSHOT, MESSAGE_ACK, MESSAGE_RESULT, MESSAGE_STRIPE, MESSAGE_ERROR, ProtocolError
+
+
+class TileWorker(object):
+    """Evolves one stripe of the grid for the coordinator (see `DistributedWorld`).
+
+    The worker listens on the TCP port and serves one coordinator connection at a time.
+    The stripe is kept between the connections, yet the coordinator loads it again once
+    it reconnects, so the worker process can be restarted at any time.
+
+    The stripe is evolved by the same rules as by `NumpyWorld`, the rows out of the stripe
+    are the halo rows sent by the coordinator (empty out of the grid). Births of more species
+    are reported to the coordinator which chooses the species and sends them with the next
+    request.
+
+    Attributes:
+        host (str): Host the worker listens on.
+        port (int): Port the worker listens on (picked by the system if 0 is given).
+        label_grid (numpy.ndarray): Species labels of the stripe, None until loaded.
+        previous_label_grid (numpy.ndarray): Species labels before the last step.
+        label_cnt (int): Amount of labels including the empty one.
+    """
+    HOST = '127.0.0.1'
+    BACKLOG = 1
+
+    def __init__(self, host=HOST, port=0):
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # the restarted worker binds the same port again
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((host, port))
+        self.server_socket.listen(self.BACKLOG)
+        self.host, self.port = self.server_socket.getsockname()[:2]
+
+        self.label_grid = None
+        self.previous_label_grid = None
+        self.label_cnt = 0
+
+    def serve_forever(self):
+        """Serves the coordinator connections one by one until the worker is stopped."""
+        while True:
+            connection, _ = self.server_socket.accept()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                self.serve_connection(connection)
+            except (socket.error, ProtocolError):
+                # the coordinator is gone, the next one loads the stripe again
+                pass
+            finally:
+                connection.close()
+
+    def serve_connection(self, connection):
+        """Replies to the requests until the coordinator closes the connection.
+
+        Attributes:
+            connection (socket.socket): Connection to the coordinator.
+        """
+        while True:
+            message_type, payload = receive_message(connection)
+            if message_type is None:
+                return
+
+            send_message(connection, *self.handle_message(message_type, payload))
+
+    def handle_message(self, message_type, payload):
+        """Handles the request of the coordinator.
+
+        Attributes:
+            message_type (int): Type of the request (one of `MESSAGE_*`).
+            payload (str): Payload of the request.
+
+        Returns:
+            message_type (int): Type of the reply.
+            payload (str): Payload of the reply, the error message if the request failed.
+        """
+        try:
+            if message_type == MESSAGE_LOAD:
+                return MESSAGE_ACK, self._load(payload)
+            if message_type == MESSAGE_STEP:
+                return MESSAGE_RESULT, self._step(payload)
+            if message_type == MESSAGE_SNAPSHOT:
+                return MESSAGE_STRIPE, self._snapshot(payload)
+            return MESSAGE_ERROR, 'Message type is not known: %s' % message_type
+        except Exception as err:
+            return MESSAGE_ERROR, repr(err)
+
+    def close(self):
+        """Stops listening."""
+        self.server_socket.close()
+
+    def _load(self, payload):
+        """Loads the stripe.
+
+        Returns:
+            (str): Empty payload of the reply.
+        """
+        self.label_grid, self.label_cnt = decode_load(payload)
+        self.previous_label_grid = self.label_grid
+
+        return ''
+
+    def _settle(self, revert, choice_a):
+        """Finishes the previous step by the chosen species or by reverting it.
+
+        Attributes:
+            revert (bool): True if the previous step is to be reverted.
+            choice_a (numpy.ndarray): Chosen labels as rows of x|y|label.
+        """
+        if revert:
+            self.label_grid = self.previous_label_grid
+        elif len(choice_a):
+            self.label_grid[choice_a[:, 0], choice_a[:, 1]] = choice_a[:, 2]
+
+    def _step(self, payload):
+        """Settles the previous step and evolves the stripe with the halo rows.
+
+        Returns:
+            (str): Payload of the result (see `encode_result`).
+        """
+        rows_cnt, height = self.label_grid.shape
+        revert, choice_a, top_row, bottom_row = decode_step(payload, height)
+        self._settle(revert, choice_a)
+
+        halo_grid = np.zeros((rows_cnt + 2, height), dtype=np.uint16)
+        halo_grid[1:-1] = self.label_grid
+        if top_row is not None:
+            halo_grid[0] = top_row
+        if bottom_row is not None:
+            halo_grid[-1] = bottom_row
+
+        evolved_halo_grid, birth_candidates, birth_candidates_cnt = \
+            apply_rules(halo_grid, self.label_cnt)
+
+        self.previous_label_grid = self.label_grid
+        self.label_grid = evolved_halo_grid[1:-1]
+
+        tie_l = [(int(x), int(y), (np.flatnonzero(birth_candidates[:, x + 1, y]) + 1).tolist())
+                 for x, y in np.argwhere(birth_candidates_cnt[1:-1] > 1)]
+        population_a = np.bincount(self.label_grid.ravel(), minlength=self.label_cnt)
+
+        return encode_result(bool(self.label_grid.any()), population_a, self.label_grid[0],
+                             self.label_grid[-1], tie_l)
+
+    def _snapshot(self, payload):
+        """Settles the previous step and encodes the stripe.
+
+        Returns:
+            (str): Payload with the rows of the stripe.
+        """
+        revert, choice_a, _ = decode_settle(payload)
+        self._settle(revert, choice_a)
+
+        return encode_stripe(self.label_grid)
+
+
+def start_local_worker(port=0):
+    """Starts the worker process listening on the localhost port.
+
+    Attributes:
+        port (int, optional): Port the worker listens on, picked by the system if 0.
+
+    Returns:
+        process (subprocess.Popen): Process of the worker.
+        address (tuple): Host and port of the worker.
+
+    Raises:
+        WorkerStartError: If the worker does not start listening.
+    """
+    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # connections of the caller are not inherited, so they are closed once it closes them
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'life_game.distributed.worker', '--port', str(port)],
+        cwd=root_dir, stdout=subprocess.PIPE, close_fds=True)
+
+    # the worker announces the port once it listens
+    line = process.stdout.readline()
+    try:
+        host, port = line.split()[-1].rsplit(':', 1)
+        return process, (host, int(port))
+    except (ValueError, IndexError):
+        process.kill()
+        process.wait()
+        raise WorkerStartError('Worker did not start: %r' % line)
+
+
+def stop_local_workers(process_l):
+    """Stops the worker processes.
+
+    Attributes:
+        process_l (list): Processes of the workers (see `start_local_worker`).
+    """
+    for process in process_l:
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
+        process.stdout.close()
+
+
+class WorkerStartError(Exception):
+    pass
+
+
+if __name__ == '__main__':
+    """Runs the worker until it is stopped.
+
+    Example:
+        $ python -m life_game.distributed.worker --port 7001
+        $ python -m life_game.distributed.worker --host 0.0.0.0 --port 7001
+    """
+    parser = argparse.ArgumentParser(prog='python -m life_game.distributed.worker')
+    parser.add_argument('--host', default=TileWorker.HOST, help='host to listen on')
+    parser.add_argument('--port', type=int, default=0,
+                        help='port to listen on (picked by the system by default)')
+    parsed_arguments = parser.parse_args(sys.argv[1:])
+
+    worker = TileWorker(parsed_arguments.host, parsed_arguments.port)
+    print '* The worker is listening on %s:%d' % (worker.host, worker.port)
+    sys.stdout.flush()
+
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
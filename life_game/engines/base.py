@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+from life_game.models.organism import Organism
+from life_game.models.organism_store import LabelGridStore
+from life_game.models.world import World, WorldInternalError
+
+
+class EngineWorld(World):
+    """Base class for worlds which keep organisms in their own compact representation.
+
+    The world grid is used only to populate initial organisms (and resolve initial conflicts),
+    afterwards the representation built by the subclass is the only source of truth and the
+    organisms are built from it lazily, e.g. when the state of the game is saved.
+
+    Each specific engine must inherit from this class and override the `iterate`,
+    `_load_organisms`, `_get_species_at` and `_read_organisms` methods. Engines which know
+    the births and deaths override `_read_changes` as well.
+
+    Attributes:
+        world_grid (WorldGrid): Living space for organisms (world grid).
+        organism_l (OrganismStore): Organisms which are currently present in the game.
+        rules_engine (EvolutionRulesEngine): Resolves initial conflicts among organisms.
+        populated (bool): True if the representation is built, False otherwise.
+        born_organism_l (list): Organisms born in the last iteration, None if not known.
+        dead_organism_l (list): Organisms died in the last iteration, None if not known.
+    """
+    # True if `_load_organisms` loads the label grid of `LabelGridStore` without the organisms
+    LOADS_LABEL_GRID = False
+
+    def __init__(self, world_grid, organism_l, rules_engine):
+        self._organism_l = None
+        self._born_organism_l = None
+        self._dead_organism_l = None
+        self._random_choice_cnt = 0
+        self.populated = False
+
+        super(EngineWorld, self).__init__(world_grid, organism_l, rules_engine)
+
+    @property
+    def organism_l(self):
+        """OrganismStore: Organisms which are currently present in the game (built lazily)."""
+        if self._organism_l is None:
+            self._organism_l = self._get_all_organisms()
+        return self._organism_l
+
+    @organism_l.setter
+    def organism_l(self, organism_l):
+        self._organism_l = organism_l
+
+    @property
+    def born_organism_l(self):
+        """list: Organisms born in the last iteration (built lazily), None if not known."""
+        if self._born_organism_l is None:
+            self._born_organism_l, self._dead_organism_l = self._read_changes()
+        return self._born_organism_l
+
+    @born_organism_l.setter
+    def born_organism_l(self, born_organism_l):
+        self._born_organism_l = born_organism_l
+
+    @property
+    def dead_organism_l(self):
+        """list: Organisms died in the last iteration (built lazily), None if not known."""
+        if self._dead_organism_l is None:
+            self._born_organism_l, self._dead_organism_l = self._read_changes()
+        return self._dead_organism_l
+
+    @dead_organism_l.setter
+    def dead_organism_l(self, dead_organism_l):
+        self._dead_organism_l = dead_organism_l
+
+    @property
+    def random_choice_cnt(self):
+        """int: Amount of random choices made by the engine so far."""
+        return self._random_choice_cnt
+
+    def populate_initial_organisms(self):
+        """Populates world with initial organisms and builds the representation from them.
+
+        The label grid (see `LabelGridStore`) is loaded without populating the world grid,
+        if the engine supports it - there is one organism per cell, so no conflict.
+
+        Returns:
+            initial_conflict (bool): True if initial conflict occurred, False otherwise.
+
+        Raises:
+            WorldInternalError: If organisms provided to the game are not valid.
+        """
+        if self.LOADS_LABEL_GRID and isinstance(self._organism_l, LabelGridStore):
+            initial_conflict = False
+            self.generation = 0
+        else:
+            initial_conflict = super(EngineWorld, self).populate_initial_organisms()
+
+        self._load_organisms(self._organism_l)
+        self.populated = True
+        self.born_organism_l, self.dead_organism_l = [], []
+
+        return initial_conflict
+
+    def iterate(self):
+        """This method must be overriden in subclass.
+
+        Raises:
+            NotImplementedError: If method is not overriden.
+        """
+        raise NotImplementedError('This method must be overriden in subclass!')
+
+    def _invalidate_organisms(self):
+        """Drops the organisms built from the representation (it has evolved)."""
+        self._organism_l = None
+
+    def _invalidate_changes(self):
+        """Drops the births and deaths built from the representation (it has iterated)."""
+        self._born_organism_l = None
+        self._dead_organism_l = None
+
+    def _read_changes(self):
+        """Builds births and deaths of the last iteration from the representation.
+
+        Engines which do not keep the previous generation do not know the changes.
+
+        Returns:
+            born_organism_l (list): Organisms born in the last iteration, None if not known.
+            dead_organism_l (list): Organisms died in the last iteration, None if not known.
+        """
+        return None, None
+
+    def _load_organisms(self, organism_l):
+        """This method must be overriden in subclass.
+
+        Attributes:
+            organism_l (list): Organisms to be loaded into the representation.
+
+        Raises:
+            NotImplementedError: If method is not overriden.
+        """
+        raise NotImplementedError('This method must be overriden in subclass!')
+
+    def _get_species_at(self, x, y):
+        """This method must be overriden in subclass.
+
+        Attributes:
+            x (int): Valid coordinate at x axes.
+            y (int): Valid coordinate at y axes.
+
+        Returns:
+            species (int): Species of organism at x|y if exist, else None.
+
+        Raises:
+            NotImplementedError: If method is not overriden.
+        """
+        raise NotImplementedError('This method must be overriden in subclass!')
+
+    def _read_organisms(self):
+        """This method must be overriden in subclass.
+
+        Returns:
+            organism_l (list): Organisms ordered by x and then by y coordinates.
+
+        Raises:
+            NotImplementedError: If method is not overriden.
+        """
+        raise NotImplementedError('This method must be overriden in subclass!')
+
+    def _get_organism_at(self, x, y):
+        """Retrieves organism at coordinates x|y.
+
+        Reads the representation once the world is populated, the world grid otherwise.
+
+        Attributes:
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+
+        Returns:
+            organism (Organism): Organism if exist, else None.
+
+        Raises:
+            WorldInternalError: If coordinates (x|y) are not valid.
+        """
+        if not self.populated:
+            return super(EngineWorld, self)._get_organism_at(x, y)
+
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise WorldInternalError('Organism (X|Y) does not exist.')
+
+        species = self._get_species_at(x, y)
+        if species is not None:
+            return Organism(x, y, species)
+        return None
+
+    def _get_all_organisms(self):
+        """Retrieves all organisms which are positioned on the grid at the moment.
+
+        Returns:
+            organism_l (list): Organisms positioned on the grid.
+        """
+        if not self.populated:
+            return super(EngineWorld, self)._get_all_organisms()
+
+        return self._read_organisms()
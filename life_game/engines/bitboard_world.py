@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+from life_game.models.organism_store import OrganismStore
+from life_game.models.world import WorldInternalError
+from life_game.engines.base import EngineWorld
+
+
+class BitboardWorld(EngineWorld):
+    """World of a single species which evolves organisms by bitwise operations.
+
+    Each row of the grid (cells with the same x coordinate) is packed into one Python int,
+    bit y is set if there is an organism at x|y. Neighbors are counted by bitwise full adders,
+    so one operation evolves the whole row.
+
+    The rules of `EvolutionRulesEngine` are kept in the same order. Survival rule goes first
+    (two or three neighbors), isolation (less than two) and overcrowding (more than four)
+    can only kill the organism which did not survive, so as an organism with four neighbors
+    (no rule applied). Birth rule needs exactly three neighbors. Hence:
+        next = (neighbors == 3) | (organism & (neighbors == 2))
+
+    Attributes:
+        world_grid (WorldGrid): Living space for organisms (world grid).
+        organism_l (list): Organisms which are currently present in the game.
+        rules_engine (EvolutionRulesEngine): Resolves initial conflicts among organisms.
+        species (int): The only species living in the world.
+        row_l (list): Rows of the grid packed into ints, indexed by x coordinate.
+        previous_row_l (list): Rows of the grid before the last iteration.
+    """
+    def __init__(self, world_grid, organism_l, rules_engine):
+        self.species = None
+        self.row_l = []
+        self.previous_row_l = []
+
+        super(BitboardWorld, self).__init__(world_grid, organism_l, rules_engine)
+
+    @property
+    def row_mask(self):
+        """int: Mask with a bit set for every cell in the row."""
+        return (1 << self.height) - 1
+
+    def iterate(self):
+        """Main method to iterate the world.
+
+        Public method which have to be called after the world is populated with organisms.
+        As in `World.iterate`, the world is left untouched if no organism would evolve.
+        """
+        evolved_row_l = self._evolve_rows(self.row_l)
+
+        self.previous_row_l = self.row_l
+        self._invalidate_changes()
+
+        if any(evolved_row_l):
+            self.row_l = evolved_row_l
+            self._invalidate_organisms()
+
+        self.generation += 1
+
+    def _evolve_rows(self, row_l):
+        """Evolves all the rows of the grid.
+
+        Every row is split into horizontal sums first (two bits - sum and carry), the sums of
+        rows above and below are added to the row's own left|right pair afterwards.
+
+        Attributes:
+            row_l (list): Rows of the grid packed into ints.
+
+        Returns:
+            evolved_row_l (list): Rows of the next generation.
+        """
+        row_mask = self.row_mask
+        pair_sum_l, pair_carry_l, triple_sum_l, triple_carry_l = [], [], [], []
+
+        for row in row_l:
+            left, right = (row << 1) & row_mask, row >> 1
+            pair_sum, pair_carry = left ^ right, left & right
+            pair_sum_l.append(pair_sum)
+            pair_carry_l.append(pair_carry)
+            triple_sum_l.append(pair_sum ^ row)
+            triple_carry_l.append(pair_carry | (pair_sum & row))
+
+        # rows outside of the grid are empty
+        triple_sum_l = [0] + triple_sum_l + [0]
+        triple_carry_l = [0] + triple_carry_l + [0]
+
+        evolved_row_l = []
+
+        for x, row in enumerate(row_l):
+            above_sum, below_sum = triple_sum_l[x], triple_sum_l[x + 2]
+            above_carry, below_carry = triple_carry_l[x], triple_carry_l[x + 2]
+            own_sum, own_carry = pair_sum_l[x], pair_carry_l[x]
+
+            # ones: full adder over the sums, carry goes to twos
+            ones = above_sum ^ below_sum ^ own_sum
+            ones_carry = (above_sum & below_sum) | (own_sum & (above_sum ^ below_sum))
+            # twos: full adder over the carries, carry goes to fours
+            twos = above_carry ^ below_carry ^ own_carry
+            twos_carry = (above_carry & below_carry) | (own_carry & (above_carry ^ below_carry))
+            # add the carry of ones to twos
+            fours = twos_carry ^ (twos & ones_carry)
+            twos ^= ones_carry
+
+            # two or three neighbors (eight neighbors overflow to zero)
+            evolved_row_l.append(twos & ~fours & (ones | row))
+
+        return evolved_row_l
+
+    def _load_organisms(self, organism_l):
+        """Packs organisms into rows.
+
+        Attributes:
+            organism_l (list): Organisms to be loaded into the rows.
+
+        Raises:
+            WorldInternalError: If organisms are not of a single species.
+        """
+        species_s = set(organism.species for organism in organism_l)
+        if len(species_s) > 1:
+            raise WorldInternalError('Bitboard world supports a single species only.')
+
+        self.species = species_s.pop() if species_s else None
+        self.row_l = [0] * self.width
+
+        for organism in organism_l:
+            self.row_l[organism.x] |= 1 << organism.y
+
+        self.previous_row_l = self.row_l
+
+    def _get_species_at(self, x, y):
+        """Retrieves species at coordinates x|y from the rows.
+
+        Attributes:
+            x (int): Valid coordinate at x axes.
+            y (int): Valid coordinate at y axes.
+
+        Returns:
+            species (int): Species of organism at x|y if exist, else None.
+        """
+        if self.row_l[x] >> y & 1:
+            return self.species
+        return None
+
+    def _read_changes(self):
+        """Builds births and deaths of the last iteration by comparing the rows.
+
+        Returns:
+            born_organism_l (OrganismStore): Organisms born in the last iteration.
+            dead_organism_l (OrganismStore): Organisms died in the last iteration.
+        """
+        born_row_l = [row & ~previous_row for row, previous_row in zip(self.row_l,
+                                                                       self.previous_row_l)]
+        dead_row_l = [previous_row & ~row for row, previous_row in zip(self.row_l,
+                                                                       self.previous_row_l)]
+
+        return self._build_organisms(born_row_l), self._build_organisms(dead_row_l)
+
+    def _read_organisms(self):
+        """Builds organisms from the rows.
+
+        Returns:
+            organism_l (OrganismStore): Organisms ordered by x and then by y coordinates.
+        """
+        return self._build_organisms(self.row_l)
+
+    def _build_organisms(self, row_l):
+        """Builds organisms from the bits set in rows.
+
+        Attributes:
+            row_l (list): Rows packed into ints, indexed by x coordinate.
+
+        Returns:
+            organism_l (OrganismStore): Organisms ordered by x and then by y coordinates.
+        """
+        organism_l = OrganismStore()
+
+        for x, row in enumerate(row_l):
+            y = 0
+            while row:
+                if row & 1:
+                    organism_l.x_a.append(x)
+                    organism_l.y_a.append(y)
+                row >>= 1
+                y += 1
+
+        organism_l.species_a.extend([self.species] * len(organism_l.x_a))
+
+        return organism_l
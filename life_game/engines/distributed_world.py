@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+import time
+import socket
+import random
+
+import numpy as np
+
+from life_game.models.world import WorldInternalError
+from life_game.engines.numpy_world import NumpyWorld
+from life_game.engines.tile_world import get_stripes
+from life_game.distributed.protocol import send_message, receive_message, encode_load, \
+    encode_settle, encode_step, decode_result, decode_stripe, MESSAGE_LOAD, MESSAGE_STEP, \
+    MESSAGE_SNAPSHOT, MESSAGE_ACK, MESSAGE_RESULT, MESSAGE_STRIPE, MESSAGE_ERROR, ProtocolError
+
+
+class DistributedWorld(NumpyWorld):
+    """World which is evolved by worker processes connected over TCP (the coordinator).
+
+    The grid is split into stripes of rows (cells with the same x coordinate), every stripe
+    is owned by one worker (see `TileWorker`), possibly on another machine. In each generation
+    the coordinator sends every worker the halo rows (the edge rows of the neighbouring
+    stripes) and the worker replies with its own edge rows, the population of the stripe and
+    the births of more species. Those are resolved by the coordinator in the same order as
+    `NumpyWorld` does, so the results are the same, and the chosen species are sent with
+    the next request. Whole stripes are gathered only when the organisms are read (e.g. when
+    the state is saved) and for the checkpoints.
+
+    The checkpoint (label grid, random state) is kept every `checkpoint_interval`
+    generations. Once some worker fails (the connection is lost or times out), all the workers
+    are connected again, loaded from the checkpoint and the generations since the checkpoint
+    are evolved again, so the restarted worker catches up. The random state is restored
+    as well, so the replayed generations are the same (given the random module is not used
+    by anything else in the meantime). Choices of the seeded rules engine are keyed by
+    the generation and the cell, so they are the same without the random state.
+
+    Attributes:
+        world_grid (WorldGrid): Living space for organisms (world grid).
+        organism_l (list): Organisms which are currently present in the game.
+        rules_engine (EvolutionRulesEngine): Resolves initial conflicts among organisms.
+        worker_address_l (list): Hosts and ports of the workers (at most one per row is used).
+        checkpoint_interval (int): Amount of generations between checkpoints.
+        connect_timeout (float): Seconds the worker is waited for to accept the connection.
+        timeout (float): Seconds the worker is waited for to reply.
+        generation (int): Generation (iterations since the initial state).
+        population_d (dict): Amount of organisms by species.
+        species_l (list): Species identifiers, index + 1 is the label used in the array.
+        label_grid (numpy.ndarray): Species labels indexed by x|y coordinates (gathered
+            lazily).
+        previous_label_grid (numpy.ndarray): Species labels gathered before.
+    """
+    CHECKPOINT_INTERVAL = 100
+    CONNECT_TIMEOUT = 30.0
+    TIMEOUT = 300.0
+    RETRY_SECONDS = 0.1
+    RECOVERIES_CNT = 3
+
+    def __init__(self, world_grid, organism_l, rules_engine, worker_address_l=(),
+                 checkpoint_interval=CHECKPOINT_INTERVAL, connect_timeout=CONNECT_TIMEOUT,
+                 timeout=TIMEOUT):
+        self.worker_address_l = [tuple(address) for address in worker_address_l]
+        self.checkpoint_interval = checkpoint_interval
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.population_d = {}
+
+        self._connection_l = []
+        # edge rows (first and last) of every stripe
+        self._edge_row_l = []
+        # settlement of the last step (revert, choices) sent with the next request
+        self._settle_l = []
+        # generation, label grid, random state and amount of random choices
+        self._checkpoint = None
+        self._label_grid_generation = 0
+        self._previous_label_grid_generation = None
+
+        super(DistributedWorld, self).__init__(world_grid, organism_l, rules_engine)
+
+    @property
+    def workers_cnt(self):
+        """int: Amount of the workers used (at most one per row)."""
+        return min(len(self.worker_address_l), self.width)
+
+    @property
+    def stripe_l(self):
+        """list: Rows (x start and end) of the stripes, one per worker."""
+        return get_stripes(self.width, self.workers_cnt)
+
+    @property
+    def checkpoint_generation(self):
+        """int: Generation of the last checkpoint, None if there is not any."""
+        if self._checkpoint is None:
+            return None
+        return self._checkpoint[0]
+
+    def iterate(self):
+        """Main method to iterate the world.
+
+        Public method which have to be called after the world is populated with organisms.
+        As in `World.iterate`, the world is left untouched if no organism would evolve.
+
+        Raises:
+            WorldInternalError: If the workers fail and can not be recovered.
+        """
+        if not self.species_l:
+            return
+
+        self._exchange(self._step)
+        self.generation += 1
+        self._invalidate_changes()
+        self._invalidate_organisms()
+
+        if self.generation % self.checkpoint_interval == 0:
+            self._exchange(self._save_checkpoint)
+
+    def close(self):
+        """Closes the connections, the workers keep running for the next coordinator."""
+        for connection in self._connection_l:
+            connection.close()
+
+        self._connection_l = []
+
+    def _load_organisms(self, organism_l):
+        """Builds the array of species labels from organisms, it is the first checkpoint.
+
+        Attributes:
+            organism_l (list): Organisms to be loaded into the label grid.
+        """
+        super(DistributedWorld, self)._load_organisms(organism_l)
+
+        self.generation = 0
+        self._label_grid_generation = 0
+        self._previous_label_grid_generation = None
+        # random state is taken once the workers are loaded for the first time
+        self._checkpoint = (0, self.label_grid.copy(), None, self._random_choice_cnt)
+        self._count_population(np.bincount(self.label_grid.ravel(),
+                                           minlength=len(self.species_l) + 1))
+
+    def _get_species_at(self, x, y):
+        """Retrieves species at coordinates x|y from the gathered label grid."""
+        self._gather_label_grid()
+
+        return super(DistributedWorld, self)._get_species_at(x, y)
+
+    def _read_changes(self):
+        """Builds births and deaths of the last iteration from the gathered label grids.
+
+        Returns:
+            born_organism_l (OrganismStore): Organisms born in the last iteration, None
+                if the previous generation was not gathered.
+            dead_organism_l (OrganismStore): Organisms died in the last iteration, None
+                if the previous generation was not gathered.
+        """
+        self._gather_label_grid()
+
+        if self._previous_label_grid_generation != self.generation - 1:
+            return None, None
+
+        return super(DistributedWorld, self)._read_changes()
+
+    def _read_organisms(self):
+        """Builds organisms from the gathered label grid."""
+        self._gather_label_grid()
+
+        return super(DistributedWorld, self)._read_organisms()
+
+    def _exchange(self, method):
+        """Runs the exchange with the workers, they are recovered from the checkpoint if any
+        of them fails.
+
+        Attributes:
+            method (callable): Exchange with the connected workers.
+
+        Raises:
+            WorldInternalError: If the workers can not be recovered or some of them reports
+                an error.
+        """
+        recoveries_cnt = 0
+
+        while True:
+            try:
+                if not self._connection_l:
+                    self._restore_checkpoint()
+                return method()
+            except (socket.error, ProtocolError) as err:
+                self.close()
+
+                if recoveries_cnt >= self.RECOVERIES_CNT:
+                    raise WorldInternalError('Workers could not be recovered: %s' % err)
+                recoveries_cnt += 1
+
+    def _connect(self):
+        """Connects all the workers.
+
+        Raises:
+            WorldInternalError: If there are no workers.
+            socket.error: If some worker does not accept the connection in time.
+        """
+        if not self.workers_cnt:
+            raise WorldInternalError('There are no workers of the distributed world.')
+
+        deadline = time.time() + self.connect_timeout
+
+        for address in self.worker_address_l[:self.workers_cnt]:
+            while True:
+                try:
+                    connection = socket.create_connection(address, self.connect_timeout)
+                except socket.error:
+                    # the worker may be restarting
+                    if time.time() >= deadline:
+                        raise
+                    time.sleep(self.RETRY_SECONDS)
+                else:
+                    break
+
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection.settimeout(self.timeout)
+            self._connection_l.append(connection)
+
+    def _restore_checkpoint(self):
+        """Connects the workers, loads them from the checkpoint and evolves them again
+        to the current generation."""
+        self._connect()
+
+        generation, label_grid, random_state, random_choice_cnt = self._checkpoint
+        label_cnt = len(self.species_l) + 1
+
+        for index, (x_start, x_end) in enumerate(self.stripe_l):
+            send_message(self._connection_l[index], MESSAGE_LOAD,
+                         encode_load(label_grid[x_start:x_end], label_cnt))
+        for index in xrange(self.workers_cnt):
+            self._receive(index, MESSAGE_ACK)
+
+        self._edge_row_l = [(label_grid[x_start].copy(), label_grid[x_end - 1].copy())
+                            for x_start, x_end in self.stripe_l]
+        self._settle_l = [(False, [])] * self.workers_cnt
+
+        if random_state is None:
+            self._checkpoint = (generation, label_grid, random.getstate(), random_choice_cnt)
+        else:
+            random.setstate(random_state)
+            self._random_choice_cnt = random_choice_cnt
+
+        target_generation = self.generation
+        self.generation = generation
+        while self.generation < target_generation:
+            self._step()
+            self.generation += 1
+
+    def _save_checkpoint(self):
+        """Gathers the label grid and keeps it as the checkpoint."""
+        if self._label_grid_generation != self.generation:
+            self._gather_stripes()
+
+        self._checkpoint = (self.generation, self.label_grid.copy(), random.getstate(),
+                            self._random_choice_cnt)
+
+    def _step(self):
+        """Evolves all the stripes by one generation.
+
+        The births of more species are resolved stripe by stripe (as they are ordered by x),
+        the workers are told the chosen species (or to revert the generation if nothing
+        would evolve) with the next request.
+        """
+        last_index = self.workers_cnt - 1
+
+        for index, connection in enumerate(self._connection_l):
+            top_row = self._edge_row_l[index - 1][1] if index > 0 else None
+            bottom_row = self._edge_row_l[index + 1][0] if index < last_index else None
+            revert, choice_l = self._settle_l[index]
+            send_message(connection, MESSAGE_STEP,
+                         encode_step(revert, choice_l, top_row, bottom_row))
+
+        result_l = [decode_result(self._receive(index, MESSAGE_RESULT), self.height)
+                    for index in xrange(self.workers_cnt)]
+
+        population_a = np.zeros(len(self.species_l) + 1, dtype=np.int64)
+        edge_row_l, settle_l = [], []
+        alive = False
+
+        for (x_start, x_end), result in zip(self.stripe_l, result_l):
+            stripe_alive, stripe_population_a, first_row, last_row, tie_l = result
+            alive = alive or stripe_alive
+            population_a += stripe_population_a
+
+            choice_l = []
+            for x, y, label_l in tie_l:
+                label = self._choose_birth_label(label_l, x_start + x, y)
+                choice_l.extend((x, y, label))
+
+                # the stripe holds the first of the species until it is settled
+                population_a[label_l[0]] -= 1
+                population_a[label] += 1
+                if x == 0:
+                    first_row[y] = label
+                if x == x_end - x_start - 1:
+                    last_row[y] = label
+
+            edge_row_l.append((first_row, last_row))
+            settle_l.append((False, choice_l))
+
+        if alive:
+            self._edge_row_l, self._settle_l = edge_row_l, settle_l
+            self._count_population(population_a)
+        else:
+            self._settle_l = [(True, [])] * self.workers_cnt
+
+    def _gather_label_grid(self):
+        """Gathers the stripes of the current generation into the label grid (if not yet)."""
+        if self._label_grid_generation == self.generation:
+            return
+
+        self._exchange(self._gather_stripes)
+
+    def _gather_stripes(self):
+        """Requests the stripes of all the workers and builds the label grid from them."""
+        for index, connection in enumerate(self._connection_l):
+            revert, choice_l = self._settle_l[index]
+            send_message(connection, MESSAGE_SNAPSHOT, encode_settle(revert, choice_l))
+
+        label_grid = np.zeros((self.width, self.height), dtype=np.uint16)
+        for index, (x_start, x_end) in enumerate(self.stripe_l):
+            label_grid[x_start:x_end] = decode_stripe(self._receive(index, MESSAGE_STRIPE),
+                                                      self.height)
+
+        self._settle_l = [(False, [])] * self.workers_cnt
+
+        self.previous_label_grid, self._previous_label_grid_generation = \
+            self.label_grid, self._label_grid_generation
+        self.label_grid, self._label_grid_generation = label_grid, self.generation
+
+    def _receive(self, index, message_type):
+        """Receives the reply of the worker.
+
+        Attributes:
+            index (int): Index of the worker.
+            message_type (int): Type of the reply expected (one of `MESSAGE_*`).
+
+        Returns:
+            payload (str): Payload of the reply.
+
+        Raises:
+            WorldInternalError: If the worker reports an error.
+            ProtocolError: If the connection is closed or the reply is not expected.
+        """
+        reply_type, payload = receive_message(self._connection_l[index])
+
+        if reply_type is None:
+            raise ProtocolError('Worker %s:%d closed the connection.'
+                                % self.worker_address_l[index])
+        if reply_type == MESSAGE_ERROR:
+            raise WorldInternalError('Worker %s:%d failed: %s'
+                                     % (self.worker_address_l[index] + (payload,)))
+        if reply_type != message_type:
+            raise ProtocolError('Worker %s:%d replied by unexpected message: %d'
+                                % (self.worker_address_l[index] + (reply_type,)))
+
+        return payload
+
+    def _count_population(self, population_a):
+        """Keeps the amount of organisms by species.
+
+        Attributes:
+            population_a (numpy.ndarray): Amount of cells by label.
+        """
+        self.population_d = dict((species, int(population_a[index + 1]))
+                                 for index, species in enumerate(self.species_l))
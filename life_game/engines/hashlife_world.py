@@ -0,0 +1,469 @@
+#!/usr/bin/env python
+from life_game.models.organism_store import OrganismStore
+from life_game.models.neighbour_table import NeighbourTable
+from life_game.models.world import WorldInternalError
+from life_game.engines.base import EngineWorld
+
+
+class HashlifeNode(object):
+    """Represents a square of 2^level x 2^level cells in the quadtree.
+
+    Nodes are immutable and canonicalized (equal squares share one node), so the evolution
+    of a node can be memoized. Quadrants are `a` (low x, low y), `b` (low x, high y),
+    `c` (high x, low y) and `d` (high x, high y).
+
+    Attributes:
+        level (int): Level of the node, the node covers 2^level x 2^level cells.
+        a (HashlifeNode): Quadrant with low x and low y, None for a cell.
+        b (HashlifeNode): Quadrant with low x and high y, None for a cell.
+        c (HashlifeNode): Quadrant with high x and low y, None for a cell.
+        d (HashlifeNode): Quadrant with high x and high y, None for a cell.
+        population (int): Amount of organisms in the node.
+        state (int): State of the cell (one of `HashlifeWorld.STATE_*`), None for a square.
+    """
+    __slots__ = ('level', 'a', 'b', 'c', 'd', 'population', 'state')
+
+    def __init__(self, level, a, b, c, d, population, state=None):
+        self.level = level
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.population = population
+        self.state = state
+
+
+class HashlifeNodeCache(object):
+    """Bounded cache which evicts entries not used recently.
+
+    Entries are kept in two generations of dicts. When the recent generation is full,
+    the old one is dropped and the recent one becomes old. Entries found in the old
+    generation are moved back to the recent one.
+
+    Attributes:
+        max_size (int): Maximal amount of entries in the cache.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._recent_d = {}
+        self._old_d = {}
+
+    def __len__(self):
+        return len(self._recent_d) + len(self._old_d)
+
+    def get(self, key):
+        """Retrieves the value for key.
+
+        Attributes:
+            key (object): Key of the entry.
+
+        Returns:
+            value (object): Value of the entry if cached, else None.
+        """
+        value = self._recent_d.get(key)
+
+        if value is None:
+            value = self._old_d.pop(key, None)
+            if value is not None:
+                self.set(key, value)
+
+        return value
+
+    def set(self, key, value):
+        """Caches the value for key, evicts the old generation if the cache is full.
+
+        Attributes:
+            key (object): Key of the entry.
+            value (object): Value of the entry.
+        """
+        if len(self._recent_d) >= self.max_size // 2:
+            self._old_d = self._recent_d
+            self._recent_d = {}
+
+        self._recent_d[key] = value
+
+
+class HashlifeWorld(EngineWorld):
+    """World of a single species which jumps ahead by 2^k iterations at once (Hashlife).
+
+    The grid is embedded into a quadtree of canonicalized nodes. Cells outside of the grid
+    are walls - they never change and never count as neighbors, so the borders behave the
+    same as in `World`. Evolution of every node is memoized, which lets the world advance
+    by 2^k iterations in one step.
+
+    The rules of `EvolutionRulesEngine` reduce to: organism survives with two or three
+    neighbors, empty cell gives birth with exactly three neighbors (see `BitboardWorld`).
+
+    Attributes:
+        world_grid (WorldGrid): Living space for organisms (world grid).
+        organism_l (list): Organisms which are currently present in the game.
+        rules_engine (EvolutionRulesEngine): Resolves initial conflicts among organisms.
+        species (int): The only species living in the world.
+        root (HashlifeNode): Quadtree with the grid placed at (offset|offset).
+        offset (int): Position of the grid in the quadtree.
+        node_cache (HashlifeNodeCache): Canonical nodes by their quadrants.
+        evolution_cache (HashlifeNodeCache): Evolved nodes by node and step level.
+    """
+    STATE_DEAD = 0
+    STATE_ALIVE = 1
+    STATE_WALL = 2
+
+    JUMPS_AHEAD = True
+
+    CACHE_SIZE = 1 << 20
+
+    # level 2 node is evolved as 4x4 cells, only the center 2x2 cells
+    LEAF_NEIGHBOUR_TABLE = NeighbourTable.get(4, 4)
+    CENTER_INDEX_L = [5, 6, 9, 10]
+
+    def __init__(self, world_grid, organism_l, rules_engine, cache_size=CACHE_SIZE):
+        self.species = None
+        self.root = None
+        self.offset = 0
+
+        self.node_cache = HashlifeNodeCache(cache_size)
+        self.evolution_cache = HashlifeNodeCache(cache_size)
+
+        self._cell_l = [HashlifeNode(0, None, None, None, None, state, state)
+                        for state in (self.STATE_DEAD, self.STATE_ALIVE)]
+        self._cell_l.append(HashlifeNode(0, None, None, None, None, 0, self.STATE_WALL))
+        self._uniform_node_d = {}
+
+        super(HashlifeWorld, self).__init__(world_grid, organism_l, rules_engine)
+
+    def iterate(self):
+        """Main method to iterate the world.
+
+        Public method which have to be called after the world is populated with organisms.
+        """
+        self.advance(1)
+
+    def advance(self, iterations_cnt):
+        """Advances the world by the amount of iterations at once.
+
+        The iterations are split into steps of 2^k iterations (the biggest first). As in
+        `World.iterate`, the world is left untouched since the iteration in which no organism
+        would evolve, so the step which ends with no organisms is split into smaller ones.
+
+        Attributes:
+            iterations_cnt (int): Amount of iterations.
+        """
+        remaining_cnt = iterations_cnt
+        step_level = max(remaining_cnt.bit_length() - 1, 0)
+
+        # births and deaths are not known after a jump
+        self._invalidate_changes()
+
+        while remaining_cnt > 0:
+            if 1 << step_level > remaining_cnt:
+                step_level -= 1
+                continue
+
+            evolved_root = self._evolve_root(step_level)
+
+            if evolved_root.population == 0:
+                if step_level == 0:
+                    # no organism would evolve in the next iteration, the world stays the same
+                    break
+                step_level -= 1
+                continue
+
+            self.root = evolved_root
+            remaining_cnt -= 1 << step_level
+            self._invalidate_organisms()
+
+        self.generation += iterations_cnt
+
+    def _evolve_root(self, step_level):
+        """Evolves the whole quadtree by 2^step_level iterations.
+
+        Attributes:
+            step_level (int): Evolution goes by 2^step_level iterations.
+
+        Returns:
+            root (HashlifeNode): Evolved quadtree of the same level as the current one.
+        """
+        while self.root.level < step_level + 2:
+            self.offset += 1 << (self.root.level - 1)
+            self.root = self._expand(self.root)
+
+        # the evolved node is the center of the root, expanding it keeps the grid in place
+        return self._expand(self._evolve(self.root, step_level))
+
+    def _evolve(self, node, step_level):
+        """Evolves the center of the node by 2^step_level iterations.
+
+        Attributes:
+            node (HashlifeNode): Node of level 2 or higher.
+            step_level (int): Evolution goes by 2^step_level iterations (at most level - 2).
+
+        Returns:
+            node (HashlifeNode): Evolved center of the node, one level lower.
+        """
+        if node.population == 0:
+            # walls and empty cells never change
+            return self._get_center(node)
+
+        step_level = min(step_level, node.level - 2)
+        key = (node, step_level)
+
+        evolved_node = self.evolution_cache.get(key)
+        if evolved_node is not None:
+            return evolved_node
+
+        if node.level == 2:
+            evolved_node = self._evolve_cells(node)
+        else:
+            a, b, c, d = node.a, node.b, node.c, node.d
+            # nine overlapping sub-squares, evolved by 2^step_level (at most half of the step)
+            n00 = self._evolve(a, step_level)
+            n01 = self._evolve(self._join(a.b, b.a, a.d, b.c), step_level)
+            n02 = self._evolve(b, step_level)
+            n10 = self._evolve(self._join(a.c, a.d, c.a, c.b), step_level)
+            n11 = self._evolve(self._join(a.d, b.c, c.b, d.a), step_level)
+            n12 = self._evolve(self._join(b.c, b.d, d.a, d.b), step_level)
+            n20 = self._evolve(c, step_level)
+            n21 = self._evolve(self._join(c.b, d.a, c.d, d.c), step_level)
+            n22 = self._evolve(d, step_level)
+
+            if step_level < node.level - 2:
+                # the whole step is done, just take centers
+                evolved_node = self._join(self._join(n00.d, n01.c, n10.b, n11.a),
+                                          self._join(n01.d, n02.c, n11.b, n12.a),
+                                          self._join(n10.d, n11.c, n20.b, n21.a),
+                                          self._join(n11.d, n12.c, n21.b, n22.a))
+            else:
+                # the second half of the step
+                evolved_node = self._join(self._evolve(self._join(n00, n01, n10, n11), step_level),
+                                          self._evolve(self._join(n01, n02, n11, n12), step_level),
+                                          self._evolve(self._join(n10, n11, n20, n21), step_level),
+                                          self._evolve(self._join(n11, n12, n21, n22), step_level))
+
+        self.evolution_cache.set(key, evolved_node)
+        return evolved_node
+
+    def _evolve_cells(self, node):
+        """Evolves the center 2x2 cells of the level 2 node (4x4 cells) by one iteration.
+
+        Attributes:
+            node (HashlifeNode): Node of level 2.
+
+        Returns:
+            node (HashlifeNode): Evolved center of the node (level 1).
+        """
+        a, b, c, d = node.a, node.b, node.c, node.d
+        # cells of the 4x4 grid by flat indices (x * 4 + y), the center ones have no
+        # neighbours outside of it
+        cell_l = [a.a, a.b, b.a, b.b,
+                  a.c, a.d, b.c, b.d,
+                  c.a, c.b, d.a, d.b,
+                  c.c, c.d, d.c, d.d]
+
+        evolved_cell_l = []
+
+        for index in self.CENTER_INDEX_L:
+            cell = cell_l[index]
+            if cell.state == self.STATE_WALL:
+                evolved_cell_l.append(cell)
+                continue
+
+            neighbors_cnt = sum(cell_l[neighbour_index].population for neighbour_index
+                                in self.LEAF_NEIGHBOUR_TABLE.get_neighbour_indices(index))
+
+            if neighbors_cnt == 3 or (neighbors_cnt == 2 and cell.population):
+                evolved_cell_l.append(self._cell_l[self.STATE_ALIVE])
+            else:
+                evolved_cell_l.append(self._cell_l[self.STATE_DEAD])
+
+        return self._join(*evolved_cell_l)
+
+    def _join(self, a, b, c, d):
+        """Retrieves the canonical node made of four quadrants.
+
+        Attributes:
+            a (HashlifeNode): Quadrant with low x and low y.
+            b (HashlifeNode): Quadrant with low x and high y.
+            c (HashlifeNode): Quadrant with high x and low y.
+            d (HashlifeNode): Quadrant with high x and high y.
+
+        Returns:
+            node (HashlifeNode): Node one level higher than the quadrants.
+        """
+        key = (a, b, c, d)
+
+        node = self.node_cache.get(key)
+        if node is None:
+            node = HashlifeNode(a.level + 1, a, b, c, d,
+                                a.population + b.population + c.population + d.population)
+            self.node_cache.set(key, node)
+
+        return node
+
+    def _get_center(self, node):
+        """Retrieves the center of the node, one level lower.
+
+        Attributes:
+            node (HashlifeNode): Node of level 2 or higher.
+
+        Returns:
+            node (HashlifeNode): Center of the node.
+        """
+        return self._join(node.a.d, node.b.c, node.c.b, node.d.a)
+
+    def _expand(self, node):
+        """Surrounds the node by walls, the node becomes center of the new node.
+
+        Attributes:
+            node (HashlifeNode): Node of level 1 or higher.
+
+        Returns:
+            node (HashlifeNode): Node one level higher.
+        """
+        wall = self._get_uniform_node(self.STATE_WALL, node.level - 1)
+
+        return self._join(self._join(wall, wall, wall, node.a),
+                          self._join(wall, wall, node.b, wall),
+                          self._join(wall, node.c, wall, wall),
+                          self._join(node.d, wall, wall, wall))
+
+    def _get_uniform_node(self, state, level):
+        """Retrieves the node with all the cells in the same state.
+
+        Attributes:
+            state (int): State of the cells.
+            level (int): Level of the node.
+
+        Returns:
+            node (HashlifeNode): Uniform node.
+        """
+        if level == 0:
+            return self._cell_l[state]
+
+        key = (state, level)
+
+        node = self._uniform_node_d.get(key)
+        if node is None:
+            quadrant = self._get_uniform_node(state, level - 1)
+            node = self._join(quadrant, quadrant, quadrant, quadrant)
+            self._uniform_node_d[key] = node
+
+        return node
+
+    def _load_organisms(self, organism_l):
+        """Builds the quadtree from organisms.
+
+        The grid is placed to the center of the quadtree, which is big enough to keep
+        the grid in the center after evolution.
+
+        Attributes:
+            organism_l (list): Organisms to be loaded into the quadtree.
+
+        Raises:
+            WorldInternalError: If organisms are not of a single species.
+        """
+        species_s = set(organism.species for organism in organism_l)
+        if len(species_s) > 1:
+            raise WorldInternalError('Hashlife world supports a single species only.')
+
+        self.species = species_s.pop() if species_s else None
+
+        level = 2
+        while 1 << (level - 1) < max(self.width, self.height):
+            level += 1
+
+        self.offset = 1 << (level - 2)
+        cell_l = [(organism.x, organism.y) for organism in organism_l]
+        self.root = self._build_node(level, -self.offset, -self.offset, cell_l)
+
+    def _build_node(self, level, x, y, cell_l):
+        """Builds the node of cells at x|y coordinates of the grid.
+
+        Attributes:
+            level (int): Level of the node.
+            x (int): Coordinate of the node's low x corner (can be outside of the grid).
+            y (int): Coordinate of the node's low y corner (can be outside of the grid).
+            cell_l (list): Cells (x|y) with organisms inside the node.
+
+        Returns:
+            node (HashlifeNode): Node of cells.
+        """
+        size = 1 << level
+
+        if x >= self.width or y >= self.height or x + size <= 0 or y + size <= 0:
+            return self._get_uniform_node(self.STATE_WALL, level)
+
+        inside = x >= 0 and y >= 0 and x + size <= self.width and y + size <= self.height
+        if inside and not cell_l:
+            return self._get_uniform_node(self.STATE_DEAD, level)
+
+        if level == 0:
+            return self._cell_l[self.STATE_ALIVE if cell_l else self.STATE_DEAD]
+
+        half = size >> 1
+        quadrant_cell_l = [[], [], [], []]
+        for cell in cell_l:
+            quadrant_cell_l[(cell[0] >= x + half) * 2 + (cell[1] >= y + half)].append(cell)
+
+        return self._join(self._build_node(level - 1, x, y, quadrant_cell_l[0]),
+                          self._build_node(level - 1, x, y + half, quadrant_cell_l[1]),
+                          self._build_node(level - 1, x + half, y, quadrant_cell_l[2]),
+                          self._build_node(level - 1, x + half, y + half, quadrant_cell_l[3]))
+
+    def _get_species_at(self, x, y):
+        """Retrieves species at coordinates x|y from the quadtree.
+
+        Attributes:
+            x (int): Valid coordinate at x axes.
+            y (int): Valid coordinate at y axes.
+
+        Returns:
+            species (int): Species of organism at x|y if exist, else None.
+        """
+        node = self.root
+        x, y = x + self.offset, y + self.offset
+
+        while node.level > 0 and node.population:
+            half = 1 << (node.level - 1)
+            if x < half:
+                node = node.a if y < half else node.b
+            else:
+                node = node.c if y < half else node.d
+            x, y = x % half, y % half
+
+        if node.population:
+            return self.species
+        return None
+
+    def _read_organisms(self):
+        """Builds organisms from the quadtree.
+
+        Returns:
+            organism_l (OrganismStore): Organisms ordered by x and then by y coordinates.
+        """
+        cell_l = []
+        self._read_cells(self.root, -self.offset, -self.offset, cell_l)
+        cell_l.sort()
+
+        return OrganismStore.from_cells((x, y, self.species) for x, y in cell_l)
+
+    def _read_cells(self, node, x, y, cell_l):
+        """Collects cells with organisms in the node.
+
+        Attributes:
+            node (HashlifeNode): Node to be read.
+            x (int): Coordinate of the node's low x corner.
+            y (int): Coordinate of the node's low y corner.
+            cell_l (list): Cells (x|y) with organisms, extended in place.
+        """
+        if not node.population:
+            return
+
+        if node.level == 0:
+            cell_l.append((x, y))
+            return
+
+        half = 1 << (node.level - 1)
+        self._read_cells(node.a, x, y, cell_l)
+        self._read_cells(node.b, x, y + half, cell_l)
+        self._read_cells(node.c, x + half, y, cell_l)
+        self._read_cells(node.d, x + half, y + half, cell_l)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+import random
+
+import numpy as np
+
+from life_game.models.organism_store import OrganismStore, LabelGridStore
+from life_game.models.world import WorldInternalError
+from life_game.engines.base import EngineWorld
+
+NEIGHBOR_OFFSET_L = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+class NumpyWorld(EngineWorld):
+    """World which evolves all the organisms at once by vectorized NumPy operations.
+
+    The grid is kept as a 2d array of species labels (0 stands for an empty cell), neighbors
+    of every cell are counted per species by summing shifted arrays and the evolution rules
+    are applied as array masks. Results follow the semantics of `EvolutionRulesEngine`:
+        - organism survives if there are two or three neighbors of its species,
+        - otherwise it dies (isolation, overcrowding or no rule applied at all),
+        - empty cell gives birth if there are exactly three neighbors of one species,
+          species is chosen randomly if there are more such species.
+
+    Species of the births are chosen by the `random` module in the order of the cells, or all
+    at once by the cell and the generation if the rules engine is seeded (see `CellRandom`).
+
+    The label grid of `LabelGridStore` (e.g. mapped from a binary file) is used as it is,
+    if its species are the labels already, otherwise it is relabeled in one pass.
+
+    Attributes:
+        world_grid (WorldGrid): Living space for organisms (world grid).
+        organism_l (list): Organisms which are currently present in the game.
+        rules_engine (EvolutionRulesEngine): Resolves initial conflicts among organisms.
+        species_l (list): Species identifiers, index + 1 is the label used in the array.
+        label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+        previous_label_grid (numpy.ndarray): Species labels before the last iteration.
+    """
+    LOADS_LABEL_GRID = True
+
+    def __init__(self, world_grid, organism_l, rules_engine):
+        self.species_l = []
+        self.label_grid = None
+        self.previous_label_grid = None
+
+        super(NumpyWorld, self).__init__(world_grid, organism_l, rules_engine)
+
+    def iterate(self):
+        """Main method to iterate the world.
+
+        Public method which have to be called after the world is populated with organisms.
+        As in `World.iterate`, the world is left untouched if no organism would evolve.
+        """
+        if not self.species_l:
+            self.generation += 1
+            return
+
+        evolved_label_grid = self._evolve_label_grid(self.label_grid)
+
+        self.previous_label_grid = self.label_grid
+        self._invalidate_changes()
+
+        if evolved_label_grid.any():
+            self.label_grid = evolved_label_grid
+            self._invalidate_organisms()
+
+        self.generation += 1
+
+    def _evolve_label_grid(self, label_grid):
+        """Evolves all the cells of the label grid in one vectorized pass.
+
+        Attributes:
+            label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+
+        Returns:
+            evolved_label_grid (numpy.ndarray): Species labels of the next generation.
+        """
+        evolved_label_grid, birth_candidates, birth_candidates_cnt = \
+            self._apply_rules(label_grid)
+
+        # species for the new organism is chosen randomly if more of them can give birth
+        tie_a = np.argwhere(birth_candidates_cnt > 1)
+        cell_random = self.rules_engine.cell_random
+
+        if cell_random is None:
+            for x, y in tie_a:
+                label_l = np.flatnonzero(birth_candidates[:, x, y]) + 1
+                evolved_label_grid[x, y] = self._choose_birth_label(label_l, x, y)
+        elif len(tie_a):
+            x_a, y_a = tie_a[:, 0], tie_a[:, 1]
+            index_a = cell_random.get_indexes(birth_candidates_cnt[x_a, y_a], self.generation,
+                                              x_a, y_a)
+            # label of the candidate at the index, the candidates are ordered by label
+            rank_a = birth_candidates[:, x_a, y_a].cumsum(axis=0)
+            evolved_label_grid[x_a, y_a] = (rank_a > index_a).argmax(axis=0) + 1
+            self._random_choice_cnt += len(tie_a)
+
+        return evolved_label_grid
+
+    def _choose_birth_label(self, label_l, x, y):
+        """Chooses randomly the label of the born organism among more labels.
+
+        Same choice as `EvolutionRulesEngine.choose_birth_species` makes among the species
+        (the labels are ordered as the species).
+
+        Attributes:
+            label_l (list): Labels which can give birth, ordered.
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+
+        Returns:
+            label (int): Label of the born organism.
+        """
+        self._random_choice_cnt += 1
+
+        cell_random = self.rules_engine.cell_random
+        if cell_random is not None:
+            return cell_random.choose(label_l, self.generation, (int(x), int(y)))
+
+        return random.choice(label_l)
+
+    def _apply_rules(self, label_grid):
+        """Applies the rules on all the cells of the label grid, births are not resolved.
+
+        Attributes:
+            label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+
+        Returns:
+            Results of `apply_rules`.
+        """
+        return apply_rules(label_grid, len(self.species_l) + 1)
+
+    def _load_organisms(self, organism_l):
+        """Builds the array of species labels from organisms.
+
+        Attributes:
+            organism_l (list): Organisms to be loaded into the label grid.
+
+        Raises:
+            WorldInternalError: If the label grid does not match the world grid.
+        """
+        if isinstance(organism_l, LabelGridStore):
+            self._load_label_grid(organism_l)
+            return
+
+        self.species_l = sorted(set(organism.species for organism in organism_l))
+        self.label_grid = np.zeros((self.width, self.height), dtype=np.uint16)
+
+        for organism in organism_l:
+            self.label_grid[organism.x, organism.y] = self.species_l.index(organism.species) + 1
+
+        self.previous_label_grid = self.label_grid
+
+    def _load_label_grid(self, label_grid_store):
+        """Loads the grid of species labels of the store, without building the organisms.
+
+        Attributes:
+            label_grid_store (LabelGridStore): Store with the grid of species labels.
+
+        Raises:
+            WorldInternalError: If the label grid does not match the world grid.
+        """
+        species_grid = label_grid_store.label_grid
+        if species_grid.shape != (self.width, self.height):
+            raise WorldInternalError('Label grid does not match the world grid.')
+
+        species_a = np.flatnonzero(label_grid_store.count_species()[1:]) + 1
+        self.species_l = [int(species) for species in species_a]
+
+        if self.species_l == range(1, len(self.species_l) + 1):
+            # labels are the species, the grid is not changed by the evolution
+            self.label_grid = species_grid
+        else:
+            label_a = np.zeros(species_a[-1] + 1, dtype=np.uint16)
+            label_a[species_a] = np.arange(1, len(species_a) + 1)
+            self.label_grid = label_a[species_grid]
+
+        self.previous_label_grid = self.label_grid
+
+    def _get_species_at(self, x, y):
+        """Retrieves species at coordinates x|y from the label grid.
+
+        Attributes:
+            x (int): Valid coordinate at x axes.
+            y (int): Valid coordinate at y axes.
+
+        Returns:
+            species (int): Species of organism at x|y if exist, else None.
+        """
+        label = self.label_grid[x, y]
+        if label:
+            return self.species_l[label - 1]
+        return None
+
+    def _read_changes(self):
+        """Builds births and deaths of the last iteration by comparing the label grids.
+
+        Returns:
+            born_organism_l (OrganismStore): Organisms born in the last iteration.
+            dead_organism_l (OrganismStore): Organisms died in the last iteration.
+        """
+        alive = self.label_grid > 0
+        previous_alive = self.previous_label_grid > 0
+
+        born_organism_l = self._build_organisms(self.label_grid, alive & ~previous_alive)
+        dead_organism_l = self._build_organisms(self.previous_label_grid, previous_alive & ~alive)
+
+        return born_organism_l, dead_organism_l
+
+    def _build_organisms(self, label_grid, mask):
+        """Builds organisms from the label grid at the cells selected by mask.
+
+        Attributes:
+            label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+            mask (numpy.ndarray): Selected cells indexed by x|y coordinates.
+
+        Returns:
+            organism_l (OrganismStore): Organisms ordered by x and then by y coordinates.
+        """
+        x_a, y_a = np.nonzero(mask)
+        species_a = np.array([0] + self.species_l)[label_grid[x_a, y_a]]
+
+        return OrganismStore.from_arrays(x_a, y_a, species_a)
+
+    def _read_organisms(self):
+        """Builds organisms from the label grid.
+
+        Returns:
+            organism_l (OrganismStore): Organisms ordered by x and then by y coordinates.
+        """
+        return self._build_organisms(self.label_grid, self.label_grid > 0)
+
+
+def apply_rules(label_grid, label_cnt):
+    """Applies the rules on all the cells of the label grid, births are not resolved.
+
+    Cells out of the label grid are considered empty.
+
+    Attributes:
+        label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+        label_cnt (int): Amount of labels including the empty one (amount of species + 1).
+
+    Returns:
+        evolved_label_grid (numpy.ndarray): Species labels of the next generation, the cell
+            where more species can give birth holds the first of them.
+        birth_candidates (numpy.ndarray): Species (label - 1) which can give birth indexed
+            by label and x|y coordinates.
+        birth_candidates_cnt (numpy.ndarray): Amount of species which can give birth
+            indexed by x|y coordinates.
+    """
+    count_grid = count_neighbors(label_grid, label_cnt)
+    alive = label_grid > 0
+
+    # plane 0 counts empty neighbors, so the label itself picks the count of own species
+    own_count = np.take_along_axis(count_grid, label_grid[np.newaxis].astype(np.intp),
+                                   axis=0)[0]
+    # survival rule is applied first, isolation, overcrowding and 4 neighbors kill
+    survival = alive & ((own_count == 2) | (own_count == 3))
+
+    birth_candidates = (count_grid[1:] == 3) & ~alive
+    birth_candidates_cnt = birth_candidates.sum(axis=0)
+
+    evolved_label_grid = np.where(survival, label_grid, 0).astype(np.uint16)
+    birth = birth_candidates_cnt > 0
+    evolved_label_grid[birth] = birth_candidates.argmax(axis=0)[birth] + 1
+
+    return evolved_label_grid, birth_candidates, birth_candidates_cnt
+
+
+def count_neighbors(label_grid, label_cnt):
+    """Counts neighbors of every cell per species by summing shifted arrays.
+
+    Attributes:
+        label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+        label_cnt (int): Amount of labels including the empty one.
+
+    Returns:
+        count_grid (numpy.ndarray): Neighbor counts indexed by label and x|y coordinates.
+    """
+    width, height = label_grid.shape
+
+    padded_grid = np.zeros((label_cnt, width + 2, height + 2), dtype=np.uint8)
+    padded_grid[:, 1:-1, 1:-1] = \
+        label_grid[np.newaxis] == np.arange(label_cnt)[:, np.newaxis, np.newaxis]
+
+    count_grid = np.zeros((label_cnt, width, height), dtype=np.uint8)
+    for dx, dy in NEIGHBOR_OFFSET_L:
+        count_grid += padded_grid[:, 1 + dx:width + 1 + dx, 1 + dy:height + 1 + dy]
+
+    return count_grid
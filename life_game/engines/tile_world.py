@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+import mmap
+import multiprocessing
+
+import numpy as np
+
+from life_game.models.world import WorldInternalError
+from life_game.engines.numpy_world import NumpyWorld
+
+
+class TileWorld(NumpyWorld):
+    """World which evolves stripes of the grid in parallel worker processes.
+
+    The grid is split into stripes of rows (cells with the same x coordinate), every stripe
+    is owned by one worker process. The label grid (see `NumpyWorld`) is double buffered
+    in shared memory (anonymous `mmap` inherited by the forked workers), so nothing but
+    a short command and the reply is sent between the processes in each generation.
+
+    In each generation the workers read the current buffer and write their stripes to
+    the other one. The halo (one row of each neighbouring stripe) is read from the current
+    buffer directly - it is not changed until all the workers reply, which is the barrier
+    of the generation. Births of more species in one cell are resolved by the world after
+    the barrier, in the same order as `NumpyWorld` does, so the results are the same.
+
+    Workers are forked once the world is populated and stopped by `close` (or with
+    the process as they are daemonic). The thread of `BackgroundStateWriter` may already
+    exist then (it is started with the IO handler), which is safe - no state has been
+    submitted yet, so the thread waits for one, and the forked worker touches nothing but
+    its connection and the shared buffers (no lock or file of the writer).
+
+    Attributes:
+        world_grid (WorldGrid): Living space for organisms (world grid).
+        organism_l (list): Organisms which are currently present in the game.
+        rules_engine (EvolutionRulesEngine): Resolves initial conflicts among organisms.
+        workers_cnt (int): Amount of worker processes (at most one per row).
+        species_l (list): Species identifiers, index + 1 is the label used in the array.
+        label_grid (numpy.ndarray): Species labels indexed by x|y coordinates.
+        previous_label_grid (numpy.ndarray): Species labels before the last iteration.
+    """
+    LABEL_DTYPE = np.uint16
+
+    def __init__(self, world_grid, organism_l, rules_engine, workers_cnt=None):
+        self.workers_cnt = min(workers_cnt or multiprocessing.cpu_count(), world_grid.width)
+
+        self._buffer_l = []
+        self._label_grid_l = []
+        self._current_index = 0
+        self._process_l = []
+        self._connection_l = []
+
+        super(TileWorld, self).__init__(world_grid, organism_l, rules_engine)
+
+    @property
+    def stripe_l(self):
+        """list: Rows (x start and end) of the stripes, one per worker."""
+        return get_stripes(self.width, self.workers_cnt)
+
+    def populate_initial_organisms(self):
+        """Populates world with initial organisms and starts the worker processes.
+
+        Returns:
+            initial_conflict (bool): True if initial conflict occurred, False otherwise.
+
+        Raises:
+            WorldInternalError: If organisms provided to the game are not valid.
+        """
+        initial_conflict = super(TileWorld, self).populate_initial_organisms()
+
+        # workers of the previous population would read the old buffers
+        self.close()
+        if self.species_l:
+            self._start_workers()
+
+        return initial_conflict
+
+    def iterate(self):
+        """Main method to iterate the world.
+
+        Public method which have to be called after the world is populated with organisms.
+        As in `World.iterate`, the world is left untouched if no organism would evolve.
+
+        Raises:
+            WorldInternalError: If some of the workers fails.
+        """
+        if not self.species_l:
+            self.generation += 1
+            return
+
+        if not self._process_l:
+            raise WorldInternalError('Workers of the tile world are not running.')
+
+        next_index = 1 - self._current_index
+        for connection in self._connection_l:
+            connection.send(self._current_index)
+
+        # barrier, the current buffer is not read by any worker afterwards
+        reply_l = []
+        for connection in self._connection_l:
+            try:
+                reply_l.append(connection.recv())
+            except EOFError:
+                raise WorldInternalError('Worker of the tile world has stopped.')
+
+        error_l = [error for error, _, _ in reply_l if error]
+        if error_l:
+            raise WorldInternalError('Worker of the tile world failed: %s' % error_l[0])
+
+        # stripes are ordered by x, births are resolved in the same order as by `NumpyWorld`
+        evolved_label_grid = self._label_grid_l[next_index]
+        for _, birth_l, _ in reply_l:
+            for x, y, label_l in birth_l:
+                evolved_label_grid[x, y] = self._choose_birth_label(label_l, x, y)
+
+        self.previous_label_grid = self.label_grid
+        self._invalidate_changes()
+
+        if any(alive for _, _, alive in reply_l):
+            self.label_grid = evolved_label_grid
+            self._current_index = next_index
+            self._invalidate_organisms()
+
+        self.generation += 1
+
+    def close(self):
+        """Stops the worker processes."""
+        for connection in self._connection_l:
+            try:
+                connection.send(None)
+            except (OSError, IOError):
+                # the worker has stopped already
+                pass
+
+        for process in self._process_l:
+            process.join()
+
+        self._process_l, self._connection_l = [], []
+
+    def _load_organisms(self, organism_l):
+        """Builds the array of species labels from organisms in the shared buffers.
+
+        Attributes:
+            organism_l (list): Organisms to be loaded into the label grid.
+        """
+        super(TileWorld, self)._load_organisms(organism_l)
+
+        size = self.width * self.height * np.dtype(self.LABEL_DTYPE).itemsize
+        self._buffer_l = [mmap.mmap(-1, max(size, 1)) for _ in xrange(2)]
+        self._label_grid_l = [
+            np.frombuffer(buffer, dtype=self.LABEL_DTYPE, count=self.width * self.height)
+            .reshape(self.width, self.height) for buffer in self._buffer_l]
+
+        self._current_index = 0
+        self._label_grid_l[0][:] = self.label_grid
+        self.label_grid = self.previous_label_grid = self._label_grid_l[0]
+
+    def _start_workers(self):
+        """Starts the worker process of every stripe."""
+        for x_start, x_end in self.stripe_l:
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=self._run_worker,
+                                              args=(worker_connection, x_start, x_end))
+            process.daemon = True
+            process.start()
+            worker_connection.close()
+
+            self._process_l.append(process)
+            self._connection_l.append(connection)
+
+    def _run_worker(self, connection, x_start, x_end):
+        """Evolves the stripe whenever the index of the current buffer is received.
+
+        The worker replies with the error (None if there is not any), the births of more
+        species (x|y|labels) and whether there is any organism in the evolved stripe.
+        The loop ends once None is received.
+
+        Attributes:
+            connection (Connection): Connection to the world.
+            x_start (int): The first row of the stripe.
+            x_end (int): The row after the last one of the stripe.
+        """
+        while True:
+            current_index = connection.recv()
+            if current_index is None:
+                break
+
+            try:
+                birth_l, alive = self._evolve_stripe(current_index, x_start, x_end)
+            except Exception as err:
+                connection.send((repr(err), [], False))
+            else:
+                connection.send((None, birth_l, alive))
+
+        connection.close()
+
+    def _evolve_stripe(self, current_index, x_start, x_end):
+        """Evolves the stripe from the current buffer to the other one.
+
+        Attributes:
+            current_index (int): Index of the current buffer.
+            x_start (int): The first row of the stripe.
+            x_end (int): The row after the last one of the stripe.
+
+        Returns:
+            birth_l (list): Births of more species (x|y|labels) ordered by x and then by y.
+            alive (bool): True if there is any organism in the evolved stripe.
+        """
+        label_grid = self._label_grid_l[current_index]
+        evolved_label_grid = self._label_grid_l[1 - current_index]
+
+        # stripe with the halo, the rows out of the grid are empty (as in `NumpyWorld`)
+        halo_start, halo_end = max(x_start - 1, 0), min(x_end + 1, self.width)
+        evolved_halo_grid, birth_candidates, birth_candidates_cnt = \
+            self._apply_rules(label_grid[halo_start:halo_end])
+
+        stripe = slice(x_start - halo_start, x_end - halo_start)
+        evolved_label_grid[x_start:x_end] = evolved_halo_grid[stripe]
+
+        birth_l = [
+            (int(x) + x_start, int(y),
+             [int(label) for label in np.flatnonzero(
+                 birth_candidates[:, int(x) + x_start - halo_start, y]) + 1])
+            for x, y in np.argwhere(birth_candidates_cnt[stripe] > 1)]
+
+        return birth_l, bool(evolved_label_grid[x_start:x_end].any())
+
+
+def get_stripes(width, stripes_cnt):
+    """Splits the rows of the grid into stripes of (nearly) the same size.
+
+    Attributes:
+        width (int): Amount of rows (cells at x axes) of the grid.
+        stripes_cnt (int): Amount of the stripes (at most the amount of rows).
+
+    Returns:
+        (list): Rows (x start and end) of the stripes ordered by x.
+    """
+    return [(width * stripe // stripes_cnt, width * (stripe + 1) // stripes_cnt)
+            for stripe in xrange(stripes_cnt)]
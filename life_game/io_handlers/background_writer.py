@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+import threading
+from collections import namedtuple
+
+from life_game.models.state import State
+from life_game.models.organism_store import OrganismStore
+
+# immutable copy of organism, the game may change organisms while the snapshot is written
+OrganismSnapshot = namedtuple('OrganismSnapshot', ['x', 'y', 'species'])
+
+
+class SnapshotStore(OrganismStore):
+    """Store of a snapshot, its organisms are built as immutable snapshots."""
+    ORGANISM_CLASS = OrganismSnapshot
+
+
+class BackgroundStateWriter(object):
+    """Writes states in a background thread, so the game does not wait for the IO.
+
+    States are handed over through a bounded queue with a single slot. If the writer falls
+    behind, the stale state in the slot is replaced by the newer one (coalesced), so only
+    the newest pending state is written. Error of the write is raised by the next call
+    of `submit`, `wait` or `close`.
+
+    Attributes:
+        write_function (callable): Writes the state and iteration (called in background).
+        coalesced_cnt (int): Amount of states which were replaced before they were written.
+    """
+    def __init__(self, write_function):
+        self.write_function = write_function
+        self.coalesced_cnt = 0
+
+        # reentrant, so the signal handler can flush the state while the game submits one
+        self._condition = threading.Condition(threading.RLock())
+        self._pending_item = None
+        self._writing = False
+        self._closed = False
+        self._error = None
+
+        self._thread = threading.Thread(target=self._run, name='state-writer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    @staticmethod
+    def take_snapshot(state, iteration):
+        """Takes an immutable snapshot of the state.
+
+        Attributes:
+            state (State): State to be written.
+            iteration (int): Iteration to be written.
+
+        Returns:
+            state (State): State with organisms copied to the store owned by the snapshot
+                (organisms of the store are immutable snapshots).
+        """
+        return State(state.cells_cnt, state.species_cnt, iteration,
+                     SnapshotStore(state.organism_l))
+
+    def submit(self, state, iteration):
+        """Hands the state over to the background thread (replaces the pending one).
+
+        Attributes:
+            state (State): State to be written, must not be changed afterwards.
+            iteration (int): Iteration to be written.
+
+        Raises:
+            Exception: Error of the previous write (raised by `write_function`).
+        """
+        with self._condition:
+            self._raise_error()
+
+            if self._pending_item is not None:
+                self.coalesced_cnt += 1
+
+            self._pending_item = (state, iteration)
+            self._condition.notify_all()
+
+    def wait(self):
+        """Waits until all the submitted states are written.
+
+        Raises:
+            Exception: Error of the write (raised by `write_function`).
+        """
+        with self._condition:
+            while (self._pending_item is not None or self._writing) and self._error is None:
+                self._condition.wait()
+
+            self._raise_error()
+
+    def close(self):
+        """Writes the pending state and stops the background thread.
+
+        Raises:
+            Exception: Error of the write (raised by `write_function`).
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join()
+
+        with self._condition:
+            self._raise_error()
+
+    def _raise_error(self):
+        """Raises the error of the write (once)."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        """Writes the submitted states until the writer is closed or the write fails."""
+        while True:
+            with self._condition:
+                while self._pending_item is None and not self._closed:
+                    self._condition.wait()
+
+                if self._pending_item is None:
+                    return
+
+                state, iteration = self._pending_item
+                self._pending_item = None
+                self._writing = True
+
+            try:
+                self.write_function(state, iteration)
+            except Exception as err:
+                with self._condition:
+                    self._error = err
+                    self._writing = False
+                    self._pending_item = None
+                    self._condition.notify_all()
+                return
+
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
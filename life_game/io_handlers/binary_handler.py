@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+import os
+import mmap
+import struct
+
+import numpy as np
+
+from life_game.models.state import State
+from life_game.models.organism_store import OrganismStore, LabelGridStore
+
+
+class BinaryHandlerMixin(object):
+    """Provides methods to operate with binary state files.
+
+    The file consists of a fixed header followed by a packed grid of species labels
+    (little-endian uint16 per cell, 0 for an empty cell, row `x` holds cells `y`). The size
+    of the file depends only on the amount of cells, so the checkpoints of the game are
+    written in place through `mmap` and the grid is loaded without copying - the organisms
+    of the read state are a `LabelGridStore` over the mapped grid.
+
+    Has a dependency on the `numpy` module.
+    """
+    MAGIC = 'LIFE'
+    VERSION = 1
+    # magic, version, label size, cells, species, iteration
+    HEADER_STRUCT = struct.Struct('<4sHHIIQ')
+    LABEL_DTYPE = np.dtype('<u2')
+    MAX_SPECIES = 0xFFFF
+
+    def read_state_from_binary(self, input_file):
+        """Reads a state from specified binary file.
+
+        Attributes:
+            input_file (str): Path to the input binary file.
+
+        Returns:
+            state (State): Parsed state from input binary file, its organisms are built from
+                the mapped label grid only once they are used.
+
+        Raises:
+            BinaryFileError: If binary file is not valid or state can not be read from the file.
+        """
+        cells_cnt, species_cnt, iteration, label_grid = self.read_label_grid_from_binary(
+            input_file)
+
+        return State(cells_cnt, species_cnt, iteration, LabelGridStore(label_grid))
+
+    def read_label_grid_from_binary(self, input_file):
+        """Maps the species labels of specified binary file into memory (without copying).
+
+        Attributes:
+            input_file (str): Path to the input binary file.
+
+        Returns:
+            cells_cnt (int): Number of cells.
+            species_cnt (int): Number of species.
+            iteration (int): Number of iterations.
+            label_grid (np.ndarray): Read-only grid of species labels (`label_grid[x, y]`),
+                the file stays mapped as long as the grid is referenced.
+
+        Raises:
+            BinaryFileError: If binary file is not valid or can not be read.
+        """
+        try:
+            with open(input_file, 'rb') as opened_file:
+                file_size = os.fstat(opened_file.fileno()).st_size
+                if file_size < self.HEADER_STRUCT.size:
+                    raise BinaryFileError('Binary file is too short.')
+
+                mapped_file = mmap.mmap(opened_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, IOError) as err:
+            raise BinaryFileError('Can not read the binary file. %s' % err.message)
+
+        magic, version, label_size, cells_cnt, species_cnt, iteration = \
+            self.HEADER_STRUCT.unpack_from(mapped_file)
+
+        if magic != self.MAGIC or version != self.VERSION or \
+                label_size != self.LABEL_DTYPE.itemsize:
+            raise BinaryFileError('Binary file has unknown format.')
+
+        if file_size != self._get_binary_size(cells_cnt):
+            raise BinaryFileError('Binary file does not match the amount of cells.')
+
+        label_grid = np.frombuffer(mapped_file, dtype=self.LABEL_DTYPE,
+                                   count=cells_cnt * cells_cnt, offset=self.HEADER_STRUCT.size)
+
+        return cells_cnt, species_cnt, iteration, label_grid.reshape(cells_cnt, cells_cnt)
+
+    def write_state_to_binary(self, output_file, state, iteration):
+        """Writes a state and current iteration into the output file in place.
+
+        The file is resized only if the amount of cells differs from the previous state.
+
+        Attributes:
+            output_file (File|str): Output file opened for reading and writing in binary mode
+                or path to the output file.
+            state (State): State to be written in the output file.
+            iteration (int): Iteration to be written in the output file.
+
+        Raises:
+            BinaryFileError: If state can not be written to the output file.
+        """
+        try:
+            if isinstance(output_file, basestring):
+                with open(output_file, 'w+b') as opened_file:
+                    self._write_binary_in_place(opened_file, state, iteration)
+            else:
+                self._write_binary_in_place(output_file, state, iteration)
+        except (OSError, IOError, mmap.error) as err:
+            raise BinaryFileError('Can not write to the binary file. %s' % err.message)
+
+    def _write_binary_in_place(self, output_file, state, iteration):
+        """Writes the header and the label grid through the memory map of the file.
+
+        Attributes:
+            output_file (File): Output file opened for reading and writing in binary mode.
+            state (State): State to be written in the output file.
+            iteration (int): Iteration to be written in the output file.
+
+        Raises:
+            BinaryFileError: If the organisms can not be stored in the label grid.
+        """
+        cells_cnt = state.cells_cnt
+        organism_l = state.organism_l
+        # the label grid of the same size is copied as it is
+        source_label_grid = organism_l.label_grid if isinstance(organism_l, LabelGridStore) \
+            and organism_l.label_grid.shape == (cells_cnt, cells_cnt) else None
+
+        if organism_l and source_label_grid is None:
+            if isinstance(organism_l, OrganismStore):
+                # coordinates and species are read right from the arrays of the store
+                x_a, y_a, species_a = [np.frombuffer(store_a, dtype=np.uint16) for store_a
+                                       in (organism_l.x_a, organism_l.y_a, organism_l.species_a)]
+            else:
+                organism_a = np.array([(organism.x, organism.y, organism.species)
+                                       for organism in organism_l], dtype=np.int64)
+                x_a, y_a, species_a = organism_a[:, 0], organism_a[:, 1], organism_a[:, 2]
+
+            if x_a.min() < 0 or y_a.min() < 0 or max(x_a.max(), y_a.max()) >= cells_cnt:
+                raise BinaryFileError('Organisms must be inside the world grid.')
+
+            if species_a.min() <= 0 or species_a.max() > self.MAX_SPECIES:
+                raise BinaryFileError('Species must be between 1 and %s.' % self.MAX_SPECIES)
+
+        output_file.flush()
+        file_size = self._get_binary_size(cells_cnt)
+        if os.fstat(output_file.fileno()).st_size != file_size:
+            output_file.truncate(file_size)
+
+        mapped_file = mmap.mmap(output_file.fileno(), file_size, access=mmap.ACCESS_WRITE)
+        try:
+            self.HEADER_STRUCT.pack_into(mapped_file, 0, self.MAGIC, self.VERSION,
+                                         self.LABEL_DTYPE.itemsize, cells_cnt,
+                                         state.species_cnt, iteration)
+
+            label_grid = np.frombuffer(mapped_file, dtype=self.LABEL_DTYPE,
+                                       count=cells_cnt * cells_cnt,
+                                       offset=self.HEADER_STRUCT.size)
+            label_grid = label_grid.reshape(cells_cnt, cells_cnt)
+
+            if source_label_grid is not None:
+                label_grid[:] = source_label_grid
+            else:
+                label_grid.fill(0)
+                if organism_l:
+                    label_grid[x_a, y_a] = species_a
+
+            # the grid must not outlive the map
+            del label_grid
+        finally:
+            mapped_file.close()
+
+    def _get_binary_size(self, cells_cnt):
+        """Computes the size of binary file.
+
+        Attributes:
+            cells_cnt (int): Number of cells.
+
+        Returns:
+            (int): Size of binary file in bytes.
+        """
+        return self.HEADER_STRUCT.size + cells_cnt * cells_cnt * self.LABEL_DTYPE.itemsize
+
+
+class BinaryFileError(Exception):
+    pass
@@ -1,23 +1,79 @@
 #!/usr/bin/env python
 import os
+import argparse
 
 from life_game.io_handlers.xml_handler import XMLHandlerMixin, XMLFileError
+from life_game.io_handlers.binary_handler import BinaryHandlerMixin, BinaryFileError
+from life_game.io_handlers.background_writer import BackgroundStateWriter
+from life_game.io_handlers.trajectory import TrajectoryWriter, TrajectoryError
+from life_game.io_handlers.metrics_writer import MetricsWriter
+from life_game.io_handlers.write_policy import EveryIterationWritePolicy, \
+    FinalStateWritePolicy, EveryNIterationsWritePolicy, IntervalWritePolicy, OnExitWritePolicy
 
 
-class GameIOHandler(XMLHandlerMixin):
+class GameIOHandler(XMLHandlerMixin, BinaryHandlerMixin):
     """Handles IO operations inside the game.
 
+    The format of the files (XML or binary) is given by their extension.
+
     Attributes:
         input_file (str): Path to the input file.
         output_file (str): Path to the output file.
+        output_format (str): Format of the output file.
         keep_out_file_open (bool): True if output file is kept open between iterations,
             False otherwise.
+        write_policy (WritePolicy): Decides after which iterations the state is written.
+        pretty_print (bool): True if the output XML is indented, False otherwise.
+        background_writer (BackgroundStateWriter): Writes the states in a background thread,
+            None if the states are written directly.
+        trajectory_file (str): Path to the trajectory file with all the generations, None
+            if the trajectory is not written.
+        keyframe_interval (int): Maximal amount of generations between keyframes
+            of the trajectory.
+        trajectory_writer (TrajectoryWriter): Appends the generations to the trajectory file,
+            None until the trajectory is opened.
+        metrics_file (str): Path to the file with the metrics as JSON lines, None if
+            the metrics are not written.
+        metrics_writer (MetricsWriter): Writes the metrics to the metrics file, None until
+            the metrics are opened.
     """
-    def __init__(self, input_file, output_file='out.xml', keep_out_file_open=True):
+    FORMAT_XML = 'xml'
+    FORMAT_BINARY = 'binary'
+    FORMAT_BY_EXTENSION_D = {'.xml': FORMAT_XML, '.life': FORMAT_BINARY}
+
+    METRICS_LINES = 'lines'
+    METRICS_SUMMARY = 'summary'
+    METRICS_FILE = 'metrics.jsonl'
+
+    BATCH_OUTPUT_DIR = 'out'
+    BATCH_SUMMARY_FILE = 'summary.json'
+
+    ENSEMBLE_FILE = 'ensemble.jsonl'
+
+    def __init__(self, input_file, output_file='out.xml', keep_out_file_open=True,
+                 write_policy=None, write_in_background=False, pretty_print=True,
+                 trajectory_file=None, keyframe_interval=TrajectoryWriter.KEYFRAME_INTERVAL,
+                 metrics_file=None):
         self.input_file = input_file
         self.output_file = output_file
+        self.output_format = self.get_file_format(output_file) or self.FORMAT_XML
         # in case of adding simple mode (without having the file open between iterations)
         self.keep_out_file_open = keep_out_file_open
+        self.write_policy = write_policy if write_policy else EveryIterationWritePolicy()
+        self.pretty_print = pretty_print
+        self.trajectory_file = trajectory_file
+        self.keyframe_interval = keyframe_interval
+        self.trajectory_writer = None
+        self.metrics_file = metrics_file
+        self.metrics_writer = None
+
+        # state which was not written yet (kept as a function to build it only if needed)
+        self._pending_state_getter = None
+        self._pending_iteration = None
+
+        # signals received while the state is changing or written are handled afterwards
+        self._signals_deferred_cnt = 0
+        self._deferred_signal_handler = None
 
         # we don't want to open and close file after the each iteration (its quite expensive)
         # usually better to use with statement, yet for this case
@@ -25,6 +81,199 @@ class GameIOHandler(XMLHandlerMixin):
         if self.keep_out_file_open:
             self.opened_output_file = self._open_file()
 
+        # the game iterates while the previous state is being serialized
+        self.background_writer = None
+        if write_in_background:
+            self.background_writer = BackgroundStateWriter(self._write_state_to_file)
+
+    @staticmethod
+    def parse_arguments(arguments):
+        """Parses the arguments provided by user.
+
+        Attributes:
+            arguments (list): Arguments provided to the game (including the script name).
+
+        Returns:
+            (argparse.Namespace): Parsed arguments.
+
+        Raises:
+            IOValidationError: If the arguments are not valid.
+        """
+        parser = GameArgumentParser(prog=arguments[0] if arguments else None)
+        parser.add_argument('input_file')
+        parser.add_argument('--output-file', default='out.xml',
+                            help='path to the output file (.xml or .life)')
+
+        write_group = parser.add_mutually_exclusive_group()
+        write_group.add_argument('--write-final', action='store_true',
+                                 help='write only the final state')
+        write_group.add_argument('--write-every', type=int, metavar='N',
+                                 help='write the state every N iterations')
+        write_group.add_argument('--write-interval', type=float, metavar='SECONDS',
+                                 help='write the state at most once per SECONDS')
+        write_group.add_argument('--write-on-exit', action='store_true',
+                                 help='write the final state or the latest one on signal')
+        parser.add_argument('--write-in-background', action='store_true',
+                            help='write the states in a background thread')
+        parser.add_argument('--no-pretty-print', dest='pretty_print', action='store_false',
+                            help='write the state without indentation')
+        parser.add_argument('--trajectory-file',
+                            help='append all the generations to the trajectory file')
+        parser.add_argument('--keyframe-interval', type=int, metavar='N',
+                            default=TrajectoryWriter.KEYFRAME_INTERVAL,
+                            help='write all the organisms to the trajectory every N generations')
+        parser.add_argument('--metrics', choices=(GameIOHandler.METRICS_LINES,
+                                                  GameIOHandler.METRICS_SUMMARY),
+                            help='measure the game, write the metrics of every generation as '
+                                 'JSON lines or print only their summary at exit')
+        parser.add_argument('--metrics-file', default=GameIOHandler.METRICS_FILE,
+                            help='path to the file with the metrics as JSON lines')
+        parser.add_argument('--engine', help='engine which evolves the world (auto by default)')
+        parser.add_argument('--detect-cycles', action='store_true',
+                            help='skip the remaining iterations once the world settles into '
+                                 'a still life or an oscillator')
+        parser.add_argument('--seed', type=int,
+                            help='seed of the random choices, the same for every engine and '
+                                 'order of the cells (the seed of the input by default)')
+
+        worker_group = parser.add_mutually_exclusive_group()
+        worker_group.add_argument('--worker', dest='worker_address_l', action='append',
+                                  metavar='HOST:PORT',
+                                  help='worker of the distributed engine, repeatable')
+        worker_group.add_argument('--local-workers', type=int, metavar='N',
+                                  help='start N workers of the distributed engine on localhost')
+        parser.add_argument('--checkpoint-interval', type=int, metavar='N',
+                            help='checkpoint the distributed engine every N generations')
+
+        batch_group = parser.add_argument_group('batch mode')
+        batch_group.add_argument('--batch', action='store_true',
+                                 help='the input is a directory or a manifest (input file and '
+                                      'optional output file per line) of many games')
+        batch_group.add_argument('--output-dir', default=GameIOHandler.BATCH_OUTPUT_DIR,
+                                 help='directory of the output files of the games')
+        batch_group.add_argument('--output-format', default=GameIOHandler.FORMAT_XML,
+                                 choices=(GameIOHandler.FORMAT_XML, GameIOHandler.FORMAT_BINARY),
+                                 help='format of the output files of the games')
+        batch_group.add_argument('--pool-size', type=int, metavar='N',
+                                 help='amount of worker processes (CPU count by default)')
+        batch_group.add_argument('--summary-file',
+                                 help='path to the JSON summary of the games (summary.json '
+                                      'in the output directory by default)')
+
+        ensemble_group = parser.add_argument_group('ensemble mode')
+        ensemble_group.add_argument('--ensemble', type=int, metavar='N',
+                                    help='run the input under N seeds (starting with --seed, '
+                                         'the seed of the input or 0) on --pool-size worker '
+                                         'processes and aggregate the populations')
+        ensemble_group.add_argument('--ensemble-file', default=GameIOHandler.ENSEMBLE_FILE,
+                                    help='path to the aggregates of the generations as JSON '
+                                         'lines')
+
+        parsed_arguments = parser.parse_args(arguments[1:])
+
+        if parsed_arguments.write_every is not None and parsed_arguments.write_every <= 0:
+            raise IOValidationError('The amount of iterations between writes must be positive.')
+
+        if parsed_arguments.write_interval is not None and parsed_arguments.write_interval < 0:
+            raise IOValidationError('The interval between writes must not be negative.')
+
+        if parsed_arguments.keyframe_interval <= 0:
+            raise IOValidationError('The amount of generations between keyframes must be '
+                                    'positive.')
+
+        if not GameIOHandler.get_file_format(parsed_arguments.output_file):
+            raise IOValidationError('The output file must be a XML or binary (.life) file.')
+
+        if parsed_arguments.local_workers is not None and parsed_arguments.local_workers <= 0:
+            raise IOValidationError('The amount of local workers must be positive.')
+
+        if parsed_arguments.pool_size is not None and parsed_arguments.pool_size <= 0:
+            raise IOValidationError('The amount of worker processes must be positive.')
+
+        if parsed_arguments.seed is not None and parsed_arguments.seed < 0:
+            raise IOValidationError('The seed must not be negative.')
+
+        if parsed_arguments.ensemble is not None and parsed_arguments.ensemble <= 0:
+            raise IOValidationError('The amount of runs of the ensemble must be positive.')
+
+        if parsed_arguments.ensemble is not None and parsed_arguments.batch:
+            raise IOValidationError('Either the batch or the ensemble can be run.')
+
+        if parsed_arguments.checkpoint_interval is not None and \
+                parsed_arguments.checkpoint_interval <= 0:
+            raise IOValidationError('The amount of generations between checkpoints must be '
+                                    'positive.')
+
+        # validated here, so the game does not fail once the state is read
+        GameIOHandler.get_worker_addresses(parsed_arguments)
+
+        return parsed_arguments
+
+    @staticmethod
+    def get_worker_addresses(parsed_arguments):
+        """Builds the addresses of the workers of the distributed engine selected by user.
+
+        Attributes:
+            parsed_arguments (argparse.Namespace): Arguments parsed by `parse_arguments`.
+
+        Returns:
+            worker_address_l (list): Hosts and ports of the workers.
+
+        Raises:
+            IOValidationError: If some address is not valid.
+        """
+        worker_address_l = []
+
+        for worker_address in parsed_arguments.worker_address_l or []:
+            host, _, port = worker_address.rpartition(':')
+            if not host or not port.isdigit():
+                raise IOValidationError('The worker must be given as HOST:PORT: %s'
+                                        % worker_address)
+            worker_address_l.append((host, int(port)))
+
+        return worker_address_l
+
+    @staticmethod
+    def get_write_policy(parsed_arguments):
+        """Builds the write policy selected by user.
+
+        Attributes:
+            parsed_arguments (argparse.Namespace): Arguments parsed by `parse_arguments`.
+
+        Returns:
+            write_policy (WritePolicy): Selected write policy, every iteration by default.
+        """
+        if parsed_arguments.write_final:
+            return FinalStateWritePolicy()
+
+        if parsed_arguments.write_every is not None:
+            return EveryNIterationsWritePolicy(parsed_arguments.write_every)
+
+        if parsed_arguments.write_interval is not None:
+            return IntervalWritePolicy(parsed_arguments.write_interval)
+
+        if parsed_arguments.write_on_exit:
+            return OnExitWritePolicy()
+
+        return EveryIterationWritePolicy()
+
+    @staticmethod
+    def get_file_format(file_path):
+        """Finds out the format of the file from its extension.
+
+        Attributes:
+            file_path (str|File): Path to the file, opened files are considered to be XML.
+
+        Returns:
+            file_format (str): Format of the file, None if the extension is not known.
+        """
+        if not isinstance(file_path, basestring):
+            return GameIOHandler.FORMAT_XML
+
+        extension = os.path.splitext(file_path)[1].lower()
+
+        return GameIOHandler.FORMAT_BY_EXTENSION_D.get(extension)
+
     @staticmethod
     def check_input(arguments):
         """Checks the input provided by user.
@@ -37,20 +286,20 @@ class GameIOHandler(XMLHandlerMixin):
 
         Raises:
             IOValidationError: If the input is not specified or does not exist or
-            is not a XML file (simple check).
+            is not a XML or binary file (simple check of the extension). In batch mode
+            the input is a directory or a manifest of any extension.
         """
-        # no need to use AgreementParser since we can encapsulate the logic here
-        if len(arguments) != 2:
-            raise IOValidationError('The input file must be specified.')
-
-        input_file = arguments[1]
+        parsed_arguments = GameIOHandler.parse_arguments(arguments)
+        input_file = parsed_arguments.input_file
 
         if not os.path.exists(input_file):
             raise IOValidationError('The input file must exist.')
 
-        # dummy check for xml file
-        if '.xml' not in input_file:
-            raise IOValidationError('The input file must be a XML file.')
+        if parsed_arguments.batch:
+            return input_file
+
+        if not GameIOHandler.get_file_format(input_file):
+            raise IOValidationError('The input file must be a XML or binary (.life) file.')
 
         return input_file
 
@@ -86,19 +335,175 @@ class GameIOHandler(XMLHandlerMixin):
             input_file = self.input_file
 
         try:
-            state = self.read_state_from_xml(input_file)
-        except XMLFileError as err:
+            if self.get_file_format(input_file) == self.FORMAT_BINARY:
+                state = self.read_state_from_binary(input_file)
+            else:
+                state = self.read_state_from_xml(input_file)
+        except (XMLFileError, BinaryFileError) as err:
             raise ReadStateError('State can not be read from file: %s' % err.message)
         else:
             if state.is_valid():
                 return state
             raise ReadStateError('State is not valid: %s' % state)
 
+    def is_write_due(self, iteration):
+        """Finds out if the state of iteration is to be written according to the write policy.
+
+        Attributes:
+            iteration (int): Iteration (remaining iterations) of the state.
+
+        Returns:
+            (bool): True if the state is to be written, False otherwise.
+        """
+        return self.write_policy.is_write_due(iteration)
+
+    def defer_state(self, state_getter, iteration):
+        """Keeps the state which is not written, so it can be written later by `flush`.
+
+        Attributes:
+            state_getter (callable): Builds the state to be written.
+            iteration (int): Iteration to be written in the output file.
+        """
+        self._pending_state_getter = state_getter
+        self._pending_iteration = iteration
+
+    def defer_signals(self):
+        """Defers the handlers of signals (see `handle_signal`) until `release_signals`.
+
+        Meant for the parts of the game which change or write the state, so the pending state
+        is not built in the middle of them. Calls can be nested.
+        """
+        self._signals_deferred_cnt += 1
+
+    def release_signals(self):
+        """Releases the signals deferred by `defer_signals`.
+
+        The deferred handler (if any) is run once all the calls are released.
+        """
+        self._signals_deferred_cnt -= 1
+
+        if not self._signals_deferred_cnt and self._deferred_signal_handler:
+            handler, self._deferred_signal_handler = self._deferred_signal_handler, None
+            handler()
+
+    def handle_signal(self, handler):
+        """Runs the handler of the signal now or once the deferred signals are released.
+
+        Attributes:
+            handler (callable): Handles the signal, e.g. flushes the pending state and exits.
+        """
+        if self._signals_deferred_cnt:
+            self._deferred_signal_handler = handler
+        else:
+            handler()
+
+    def flush(self):
+        """Writes the pending state (if any), e.g. on exit or signal.
+
+        The states handed over to the background writer are written before the method returns.
+
+        Raises:
+            WriteStateError: If state can not be written to the output file.
+        """
+        if self._pending_state_getter:
+            self.write_state(self._pending_state_getter(), self._pending_iteration)
+
+        if self.background_writer:
+            self.background_writer.wait()
+
+        if self.trajectory_writer:
+            self.trajectory_writer.flush()
+
+        if self.metrics_writer:
+            self.metrics_writer.flush()
+
+    def open_trajectory(self, cells_cnt, species_cnt):
+        """Opens the trajectory file (if requested), the previous trajectory is replaced.
+
+        Attributes:
+            cells_cnt (int): Amount of cells in the game.
+            species_cnt (int): Amount of species in the game.
+
+        Raises:
+            WriteStateError: If the trajectory file can not be opened.
+        """
+        if not self.trajectory_file:
+            return
+
+        try:
+            self.trajectory_writer = TrajectoryWriter(self.trajectory_file, cells_cnt,
+                                                      species_cnt, self.keyframe_interval)
+        except (OSError, IOError, TrajectoryError) as err:
+            raise WriteStateError('Trajectory file can not be opened: %s' % err)
+
+    def log_generation(self, generation, organism_getter, born_organism_l, dead_organism_l):
+        """Appends the generation to the trajectory file (if opened).
+
+        Attributes:
+            generation (int): Generation (iterations since the initial state).
+            organism_getter (callable): Builds all the organisms of the generation.
+            born_organism_l (list): Organisms born since the previous generation, None
+                if not known.
+            dead_organism_l (list): Organisms died since the previous generation, None
+                if not known.
+
+        Raises:
+            WriteStateError: If the generation can not be written to the trajectory file.
+        """
+        if not self.trajectory_writer:
+            return
+
+        try:
+            self.trajectory_writer.append(generation, organism_getter, born_organism_l,
+                                          dead_organism_l)
+        except (OSError, IOError, TrajectoryError) as err:
+            raise WriteStateError('Generation can not be written to trajectory: %s' % err)
+
+    def open_metrics(self):
+        """Opens the metrics file (if requested), the previous metrics are replaced.
+
+        Raises:
+            WriteStateError: If the metrics file can not be opened.
+        """
+        if not self.metrics_file:
+            return
+
+        try:
+            self.metrics_writer = MetricsWriter(self.metrics_file)
+        except (OSError, IOError) as err:
+            raise WriteStateError('Metrics file can not be opened: %s' % err)
+
+    def log_metrics(self, record):
+        """Appends the metrics record to the metrics file (if opened).
+
+        Attributes:
+            record (dict): Metrics of the generation or the summary of the game.
+
+        Raises:
+            WriteStateError: If the record can not be written to the metrics file.
+        """
+        if not self.metrics_writer:
+            return
+
+        try:
+            self.metrics_writer.write_record(record)
+        except (OSError, IOError) as err:
+            raise WriteStateError('Metrics can not be written: %s' % err)
+
+    def close_metrics(self):
+        """Closes the metrics file (if opened)."""
+        if self.metrics_writer:
+            self.metrics_writer.close()
+            self.metrics_writer = None
+
     def write_state(self, state, iteration):
         """Writes a state and current iteration into the output file.
 
         Note:
              Output file is kept open as the IO operations are quite expensive.
+             If the background writer is used, only a snapshot of the state is taken and
+             the error of the previous write may be raised. Signals are deferred while
+             the state is written and the pending state is kept if the write fails.
 
         Attributes:
             state (State): State to be written in the output file.
@@ -107,16 +512,59 @@ class GameIOHandler(XMLHandlerMixin):
         Raises:
             WriteStateError: If state can not be written to the output file.
         """
-        self._rewind_file()
-
+        self.defer_signals()
         try:
-            self.write_state_to_xml(self.opened_output_file, state, iteration)
-        except XMLFileError as err:
-            raise WriteStateError('State can not be written to file: %s' % err.message)
+            if self.background_writer:
+                snapshot = self.background_writer.take_snapshot(state, iteration)
+                self.background_writer.submit(snapshot, iteration)
+            else:
+                self._write_state_to_file(state, iteration)
+
+            # the newer state is written, there is nothing pending anymore
+            self._pending_state_getter = None
+            self._pending_iteration = None
+        finally:
+            self.release_signals()
 
     def clean(self):
-        """Mainly closes the file which is kept open between iterations."""
-        self.opened_output_file.close()
+        """Mainly closes the file which is kept open between iterations.
+
+        The pending state is written before and the background writer is stopped.
+
+        Raises:
+            WriteStateError: If the pending state can not be written to the output file.
+        """
+        try:
+            self.flush()
+
+            if self.background_writer:
+                self.background_writer.close()
+        finally:
+            self.opened_output_file.close()
+
+            if self.trajectory_writer:
+                self.trajectory_writer.close()
+
+    def _write_state_to_file(self, state, iteration):
+        """Replaces the content of the output file by the state and iteration.
+
+        Attributes:
+            state (State): State to be written in the output file.
+            iteration (int): Iteration to be written in the output file.
+
+        Raises:
+            WriteStateError: If state can not be written to the output file.
+        """
+        try:
+            if self.output_format == self.FORMAT_BINARY:
+                # the binary file has fixed size, it is rewritten in place
+                self.write_state_to_binary(self.opened_output_file, state, iteration)
+            else:
+                self._rewind_file()
+                self.write_state_to_xml(self.opened_output_file, state, iteration,
+                                        pretty_print=self.pretty_print)
+        except (XMLFileError, BinaryFileError) as err:
+            raise WriteStateError('State can not be written to file: %s' % err.message)
 
     def _open_file(self):
         """Opens the output file.
@@ -127,9 +575,11 @@ class GameIOHandler(XMLHandlerMixin):
         Raises:
             IOValidationError: If the output file can not be opened.
         """
-        return open(self.output_file, 'w')
+        mode = 'w+b' if self.output_format == self.FORMAT_BINARY else 'w'
+
+        return open(self.output_file, mode)
         try:
-            opened_file = open(self.output_file, 'w')
+            opened_file = open(self.output_file, mode)
         except (OSError, IOError) as err:
             raise IOValidationError('Can not open the output file.')
         else:
@@ -144,6 +594,20 @@ class GameIOHandler(XMLHandlerMixin):
         self.opened_output_file.truncate()
 
 
+class GameArgumentParser(argparse.ArgumentParser):
+    """Argument parser which raises `IOValidationError` instead of exiting the game."""
+    def error(self, message):
+        """Overrides method derived from base class.
+
+        Attributes:
+            message (str): Error message.
+
+        Raises:
+            IOValidationError: Always.
+        """
+        raise IOValidationError('The input is not valid: %s' % message)
+
+
 class IOValidationError(Exception):
     pass
 
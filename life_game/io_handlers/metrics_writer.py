@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+import json
+
+
+class MetricsWriter(object):
+    """Writes the metrics of the game as JSON lines, one record per line.
+
+    Records of the generations are followed by the summary of the game (see `GameMetrics`).
+
+    Attributes:
+        metrics_file (str): Path to the metrics file.
+    """
+    def __init__(self, metrics_file):
+        self.metrics_file = metrics_file
+
+        self._opened_metrics_file = open(metrics_file, 'w')
+
+    def write_record(self, record):
+        """Appends the record to the metrics file.
+
+        Attributes:
+            record (dict): Metrics of the generation or the summary of the game.
+        """
+        self._opened_metrics_file.write(json.dumps(record, sort_keys=True) + '\n')
+
+    def flush(self):
+        """Flushes the written records to the metrics file."""
+        self._opened_metrics_file.flush()
+
+    def close(self):
+        """Closes the metrics file."""
+        self._opened_metrics_file.close()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+import struct
+import bisect
+
+from life_game.models.state import State
+from life_game.models.organism_store import OrganismStore, iter_cells
+
+
+class TrajectoryWriter(object):
+    """Appends the generations of the game to the trajectory file.
+
+    The trajectory file starts with a header (cells, species, keyframe interval) followed
+    by records. A keyframe record holds all the organisms of the generation, a delta record
+    holds only the organisms born and died since the previous generation. Keyframe is written
+    every `keyframe_interval` generations and whenever the changes are not known (e.g. the
+    game skipped some generations).
+
+    Offsets of the keyframes are appended to the index file (`<trajectory file>.idx`),
+    so the generation can be read without scanning the whole trajectory.
+
+    Coordinates and species are stored as 16 bits, the record is packed as a whole before
+    it is written, so the trajectory is not broken by the organism which does not fit.
+
+    Attributes:
+        trajectory_file (str): Path to the trajectory file.
+        cells_cnt (int): Amount of cells in the game.
+        species_cnt (int): Amount of species in the game.
+        keyframe_interval (int): Maximal amount of generations between keyframes.
+    """
+    KEYFRAME_INTERVAL = 1000
+
+    MAGIC = 'LTRJ'
+    VERSION = 1
+    # magic, version, cells, species, keyframe interval
+    HEADER_STRUCT = struct.Struct('<4sHIII')
+    # record type, generation, amount of organisms (keyframe) or born organisms (delta),
+    # amount of died organisms (delta)
+    RECORD_STRUCT = struct.Struct('<BQII')
+    RECORD_KEYFRAME = 1
+    RECORD_DELTA = 2
+    # organism is stored as x, y, species
+    ORGANISM_FORMAT = '<%dH'
+    # generation, offset of the keyframe
+    INDEX_STRUCT = struct.Struct('<QQ')
+    INDEX_EXTENSION = '.idx'
+
+    def __init__(self, trajectory_file, cells_cnt, species_cnt,
+                 keyframe_interval=KEYFRAME_INTERVAL):
+        self.trajectory_file = trajectory_file
+        self.cells_cnt = cells_cnt
+        self.species_cnt = species_cnt
+        self.keyframe_interval = keyframe_interval
+
+        self._last_generation = None
+        self._last_keyframe_generation = None
+
+        try:
+            header_data = self.HEADER_STRUCT.pack(self.MAGIC, self.VERSION, cells_cnt,
+                                                  species_cnt, keyframe_interval)
+        except struct.error as err:
+            raise TrajectoryError('Header can not be stored in the trajectory: %s' % err)
+
+        self._opened_trajectory_file = open(trajectory_file, 'wb')
+        self._opened_index_file = open(trajectory_file + self.INDEX_EXTENSION, 'wb')
+
+        self._opened_trajectory_file.write(header_data)
+
+    def append(self, generation, organism_getter, born_organism_l, dead_organism_l):
+        """Appends the generation to the trajectory.
+
+        Attributes:
+            generation (int): Generation (iterations since the initial state).
+            organism_getter (callable): Builds all the organisms of the generation
+                (called only if keyframe is written).
+            born_organism_l (list): Organisms born since the previous generation, None
+                if not known.
+            dead_organism_l (list): Organisms died since the previous generation, None
+                if not known.
+
+        Raises:
+            TrajectoryError: If the organisms can not be stored in the trajectory.
+        """
+        if generation == self._last_generation:
+            return
+
+        is_keyframe = born_organism_l is None or dead_organism_l is None or \
+            self._last_generation is None or generation != self._last_generation + 1 or \
+            generation - self._last_keyframe_generation >= self.keyframe_interval
+
+        if is_keyframe:
+            self._write_keyframe(generation, organism_getter())
+        else:
+            self._write_record(self.RECORD_DELTA, generation, born_organism_l, dead_organism_l)
+
+        self._last_generation = generation
+
+    def flush(self):
+        """Flushes the written records to the files."""
+        self._opened_trajectory_file.flush()
+        self._opened_index_file.flush()
+
+    def close(self):
+        """Closes the trajectory and index files."""
+        self._opened_trajectory_file.close()
+        self._opened_index_file.close()
+
+    def _write_keyframe(self, generation, organism_l):
+        """Writes the keyframe and its offset into the index.
+
+        Attributes:
+            generation (int): Generation of the keyframe.
+            organism_l (list): All the organisms of the generation.
+        """
+        offset = self._opened_trajectory_file.tell()
+
+        self._write_record(self.RECORD_KEYFRAME, generation, organism_l, [])
+        self._opened_index_file.write(self.INDEX_STRUCT.pack(generation, offset))
+
+        self._last_keyframe_generation = generation
+
+    def _write_record(self, record_type, generation, organism_l, dead_organism_l):
+        """Writes the record with two groups of organisms.
+
+        Attributes:
+            record_type (int): Type of the record (one of `RECORD_*`).
+            generation (int): Generation of the record.
+            organism_l (list): Organisms of keyframe or born organisms of delta.
+            dead_organism_l (list): Died organisms of delta.
+
+        Raises:
+            TrajectoryError: If the organisms can not be stored in the trajectory.
+        """
+        try:
+            record_data_l = [self.RECORD_STRUCT.pack(record_type, generation, len(organism_l),
+                                                     len(dead_organism_l))]
+
+            for organism_group_l in (organism_l, dead_organism_l):
+                if not organism_group_l:
+                    continue
+
+                value_l = []
+                for cell in iter_cells(organism_group_l):
+                    value_l.extend(cell)
+
+                record_data_l.append(struct.pack(self.ORGANISM_FORMAT % len(value_l), *value_l))
+        except struct.error as err:
+            raise TrajectoryError('Organisms can not be stored in the trajectory: %s' % err)
+
+        self._opened_trajectory_file.write(''.join(record_data_l))
+
+
+class TrajectoryReader(object):
+    """Reads the generations from the trajectory file written by `TrajectoryWriter`.
+
+    Generation is read from the nearest preceding keyframe by replaying the deltas.
+
+    Attributes:
+        trajectory_file (str): Path to the trajectory file.
+        cells_cnt (int): Amount of cells in the game.
+        species_cnt (int): Amount of species in the game.
+        keyframe_interval (int): Maximal amount of generations between keyframes.
+    """
+    def __init__(self, trajectory_file):
+        self.trajectory_file = trajectory_file
+
+        try:
+            with open(trajectory_file + TrajectoryWriter.INDEX_EXTENSION, 'rb') as index_file:
+                index_data = index_file.read()
+
+            self._opened_trajectory_file = open(trajectory_file, 'rb')
+            header_data = self._opened_trajectory_file.read(TrajectoryWriter.HEADER_STRUCT.size)
+        except (OSError, IOError) as err:
+            raise TrajectoryError('Can not read the trajectory file. %s' % err.message)
+
+        if len(header_data) != TrajectoryWriter.HEADER_STRUCT.size:
+            raise TrajectoryError('Trajectory file is too short.')
+
+        magic, version, self.cells_cnt, self.species_cnt, self.keyframe_interval = \
+            TrajectoryWriter.HEADER_STRUCT.unpack(header_data)
+
+        if magic != TrajectoryWriter.MAGIC or version != TrajectoryWriter.VERSION:
+            raise TrajectoryError('Trajectory file has unknown format.')
+
+        # the index can be incomplete if the game was stopped while writing it
+        entry_size = TrajectoryWriter.INDEX_STRUCT.size
+        self._keyframe_generation_l, self._keyframe_offset_l = [], []
+        for start in xrange(0, len(index_data) - entry_size + 1, entry_size):
+            generation, offset = TrajectoryWriter.INDEX_STRUCT.unpack_from(index_data, start)
+            self._keyframe_generation_l.append(generation)
+            self._keyframe_offset_l.append(offset)
+
+    def read_generation(self, generation):
+        """Reads the state of the generation.
+
+        Attributes:
+            generation (int): Generation (iterations since the initial state).
+
+        Returns:
+            state (State): State of the generation, `iterations_cnt` is the generation.
+
+        Raises:
+            TrajectoryError: If the generation is not in the trajectory.
+        """
+        keyframe_position = bisect.bisect_right(self._keyframe_generation_l, generation) - 1
+        if keyframe_position < 0:
+            raise TrajectoryError('Generation %s is not in the trajectory.' % generation)
+
+        self._opened_trajectory_file.seek(self._keyframe_offset_l[keyframe_position])
+
+        species_by_cell_d = {}
+        current_generation = None
+
+        while True:
+            record = self._read_record()
+            if record is None:
+                break
+
+            record_type, record_generation, organism_l, dead_organism_l = record
+            if record_generation > generation:
+                break
+
+            if record_type == TrajectoryWriter.RECORD_KEYFRAME:
+                species_by_cell_d.clear()
+
+            for x, y, _ in dead_organism_l:
+                species_by_cell_d.pop((x, y), None)
+
+            for x, y, species in organism_l:
+                species_by_cell_d[(x, y)] = species
+
+            current_generation = record_generation
+
+        if current_generation != generation:
+            raise TrajectoryError('Generation %s is not in the trajectory.' % generation)
+
+        organism_l = OrganismStore.from_cells(
+            (x, y, species) for (x, y), species in sorted(species_by_cell_d.iteritems()))
+
+        return State(self.cells_cnt, self.species_cnt, generation, organism_l)
+
+    def close(self):
+        """Closes the trajectory file."""
+        self._opened_trajectory_file.close()
+
+    def _read_record(self):
+        """Reads the record at the current position of the trajectory file.
+
+        Returns:
+            record (tuple): Type, generation and two groups of organisms (x, y, species)
+                of the record, None at the end of the file (or at the incomplete record).
+        """
+        record_data = self._opened_trajectory_file.read(TrajectoryWriter.RECORD_STRUCT.size)
+        if len(record_data) != TrajectoryWriter.RECORD_STRUCT.size:
+            return None
+
+        record_type, generation, organisms_cnt, dead_organisms_cnt = \
+            TrajectoryWriter.RECORD_STRUCT.unpack(record_data)
+
+        organism_group_l = []
+        for cnt in (organisms_cnt, dead_organisms_cnt):
+            organism_format = TrajectoryWriter.ORGANISM_FORMAT % (cnt * 3)
+            organism_data = self._opened_trajectory_file.read(struct.calcsize(organism_format))
+            if len(organism_data) != struct.calcsize(organism_format):
+                return None
+
+            value_l = struct.unpack(organism_format, organism_data)
+            organism_group_l.append(zip(value_l[0::3], value_l[1::3], value_l[2::3]))
+
+        return (record_type, generation) + tuple(organism_group_l)
+
+
+class TrajectoryError(Exception):
+    pass
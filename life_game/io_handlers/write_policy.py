@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+import time
+
+
+class WritePolicy(object):
+    """Base class for write policies.
+
+    Write policy decides after which iterations the state is written to the output file.
+    The final state (iteration 0) is always written. States which are not written are kept
+    pending, so the latest of them can still be written on exit or signal.
+
+    Each specific policy must inherit from this class and override the `is_write_due` method.
+    """
+    # True if only the final state is of interest, so the game may jump straight to it
+    FINAL_STATE_ONLY = False
+
+    def is_write_due(self, iteration):
+        """This method must be overriden in subclass.
+
+        Attributes:
+            iteration (int): Iteration (remaining iterations) of the state.
+
+        Raises:
+            NotImplementedError: If method is not overriden.
+        """
+        raise NotImplementedError('This method must be overriden in subclass!')
+
+
+class EveryIterationWritePolicy(WritePolicy):
+    """Writes the state after every iteration."""
+    def is_write_due(self, iteration):
+        """Overrides method derived from base class.
+
+        Attributes:
+            iteration (int): Iteration (remaining iterations) of the state.
+
+        Returns:
+            (bool): Always True.
+        """
+        return True
+
+
+class FinalStateWritePolicy(WritePolicy):
+    """Writes only the final state."""
+    FINAL_STATE_ONLY = True
+
+    def is_write_due(self, iteration):
+        """Overrides method derived from base class.
+
+        Attributes:
+            iteration (int): Iteration (remaining iterations) of the state.
+
+        Returns:
+            (bool): True for the final state, False otherwise.
+        """
+        return iteration == 0
+
+
+class EveryNIterationsWritePolicy(WritePolicy):
+    """Writes the state after every N iterations (counted back from the final state).
+
+    Attributes:
+        iterations_cnt (int): Amount of iterations between writes.
+    """
+    def __init__(self, iterations_cnt):
+        self.iterations_cnt = iterations_cnt
+
+    def is_write_due(self, iteration):
+        """Overrides method derived from base class.
+
+        Attributes:
+            iteration (int): Iteration (remaining iterations) of the state.
+
+        Returns:
+            (bool): True for every N-th iteration, False otherwise.
+        """
+        return iteration % self.iterations_cnt == 0
+
+
+class IntervalWritePolicy(WritePolicy):
+    """Writes the state at most once per interval (and the final state).
+
+    Attributes:
+        interval (float): Minimal amount of seconds between writes.
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self._last_write_time = time.time()
+
+    def is_write_due(self, iteration):
+        """Overrides method derived from base class.
+
+        Attributes:
+            iteration (int): Iteration (remaining iterations) of the state.
+
+        Returns:
+            (bool): True if the interval has passed since the last write, False otherwise.
+        """
+        now = time.time()
+
+        if iteration == 0 or now - self._last_write_time >= self.interval:
+            self._last_write_time = now
+            return True
+
+        return False
+
+
+class OnExitWritePolicy(FinalStateWritePolicy):
+    """Writes the final state or the latest state when the game is stopped by signal.
+
+    Unlike `FinalStateWritePolicy`, the game iterates one by one, so the latest state
+    is always available.
+    """
+    FINAL_STATE_ONLY = False
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
+from itertools import islice
+
 from lxml import etree
 
 from life_game.models.state import State
 from life_game.models.organism import Organism
+from life_game.models.organism_store import OrganismStore, OrganismStoreError, iter_cells
 
 
 class XMLHandlerMixin(object):
@@ -18,11 +21,38 @@ class XMLHandlerMixin(object):
     ELEMENT_CELLS = 'cells'
     ELEMENT_SPECIES = 'species'
     ELEMENT_ITERATIONS = 'iterations'
+    ELEMENT_SEED = 'seed'
     ELEMENT_ORGANISMS = 'organisms'
     ELEMENT_ORGANISM = 'organism'
     ELEMENT_X_POS = 'x_pos'
     ELEMENT_Y_POS = 'y_pos'
 
+    # amount of organisms which are serialized into one string before it is written
+    ORGANISMS_PER_CHUNK = 4096
+
+    # parts of the serialized XML (the same as `lxml` produces): header with the world element,
+    # start of the organisms element (or its empty form), single organism and the end
+    PRETTY_TEMPLATE_D = {
+        'header': "<?xml version='1.0' encoding='UTF-8'?>\n<life>\n  <world>\n"
+                  "    <cells>%(cells)d</cells>\n    <species>%(species)d</species>\n"
+                  "    <iterations>%(iterations)d</iterations>\n  </world>\n",
+        'start': '  <organisms>\n',
+        'empty': '  <organisms/>\n</life>\n',
+        'organism': '    <organism>\n      <x_pos>%d</x_pos>\n      <y_pos>%d</y_pos>\n'
+                    '      <species>%d</species>\n    </organism>\n',
+        'end': '  </organisms>\n</life>\n'
+    }
+    COMPACT_TEMPLATE_D = {
+        'header': "<?xml version='1.0' encoding='UTF-8'?>\n<life><world>"
+                  "<cells>%(cells)d</cells><species>%(species)d</species>"
+                  "<iterations>%(iterations)d</iterations></world>",
+        'start': '<organisms>',
+        'empty': '<organisms/></life>',
+        'organism': '<organism><x_pos>%d</x_pos><y_pos>%d</y_pos>'
+                    '<species>%d</species></organism>',
+        'end': '</organisms></life>'
+    }
+
     def read_state_from_xml(self, input_file):
         """Reads a state from specified XML file.
 
@@ -39,15 +69,16 @@ class XMLHandlerMixin(object):
         """
         state_xml = etree.iterparse(input_file, events=(self.ELEMENT_START, self.ELEMENT_END))
 
-        cells_cnt, species_cnt, iterations_cnt = None, None, None
-        organism_l = []
+        cells_cnt, species_cnt, iterations_cnt, seed = None, None, None, None
+        organism_l = OrganismStore()
 
         # the file is very small - it is not necessary to clear the elements
         try:
             for event, element in state_xml:
                 if event == self.ELEMENT_END:
                     if element.tag == self.ELEMENT_WORLD:
-                        cells_cnt, species_cnt, iterations_cnt = self._read_element_world(element)
+                        cells_cnt, species_cnt, iterations_cnt, seed = \
+                            self._read_element_world(element)
                     elif element.tag == self.ELEMENT_ORGANISM:
                         organism = self._read_element_organism(element)
                         organism_l.append(organism)
@@ -55,35 +86,35 @@ class XMLHandlerMixin(object):
             raise XMLFileError('XML must be valid: %s' % err.message)
         except TypeError as err:
             raise XMLFileError('Predefined XML elements must have a value: %s' % err.message)
+        except OrganismStoreError as err:
+            raise XMLFileError('Organisms can not be read: %s' % err.message)
 
-        return State(cells_cnt, species_cnt, iterations_cnt, organism_l)
+        return State(cells_cnt, species_cnt, iterations_cnt, organism_l, seed=seed)
 
-    def write_state_to_xml(self, output_file, state, iteration):
+    def write_state_to_xml(self, output_file, state, iteration, pretty_print=True):
         """Writes a state and current iteration into the output file.
 
+        The XML is emitted directly as bytes (without building an element tree), organisms
+        are written in chunks. The output is the same as the one of `lxml` serializer.
+
         Note:
              Output file is kept open as the IO operations are quite expensive.
 
         Attributes:
-            output_file (File): Opened output file.
+            output_file (File|str): Opened output file or path to the output file.
             state (State): State to be written in the output file.
             iteration (int): Iteration to be written in the output file.
+            pretty_print (bool, optional): True if the XML is indented, False otherwise.
 
         Raises:
             XMLFileError: If state can not be written to the output file.
         """
-        life = etree.Element(self.ELEMENT_LIFE)
-
-        world = self._write_world_element(state, iteration)
-        life.append(world)
-
-        organisms = self._write_organisms_element(state.organism_l)
-        life.append(organisms)
-
-        xml_life = etree.ElementTree(life)
-
         try:
-            xml_life.write(output_file, xml_declaration=True, encoding='utf-8', pretty_print=True)
+            if isinstance(output_file, basestring):
+                with open(output_file, 'wb') as opened_file:
+                    self._write_xml_chunks(opened_file, state, iteration, pretty_print)
+            else:
+                self._write_xml_chunks(output_file, state, iteration, pretty_print)
         except (OSError, IOError) as err:
             raise XMLFileError('Can not write to the XML file. %s' % err.message)
 
@@ -97,8 +128,9 @@ class XMLHandlerMixin(object):
             cells_cnt (int): Number of cells.
             species_cnt (int): Number of species.
             iterations_cnt (int): Number of iterations.
+            seed (int): Seed of the random choices, None if not given (optional element).
         """
-        cells_cnt, species_cnt, iterations_cnt = None, None, None
+        cells_cnt, species_cnt, iterations_cnt, seed = None, None, None, None
 
         for child in world:
             if child.tag == self.ELEMENT_CELLS:
@@ -107,8 +139,10 @@ class XMLHandlerMixin(object):
                 species_cnt = child.text
             elif child.tag == self.ELEMENT_ITERATIONS:
                 iterations_cnt = child.text
+            elif child.tag == self.ELEMENT_SEED:
+                seed = int(child.text)
 
-        return int(cells_cnt), int(species_cnt), int(iterations_cnt)
+        return int(cells_cnt), int(species_cnt), int(iterations_cnt), seed
 
     def _read_element_organism(self, organism):
         """Parses the element organism.
@@ -131,61 +165,35 @@ class XMLHandlerMixin(object):
 
         return Organism(int(x), int(y), int(species))
 
-    def _write_world_element(self, state, iteration):
-        """Creates the element world.
-
-        Attributes:
-            state (State): State to be serialized to XML.
-            iteration (int): Iteration to be serialized to XML.
-
-        Returns:
-            world (etree.Element): XML element world.
-        """
-        world = etree.Element(self.ELEMENT_WORLD)
-
-        cells = etree.Element(self.ELEMENT_CELLS)
-        cells.text = str(state.cells_cnt)
-        world.append(cells)
-
-        species = etree.Element(self.ELEMENT_SPECIES)
-        species.text = str(state.species_cnt)
-        world.append(species)
-
-        iterations = etree.Element(self.ELEMENT_ITERATIONS)
-        iterations.text = str(iteration)
-        world.append(iterations)
-
-        return world
-
-    def _write_organisms_element(self, organism_l):
-        """Creates the element organisms.
+    def _write_xml_chunks(self, output_file, state, iteration, pretty_print):
+        """Writes the XML into the opened output file chunk by chunk.
 
         Attributes:
-            organism_l (list): Organisms to be serialized to XML.
-
-        Returns:
-            organism (etree.Element): XML element organism.
+            output_file (File): Opened output file.
+            state (State): State to be written in the output file.
+            iteration (int): Iteration to be written in the output file.
+            pretty_print (bool): True if the XML is indented, False otherwise.
         """
-        organisms = etree.Element(self.ELEMENT_ORGANISMS)
-
-        for organism in organism_l:
-            organism_element = etree.Element(self.ELEMENT_ORGANISM)
+        template_d = self.PRETTY_TEMPLATE_D if pretty_print else self.COMPACT_TEMPLATE_D
 
-            x_pos = etree.Element(self.ELEMENT_X_POS)
-            x_pos.text = str(organism.x)
-            organism_element.append(x_pos)
+        output_file.write(template_d['header'] % {
+            'cells': state.cells_cnt, 'species': state.species_cnt, 'iterations': iteration})
 
-            y_pos = etree.Element(self.ELEMENT_Y_POS)
-            y_pos.text = str(organism.y)
-            organism_element.append(y_pos)
+        organism_l = state.organism_l
+        if not organism_l:
+            output_file.write(template_d['empty'])
+            return
 
-            species = etree.Element(self.ELEMENT_SPECIES)
-            species.text = str(organism.species)
-            organism_element.append(species)
+        output_file.write(template_d['start'])
 
-            organisms.append(organism_element)
+        organism_template = template_d['organism']
+        cell_iterator = iter_cells(organism_l)
+        for _ in xrange(0, len(organism_l), self.ORGANISMS_PER_CHUNK):
+            output_file.write(''.join([
+                organism_template % cell
+                for cell in islice(cell_iterator, self.ORGANISMS_PER_CHUNK)]))
 
-        return organisms
+        output_file.write(template_d['end'])
 
 
 class XMLFileError(Exception):
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+import random
+from collections import deque
+
+from life_game.models.organism_store import iter_cells
+
+
+class CycleDetector(object):
+    """Detects that the world has settled into a still life or an oscillator.
+
+    The state of the world is hashed by Zobrist hashing - every organism (x|y|species) has
+    its random key and the hash is a xor of keys of all the organisms. So the hash is updated
+    incrementally by births and deaths of the last iteration, without scanning the world.
+
+    Hashes of recent iterations are kept in a bounded window. Once the hash repeats, the world
+    is in a cycle with period of iterations between the two occurrences. The cycle is trusted
+    only if no random choice was made during it, otherwise the world may leave the cycle.
+
+    Attributes:
+        window_size (int): Amount of recent iterations which are kept.
+        state_hash (long): Hash of the current state of the world.
+        iteration (int): Amount of iterations since the reset.
+    """
+    WINDOW_SIZE = 1024
+    KEY_BITS = 128
+    # keys are generated by own generator, so the game's random choices are not affected
+    KEY_SEED = 1
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        self.window_size = window_size
+        self.state_hash = 0
+        self.iteration = 0
+
+        self._iteration_by_hash_d = {}
+        self._window_q = deque()
+        self._random_choice_cnt = 0
+        self._random_iteration = 0
+        self._key_d = {}
+        self._generator = random.Random(self.KEY_SEED)
+
+    def reset(self, world):
+        """Starts detection from the current state of the world.
+
+        Attributes:
+            world (World): World which is going to be iterated.
+        """
+        self.state_hash = self._hash_organisms(world.organism_l)
+        self.iteration = 0
+
+        self._iteration_by_hash_d.clear()
+        self._window_q.clear()
+        self._random_choice_cnt = world.random_choice_cnt
+        self._random_iteration = 0
+
+        self._remember(self.state_hash)
+
+    def update(self, world):
+        """Updates the hash by the last iteration of the world and looks for a cycle.
+
+        Attributes:
+            world (World): World which has been iterated once since the last update.
+
+        Returns:
+            period (int): Period of the cycle if the world is in the cycle, else None.
+        """
+        self.iteration += 1
+
+        born_organism_l, dead_organism_l = world.born_organism_l, world.dead_organism_l
+
+        if born_organism_l is None or dead_organism_l is None:
+            # the world does not know the changes, hash all the organisms
+            self.state_hash = self._hash_organisms(world.organism_l)
+        else:
+            self.state_hash ^= self._hash_organisms(born_organism_l)
+            self.state_hash ^= self._hash_organisms(dead_organism_l)
+
+        if world.random_choice_cnt != self._random_choice_cnt:
+            self._random_choice_cnt = world.random_choice_cnt
+            self._random_iteration = self.iteration
+
+        period = None
+        previous_iteration = self._iteration_by_hash_d.get(self.state_hash)
+
+        # iterations after the previous occurrence must not have made a random choice
+        if previous_iteration is not None and previous_iteration >= self._random_iteration:
+            period = self.iteration - previous_iteration
+
+        self._remember(self.state_hash)
+
+        return period
+
+    def _remember(self, state_hash):
+        """Adds the hash of current iteration to the window, forgets the oldest one if full.
+
+        Attributes:
+            state_hash (long): Hash of the current state of the world.
+        """
+        self._iteration_by_hash_d[state_hash] = self.iteration
+        self._window_q.append((state_hash, self.iteration))
+
+        if len(self._window_q) > self.window_size:
+            old_hash, old_iteration = self._window_q.popleft()
+            if self._iteration_by_hash_d.get(old_hash) == old_iteration:
+                del self._iteration_by_hash_d[old_hash]
+
+    def _hash_organisms(self, organism_l):
+        """Hashes organisms (xor of their keys).
+
+        Attributes:
+            organism_l (list): Organisms to be hashed.
+
+        Returns:
+            organisms_hash (long): Hash of the organisms.
+        """
+        organisms_hash = 0
+
+        for x, y, species in iter_cells(organism_l):
+            organisms_hash ^= self._get_key(x, y, species)
+
+        return organisms_hash
+
+    def _get_key(self, x, y, species):
+        """Retrieves the random key of organism, the key is generated on the first use.
+
+        Attributes:
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+            species (int): Species identifier.
+
+        Returns:
+            key (long): Random key of organism.
+        """
+        cell = (x, y, species)
+
+        key = self._key_d.get(cell)
+        if key is None:
+            key = self._generator.getrandbits(self.KEY_BITS)
+            self._key_d[cell] = key
+
+        return key
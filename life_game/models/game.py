@@ -1,7 +1,17 @@
 #!/usr/bin/env python
+import time
+
 from life_game.models.state import State
 from life_game.models.world import World, WorldInternalError
 from life_game.models.world_grid import WorldGrid
+from life_game.models.cycle_detector import CycleDetector
+from life_game.models.metrics import GameMetrics
+from life_game.models.organism_store import get_species, get_ordered
+from life_game.engines.numpy_world import NumpyWorld
+from life_game.engines.bitboard_world import BitboardWorld
+from life_game.engines.hashlife_world import HashlifeWorld
+from life_game.engines.tile_world import TileWorld
+from life_game.engines.distributed_world import DistributedWorld
 from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
 from life_game.io_handlers.game_io_handler import WriteStateError
 
@@ -14,51 +24,366 @@ class Game(object):
     Attributes:
         io_handler (GameIOHandler): Object which handles game's IO operations.
         state (State): Current state of the Game.
+        engine (str): Name of the engine which evolves the world (one of `ENGINE_*`).
+            The auto engine picks the hashlife (only the final state is saved) or bitboard one
+            if the organisms are of a single species, python otherwise.
+        final_state_only (bool): True if only the final state is saved, False if the states
+            are saved as the write policy of IO handler decides. Taken from the write policy
+            if not specified.
+        detect_cycles (bool): True if the game jumps to the final iteration once the world
+            settles into a still life or an oscillator, False otherwise.
+        metrics (GameMetrics): Metrics the phases of the game are measured to (written
+            by the IO handler), None if the game is not measured.
+        world_kwargs (dict): Keyword arguments of the world of the engine, e.g. the workers
+            of the distributed one.
+        seed (int): Seed of the random choices (see `EvolutionRulesEngine`), taken from
+            the state if not specified, None if the choices are not reproducible.
     """
-    def __init__(self, io_handler, state):
+    ENGINE_AUTO = 'auto'
+    ENGINE_PYTHON = 'python'
+    ENGINE_NUMPY = 'numpy'
+    ENGINE_BITBOARD = 'bitboard'
+    ENGINE_HASHLIFE = 'hashlife'
+    ENGINE_TILES = 'tiles'
+    ENGINE_DISTRIBUTED = 'distributed'
+
+    WORLD_BY_ENGINE_D = {
+        ENGINE_PYTHON: World,
+        ENGINE_NUMPY: NumpyWorld,
+        ENGINE_BITBOARD: BitboardWorld,
+        ENGINE_HASHLIFE: HashlifeWorld,
+        ENGINE_TILES: TileWorld,
+        ENGINE_DISTRIBUTED: DistributedWorld
+    }
+
+    def __init__(self, io_handler, state, engine=ENGINE_AUTO, final_state_only=None,
+                 detect_cycles=False, metrics=None, world_kwargs=None, seed=None):
         self.io_handler = io_handler
         self.state = state
+        self.engine = engine
+        self.final_state_only = final_state_only
+        self.detect_cycles = detect_cycles
+        self.metrics = metrics
+        self.world_kwargs = world_kwargs or {}
+        self.seed = seed if seed is not None else state.seed
+
+        if self.final_state_only is None:
+            self.final_state_only = self.io_handler.write_policy.FINAL_STATE_ONLY
 
     def start(self):
         """Main method which starts the whole game.
 
         The method prepares all the necessary objects like game engine, world and world grid.
         Also proceeds with the iterations. The number of iterations is specified in the state.
+        Phases of the game are measured if the game has the metrics.
+
+        Raises:
+            GameRuntimeError: If the engine is not known or the game can not proceed.
         """
+        world_class = self._get_world_class()
+        if self.metrics:
+            self.metrics.start()
+            self._open_metrics()
+
         print '* Initiating the rules engine. \n'
-        rules_engine = EvolutionRulesEngine()
+        rules_engine = EvolutionRulesEngine(seed=self.seed)
 
         print '* Preparing the world grid. \n'
         world_grid = WorldGrid(self.state.cells_cnt, self.state.cells_cnt)
 
         print '* Preparing the world itself. \n'
-        world = World(world_grid, self.state.organism_l, rules_engine)
+        world = world_class(world_grid, self.state.organism_l, rules_engine, **self.world_kwargs)
+        world.metrics = self.metrics
         try:
-            world.populate_initial_organisms()
+            self._run_phase(GameMetrics.PHASE_POPULATE, world.populate_initial_organisms)
         except WorldInternalError as err:
             raise GameRuntimeError('Game could not be initialized: %s' % err.message)
 
-        print '* Proceeding with iterations. \n'      
-        for i in xrange(self.state.iterations_cnt, 0, -1):
-            try:
-                world.iterate()
-            except WorldInternalError as err:
-                raise GameRuntimeError('Game could not proceed with iteration: %s' % err.message)
+        if self.metrics:
+            self.metrics.count_population(world.organism_l)
+
+        try:
+            self._open_trajectory(world)
+
+            print '* Proceeding with iterations. \n'
+            if self.final_state_only and world.JUMPS_AHEAD:
+                self._advance_to_final_state(world)
             else:
-                # save current state of the game and current iteration
-                self._save(world.organism_l, i - 1)
+                self._iterate_and_save(world)
+        finally:
+            world.close()
 
         print '* Cleaning after iterations. \n'
-        self._clean()
+        self._run_phase(GameMetrics.PHASE_CLEAN, self._clean)
+
+        if self.metrics:
+            self.metrics.stop()
+            self._close_metrics()
+
+    def _iterate_and_save(self, world):
+        """Iterates the world one by one and saves the state after every iteration.
+
+        Only the final state is saved if requested, otherwise the IO handler decides which
+        states are written. Once the world settles into a cycle,
+        the remaining iterations are skipped up to the one with the same state as the final.
+        Signals are deferred during every generation, so the pending state is built only from
+        the world which has finished the iteration it is saved as.
+
+        Attributes:
+            world (World): World to be iterated.
+
+        Raises:
+            GameRuntimeError: If the game can not proceed with iteration or save the state.
+        """
+        iterations_cnt = remaining_cnt = self.state.iterations_cnt
+
+        cycle_detector = None
+        if self.detect_cycles:
+            cycle_detector = CycleDetector()
+            cycle_detector.reset(world)
+
+        while remaining_cnt > 0:
+            if self.metrics:
+                self.metrics.start_generation()
+
+            self.io_handler.defer_signals()
+            try:
+                self._run_phase(GameMetrics.PHASE_EVOLVE, self._advance, world, 1)
+                remaining_cnt -= 1
+                changes_known = True
+                self._run_phase(GameMetrics.PHASE_TRAJECTORY, self._log_generation, world,
+                                iterations_cnt - remaining_cnt)
+
+                if cycle_detector:
+                    period = self._run_phase(GameMetrics.PHASE_CYCLES, cycle_detector.update,
+                                             world)
+                    if period:
+                        # every full period ends in the same state
+                        self._run_phase(GameMetrics.PHASE_EVOLVE, self._advance, world,
+                                        remaining_cnt % period)
+                        remaining_cnt = 0
+                        changes_known = False
+                        self._run_phase(GameMetrics.PHASE_TRAJECTORY, self._log_generation,
+                                        world, iterations_cnt, changes_known=False)
+
+                if not self.final_state_only or not remaining_cnt:
+                    # save current state of the game and current iteration
+                    self._run_phase(GameMetrics.PHASE_SAVE, self._save, world, remaining_cnt)
+            finally:
+                self.io_handler.release_signals()
+
+            if self.metrics:
+                self._end_generation(world, iterations_cnt - remaining_cnt, changes_known)
+
+    def _advance_to_final_state(self, world):
+        """Advances the world by all the iterations at once and saves the final state.
+
+        Attributes:
+            world (World): World to be advanced.
+
+        Raises:
+            GameRuntimeError: If the game can not proceed with iterations or save the state.
+        """
+        iterations_cnt = self.state.iterations_cnt
+        if not iterations_cnt:
+            return
+
+        if self.metrics:
+            self.metrics.start_generation()
+
+        self.io_handler.defer_signals()
+        try:
+            self._run_phase(GameMetrics.PHASE_EVOLVE, self._advance, world, iterations_cnt)
+            self._run_phase(GameMetrics.PHASE_TRAJECTORY, self._log_generation, world,
+                            iterations_cnt, changes_known=False)
+            self._run_phase(GameMetrics.PHASE_SAVE, self._save, world, 0)
+        finally:
+            self.io_handler.release_signals()
+
+        if self.metrics:
+            self._end_generation(world, iterations_cnt, changes_known=False)
+
+    def _advance(self, world, iterations_cnt):
+        """Advances the world by the amount of iterations.
+
+        Attributes:
+            world (World): World to be advanced.
+            iterations_cnt (int): Amount of iterations.
+
+        Raises:
+            GameRuntimeError: If the game can not proceed with iteration.
+        """
+        try:
+            world.advance(iterations_cnt)
+        except WorldInternalError as err:
+            raise GameRuntimeError('Game could not proceed with iteration: %s' % err.message)
+
+    def _run_phase(self, phase, method, *args, **kwargs):
+        """Runs the method as the phase of the game, measured only if there are metrics.
+
+        Attributes:
+            phase (str): Phase of the game (one of `GameMetrics.PHASE_*`).
+            method (callable): Method which is to be run.
+            *args: Arguments of the method.
+            **kwargs: Keyword arguments of the method.
+
+        Returns:
+            Whatever the method returns.
+        """
+        if not self.metrics:
+            return method(*args, **kwargs)
+
+        start_time = time.time()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.metrics.lap(phase, start_time)
+
+    def _get_world_class(self):
+        """Finds out the world class which implements the selected engine.
+
+        Returns:
+            (type): World class for the selected engine.
+
+        Raises:
+            GameRuntimeError: If the engine is not known.
+        """
+        engine = self.engine
+
+        if engine == self.ENGINE_AUTO:
+            # organisms decide, the amount of species in the header does not have to match
+            if len(get_species(self.state.organism_l)) > 1:
+                engine = self.ENGINE_PYTHON
+            elif self.final_state_only:
+                engine = self.ENGINE_HASHLIFE
+            else:
+                engine = self.ENGINE_BITBOARD
 
-    def _save(self, organism_l, iteration):
+        try:
+            return self.WORLD_BY_ENGINE_D[engine]
+        except KeyError:
+            raise GameRuntimeError('Engine is not known: %s' % self.engine)
+
+    def _open_trajectory(self, world):
+        """Opens the trajectory of the game (if requested) with the initial generation.
+
+        Attributes:
+            world (World): World with the initial organisms.
+
+        Raises:
+            GameRuntimeError: If the trajectory can not be written.
+        """
+        try:
+            self.io_handler.open_trajectory(self.state.cells_cnt, self.state.species_cnt)
+        except WriteStateError as err:
+            raise GameRuntimeError('Game could not save the trajectory: %s' % err.message)
+
+        self._log_generation(world, 0, changes_known=False)
+
+    def _log_generation(self, world, generation, changes_known=True):
+        """Appends the current generation to the trajectory of the game (if requested).
+
+        The trajectory is built from the births and deaths reported by the world.
+
+        Args:
+            world (World): World with organisms of the generation.
+            generation (int): Generation (iterations since the initial state).
+            changes_known (bool, optional): False if the world was advanced by more than
+                one iteration, so its changes do not lead from the previous generation.
+
+        Raises:
+            GameRuntimeError: If the generation can not be written.
+        """
+        if not self.io_handler.trajectory_writer:
+            return
+
+        born_organism_l, dead_organism_l = None, None
+        if changes_known:
+            born_organism_l, dead_organism_l = world.born_organism_l, world.dead_organism_l
+
+        try:
+            self.io_handler.log_generation(generation, lambda: world.organism_l,
+                                           born_organism_l, dead_organism_l)
+        except WriteStateError as err:
+            raise GameRuntimeError('Game could not save the trajectory: %s' % err.message)
+
+    def _open_metrics(self):
+        """Opens the metrics file of the game (if requested).
+
+        Raises:
+            GameRuntimeError: If the metrics file can not be opened.
+        """
+        try:
+            self.io_handler.open_metrics()
+        except WriteStateError as err:
+            raise GameRuntimeError('Game could not save the metrics: %s' % err.message)
+
+    def _end_generation(self, world, generation, changes_known=True):
+        """Ends measuring of the generation and writes its metrics (if requested).
+
+        Args:
+            world (World): World with organisms of the generation.
+            generation (int): Generation (iterations since the initial state).
+            changes_known (bool, optional): False if the world was advanced by more than
+                one iteration, so its changes do not lead from the previous generation.
+
+        Raises:
+            GameRuntimeError: If the metrics can not be written.
+        """
+        born_organism_l, dead_organism_l = None, None
+        if changes_known:
+            born_organism_l, dead_organism_l = world.born_organism_l, world.dead_organism_l
+
+        record = self.metrics.end_generation(generation, born_organism_l, dead_organism_l,
+                                             lambda: world.organism_l)
+        if record is not None:
+            self._log_metrics(record)
+
+    def _log_metrics(self, record):
+        """Writes the metrics record (if requested).
+
+        Args:
+            record (dict): Metrics of the generation or the summary of the game.
+
+        Raises:
+            GameRuntimeError: If the metrics can not be written.
+        """
+        try:
+            self.io_handler.log_metrics(record)
+        except WriteStateError as err:
+            raise GameRuntimeError('Game could not save the metrics: %s' % err.message)
+
+    def _close_metrics(self):
+        """Writes the summary of the metrics (if requested) and closes the metrics file.
+
+        Raises:
+            GameRuntimeError: If the summary can not be written.
+        """
+        try:
+            self._log_metrics(self.metrics.get_summary())
+        finally:
+            self.io_handler.close_metrics()
+
+    def _save(self, world, iteration):
         """Saves the current state of the game to the output file.
 
+        The state is written only if the write policy of IO handler says so, otherwise
+        it is deferred (and built only if it is written later, e.g. on exit or signal).
+
         Args:
-            organism_l (list): Organisms to be saved.
+            world (World): World with organisms to be saved.
             iteration (int): Iteration to be saved.
+
+        Raises:
+            GameRuntimeError: If the state can not be written.
         """
-        self.state = self._get_current_state(organism_l, iteration)
+        state_getter = lambda: self._get_current_state(world.organism_l, iteration)
+
+        if not self.io_handler.is_write_due(iteration):
+            self.io_handler.defer_state(state_getter, iteration)
+            return
+
+        self.state = state_getter()
 
         try:
             self.io_handler.write_state(self.state, iteration)
@@ -68,6 +393,9 @@ class Game(object):
     def _get_current_state(self, organism_l, iteration):
         """Finds out the current state of the game.
 
+        Organisms of the state are ordered by x and then by y coordinates, the world keeps
+        them in no particular order.
+
         Args:
             organism_l (list): Organisms to be used in current state.
             iteration (int): Iteration to be saved in current state.
@@ -75,14 +403,21 @@ class Game(object):
         Returns:
             State: Current state of the game.
         """
-        return State(self.state.cells_cnt, self.state.species_cnt, iteration, organism_l)
+        return State(self.state.cells_cnt, self.state.species_cnt, iteration,
+                     get_ordered(organism_l))
 
     def _clean(self):
         """Cleans up after the iterations are completed.
 
-        Mainly to clean the IO handler (close the output file).
+        Mainly to clean the IO handler (write the pending state and close the output file).
+
+        Raises:
+            GameRuntimeError: If the pending state can not be written.
         """
-        self.io_handler.clean()
+        try:
+            self.io_handler.clean()
+        except WriteStateError as err:
+            raise GameRuntimeError('Game could not save the state: %s' % err.message)
 
 
 class GameRuntimeError(Exception):
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+import sys
+import math
+import time
+from array import array
+
+from life_game.models.organism_store import iter_cells
+
+try:
+    import resource
+except ImportError:
+    # not available out of the Unix-like systems
+    resource = None
+
+
+class GameMetrics(object):
+    """Collects the metrics of the game by generations.
+
+    The game and the world measure their phases only if they are given the metrics, so there
+    is no cost when the metrics are disabled. The world phases (`PHASE_NEIGHBOURS`,
+    `PHASE_RULES`, `PHASE_UPDATE`) are part of the `PHASE_EVOLVE` phase of the game, phases
+    measured out of any generation (e.g. `PHASE_POPULATE`) count only to the totals.
+
+    Population by species is counted once and then updated by births and deaths, it is
+    counted again only if the changes of the generation are not known.
+
+    Latencies of the generations are kept in the histogram, so the memory does not grow with
+    the amount of generations. Records of the generations are built only if requested.
+
+    Attributes:
+        generation (int): The last generation which ended.
+        population_d (dict): Amount of organisms by species.
+        births_cnt (int): Amount of organisms born in all the generations (with known changes).
+        deaths_cnt (int): Amount of organisms died in all the generations (with known changes).
+        phase_seconds_d (dict): Seconds spent by phases in total.
+        latency_histogram (LatencyHistogram): Seconds spent by generations.
+        generation_records (bool): True if the records of the generations are built, False
+            if only the summary is (e.g. the generations are not written).
+    """
+    PHASE_POPULATE = 'populate'
+    PHASE_EVOLVE = 'evolve'
+    PHASE_NEIGHBOURS = 'neighbours'
+    PHASE_RULES = 'rules'
+    PHASE_UPDATE = 'update'
+    PHASE_CYCLES = 'cycles'
+    PHASE_TRAJECTORY = 'trajectory'
+    PHASE_SAVE = 'save'
+    PHASE_CLEAN = 'clean'
+
+    RECORD_GENERATION = 'generation'
+    RECORD_SUMMARY = 'summary'
+
+    PERCENTILE_L = (50, 90, 99)
+
+    def __init__(self, generation_records=True):
+        self.generation = 0
+        self.population_d = {}
+        self.births_cnt = 0
+        self.deaths_cnt = 0
+        self.phase_seconds_d = {}
+        self.latency_histogram = LatencyHistogram()
+        self.generation_records = generation_records
+
+        self._start_time = None
+        self._stop_time = None
+        self._generation_start_time = None
+        self._generation_phase_seconds_d = None
+
+    def start(self):
+        """Starts measuring of the whole game."""
+        self._start_time = time.time()
+        self._stop_time = None
+
+    def stop(self):
+        """Stops measuring of the whole game."""
+        self._stop_time = time.time()
+
+    def add_phase(self, phase, seconds):
+        """Adds the time spent by the phase.
+
+        Attributes:
+            phase (str): Phase of the game (one of `PHASE_*`).
+            seconds (float): Seconds spent by the phase.
+        """
+        self.phase_seconds_d[phase] = self.phase_seconds_d.get(phase, 0.0) + seconds
+
+        if self._generation_phase_seconds_d is not None:
+            self._generation_phase_seconds_d[phase] = \
+                self._generation_phase_seconds_d.get(phase, 0.0) + seconds
+
+    def lap(self, phase, start_time):
+        """Adds the time since the start of the phase, so the next phase can start.
+
+        Attributes:
+            phase (str): Phase of the game (one of `PHASE_*`).
+            start_time (float): Time the phase started.
+
+        Returns:
+            (float): Current time.
+        """
+        now = time.time()
+        self.add_phase(phase, now - start_time)
+
+        return now
+
+    def count_population(self, organism_l):
+        """Counts the organisms by species.
+
+        Attributes:
+            organism_l (iterable): Organisms (or store) of the game.
+        """
+        population_d = dict.fromkeys(self.population_d, 0)
+
+        for _, _, species in iter_cells(organism_l):
+            population_d[species] = population_d.get(species, 0) + 1
+
+        self.population_d = population_d
+
+    def start_generation(self):
+        """Starts measuring of the generation."""
+        self._generation_start_time = time.time()
+        self._generation_phase_seconds_d = {} if self.generation_records else None
+
+    def end_generation(self, generation, born_organism_l, dead_organism_l, organism_getter):
+        """Ends measuring of the generation.
+
+        Attributes:
+            generation (int): Generation (iterations since the initial state).
+            born_organism_l (list): Organisms born since the previous generation, None
+                if not known.
+            dead_organism_l (list): Organisms died since the previous generation, None
+                if not known.
+            organism_getter (callable): Builds all the organisms of the generation, called
+                only if the changes are not known.
+
+        Returns:
+            record (dict): Metrics of the generation (JSON serializable), None if the records
+                of the generations are not built.
+        """
+        latency = time.time() - self._generation_start_time
+        self.latency_histogram.add(latency)
+        self.generation = generation
+
+        births_cnt, deaths_cnt = None, None
+        if born_organism_l is None or dead_organism_l is None:
+            self.count_population(organism_getter())
+        else:
+            births_cnt, deaths_cnt = len(born_organism_l), len(dead_organism_l)
+            self.births_cnt += births_cnt
+            self.deaths_cnt += deaths_cnt
+
+            population_d = self.population_d
+            for _, _, species in iter_cells(born_organism_l):
+                population_d[species] = population_d.get(species, 0) + 1
+            for _, _, species in iter_cells(dead_organism_l):
+                population_d[species] -= 1
+
+        if not self.generation_records:
+            return None
+
+        record = {
+            'type': self.RECORD_GENERATION,
+            'generation': generation,
+            'seconds': latency,
+            'phase_seconds': self._generation_phase_seconds_d,
+            'population': dict(self.population_d),
+            'births': births_cnt,
+            'deaths': deaths_cnt
+        }
+        self._generation_phase_seconds_d = None
+
+        return record
+
+    def get_summary(self):
+        """Summarizes the metrics of the whole game.
+
+        Returns:
+            summary (dict): Metrics of the game (JSON serializable).
+        """
+        stop_time = self._stop_time if self._stop_time is not None else time.time()
+        seconds = stop_time - self._start_time if self._start_time is not None else 0.0
+
+        latency_d = {}
+        if self.latency_histogram.count:
+            for percentile in self.PERCENTILE_L:
+                latency_d['p%d' % percentile] = self.latency_histogram.get_percentile(percentile)
+            latency_d['max'] = self.latency_histogram.max_latency
+
+        return {
+            'type': self.RECORD_SUMMARY,
+            'generations': self.generation,
+            'seconds': seconds,
+            'generations_per_second': self.generation / seconds if seconds else None,
+            'latency_seconds': latency_d,
+            'phase_seconds': dict(self.phase_seconds_d),
+            'population': dict(self.population_d),
+            'births': self.births_cnt,
+            'deaths': self.deaths_cnt,
+            'peak_rss_kb': get_peak_rss_kb()
+        }
+
+
+class LatencyHistogram(object):
+    """Histogram of latencies in logarithmic buckets (fixed memory, any amount of latencies).
+
+    Bucket `i` holds the latencies in (`MIN_LATENCY` * g ** (i - 1), `MIN_LATENCY` * g ** i],
+    where g = (1 + `RELATIVE_ERROR`) / (1 - `RELATIVE_ERROR`), so its representative value
+    differs from any of them by `RELATIVE_ERROR` at most. The minimum and the maximum are
+    kept exactly.
+
+    Attributes:
+        count (int): Amount of latencies.
+        min_latency (float): The lowest latency, None if there is none.
+        max_latency (float): The highest latency, None if there is none.
+        bucket_cnt_a (array): Amount of latencies by buckets.
+    """
+    RELATIVE_ERROR = 0.01
+    # lower latencies fall into the first bucket, higher ones than about a day into the last
+    MIN_LATENCY = 1e-6
+    BUCKETS_CNT = 1300
+
+    GROWTH = (1 + RELATIVE_ERROR) / (1 - RELATIVE_ERROR)
+    _LOG_GROWTH = math.log(GROWTH)
+
+    def __init__(self):
+        self.count = 0
+        self.min_latency = None
+        self.max_latency = None
+        self.bucket_cnt_a = array('L', [0]) * self.BUCKETS_CNT
+
+    def add(self, latency):
+        """Adds the latency to its bucket.
+
+        Attributes:
+            latency (float): Seconds spent.
+        """
+        if latency > self.MIN_LATENCY:
+            bucket = min(int(math.ceil(math.log(latency / self.MIN_LATENCY) / self._LOG_GROWTH)),
+                         self.BUCKETS_CNT - 1)
+        else:
+            bucket = 0
+        self.bucket_cnt_a[bucket] += 1
+
+        self.count += 1
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        if self.max_latency is None or latency > self.max_latency:
+            self.max_latency = latency
+
+    def get_percentile(self, percentile):
+        """Estimates the percentile of the latencies (nearest rank).
+
+        Attributes:
+            percentile (float): Percentile (0 up to 100).
+
+        Returns:
+            (float): Representative latency of the bucket of the rank, None if there is none.
+        """
+        if not self.count:
+            return None
+
+        rank = max(int(math.ceil(percentile / 100.0 * self.count)), 1)
+        bucket_cnt_sum = 0
+
+        for bucket, bucket_cnt in enumerate(self.bucket_cnt_a):
+            bucket_cnt_sum += bucket_cnt
+            if bucket_cnt_sum >= rank:
+                break
+
+        latency = self.MIN_LATENCY * 2 * self.GROWTH ** bucket / (self.GROWTH + 1)
+
+        return min(max(latency, self.min_latency), self.max_latency)
+
+
+def get_peak_rss_kb():
+    """Finds out the peak resident set size of the process.
+
+    Returns:
+        (int): Peak RSS in kilobytes, None if it can not be found out.
+    """
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # reported in bytes there
+        peak_rss //= 1024
+
+    return peak_rss
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+
+class NeighbourTable(object):
+    """Precomputed neighbours of every cell of the grid of one size.
+
+    Cells are addressed by flat indices (x * height + y). Each cell has `NEIGHBOURS_CNT`
+    slots in the flat `index_a` array, the slots of the neighbours outside of the grid point
+    to the extra `outside_index` cell, so the borders need no checks - buffers indexed by
+    the table just keep one more (always empty) cell at the end.
+
+    Tables depend only on the grid size, use `get` to share them among the grids. A table
+    takes `NEIGHBOURS_CNT` * 4 bytes per cell, so tables of large grids are not kept.
+
+    Attributes:
+        width (int): Width of x axes.
+        height (int): Height of y axes.
+        neighbours_cnt_a (array): Amounts of the neighbours inside of the grid by cells.
+    """
+    NEIGHBOURS_CNT = 8
+    TYPECODE = 'I'
+    # amount of grid sizes whose tables are kept by `get`
+    CACHE_SIZE = 8
+    # tables of the grids with more cells are built for the caller only (32 MB per table)
+    CACHE_MAX_CELLS = 1 << 20
+    # rows of the grid built at once, so the temporary arrays stay small
+    BUILD_ROWS = 256
+    # same order as `WorldGrid.get_neighboring_cells_at` always used
+    OFFSET_L = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+    _table_d = OrderedDict()
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.outside_index = width * height
+
+        self.index_a, self.neighbours_cnt_a = self._build_index_arrays()
+
+    @classmethod
+    def get(cls, width, height):
+        """Retrieves the table for the grid size, built only once for the recent small sizes.
+
+        Attributes:
+            width (int): Width of x axes.
+            height (int): Height of y axes.
+
+        Returns:
+            table (NeighbourTable): Table for the grid size.
+        """
+        key = (width, height)
+        if width * height > cls.CACHE_MAX_CELLS:
+            return cls(width, height)
+
+        table = cls._table_d.pop(key, None)
+        if table is None:
+            table = cls(width, height)
+
+        cls._table_d[key] = table
+        while len(cls._table_d) > cls.CACHE_SIZE:
+            cls._table_d.popitem(last=False)
+
+        return table
+
+    def get_neighbour_indices(self, index):
+        """Retrieves slots of the cell's neighbours.
+
+        Attributes:
+            index (int): Flat index of the valid cell.
+
+        Returns:
+            (array): Flat indices of the neighbours, `outside_index` outside of the grid.
+        """
+        start = index * self.NEIGHBOURS_CNT
+
+        return self.index_a[start:start + self.NEIGHBOURS_CNT]
+
+    def _build_index_arrays(self):
+        """Builds the flat array of neighbour slots of all the cells.
+
+        The arrays are built by `BUILD_ROWS` rows of the grid, each block is converted
+        at once, without going through its items.
+
+        Returns:
+            index_a (array): `NEIGHBOURS_CNT` neighbour indices per cell.
+            neighbours_cnt_a (array): Amounts of the neighbours inside of the grid by cells.
+        """
+        width, height = self.width, self.height
+        index_a = array(self.TYPECODE)
+        neighbours_cnt_a = array('B')
+
+        for start_x in xrange(0, width, self.BUILD_ROWS):
+            x_grid, y_grid = np.meshgrid(np.arange(start_x, min(start_x + self.BUILD_ROWS, width)),
+                                         np.arange(height), indexing='ij')
+            index_grid = np.empty(x_grid.shape + (self.NEIGHBOURS_CNT,), dtype=self.TYPECODE)
+
+            for slot, (dx, dy) in enumerate(self.OFFSET_L):
+                neighbour_x_grid, neighbour_y_grid = x_grid + dx, y_grid + dy
+                inside_grid = (neighbour_x_grid >= 0) & (neighbour_x_grid < width) & \
+                    (neighbour_y_grid >= 0) & (neighbour_y_grid < height)
+                index_grid[:, :, slot] = np.where(inside_grid,
+                                                  neighbour_x_grid * height + neighbour_y_grid,
+                                                  self.outside_index)
+
+            index_a.fromstring(index_grid.tostring())
+            neighbours_cnt_a.fromstring(
+                (index_grid != self.outside_index).sum(axis=2).astype('B').tostring())
+
+        return index_a, neighbours_cnt_a
@@ -9,11 +9,27 @@ class Organism(object):
         y (int): Coordinate at y axes.
         species (int): Species identifier.
     """
+    # there are lots of organisms, they do not need the instance dict
+    __slots__ = ('x', 'y', 'species')
+    # organisms are compared and hashed by value, the grid and the stores build them as views
+
     def __init__(self, x, y, species):
         self.x = x
         self.y = y
         self.species = species
 
+    def __eq__(self, other):
+        if not isinstance(other, Organism):
+            return NotImplemented
+
+        return (self.x, self.y, self.species) == (other.x, other.y, other.species)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.species))
+
     def __str__(self):
         return '%(x)s-%(y)s-%(species)s' % {'x': self.x,
                                             'y' : self.y,
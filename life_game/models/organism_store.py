@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+from array import array
+from itertools import izip
+
+import numpy as np
+
+from life_game.models.organism import Organism
+
+
+class OrganismStore(object):
+    """Stores organisms in parallel typed arrays (struct of arrays).
+
+    A living organism takes 6 bytes instead of a whole `Organism` object. Organisms are
+    built lazily while the store is iterated or indexed, they are views only - changing
+    them does not change the store. Coordinates and species must fit into 16 bits.
+
+    Organisms are kept in the order they were stored until the store is updated by births
+    and deaths, then in no particular order (see `get_ordered`).
+
+    Attributes:
+        x_a (array): Coordinates at x axes.
+        y_a (array): Coordinates at y axes.
+        species_a (array): Species identifiers.
+    """
+    TYPECODE = 'H'
+    # the largest coordinate or species which fits into the arrays
+    MAX_VALUE = 0xFFFF
+    # class of the organisms built while the store is iterated or indexed
+    ORGANISM_CLASS = Organism
+    # the store is mutable and compared by organisms
+    __hash__ = None
+    # index of the organism by the key of its cell, built by the first update
+    _index_d = None
+
+    def __init__(self, organism_l=()):
+        self.x_a = array(self.TYPECODE)
+        self.y_a = array(self.TYPECODE)
+        self.species_a = array(self.TYPECODE)
+
+        self.extend(organism_l)
+
+    @classmethod
+    def from_cells(cls, cell_l):
+        """Builds the store from cells with organisms.
+
+        Attributes:
+            cell_l (iterable): Cells with organisms (x|y|species).
+
+        Returns:
+            organism_store (OrganismStore): Store with the organisms.
+
+        Raises:
+            OrganismStoreError: If coordinates or species do not fit into the arrays.
+        """
+        organism_store = cls()
+
+        for x, y, species in cell_l:
+            organism_store.append_cell(x, y, species)
+
+        return organism_store
+
+    @classmethod
+    def from_arrays(cls, x_a, y_a, species_a):
+        """Builds the store from parallel arrays (copied), e.g. numpy arrays of engines.
+
+        Attributes:
+            x_a (iterable): Coordinates at x axes.
+            y_a (iterable): Coordinates at y axes.
+            species_a (iterable): Species identifiers.
+
+        Returns:
+            organism_store (OrganismStore): Store with the organisms.
+
+        Raises:
+            OrganismStoreError: If coordinates or species do not fit into the arrays.
+        """
+        organism_store = cls()
+
+        for store_a, source_a in ((organism_store.x_a, x_a), (organism_store.y_a, y_a),
+                                  (organism_store.species_a, species_a)):
+            if hasattr(source_a, 'astype'):
+                # numpy array is converted at once, without going through its items
+                # (the conversion would wrap the values which do not fit silently)
+                if len(source_a) and (source_a.min() < 0 or source_a.max() > cls.MAX_VALUE):
+                    raise OrganismStoreError('Values out of range 0..%s.' % cls.MAX_VALUE)
+                store_a.fromstring(source_a.astype(cls.TYPECODE).tostring())
+            else:
+                try:
+                    store_a.extend(source_a)
+                except OverflowError as err:
+                    raise OrganismStoreError('Values out of range 0..%s. %s'
+                                             % (cls.MAX_VALUE, err.message))
+
+        return organism_store
+
+    def __len__(self):
+        return len(self.x_a)
+
+    def __iter__(self):
+        for x, y, species in izip(self.x_a, self.y_a, self.species_a):
+            yield self.ORGANISM_CLASS(x, y, species)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return OrganismStore.from_arrays(self.x_a[index], self.y_a[index],
+                                             self.species_a[index])
+
+        return self.ORGANISM_CLASS(self.x_a[index], self.y_a[index], self.species_a[index])
+
+    def __eq__(self, other):
+        try:
+            return list(self.iter_cells()) == list(iter_cells(other))
+        except (TypeError, AttributeError):
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return '[%s]' % ', '.join(str(organism) for organism in self)
+
+    def append(self, organism):
+        """Appends organism to the store.
+
+        Attributes:
+            organism (Organism): Organism to be stored.
+
+        Raises:
+            OrganismStoreError: If coordinates or species do not fit into the arrays.
+        """
+        self.append_cell(organism.x, organism.y, organism.species)
+
+    def append_cell(self, x, y, species):
+        """Appends organism of the cell to the store.
+
+        Values are checked before they are appended, so the arrays stay parallel.
+
+        Attributes:
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+            species (int): Species identifier.
+
+        Raises:
+            OrganismStoreError: If coordinates or species do not fit into the arrays.
+        """
+        if not (0 <= x <= self.MAX_VALUE and 0 <= y <= self.MAX_VALUE
+                and 0 <= species <= self.MAX_VALUE):
+            raise OrganismStoreError('Organism %s-%s-%s is out of range 0..%s.'
+                                     % (x, y, species, self.MAX_VALUE))
+
+        self.x_a.append(x)
+        self.y_a.append(y)
+        self.species_a.append(species)
+        self._index_d = None
+
+    def extend(self, organism_l):
+        """Appends organisms to the store.
+
+        Attributes:
+            organism_l (iterable): Organisms (or another store) to be stored.
+        """
+        if isinstance(organism_l, OrganismStore):
+            self.x_a.extend(organism_l.x_a)
+            self.y_a.extend(organism_l.y_a)
+            self.species_a.extend(organism_l.species_a)
+            self._index_d = None
+            return
+
+        for organism in organism_l:
+            self.append(organism)
+
+    def iter_cells(self):
+        """Iterates over the cells with organisms without building the organisms.
+
+        Returns:
+            (iterator): Cells with organisms (x|y|species).
+        """
+        return izip(self.x_a, self.y_a, self.species_a)
+
+    def get_species(self):
+        """Finds out the species of the organisms.
+
+        Returns:
+            species_s (set): Species identifiers.
+        """
+        return set(self.species_a)
+
+    def replace_organisms(self, born_organism_l, dead_organism_l):
+        """Removes dead organisms from the store and adds born organisms (in place).
+
+        Born organisms take the slots of the dead ones, the rest of the slots is filled by
+        the last organisms of the store (or the born ones are appended), so the work scales
+        with the amount of births and deaths, not with the amount of organisms. The order
+        of the organisms is not kept.
+
+        Slots are found by the index of the cells, built by the first update and kept
+        up to date afterwards.
+
+        Attributes:
+            born_organism_l (list): Organisms which are to be added.
+            dead_organism_l (list): Organisms which are to be removed (compared by x|y).
+
+        Returns:
+            organism_store (OrganismStore): The store itself.
+
+        Raises:
+            OrganismStoreError: If coordinates or species do not fit into the arrays.
+        """
+        born_cell_l = list(iter_cells(born_organism_l))
+        for x, y, species in born_cell_l:
+            # checked before the store is changed, so the arrays stay parallel
+            if not (0 <= x <= self.MAX_VALUE and 0 <= y <= self.MAX_VALUE
+                    and 0 <= species <= self.MAX_VALUE):
+                raise OrganismStoreError('Organism %s-%s-%s is out of range 0..%s.'
+                                         % (x, y, species, self.MAX_VALUE))
+
+        index_d = self._get_index_d()
+        x_a, y_a, species_a = self.x_a, self.y_a, self.species_a
+
+        free_index_l = []
+        for x, y, _ in iter_cells(dead_organism_l):
+            index = index_d.pop((x << 16) | y, None)
+            if index is not None:
+                free_index_l.append(index)
+
+        for x, y, species in born_cell_l:
+            if free_index_l:
+                index = free_index_l.pop()
+                x_a[index], y_a[index], species_a[index] = x, y, species
+            else:
+                index = len(x_a)
+                x_a.append(x)
+                y_a.append(y)
+                species_a.append(species)
+            index_d[(x << 16) | y] = index
+
+        # from the last slot, so the organism moved to the slot is never a dead one
+        for index in sorted(free_index_l, reverse=True):
+            last_index = len(x_a) - 1
+            if index != last_index:
+                x_a[index], y_a[index], species_a[index] = \
+                    x_a[last_index], y_a[last_index], species_a[last_index]
+                index_d[(x_a[index] << 16) | y_a[index]] = index
+            for store_a in (x_a, y_a, species_a):
+                store_a.pop()
+
+        return self
+
+    def get_ordered(self):
+        """Orders the organisms by x and then by y coordinates, e.g. before they are written.
+
+        Returns:
+            organism_store (OrganismStore): Store with the ordered organisms, the store
+                itself if it is ordered already.
+        """
+        if len(self) < 2:
+            return self
+
+        key_a = _get_keys(np.frombuffer(self.x_a, dtype=np.uint16),
+                          np.frombuffer(self.y_a, dtype=np.uint16))
+        if (key_a[1:] >= key_a[:-1]).all():
+            return self
+
+        order_a = np.argsort(key_a, kind='mergesort')
+        return OrganismStore.from_arrays(
+            (key_a >> 16)[order_a], (key_a & self.MAX_VALUE)[order_a],
+            np.frombuffer(self.species_a, dtype=np.uint16)[order_a])
+
+    def _get_index_d(self):
+        """Builds the index of the organisms by the keys of their cells (on the first use).
+
+        Returns:
+            index_d (dict): Index of the organism in the arrays by the key of its cell
+                (x in the upper 16 bits, y in the lower).
+        """
+        if self._index_d is None:
+            self._index_d = dict(((x << 16) | y, index) for index, (x, y)
+                                 in enumerate(izip(self.x_a, self.y_a)))
+
+        return self._index_d
+
+
+class LabelGridStore(OrganismStore):
+    """Store of the organisms of a grid of species labels, e.g. mapped from a binary file.
+
+    The grid is kept as it is (not copied) and the arrays of the store are built from it
+    only once they are used. Engines which keep a label grid load it directly (see
+    `NumpyWorld`), so the organisms are not built at all.
+
+    Attributes:
+        label_grid (numpy.ndarray): Species labels indexed by x|y coordinates, 0 for
+            an empty cell.
+    """
+    # rows of the grid counted at once, so the counting does not copy the whole grid
+    COUNT_ROWS = 256
+
+    def __init__(self, label_grid):
+        self.label_grid = label_grid
+        self._organism_store = None
+
+    @property
+    def x_a(self):
+        """array: Coordinates at x axes (built on the first use)."""
+        return self._get_organism_store().x_a
+
+    @property
+    def y_a(self):
+        """array: Coordinates at y axes (built on the first use)."""
+        return self._get_organism_store().y_a
+
+    @property
+    def species_a(self):
+        """array: Species identifiers (built on the first use)."""
+        return self._get_organism_store().species_a
+
+    def __len__(self):
+        if self._organism_store is not None:
+            return len(self._organism_store)
+
+        return int(np.count_nonzero(self.label_grid))
+
+    def get_ordered(self):
+        """Organisms of the grid are ordered already.
+
+        Returns:
+            organism_store (LabelGridStore): The store itself.
+        """
+        if self._organism_store is not None:
+            return self._organism_store.get_ordered()
+
+        return self
+
+    def get_species(self):
+        """Finds out the species of the organisms without building the organisms.
+
+        Returns:
+            species_s (set): Species identifiers.
+        """
+        return set(int(species) for species in np.flatnonzero(self.count_species()[1:]) + 1)
+
+    def count_species(self):
+        """Counts the cells by species label, a few rows at once.
+
+        Returns:
+            species_cnt_a (numpy.ndarray): Amount of cells by label (0 for the empty ones).
+        """
+        species_cnt_a = np.zeros(1, dtype=np.int64)
+
+        for x in xrange(0, len(self.label_grid), self.COUNT_ROWS):
+            row_species_cnt_a = np.bincount(self.label_grid[x:x + self.COUNT_ROWS].ravel())
+            if len(row_species_cnt_a) > len(species_cnt_a):
+                row_species_cnt_a[:len(species_cnt_a)] += species_cnt_a
+                species_cnt_a = row_species_cnt_a
+            else:
+                species_cnt_a[:len(row_species_cnt_a)] += row_species_cnt_a
+
+        return species_cnt_a
+
+    def _get_organism_store(self):
+        """Builds the store of the organisms from the label grid (on the first use).
+
+        Returns:
+            organism_store (OrganismStore): Organisms ordered by x and then by y coordinates.
+        """
+        if self._organism_store is None:
+            x_a, y_a = np.nonzero(self.label_grid)
+            self._organism_store = OrganismStore.from_arrays(x_a, y_a, self.label_grid[x_a, y_a])
+
+        return self._organism_store
+
+
+def _get_keys(x_a, y_a):
+    """Builds keys of the cells, ordered by x and then by y coordinates.
+
+    Attributes:
+        x_a (numpy.ndarray): Coordinates at x axes.
+        y_a (numpy.ndarray): Coordinates at y axes.
+
+    Returns:
+        key_a (numpy.ndarray): Keys of the cells (x in the upper 16 bits, y in the lower).
+    """
+    return (x_a.astype(np.uint32) << 16) | y_a.astype(np.uint32)
+
+
+def iter_cells(organism_l):
+    """Iterates over the cells with organisms of a store or a list of organisms.
+
+    Attributes:
+        organism_l (iterable): Organisms (or store) to be iterated.
+
+    Returns:
+        (iterator): Cells with organisms (x|y|species).
+    """
+    if isinstance(organism_l, OrganismStore):
+        return organism_l.iter_cells()
+
+    return ((organism.x, organism.y, organism.species) for organism in organism_l)
+
+
+def get_ordered(organism_l):
+    """Orders the organisms of a store by x and then by y coordinates (see `get_ordered`).
+
+    Attributes:
+        organism_l (iterable): Organisms (or store), a list of organisms is kept as it is.
+
+    Returns:
+        organism_l (iterable): Ordered organisms (or store).
+    """
+    if isinstance(organism_l, OrganismStore):
+        return organism_l.get_ordered()
+
+    return organism_l
+
+
+def get_species(organism_l):
+    """Finds out the species of the organisms of a store or a list of organisms.
+
+    Attributes:
+        organism_l (iterable): Organisms (or store).
+
+    Returns:
+        species_s (set): Species identifiers.
+    """
+    if isinstance(organism_l, OrganismStore):
+        return organism_l.get_species()
+
+    return set(organism.species for organism in organism_l)
+
+
+class OrganismStoreError(Exception):
+    pass
@@ -9,12 +9,15 @@ class State(object):
         species_cnt (int): Amount of species in the game.
         iterations_cnt (int): Value of current iteration in the game.
         organism_l (list): Organisms which are currently present in the game.
+        seed (int): Seed of the random choices of the game, None if the choices are not
+            reproducible.
     """
-    def __init__(self, cells_cnt, species_cnt, iterations_cnt, organism_l):
+    def __init__(self, cells_cnt, species_cnt, iterations_cnt, organism_l, seed=None):
         self.cells_cnt = cells_cnt
         self.species_cnt = species_cnt
         self.iterations_cnt = iterations_cnt
         self.organism_l = organism_l
+        self.seed = seed
 
     def __str__(self):
         return '%(cells)s-%(species)s-%(iterations)s' % {'cells': self.cells_cnt,
@@ -25,7 +28,7 @@ class State(object):
         """Validates if state's attributes are valid.
 
         Mainly checks if the cells, species and iterations are ints and higher or equal to 0.
-        Also checks if the organisms are specified.
+        Also checks if the organisms are specified and the seed (if any) is not negative.
 
         Returns:
             bool: True if attributes are valid, False otherwise.
@@ -42,4 +45,7 @@ class State(object):
         if not self.organism_l:
             return False
 
+        if self.seed is not None and self.seed < 0:
+            return False
+
         return True
@@ -1,6 +1,14 @@
 #!/usr/bin/env python
+import time
+
+import numpy as np
+
 from life_game.models.world_grid import WorldGrid, WorldGridCoordinatesError
-from life_game.rules.evolution_rules_engine import EngineCanNotEvolveOrganismError
+from life_game.models.organism import Organism
+from life_game.models.metrics import GameMetrics
+from life_game.models.organism_store import OrganismStore, get_species
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+from life_game.rules.rule_spec import RuleSpec
 
 
 class World(object):
@@ -11,13 +19,35 @@ class World(object):
 
     Attributes:
         world_grid (WorldGrid): Living space for organisms (world grid).
-        organism_l (int): Organisms which are currently present in the game.
+        organism_l (OrganismStore): Organisms which are currently present in the game
+            (list of organisms is accepted on construction).
         rules_engine (EvolutionRulesEngine): Applies evolution rules on organisms.
+        active_cell_s (set): Cells (x|y) changed in the last iteration, None if all the cells
+            have to be evaluated.
+        born_organism_l (list): Organisms born in the last iteration, None if not known.
+        dead_organism_l (list): Organisms died in the last iteration, None if not known.
+        species_cnt (int): The highest species identifier in the world.
+        species_l (list): Species which were present in the world, ordered (index + 1 is
+            the label of the species in the batches).
+        metrics (GameMetrics): Metrics the phases of iterations are added to, None if they
+            are not measured.
+        generation (int): Generation (iterations since the initial state), keys the random
+            choices of the seeded rules engine.
     """
+    # True if the world can advance by more iterations at once faster than one by one
+    JUMPS_AHEAD = False
+
     def __init__(self, world_grid, organism_l, rules_engine):
         self.world_grid = world_grid
         self.organism_l = organism_l
         self.rules_engine = rules_engine
+        self.active_cell_s = None
+        self.born_organism_l = []
+        self.dead_organism_l = []
+        self.species_cnt = 0
+        self.species_l = []
+        self.metrics = None
+        self.generation = 0
 
     @property
     def width(self):
@@ -29,6 +59,11 @@ class World(object):
         """int: Height of the world grid."""
         return self.world_grid.height
 
+    @property
+    def random_choice_cnt(self):
+        """int: Amount of random choices made by the rules engine so far."""
+        return self.rules_engine.random_choice_cnt
+
     def populate_initial_organisms(self):
         """Populates world with initial organisms.
 
@@ -51,21 +86,37 @@ class World(object):
             WorldInternalError: If organisms provided to the game are not valid.
         """
         initial_conflict = False
+        # amount of conflicts by cell, the seeded choices are keyed by it
+        conflict_cnt_d = {}
 
         for organism in self.organism_l:
             current_organism = self._get_organism_at(organism.x, organism.y)
 
             if current_organism:
                 initial_conflict = True
+                cell = (organism.x, organism.y)
                 # two organisms occupy one element, one of them must die (chosen randomly)
                 # aka choose randomly organism which will live
-                organism = self.rules_engine.evolve_organism_randomly(organism,
-                                                                      current_organism)
+                organism = self.rules_engine.evolve_organism_randomly(
+                    organism, current_organism, conflict=conflict_cnt_d.get(cell, 0))
+                conflict_cnt_d[cell] = conflict_cnt_d.get(cell, 0) + 1
             self._populate_organism(organism)
 
         # in case of initial conflict - update organisms (use without conflict or with solved one)
         if initial_conflict:
-            self.organism_l = self._get_all_organisms()
+            self.organism_l = OrganismStore(self._get_all_organisms())
+        else:
+            # copied, the store is updated in place and the state keeps its organisms
+            self.organism_l = OrganismStore(self.organism_l)
+
+        # births keep the species, the transition table can be compiled for the initial ones
+        self.species_l = sorted(get_species(self.organism_l))
+        self.species_cnt = self.species_l[-1] if self.species_l else 0
+
+        # the first iteration has to evaluate all the cells
+        self.active_cell_s = None
+        self.born_organism_l, self.dead_organism_l = [], []
+        self.generation = 0
 
         return initial_conflict
 
@@ -74,67 +125,320 @@ class World(object):
 
         Public method which have to be called after the world is populated with organisms.
 
+        Only the cells changed in the last iteration and their neighbours are evaluated,
+        the rest of the cells can not change as their neighbourhood is the same. The cells
+        to evaluate are valid, so the grid is read without checking the coordinates.
+
+        The cells are evaluated by the rule objects in one batch if they support it (e.g. the
+        predefined ones), through the transition table if the rules engine has one, through
+        the rule table of probed rule objects if the engine has one, through the rule objects
+        one by one otherwise.
+
         Raises:
             WorldInternalError: If some of the organisms are not valid. Should not happen
             if the method `populate_initial_organisms` was called after the world's creation.
         """
-        evolved_organism_l = []
+        metrics = self.metrics
+        if metrics:
+            start_time = time.time()
+
+        cell_l = self._get_cells_to_evaluate()
+        if metrics:
+            start_time = metrics.lap(GameMetrics.PHASE_NEIGHBOURS, start_time)
+
+        if self.rules_engine.supports_batch:
+            born_organism_l, dead_organism_l = self._evolve_cells_by_batch(cell_l)
+        elif self.rules_engine.get_transition_table(self.species_cnt) is not None:
+            born_organism_l, dead_organism_l = self._evolve_cells_by_table(
+                cell_l, self.rules_engine.get_transition_table(self.species_cnt))
+        else:
+            rule_table_d = self.rules_engine.get_rule_table(self.species_cnt)
+            if rule_table_d is not None:
+                born_organism_l, dead_organism_l = self._evolve_cells_by_rule_table(
+                    cell_l, rule_table_d)
+            else:
+                born_organism_l, dead_organism_l = self._evolve_cells_by_rules(cell_l)
+
+        if metrics:
+            start_time = metrics.lap(GameMetrics.PHASE_RULES, start_time)
+
+        if len(self.organism_l) + len(born_organism_l) - len(dead_organism_l) > 0:
+            # update the grid only by born and dead organisms
+            self._update_organisms(born_organism_l, dead_organism_l)
+            self.active_cell_s = set((organism.x, organism.y)
+                                     for organism in born_organism_l + dead_organism_l)
+        else:
+            # no organism would evolve, the world stays the same
+            self.active_cell_s = set()
+            born_organism_l, dead_organism_l = [], []
+
+        self.born_organism_l = born_organism_l
+        self.dead_organism_l = dead_organism_l
+        self.generation += 1
+
+        if metrics:
+            metrics.lap(GameMetrics.PHASE_UPDATE, start_time)
+
+    def advance(self, iterations_cnt):
+        """Advances the world by the amount of iterations.
+
+        The world is iterated one by one, engines which can jump ahead override this method.
 
-        for x in xrange(self.width):
-            for y in xrange(self.height):
-                evolved_organism = self._evolve_organism_at(x, y)
-                if evolved_organism:
-                    evolved_organism_l.append(evolved_organism)
+        Attributes:
+            iterations_cnt (int): Amount of iterations.
+
+        Raises:
+            WorldInternalError: If some of the organisms are not valid.
+        """
+        for _ in xrange(iterations_cnt):
+            self.iterate()
 
-        if evolved_organism_l:
-            self.organism_l = evolved_organism_l
-            # rebuild the grid and set it with evolved organisms
-            self._repopulate_organisms(self.organism_l)
+    def close(self):
+        """Releases the resources of the world, e.g. worker processes of the engines."""
+        pass
+
+    def _get_cells_to_evaluate(self):
+        """Retrieves cells which can change in the next iteration.
+
+        Returns:
+            cell_l (list): Cells (x|y) ordered by x and then by y coordinates.
+        """
+        if self.active_cell_s is None:
+            return [(x, y) for x in xrange(self.width) for y in xrange(self.height)]
 
-    def _evolve_organism_at(self, x, y):
-        """Evolves organism at coordinates x|y.
+        # flat indices (x * height + y) keep the order of the cells
+        height = self.height
+        get_neighboring_indices = self.world_grid.get_neighboring_indices_unchecked
 
-        Evolution happens by applying all the rules specified in the evolution engine.
+        index_s = set(x * height + y for x, y in self.active_cell_s)
+        for x, y in self.active_cell_s:
+            index_s.update(get_neighboring_indices(x, y))
+        index_s.discard(self.world_grid.neighbour_table.outside_index)
+
+        return [(index // height, index % height) for index in sorted(index_s)]
+
+    def _evolve_cells_by_rules(self, cell_l):
+        """Evolves the cells by the rule objects of the rules engine.
 
         Attributes:
-            x (int): Coordinate at x axes.
-            y (int): Coordinate at y axes.
+            cell_l (list): Valid cells (x|y) to be evaluated.
 
         Returns:
-            organism (Organism): Organism if evolved, else None.
+            born_organism_l (list): Organisms born in the cells.
+            dead_organism_l (list): Organisms died in the cells.
+        """
+        born_organism_l, dead_organism_l = [], []
 
-        Raises:
-            WorldInternalError: If coordinates (x|y) are not valid. Should not happen
-            if the method `populate_initial_organisms` was called after the world's creation.
+        get_organism_at = self.world_grid.get_organism_at_unchecked
+        species_plane_l = self._get_neighbours_cnt_planes()
+
+        for x, y in cell_l:
+            organism = get_organism_at(x, y)
+            evolved_organism, change = self._evolve_organism_with_change_at(
+                organism, x, y, species_plane_l)
+
+            if change == EvolutionRulesEngine.CHANGE_BIRTH:
+                born_organism_l.append(evolved_organism)
+            elif change == EvolutionRulesEngine.CHANGE_DEATH:
+                dead_organism_l.append(organism)
+
+        return born_organism_l, dead_organism_l
+
+    def _evolve_cells_by_table(self, cell_l, transition_a):
+        """Evolves the cells by the transition table of the rules engine.
+
+        Organism survives if its species and amount of neighbours of the species are flagged
+        by `RuleSpec.SURVIVAL`. Empty cell gives birth if some species is flagged by
+        `RuleSpec.BIRTH`, the species is chosen randomly among them.
+
+        Attributes:
+            cell_l (list): Valid cells (x|y) to be evaluated.
+            transition_a (array): Transition table (see `RuleSpec.compile`).
+
+        Returns:
+            born_organism_l (list): Organisms born in the cells.
+            dead_organism_l (list): Organisms died in the cells.
         """
-        evolved_organism = None
-        organism = self._get_organism_at(x, y)
-        neighboring_organism_l = self._get_neighboring_organisms_at(x, y)
+        born_organism_l, dead_organism_l = [], []
 
-        try:
-            evolved_organism = self.rules_engine.evolve_organism_by_all_rules(
-                organism, neighboring_organism_l, cell=(x, y))
-        except EngineCanNotEvolveOrganismError as err:
-            # could not evolve organism (this element will not go to the other iteration)
-            pass
-        finally:
-            return evolved_organism
+        species_a = self.world_grid.species_a
+        height = self.height
+        species_plane_l = self._get_neighbours_cnt_planes()
+        neighbours_cnt_a_d = dict(species_plane_l)
+        row_size, survival, birth = RuleSpec.ROW_SIZE, RuleSpec.SURVIVAL, RuleSpec.BIRTH
+
+        for x, y in cell_l:
+            index = x * height + y
+            species = species_a[index]
+
+            if species:
+                neighbours_cnt = neighbours_cnt_a_d[species][index]
+                if not transition_a[species * row_size + neighbours_cnt] & survival:
+                    dead_organism_l.append(Organism(x, y, species))
+                continue
+
+            species_candidate_l = [
+                neighbour_species for neighbour_species, neighbours_cnt_a in species_plane_l
+                if transition_a[neighbour_species * row_size + neighbours_cnt_a[index]] & birth]
+
+            if species_candidate_l:
+                born_organism_l.append(Organism(x, y, self.rules_engine.choose_birth_species(
+                    species_candidate_l, cell=(x, y), generation=self.generation)))
+
+        return born_organism_l, dead_organism_l
+
+    def _evolve_cells_by_batch(self, cell_l):
+        """Evolves the cells by the rule objects in one batch.
+
+        Attributes:
+            cell_l (list): Valid cells (x|y) to be evaluated.
+
+        Returns:
+            born_organism_l (list): Organisms born in the cells.
+            dead_organism_l (list): Organisms died in the cells.
+        """
+        if not cell_l:
+            return [], []
+
+        cell_a = np.array(cell_l, dtype=np.intp)
+        index_a = cell_a[:, 0] * self.height + cell_a[:, 1]
+
+        # views of the grid buffers
+        species_a = np.frombuffer(self.world_grid.species_a,
+                                  dtype=np.uint16)[index_a].astype(np.intp)
+
+        # species are evaluated as dense labels, so the columns do not depend on their values
+        label_species_a = np.array([0] + self.species_l, dtype=np.intp)
+        label_a = np.where(species_a != 0, np.searchsorted(label_species_a[1:], species_a) + 1, 0)
+
+        neighbours_cnt_a = np.empty((len(index_a), len(label_species_a)), dtype=np.intp)
+        for label, (_, plane_a) in enumerate(self._get_neighbours_cnt_planes(), 1):
+            neighbours_cnt_a[:, label] = np.frombuffer(plane_a, dtype=np.uint8)[index_a]
+
+        # the rest of the neighbours inside of the grid is empty
+        neighbours_cnt_a[:, 0] = np.frombuffer(
+            self.world_grid.neighbour_table.neighbours_cnt_a, dtype=np.uint8)[index_a]
+        neighbours_cnt_a[:, 0] -= neighbours_cnt_a[:, 1:].sum(axis=1)
+
+        evolved_label_a = self.rules_engine.evolve_batch(
+            label_a, neighbours_cnt_a, x_a=cell_a[:, 0], y_a=cell_a[:, 1],
+            generation=self.generation, species_l=self.species_l)
+        evolved_species_a = label_species_a[evolved_label_a]
+
+        # organism which evolved stays the same, same as by the rule objects one by one
+        dead_a = (species_a != 0) & (evolved_species_a == 0)
+        born_a = (species_a == 0) & (evolved_species_a != 0)
+
+        dead_organism_l = [Organism(x, y, species) for (x, y), species
+                           in zip(cell_a[dead_a].tolist(), species_a[dead_a].tolist())]
+        born_organism_l = [Organism(x, y, species) for (x, y), species
+                           in zip(cell_a[born_a].tolist(), evolved_species_a[born_a].tolist())]
+
+        return born_organism_l, dead_organism_l
+
+    def _evolve_cells_by_rule_table(self, cell_l, rule_table_d):
+        """Evolves the cells by the rule table of the rules engine.
+
+        Attributes:
+            cell_l (list): Valid cells (x|y) to be evaluated.
+            rule_table_d (dict): Rule table (see `EvolutionRulesEngine.get_rule_table`).
+
+        Returns:
+            born_organism_l (list): Organisms born in the cells.
+            dead_organism_l (list): Organisms died in the cells.
+        """
+        born_organism_l, dead_organism_l = [], []
+
+        species_a = self.world_grid.species_a
+        height = self.height
+        # the table is probed for all the species up to `species_cnt` (there are a few)
+        neighbours_cnt_a_d = dict(self._get_neighbours_cnt_planes())
+        neighbours_cnt_a_l = [neighbours_cnt_a_d.get(species)
+                              for species in xrange(1, self.species_cnt + 1)]
+
+        for x, y in cell_l:
+            index = x * height + y
+            species = species_a[index]
+
+            neighbours_cnt_t = tuple(neighbours_cnt_a[index] if neighbours_cnt_a else 0
+                                     for neighbours_cnt_a in neighbours_cnt_a_l)
+            evolved_species = rule_table_d[(species, neighbours_cnt_t)]
+
+            if species:
+                if not evolved_species:
+                    dead_organism_l.append(Organism(x, y, species))
+            elif evolved_species:
+                if isinstance(evolved_species, tuple):
+                    evolved_species = self.rules_engine.choose_birth_species(
+                        list(evolved_species), cell=(x, y), generation=self.generation)
+                born_organism_l.append(Organism(x, y, evolved_species))
 
-    def _repopulate_organisms(self, organism_l):
-        """Repopulates the world with new generation of organisms. (evolved ones)
+        return born_organism_l, dead_organism_l
 
-        Mainly rebuilds the grid and populate organisms to it.
+    def _evolve_organism_with_change_at(self, organism, x, y, species_plane_l):
+        """Evolves organism at coordinates x|y and reports the change of the cell.
 
         Attributes:
+            organism (Organism): Organism at coordinates x|y, else None.
             x (int): Coordinate at x axes.
             y (int): Coordinate at y axes.
+            species_plane_l (list): Planes of the species (see `_get_neighbours_cnt_planes`).
+
+        Returns:
+            organism (Organism): Organism if evolved, else None.
+            change (str): Change of the cell, one of `EvolutionRulesEngine.CHANGE_*`.
+        """
+        index = x * self.height + y
+        species_occurrence_d = {}
+
+        for species, neighbours_cnt_a in species_plane_l:
+            neighbours_cnt = neighbours_cnt_a[index]
+            if neighbours_cnt:
+                species_occurrence_d[species] = neighbours_cnt
+
+        return self.rules_engine.evolve_organism_with_change_by_occurrence(
+            organism, species_occurrence_d, cell=(x, y), generation=self.generation)
+
+    def _get_neighbours_cnt_planes(self):
+        """Retrieves amounts of neighbours of the species present in the world.
+
+        Only the species of `species_l` have planes, so the sparse species identifiers do not
+        add the planes (nor the loops over them) of the species which are not present.
+
+        Returns:
+            species_plane_l (list): Species and their amounts of neighbours by flat indices
+                (x * height + y), ordered by species.
+        """
+        return [(species, self.world_grid.get_neighbours_cnt_plane(species))
+                for species in self.species_l]
+
+    def _update_organisms(self, born_organism_l, dead_organism_l):
+        """Updates the world by births and deaths of organisms (incrementally).
+
+        Only the slots of the born and dead organisms are updated in the store, so
+        the organisms are not kept ordered (they are ordered once they are written).
+
+        Attributes:
+            born_organism_l (list): Organisms born in this iteration.
+            dead_organism_l (list): Organisms died in this iteration.
 
         Raises:
             WorldInternalError: If coordinates (x|y) are not valid. Should not happen
             if the method `populate_initial_organisms` was called after the world's creation.
         """
-        self.world_grid.rebuild()
-        self._populate_organisms(organism_l)   
+        try:
+            self.world_grid.update_organisms(born_organism_l, dead_organism_l)
+        except WorldGridCoordinatesError as err:
+            # we can not continue with this error (WorldInternalError)
+            raise WorldInternalError('Organisms (x|y) can not be updated. %s' % err.message)
+
+        self.organism_l.replace_organisms(born_organism_l, dead_organism_l)
+
+        # e.g. custom rules may give birth to a new species
+        born_species_s = get_species(born_organism_l).difference(self.species_l)
+        if born_species_s:
+            self.species_l = sorted(born_species_s.union(self.species_l))
+            self.species_cnt = self.species_l[-1]
 
     def _populate_organisms(self, organism_l):
         """Populates organisms to the grid.
@@ -167,46 +471,6 @@ class World(object):
             # we can not continue with this error (WorldInternalError)
             raise WorldInternalError('Organism (x|y) can not be set. %s' % err.message)
         
-    def _get_neighboring_organisms_at(self, x, y):
-        """Retrieves neighbouring organisms at coordinates x|y.
-
-        Attributes:
-            x (int): Coordinate at x axes.
-            y (int): Coordinate at y axes.
-
-        Returns:
-            neighboring_organism_l (list): Organisms surrounding coordinates (x|y).
-
-        Raises:
-            WorldInternalError: If coordinates (x|y) are not valid. Should not happen
-            if the method `populate_initial_organisms` was called after the world's creation.
-        """
-        neighboring_cell_l = self._get_neighbours_space(x, y)
-        neighboring_organism_l = self._get_organisms_at(neighboring_cell_l)
-
-        return neighboring_organism_l
-
-    def _get_organisms_at(self, cell_l):
-        """Retrieves organisms at cells x|y.
-
-        Attributes:
-            cell_l (list): Cells defined by x|y coordinates.
-
-        Returns:
-            organism (Organism): Organism if exist, else None.
-
-        Raises:
-            WorldInternalError: If coordinates (x|y) are not valid. Should not happen
-            if the method `populate_initial_organisms` was called after the world's creation.
-        """
-        organism_l = []
-
-        for cell in cell_l:
-            organism = self._get_organism_at(cell[0], cell[1])
-            organism_l.append(organism) 
-
-        return organism_l
-
     def _get_organism_at(self, x, y):
         """Retrieves organism at coordinates x|y.
 
@@ -226,45 +490,14 @@ class World(object):
             # we can not continue with this error (Game Internal error)
             raise WorldInternalError('Organism (X|Y) does not exist. %s' % err.message)
 
-    def _get_neighbours_space(self, x, y):
-        """Retrieves possible space for organisms in neighbourhood.
-
-        Attributes:
-            x (int): Coordinate at x axes.
-            y (int): Coordinate at y axes.
-
-        Returns:
-            (list): Neihbouring cells if exist, else empy list.
-
-        Raises:
-            WorldInternalError: If coordinates (x|y) are not valid. Should not happen
-            if the method `populate_initial_organisms` was called after the world's creation.
-        """
-        try:
-            return self.world_grid.get_neighboring_cells_at(x, y)
-        except WorldGridCoordinatesError as err:
-            # we can not continue with this error (Game Internal error)
-            raise WorldInternalError('Neighbors (X|Y) does not exist. %s' % err.message)       
-
     def _get_all_organisms(self):
         """Retrieves all organisms which are positioned on the grid at the moment.
 
         Returns:
             organism_l (list): Organisms positioned on the grid.
 
-        Raises:
-            WorldInternalError: If coordinates (x|y) are not valid. Should not happen
-            unless someone change the grid (width/heigth) manually.
         """
-        organism_l = []
-
-        for x in xrange(self.width):
-            for y in xrange(self.height):
-                organism = self._get_organism_at(x, y)
-                if organism:
-                    organism_l.append(organism)
-
-        return organism_l
+        return self.world_grid.get_organisms()
 
 
 class WorldInternalError(Exception):
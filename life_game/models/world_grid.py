@@ -1,34 +1,96 @@
 #!/usr/bin/env python
+from array import array
+
+import numpy as np
+
+from life_game.models.organism import Organism
+from life_game.models.neighbour_table import NeighbourTable
 
 
 class WorldGrid(object):
     """Encapsulates the living space (grid) for organisms in the game.
 
+    Species of the organisms are stored in a flat preallocated typed buffer (x * height + y),
+    an empty cell holds `EMPTY` (so the species 0 can not be stored). Births and deaths are
+    applied to the buffer in place, the buffer is never allocated again while the game runs.
+    The buffer keeps one more empty cell at the end, the neighbours outside of the grid point
+    to it in the shared `NeighbourTable`. The table is built on the first use only (by
+    the python world), the engines keep their own representation and never read it.
+
+    Amounts of neighbours of a species are kept in the plane (one `COUNT_TYPECODE` buffer)
+    once the plane is requested. The plane is counted from the buffer then and updated
+    incrementally whenever an organism is set or removed, so the world reads it instead
+    of gathering the neighbours of each cell.
+
+    Coordinates are validated once at the edges (public methods taking organisms or
+    coordinates from outside), the `*_unchecked` methods expect valid coordinates and are
+    meant for the inner loops of the world.
+
     Attributes:
         width (int): Width of x axes.
         height (int): Height of y axes.
     """
+    TYPECODE = 'H'
+    EMPTY = 0
+    # species identifiers have to fit into the buffer and differ from the empty cell
+    MAX_SPECIES = 0xFFFF
+    # there are at most 8 neighbours of one species
+    COUNT_TYPECODE = 'B'
+
     def __init__(self, width, height):
         self.width = width
         self.height= height
 
-        self.grid = self.build() 
+        self.species_a = self.build()
+        self._neighbour_table = None
+        # planes by species, there is no plane of the empty cells
+        self._neighbours_cnt_a_d = {}
+
+    @property
+    def neighbour_table(self):
+        """NeighbourTable: Neighbours of the cells, built on the first access."""
+        if self._neighbour_table is None:
+            self._neighbour_table = NeighbourTable.get(self.width, self.height)
+
+        return self._neighbour_table
+
+    @property
+    def grid(self):
+        """GridView: 2 dimensional view of organisms (or None), organisms built on access."""
+        return GridView(self)
 
     def build(self):
-        """Builds the world grid (2d list).
+        """Builds the buffer for the world grid.
 
         Returns:
-            grid (list): 2 dimensional list.
+            species_a (array): Flat typed buffer with empty cells (and the outside cell).
         """
-        return [[None]*self.width for _ in xrange(self.width)]
+        return array(self.TYPECODE, [self.EMPTY]) * (self.width * self.height + 1)
 
     def rebuild(self):
-        """Rebuilds the world grid (2d list).
+        """Empties the world grid, the buffers are cleared in place (without a temporary)."""
+        np.frombuffer(self.species_a, dtype=self.TYPECODE)[:] = self.EMPTY
+
+        for neighbours_cnt_a in self._neighbours_cnt_a_d.itervalues():
+            np.frombuffer(neighbours_cnt_a, dtype=self.COUNT_TYPECODE)[:] = 0
+
+    def get_neighbours_cnt_plane(self, species):
+        """Retrieves amounts of neighbours of the species for all the cells.
+
+        Attributes:
+            species (int): Valid species identifier.
 
         Returns:
-            grid (list): 2 dimensional list.
+            neighbours_cnt_a (array): Amounts of neighbours by flat indices (x * height + y),
+                kept up to date by the grid (must not be changed).
         """
-        self.grid = self.build()
+        neighbours_cnt_a = self._neighbours_cnt_a_d.get(species)
+
+        if neighbours_cnt_a is None:
+            neighbours_cnt_a = self._count_neighbours(species)
+            self._neighbours_cnt_a_d[species] = neighbours_cnt_a
+
+        return neighbours_cnt_a
 
     def set_organisms(self, organism_l):
         """Set organisms to the grid.
@@ -48,13 +110,60 @@ class WorldGrid(object):
         Attributes:
             organism (Organism): Organism which is to be set to the grid.
 
+        Raises:
+            WorldGridCoordinatesError: If organism coordinates (x|y) are not valid.
+            WorldGridSpeciesError: If organism species can not be stored in the grid.
+        """
+        self._validate_organism(organism, 'setting')
+
+        self._set_species(self.species_a, organism.x * self.height + organism.y,
+                          organism.species)
+
+    def remove_organism(self, organism):
+        """Removes organism from the grid.
+
+        Attributes:
+            organism (Organism): Organism which is to be removed from the grid.
+
         Raises:
             WorldGridCoordinatesError: If organism coordinates (x|y) are not valid.
         """
         if not self._are_coordinates_valid(organism.x, organism.y):
-            raise WorldGridCoordinatesError('Wrong coordinates (x|y) for setting the organism.')
+            raise WorldGridCoordinatesError('Wrong coordinates (x|y) for removing the organism.')
+
+        self._set_species(self.species_a, organism.x * self.height + organism.y, self.EMPTY)
+
+    def update_organisms(self, born_organism_l, dead_organism_l):
+        """Updates the grid by births and deaths of organisms.
 
-        self.grid[organism.x][organism.y] = organism
+        All the organisms are validated first, then they are applied to the buffer in place
+        (the world has evaluated the generation already), so only the changed cells are
+        written. The grid does not change if some organism is not valid.
+
+        Attributes:
+            born_organism_l (list): Organisms which are to be set to the grid.
+            dead_organism_l (list): Organisms which are to be removed from the grid.
+
+        Raises:
+            WorldGridCoordinatesError: If organisms coordinates (x|y) are not valid.
+            WorldGridSpeciesError: If born organisms species can not be stored in the grid.
+        """
+        for organism in dead_organism_l:
+            if not self._are_coordinates_valid(organism.x, organism.y):
+                raise WorldGridCoordinatesError(
+                    'Wrong coordinates (x|y) for removing the organism.')
+
+        for organism in born_organism_l:
+            self._validate_organism(organism, 'setting')
+
+        height = self.height
+        species_a = self.species_a
+
+        for organism in dead_organism_l:
+            self._set_species(species_a, organism.x * height + organism.y, self.EMPTY)
+
+        for organism in born_organism_l:
+            self._set_species(species_a, organism.x * height + organism.y, organism.species)
 
     def get_organism_at(self, x, y):
         """Retrieves organism at coordinates x|y.
@@ -64,15 +173,79 @@ class WorldGrid(object):
             y (int): Coordinate at y axes.
 
         Returns:
-            organism (Organism): Organism if exist, else None.
+            organism (Organism): Organism (view of the grid) if exist, else None.
 
         Raises:
             WorldGridCoordinatesError: If coordinates (x|y) are not valid.
         """
         if not self._are_coordinates_valid(x, y):
-            raise WorldGridCoordinatesError('Wrong coordinates (x|y) for getting the organism.')
+            raise WorldGridCoordinatesError('Wrong coordinates (x|y) for getting the organism.')
+
+        return self.get_organism_at_unchecked(x, y)
+
+    def get_organism_at_unchecked(self, x, y):
+        """Retrieves organism at valid coordinates x|y.
+
+        Attributes:
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+
+        Returns:
+            organism (Organism): Organism (view of the grid) if exist, else None.
+        """
+        species = self.species_a[x * self.height + y]
+        if species == self.EMPTY:
+            return None
+
+        return Organism(x, y, species)
+
+    def get_neighboring_organisms_at_unchecked(self, x, y):
+        """Retrieves organisms surrounding the cell at valid coordinates x|y.
+
+        Attributes:
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+
+        Returns:
+            neighboring_organism_l (list): Neighbouring organisms (views of the grid).
+        """
+        species_a = self.species_a
+        height = self.height
+        empty = self.EMPTY
+        neighboring_organism_l = []
+
+        for index in self.neighbour_table.get_neighbour_indices(x * height + y):
+            species = species_a[index]
+            if species != empty:
+                neighboring_organism_l.append(Organism(index // height, index % height, species))
+
+        return neighboring_organism_l
+
+    def get_neighboring_indices_unchecked(self, x, y):
+        """Retrieves flat indices (x * height + y) of the cells surrounding valid cell x|y.
 
-        return self.grid[x][y]
+        Attributes:
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+
+        Returns:
+            (array): Indices of the neighbouring cells, `neighbour_table.outside_index`
+                for the cells outside of the grid.
+        """
+        return self.neighbour_table.get_neighbour_indices(x * self.height + y)
+
+    def get_organisms(self):
+        """Retrieves all organisms positioned on the grid.
+
+        Returns:
+            organism_l (list): Organisms (views of the grid) ordered by x and then
+                by y coordinates.
+        """
+        height = self.height
+        empty = self.EMPTY
+
+        return [Organism(index // height, index % height, species)
+                for index, species in enumerate(self.species_a) if species != empty]
 
     def get_neighboring_cells_at(self, x, y):
         """Retrieves neighbouring cells for cell at coordinates x|y.
@@ -90,33 +263,90 @@ class WorldGrid(object):
         if not self._are_coordinates_valid(x, y):
             raise WorldGridCoordinatesError('Wrong coordinates (x|y) for neighboring cells.')
 
-        neighboring_cell_l = []
+        height = self.height
+        outside_index = self.neighbour_table.outside_index
+
+        return [(index // height, index % height)
+                for index in self.get_neighboring_indices_unchecked(x, y)
+                if index != outside_index]
 
-        if x > 0: 
-            neighboring_cell_l.append((x - 1, y))
+    def _set_species(self, species_a, index, species):
+        """Sets the species of the cell and updates amounts of neighbours around it.
 
-        if x < self.width - 1:
-            neighboring_cell_l.append((x + 1, y))
+        Attributes:
+            species_a (array): Buffer the species is set to.
+            index (int): Flat index of the valid cell.
+            species (int): Species of the cell (`EMPTY` for none).
+        """
+        previous_species = species_a[index]
+        if previous_species == species:
+            return
+
+        # planes which are not requested yet are counted from the buffer once they are
+        neighbours_cnt_a_d = self._neighbours_cnt_a_d
+        if previous_species in neighbours_cnt_a_d or species in neighbours_cnt_a_d:
+            outside_index = self.neighbour_table.outside_index
+            neighbour_index_a = self.neighbour_table.get_neighbour_indices(index)
 
-        if y > 0:
-            neighboring_cell_l.append((x, y - 1))
+            neighbours_cnt_a = neighbours_cnt_a_d.get(previous_species)
+            if neighbours_cnt_a is not None:
+                for neighbour_index in neighbour_index_a:
+                    if neighbour_index != outside_index:
+                        neighbours_cnt_a[neighbour_index] -= 1
 
-        if y < self.height - 1:
-            neighboring_cell_l.append((x, y + 1))
+            neighbours_cnt_a = neighbours_cnt_a_d.get(species)
+            if neighbours_cnt_a is not None:
+                for neighbour_index in neighbour_index_a:
+                    if neighbour_index != outside_index:
+                        neighbours_cnt_a[neighbour_index] += 1
 
-        if x > 0 and y > 0:
-            neighboring_cell_l.append((x - 1, y - 1))
+        species_a[index] = species
 
-        if x < self.width - 1 and y > 0:
-            neighboring_cell_l.append((x + 1, y - 1))
+    def _count_neighbours(self, species):
+        """Counts neighbours of the species for all the cells from the buffer.
 
-        if x > 0 and y < self.height - 1:
-            neighboring_cell_l.append((x - 1, y + 1))
+        Attributes:
+            species (int): Valid species identifier.
 
-        if x < self.width - 1 and y < self.height - 1:
-            neighboring_cell_l.append((x + 1, y + 1))
+        Returns:
+            neighbours_cnt_a (array): Amounts of neighbours by flat indices (x * height + y)
+                and the outside cell (always 0).
+        """
+        width, height = self.width, self.height
+        species_grid = np.frombuffer(self.species_a, dtype=np.uint16)[:-1].reshape(width, height)
 
-        return neighboring_cell_l
+        # the grid is padded by empty cells, so the neighbours are its shifted views
+        padded_grid = np.zeros((width + 2, height + 2), dtype=np.uint8)
+        padded_grid[1:-1, 1:-1] = species_grid == species
+        neighbours_cnt_grid = np.zeros((width, height), dtype=np.uint8)
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                if dx != 1 or dy != 1:
+                    neighbours_cnt_grid += padded_grid[dx:dx + width, dy:dy + height]
+
+        neighbours_cnt_a = array(self.COUNT_TYPECODE)
+        neighbours_cnt_a.fromstring(neighbours_cnt_grid.tostring())
+        neighbours_cnt_a.append(0)
+
+        return neighbours_cnt_a
+
+    def _validate_organism(self, organism, action):
+        """Validates organism which is to be stored in the grid.
+
+        Attributes:
+            organism (Organism): Organism to be validated.
+            action (str): Action for the error message.
+
+        Raises:
+            WorldGridCoordinatesError: If organism coordinates (x|y) are not valid.
+            WorldGridSpeciesError: If organism species can not be stored in the grid.
+        """
+        if not self._are_coordinates_valid(organism.x, organism.y):
+            raise WorldGridCoordinatesError(
+                'Wrong coordinates (x|y) for %s the organism.' % action)
+
+        if not self.EMPTY < organism.species <= self.MAX_SPECIES:
+            raise WorldGridSpeciesError('Wrong species for %s the organism.' % action)
 
     def _are_coordinates_valid(self, x, y):
         """Validates coordinates at x|y axes.
@@ -140,5 +370,37 @@ class WorldGrid(object):
         return valid
 
 
+class GridView(object):
+    """Read-only 2 dimensional view of the world grid (`grid[x][y]`).
+
+    Organisms are built only for the cells which are accessed.
+
+    Attributes:
+        world_grid (WorldGrid): World grid to be viewed.
+        x (int): Coordinate at x axes of the viewed column, None for the whole grid.
+    """
+    def __init__(self, world_grid, x=None):
+        self.world_grid = world_grid
+        self.x = x
+
+    def __len__(self):
+        return self.world_grid.width if self.x is None else self.world_grid.height
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError('Grid index out of range.')
+        index %= len(self)
+
+        if self.x is None:
+            return GridView(self.world_grid, index)
+
+        return self.world_grid.get_organism_at_unchecked(self.x, index)
+
+
 class WorldGridCoordinatesError(Exception):
     pass
+
+
+class WorldGridSpeciesError(WorldGridCoordinatesError):
+    # subclass, so the organism which can not be stored is handled as the wrong one
+    pass
@@ -5,10 +5,45 @@ import random
 class EvolutionRule(object):
     """Base class for evolution rules.
 
-    Each specific rule must inherit from this class and override the `apply` method.
+    Each specific rule must inherit from this class and override the `apply` method or its
+    exception-free version `evaluate` (the other one is derived from it). The rules engine
+    evaluates the rules, so the rules which are not applicable do not raise the error.
+    The method defined lower in the class hierarchy is the reference behaviour of the rule,
+    e.g. a subclass of a predefined rule which overrides only `apply` is evaluated by it.
+
+    Rules which depend only on the organism (its species) and the species occurrence dict
+    declare it by `COUNT_BASED`, the rules engine then probes them once and evaluates them
+    through a lookup table (the declaration of a parent does not hold for the subclass which
+    overrides the reference behaviour). Random choices of such rules have to be made by
+    `choose_randomly` given the cell, the generation and the chooser (keyword arguments of
+    the rules engine).
+    The choice is keyed by the cell and the generation once the engine is seeded, the chooser
+    is given only while the engine probes the rule and records the candidates.
+
+    Rules can override the optional `apply_batch` method as well, which evaluates a block of
+    cells at once. The rules engine prefers it, `apply` stays the reference behaviour - so
+    `apply_batch` is used only if it is defined by the class which defines the reference
+    behaviour (or by its subclass).
+
+    Attributes:
+        random_choice_cnt (int): Amount of random choices among more candidates made by rule.
+        cell_random (CellRandom): Makes the random choices by the cell and the generation (set
+            by the seeded rules engine), None if the choices are made by the `random` module.
     """
+    # True if the result depends only on the organism's species and the species occurrence
+    # dict (the cell is used only to place the born organism)
+    COUNT_BASED = False
+
+    # results of `evaluate`
+    RESULT_APPLIED = 'applied'
+    RESULT_NOT_APPLIED = 'not applied'
+    RESULT_NOT_APPLICABLE = 'not applicable'
+
+    random_choice_cnt = 0
+    cell_random = None
+
     def apply(self, organism, species_occurrence_d, **kwargs):
-        """This method must be overriden in subclass.
+        """This method or `evaluate` must be overriden in subclass.
 
         Attributes:
             organism (Organism): Organism which are to be set to the grid.
@@ -16,10 +51,176 @@ class EvolutionRule(object):
                 of species among organisms.
             **kwargs: Keyword arguments if specified.
 
+        Returns:
+            organism (Organism): Evolved organism, None otherwise.
+            applied (bool): Indicates if the rule was applied.
+
+        Raises:
+            EvolutionRuleError: If the rule is not applicable to the organism.
+            NotImplementedError: If neither of the methods is overriden.
+        """
+        if not self._overrides('evaluate'):
+            raise NotImplementedError('This method must be overriden in subclass!')
+
+        evolved_organism, result = self.evaluate(organism, species_occurrence_d, **kwargs)
+        if result == self.RESULT_NOT_APPLICABLE:
+            raise EvolutionRuleError('Not applicable to the organism.')
+
+        return evolved_organism, result == self.RESULT_APPLIED
+
+    def evaluate(self, organism, species_occurrence_d, **kwargs):
+        """This method or `apply` must be overriden in subclass.
+
+        Same as `apply`, but the rule which is not applicable is reported by the result.
+
+        Attributes:
+            organism (Organism): Organism which are to be set to the grid.
+            species_occurrence_d (dict): Occurrence dict indicating occurrence
+                of species among organisms.
+            **kwargs: Keyword arguments if specified.
+
+        Returns:
+            organism (Organism): Evolved organism, None otherwise.
+            result (str): Result of the rule, one of `RESULT_*`.
+
+        Raises:
+            NotImplementedError: If neither of the methods is overriden.
+        """
+        if not self._overrides('apply'):
+            raise NotImplementedError('This method must be overriden in subclass!')
+
+        try:
+            evolved_organism, applied = self.apply(organism, species_occurrence_d, **kwargs)
+        except EvolutionRuleError:
+            return None, self.RESULT_NOT_APPLICABLE
+
+        return evolved_organism, self.RESULT_APPLIED if applied else self.RESULT_NOT_APPLIED
+
+    def apply_batch(self, species_a, neighbours_cnt_a, **kwargs):
+        """This method can be overriden in subclass to evaluate more cells at once.
+
+        Same as `apply` for each of the cells, the cells the rule is not applicable to
+        are not applied. Species are given as labels (ordered as the species), the world
+        passes the species of the labels as `species_l` keyword argument.
+
+        Attributes:
+            species_a (numpy.ndarray): Species of the organisms in the cells (0 for empty).
+            neighbours_cnt_a (numpy.ndarray): Amounts of neighbours of the species by cell
+                and species (column 0 counts empty neighbours).
+            **kwargs: Keyword arguments if specified.
+
+        Returns:
+            species_a (numpy.ndarray): Species of the evolved organisms (0 for none).
+            applied_a (numpy.ndarray): Indicates if the rule was applied to the cells.
+
         Raises:
             NotImplementedError: If method is not overriden.
         """
-        raise NotImplementedError('This method must be overriden in subclass!')
+        raise NotImplementedError('This method can be overriden in subclass!')
+
+    @classmethod
+    def has_batch(cls):
+        """Checks if the rule overrides the `apply_batch` method of its reference behaviour.
+
+        Subclass which overrides only `apply` (or `evaluate`) inherits `apply_batch` of
+        the parent, which does not evaluate its logic, so it does not evaluate in batches.
+
+        Returns:
+            (bool): True if the rule evaluates more cells at once, False otherwise.
+        """
+        if not cls._overrides('apply_batch'):
+            return False
+
+        return cls._get_definition_depth('apply_batch') <= cls._get_reference_depth()
+
+    @classmethod
+    def is_count_based(cls):
+        """Checks if `COUNT_BASED` is declared for the reference behaviour of the rule.
+
+        Returns:
+            (bool): True if the rule can be probed by the rules engine, False otherwise.
+        """
+        if not cls.COUNT_BASED:
+            return False
+
+        return cls._get_definition_depth('COUNT_BASED') <= cls._get_reference_depth()
+
+    @classmethod
+    def evaluates_directly(cls):
+        """Checks if the reference behaviour of the rule is `evaluate` (not derived).
+
+        Returns:
+            (bool): True if `evaluate` is defined at or below the class which defines `apply`,
+                False if `evaluate` has to be derived from `apply`.
+        """
+        return cls._overrides('evaluate') and \
+            cls._get_definition_depth('evaluate') <= cls._get_definition_depth('apply')
+
+    @classmethod
+    def _get_reference_depth(cls):
+        """Finds out how far in the method resolution order the reference behaviour is defined.
+
+        Returns:
+            (int): Index of the class defining `apply` or `evaluate` (the lower one).
+        """
+        return min(cls._get_definition_depth('apply'), cls._get_definition_depth('evaluate'))
+
+    @classmethod
+    def _get_definition_depth(cls, method_name):
+        """Finds out how far in the method resolution order the method is defined.
+
+        Attributes:
+            method_name (str): Name of the method (or the class attribute).
+
+        Returns:
+            (int): Index of the class defining the method in the method resolution order.
+        """
+        for depth, defining_class in enumerate(cls.__mro__):
+            if method_name in vars(defining_class):
+                return depth
+
+        return len(cls.__mro__)
+
+    @classmethod
+    def _overrides(cls, method_name):
+        """Checks if the rule overrides the method of this class.
+
+        Attributes:
+            method_name (str): Name of the method.
+
+        Returns:
+            (bool): True if the method is overriden, False otherwise.
+        """
+        return getattr(cls, method_name).__func__ is not \
+            getattr(EvolutionRule, method_name).__func__
+
+    def choose_randomly(self, candidate_l, cell=None, generation=0, chooser=None):
+        """Chooses randomly one among candidates.
+
+        Choices among more than one candidate are counted, so the callers can find out
+        if the evolution was deterministic. The choice is keyed by the cell and the generation
+        if the rule has `cell_random`, so it does not depend on the order of the cells.
+
+        Attributes:
+            candidate_l (list): Candidates picked for selection, ordered.
+            cell (tuple, optional): Cell (x|y) of the choice.
+            generation (int, optional): Generation which is evolved.
+            chooser (callable, optional): Makes the choice instead (not counted), e.g. records
+                the candidates while the rules engine probes the rule.
+
+        Returns:
+            candidate (object): Selected candidate.
+        """
+        if chooser is not None:
+            return chooser(candidate_l)
+
+        if len(candidate_l) > 1:
+            self.random_choice_cnt += 1
+
+        if self.cell_random is not None and cell is not None:
+            return self.cell_random.choose(candidate_l, generation, cell)
+
+        return random.choice(candidate_l)
 
     @staticmethod
     def select_randomly(organism1, organism2):
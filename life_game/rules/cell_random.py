@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+import numpy as np
+
+
+class CellRandom(object):
+    """Counter-based random choices keyed by the seed, the counter and the cell.
+
+    Every choice is a pure function of the seed, the stream, the counter (e.g. generation)
+    and the cell x|y, nothing is drawn from a shared state. So the cells can be evaluated in any
+    order (one by one, vectorized, by stripes in parallel processes) and the same cell makes
+    the same choice, the results of the engines can be compared bit for bit.
+
+    The key is hashed by the finalizer of SplitMix64 (`_mix`), the index of the candidate is
+    the high 32 bits of the hash scaled to the amount of candidates. Python ints and NumPy
+    arrays (`get_indexes`) give the same indexes.
+
+    Attributes:
+        seed (int): Seed of the choices (non-negative).
+    """
+    # birth of more species in one cell, counter is the generation which is evolved
+    STREAM_BIRTH = 0
+    # initial conflict of two organisms in one cell, counter is the number of the conflict
+    STREAM_CONFLICT = 1
+
+    MASK = (1 << 64) - 1
+    GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+    MIX_MULTIPLIER_L = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+    MIX_SHIFT_L = (30, 27, 31)
+
+    def __init__(self, seed):
+        if seed < 0:
+            raise CellRandomError('Seed must not be negative: %s' % seed)
+
+        self.seed = seed
+        seed_key = _mix((seed + self.GOLDEN_GAMMA) & self.MASK)
+        self._stream_key_l = [_mix((seed_key + stream * self.GOLDEN_GAMMA) & self.MASK)
+                              for stream in (self.STREAM_BIRTH, self.STREAM_CONFLICT)]
+
+    def get_index(self, candidates_cnt, counter, x, y, stream=STREAM_BIRTH):
+        """Chooses the index of one among candidates for the cell.
+
+        Attributes:
+            candidates_cnt (int): Amount of candidates (positive).
+            counter (int): Counter of the stream, e.g. the generation which is evolved.
+            x (int): Coordinate at x axes.
+            y (int): Coordinate at y axes.
+            stream (int, optional): Stream of the choices, one of `STREAM_*`.
+
+        Returns:
+            index (int): Index of the chosen candidate.
+        """
+        value = _mix(self._get_counter_key(counter, stream) ^ ((x << 32) | y))
+
+        return ((value >> 32) * candidates_cnt) >> 32
+
+    def get_indexes(self, candidates_cnt_a, counter, x_a, y_a, stream=STREAM_BIRTH):
+        """Same as `get_index`, but for more cells at once.
+
+        Attributes:
+            candidates_cnt_a (numpy.ndarray): Amounts of candidates by cell.
+            counter (int): Counter of the stream, e.g. the generation which is evolved.
+            x_a (numpy.ndarray): Coordinates at x axes.
+            y_a (numpy.ndarray): Coordinates at y axes.
+            stream (int, optional): Stream of the choices, one of `STREAM_*`.
+
+        Returns:
+            index_a (numpy.ndarray): Indexes of the chosen candidates by cell.
+        """
+        cell_a = (np.asarray(x_a, dtype=np.uint64) << np.uint64(32)) | \
+            np.asarray(y_a, dtype=np.uint64)
+        value_a = _mix_array(np.uint64(self._get_counter_key(counter, stream)) ^ cell_a)
+        high_a = value_a >> np.uint64(32)
+
+        return ((high_a * np.asarray(candidates_cnt_a, dtype=np.uint64)) >>
+                np.uint64(32)).astype(np.intp)
+
+    def choose(self, candidate_l, counter, cell, stream=STREAM_BIRTH):
+        """Chooses one among candidates for the cell (see `get_index`).
+
+        Attributes:
+            candidate_l (list): Candidates picked for selection, ordered.
+            counter (int): Counter of the stream, e.g. the generation which is evolved.
+            cell (tuple): Cell (x|y) of the choice.
+            stream (int, optional): Stream of the choices, one of `STREAM_*`.
+
+        Returns:
+            candidate (object): Selected candidate.
+        """
+        return candidate_l[self.get_index(len(candidate_l), counter, cell[0], cell[1], stream)]
+
+    def _get_counter_key(self, counter, stream):
+        """Hashes the counter of the stream (the key shared by all the cells)."""
+        return _mix((self._stream_key_l[stream] + counter * self.GOLDEN_GAMMA) & self.MASK)
+
+
+def _mix(value):
+    """Finalizer of SplitMix64 on Python ints (64-bit unsigned value)."""
+    mask = CellRandom.MASK
+    first_multiplier, second_multiplier = CellRandom.MIX_MULTIPLIER_L
+    first_shift, second_shift, third_shift = CellRandom.MIX_SHIFT_L
+
+    value = ((value ^ (value >> first_shift)) * first_multiplier) & mask
+    value = ((value ^ (value >> second_shift)) * second_multiplier) & mask
+
+    return value ^ (value >> third_shift)
+
+
+def _mix_array(value_a):
+    """Finalizer of SplitMix64 on the array of uint64 (wraps around same as `_mix`)."""
+    first_multiplier, second_multiplier = [np.uint64(multiplier) for multiplier
+                                           in CellRandom.MIX_MULTIPLIER_L]
+    first_shift, second_shift, third_shift = [np.uint64(shift) for shift
+                                              in CellRandom.MIX_SHIFT_L]
+
+    value_a = (value_a ^ (value_a >> first_shift)) * first_multiplier
+    value_a = (value_a ^ (value_a >> second_shift)) * second_multiplier
+
+    return value_a ^ (value_a >> third_shift)
+
+
+class CellRandomError(Exception):
+    pass
@@ -1,8 +1,9 @@
 #!/usr/bin/env python
-import random
+import numpy as np
 
 from life_game.models.organism import Organism
-from life_game.rules.base import EvolutionRule, EvolutionRuleError
+from life_game.rules.base import EvolutionRule
+from life_game.rules.rule_spec import RuleSpec
 
 
 class EvolutionSurvivalRule(EvolutionRule):
@@ -11,7 +12,9 @@ class EvolutionSurvivalRule(EvolutionRule):
     Definition: `If there are two or three organisms of the same type living in the elements
     surrounding an organism of the same, type then it may survive.`
     """
-    def apply(self, organism, species_occurrence_d, **kwargs):
+    COUNT_BASED = True
+
+    def evaluate(self, organism, species_occurrence_d, **kwargs):
         """Overrides method derived from base class.
 
         Note:
@@ -25,25 +28,41 @@ class EvolutionSurvivalRule(EvolutionRule):
 
         Returns:
             organism (Organism): Survived organism, None otherwise.
-            applied (bool): Indicates if the rule was applied.
-
-        Raises:
-            EvolutionRuleError: If organism does not exist.
+            result (str): Result of the rule, one of `RESULT_*`.
         """
         if not organism:
-            raise EvolutionRuleError('Not applicable - organism must exist.')
+            return None, self.RESULT_NOT_APPLICABLE
 
         evolved_organism = None
-        applied = False
+        result = self.RESULT_NOT_APPLIED
 
         if species_occurrence_d:
             species_occurrence = species_occurrence_d.get(organism.species)
             if species_occurrence and species_occurrence in [2, 3]:
                 # organism can survive, there are two or three neighbours
                 evolved_organism = organism
-                applied = True
+                result = self.RESULT_APPLIED
 
-        return evolved_organism, applied
+        return evolved_organism, result
+
+    def apply_batch(self, species_a, neighbours_cnt_a, **kwargs):
+        """Overrides method derived from base class.
+
+        Attributes:
+            species_a (numpy.ndarray): Species of the organisms in the cells (0 for empty).
+            neighbours_cnt_a (numpy.ndarray): Amounts of neighbours of the species by cell
+                and species.
+            **kwargs: Keyword arguments are not used for this rule.
+
+        Returns:
+            species_a (numpy.ndarray): Species of the survived organisms, 0 otherwise.
+            applied_a (numpy.ndarray): Indicates if the rule was applied to the cells.
+        """
+        own_cnt_a = neighbours_cnt_a[np.arange(len(species_a)), species_a]
+        # organism can survive, there are two or three neighbours
+        applied_a = (species_a != 0) & ((own_cnt_a == 2) | (own_cnt_a == 3))
+
+        return np.where(applied_a, species_a, 0), applied_a
 
 
 class EvolutionIsolationRule(EvolutionRule):
@@ -52,7 +71,9 @@ class EvolutionIsolationRule(EvolutionRule):
     Definition: `If there are less than two organisms of one type surrounding one of the same
     type then it will die due to isolation.`
     """
-    def apply(self, organism, species_occurrence_d, **kwargs):
+    COUNT_BASED = True
+
+    def evaluate(self, organism, species_occurrence_d, **kwargs):
         """Overrides method derived from base class.
 
         Note:
@@ -66,25 +87,41 @@ class EvolutionIsolationRule(EvolutionRule):
 
         Returns:
             organism (Organism): Dead organism (None), original Organism otherwise.
-            applied (bool): Indicates if the rule was applied.
-
-        Raises:
-            EvolutionRuleError: If organism does not exist.
+            result (str): Result of the rule, one of `RESULT_*`.
         """
         if not organism:
-            raise EvolutionRuleError('Not applicable - organism must exist.')
+            return None, self.RESULT_NOT_APPLICABLE
 
         evolved_organism = organism
-        applied = False
+        result = self.RESULT_NOT_APPLIED
 
         if species_occurrence_d:
             species_occurrence = species_occurrence_d.get(organism.species)
             if species_occurrence and species_occurrence < 2:
                 # organism will die as there is 0 or 1 neighbours
                 evolved_organism = None
-                applied = True
+                result = self.RESULT_APPLIED
+
+        return evolved_organism, result
+
+    def apply_batch(self, species_a, neighbours_cnt_a, **kwargs):
+        """Overrides method derived from base class.
+
+        Attributes:
+            species_a (numpy.ndarray): Species of the organisms in the cells (0 for empty).
+            neighbours_cnt_a (numpy.ndarray): Amounts of neighbours of the species by cell
+                and species.
+            **kwargs: Keyword arguments are not used for this rule.
+
+        Returns:
+            species_a (numpy.ndarray): Dead organisms (0), original species otherwise.
+            applied_a (numpy.ndarray): Indicates if the rule was applied to the cells.
+        """
+        own_cnt_a = neighbours_cnt_a[np.arange(len(species_a)), species_a]
+        # organism will die as there is 0 or 1 neighbours
+        applied_a = (species_a != 0) & (own_cnt_a == 1)
 
-        return evolved_organism, applied
+        return np.where(applied_a, 0, species_a), applied_a
 
 
 class EvolutionOvercrowdingRule(EvolutionRule):
@@ -93,7 +130,9 @@ class EvolutionOvercrowdingRule(EvolutionRule):
     Definition: `If there are four or more organisms of one type surrounding one of the same
     type then it will die due to overcrowding.`
     """
-    def apply(self, organism, species_occurrence_d, **kwargs):
+    COUNT_BASED = True
+
+    def evaluate(self, organism, species_occurrence_d, **kwargs):
         """Overrides method derived from base class.
 
         Note:
@@ -107,25 +146,41 @@ class EvolutionOvercrowdingRule(EvolutionRule):
 
         Returns:
             organism (Organism): Dead organism (None), original Organism otherwise.
-            applied (bool): Indicates if the rule was applied.
-
-        Raises:
-            EvolutionRuleError: If organism does not exist.
+            result (str): Result of the rule, one of `RESULT_*`.
         """
         if not organism:
-            raise EvolutionRuleError('Not applicable - organism must exist.')
+            return None, self.RESULT_NOT_APPLICABLE
 
         evolved_organism = organism
-        applied = False
+        result = self.RESULT_NOT_APPLIED
 
         if species_occurrence_d:
             species_occurrence = species_occurrence_d.get(organism.species)
             if species_occurrence and species_occurrence > 4:
                 # organism will die as there is more than 4 neighbours
                 evolved_organism = None
-                applied = True
+                result = self.RESULT_APPLIED
 
-        return evolved_organism, applied
+        return evolved_organism, result
+
+    def apply_batch(self, species_a, neighbours_cnt_a, **kwargs):
+        """Overrides method derived from base class.
+
+        Attributes:
+            species_a (numpy.ndarray): Species of the organisms in the cells (0 for empty).
+            neighbours_cnt_a (numpy.ndarray): Amounts of neighbours of the species by cell
+                and species.
+            **kwargs: Keyword arguments are not used for this rule.
+
+        Returns:
+            species_a (numpy.ndarray): Dead organisms (0), original species otherwise.
+            applied_a (numpy.ndarray): Indicates if the rule was applied to the cells.
+        """
+        own_cnt_a = neighbours_cnt_a[np.arange(len(species_a)), species_a]
+        # organism will die as there is more than 4 neighbours
+        applied_a = (species_a != 0) & (own_cnt_a > 4)
+
+        return np.where(applied_a, 0, species_a), applied_a
 
 
 class EvolutionBirthRule(EvolutionRule):
@@ -136,7 +191,9 @@ class EvolutionBirthRule(EvolutionRule):
     condition is true for more then one species on the same element then species type for the
     new element is chosen randomly.`
     """
-    def apply(self, organism, species_occurrence_d, **kwargs):
+    COUNT_BASED = True
+
+    def evaluate(self, organism, species_occurrence_d, **kwargs):
         """Overrides method derived from base class.
 
         Note:
@@ -146,32 +203,114 @@ class EvolutionBirthRule(EvolutionRule):
             organism (Organism): Organism or (None) on which the rule will be applied.
             species_occurrence_d (dict): Occurrence dict indicating occurrence
                 of species among organisms.Indicating
-            **kwargs: Keyword arguments contain the cell (x|y) for organism to be born at.
+            **kwargs: Keyword arguments contain the cell (x|y) for organism to be born at,
+                the generation which is evolved and the chooser of the probing rules engine.
 
         Returns:
             organism (Organism): Born organism, None otherwise.
-            applied (bool): Indicates if the rule was applied.
-
-        Raises:
-            EvolutionRuleError: If organism does not exist.
+            result (str): Result of the rule, one of `RESULT_*`.
         """
         if organism:
-            raise EvolutionRuleError('Not applicable - organism must not exist.')
+            return None, self.RESULT_NOT_APPLICABLE
 
         evolved_organism = None
-        applied = False
+        result = self.RESULT_NOT_APPLIED
         birth_species_candidate_l = []
 
         if species_occurrence_d:
-            for species, occurrence in species_occurrence_d.iteritems():
+            for species, occurrence in sorted(species_occurrence_d.iteritems()):
                 if occurrence == 3:
                     birth_species_candidate_l.append(species)
 
         if birth_species_candidate_l:
             # if there are 3 organisms with same species, choose one and give a birth 
-            random_species = random.choice(birth_species_candidate_l)
             cell = kwargs.get('cell')
+            random_species = self.choose_randomly(birth_species_candidate_l, cell=cell,
+                                                  generation=kwargs.get('generation', 0),
+                                                  chooser=kwargs.get('chooser'))
             evolved_organism = Organism(cell[0], cell[1], random_species)
-            applied = True
+            result = self.RESULT_APPLIED
+
+        return evolved_organism, result
+
+    def apply_batch(self, species_a, neighbours_cnt_a, **kwargs):
+        """Overrides method derived from base class.
+
+        Attributes:
+            species_a (numpy.ndarray): Species of the organisms in the cells (0 for empty).
+            neighbours_cnt_a (numpy.ndarray): Amounts of neighbours of the species by cell
+                and species.
+            **kwargs: Keyword arguments contain the cells (`x_a` and `y_a`) and the generation
+                which is evolved, the choices are not keyed by the cells if not given.
+
+        Returns:
+            species_a (numpy.ndarray): Species of the born organisms, 0 otherwise.
+            applied_a (numpy.ndarray): Indicates if the rule was applied to the cells.
+        """
+        # species which have 3 organisms around the empty cells
+        candidate_a = (neighbours_cnt_a[:, 1:] == 3) & (species_a == 0)[:, np.newaxis]
+        applied_a = candidate_a.any(axis=1)
+        evolved_species_a = np.zeros_like(species_a)
+        x_a, y_a = kwargs.get('x_a'), kwargs.get('y_a')
+        generation = kwargs.get('generation', 0)
+
+        # choices are made cell by cell, same as `apply` does
+        for cell_position in np.flatnonzero(applied_a):
+            birth_species_candidate_l = (np.flatnonzero(candidate_a[cell_position]) + 1).tolist()
+            cell = (int(x_a[cell_position]), int(y_a[cell_position])) \
+                if x_a is not None else None
+            evolved_species_a[cell_position] = self.choose_randomly(
+                birth_species_candidate_l, cell=cell, generation=generation)
+
+        return evolved_species_a, applied_a
+
+
+class EvolutionSpecRule(EvolutionRule):
+    """Evolution rule given by the declarative specification (derived from base evolution rule).
+
+    Definition: see `RuleSpec`, e.g. `B3/S23/I2/O4` is the same as all the rules above.
+
+    Attributes:
+        rule_spec (RuleSpec): Specification of the rule.
+    """
+    COUNT_BASED = True
+
+    def __init__(self, rule_spec):
+        self.rule_spec = rule_spec
+
+    def evaluate(self, organism, species_occurrence_d, **kwargs):
+        """Overrides method derived from base class.
+
+        Note:
+        Organism survives or is born only if the returned organism exists.
+
+        Attributes:
+            organism (Organism): Organism or (None) on which the rule will be applied.
+            species_occurrence_d (dict): Occurrence dict indicating occurrence
+                of species among organisms.
+            **kwargs: Keyword arguments contain the cell (x|y) for organism to be born at,
+                the generation which is evolved and the chooser of the probing rules engine.
+
+        Returns:
+            organism (Organism): Survived or born organism, None otherwise.
+            result (str): Result of the rule, one of `RESULT_*`.
+        """
+        if organism:
+            neighbours_cnt = species_occurrence_d.get(organism.species, 0)
+            if self.rule_spec.get_flags(organism.species, neighbours_cnt) & RuleSpec.SURVIVAL:
+                return organism, self.RESULT_APPLIED
+            return None, self.RESULT_APPLIED
+
+        birth_species_candidate_l = [
+            species for species, occurrence in sorted(species_occurrence_d.iteritems())
+            if self.rule_spec.get_flags(species, occurrence) & RuleSpec.BIRTH]
+
+        if not birth_species_candidate_l:
+            return None, self.RESULT_NOT_APPLIED
+
+        cell = kwargs.get('cell')
+        random_species = self.choose_randomly(birth_species_candidate_l, cell=cell,
+                                              generation=kwargs.get('generation', 0),
+                                              chooser=kwargs.get('chooser'))
 
-        return evolved_organism, applied
+        return Organism(cell[0], cell[1], random_species), self.RESULT_APPLIED
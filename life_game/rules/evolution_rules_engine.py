@@ -1,8 +1,18 @@
 #!/usr/bin/env python
+import random
+import logging
+
+import numpy as np
+
 from life_game.rules.utils import get_occurence_dict_by_attr
-from life_game.rules.base import EvolutionRule, EvolutionRuleError
+from life_game.rules.base import EvolutionRule
 from life_game.rules.evolution_rules import EvolutionSurvivalRule, EvolutionIsolationRule, \
-    EvolutionOvercrowdingRule, EvolutionBirthRule
+    EvolutionOvercrowdingRule, EvolutionBirthRule, EvolutionSpecRule
+from life_game.rules.rule_spec import RuleSpec, RuleSpecError
+from life_game.rules.cell_random import CellRandom
+from life_game.models.organism import Organism
+
+logger = logging.getLogger(__name__)
 
 
 class EvolutionRulesEngine(object):
@@ -10,15 +20,180 @@ class EvolutionRulesEngine(object):
 
     Applies predefined rules on organisms in the game.
 
+    The rules given by the specification (predefined ones are `DEFAULT_RULE_SPEC`) are
+    compiled to the transition table as well, so the world can evaluate the cells through
+    the table instead of the rule objects. Custom rule objects which are `COUNT_BASED` are
+    probed over all the species occurrences and evaluated through the rule table, the others
+    have no table. Rule objects which all implement `apply_batch` evaluate blocks of cells
+    at once (`evolve_batch`), which is preferred to the rule table.
+
+    Random choices (births of more species, initial conflicts) are made by the `random`
+    module, unless the engine is seeded. The seeded engine keys every choice by the seed,
+    the generation and the cell (see `CellRandom`), so the worlds which evaluate the cells
+    in a different order make the same choices.
+
     Attributes:
         evolution_rule_l (EvolutionRule): Rules which will be applied by engine.
+        rule_spec (RuleSpec): Specification of the rules (given as str, see `RuleSpec`)
+            used instead of the rule objects, None for custom rule objects.
+        seed (int): Seed of the random choices, None if the `random` module is used.
+        cell_random (CellRandom): Makes the random choices of the seeded engine (shared
+            with the rules), None if the engine is not seeded.
     """
-    def __init__(self, evolution_rule_l=[]):
+    CHANGE_NONE = 'none'
+    CHANGE_BIRTH = 'birth'
+    CHANGE_DEATH = 'death'
+
+    # same as the predefined rules: survival, isolation, overcrowding and birth
+    DEFAULT_RULE_SPEC = 'B3/S23/I2/O4'
+
+    # amount of probed cells (species and neighbours of all the species) of the rule table
+    MAX_RULE_TABLE_SIZE = 1 << 17
+
+    def __init__(self, evolution_rule_l=[], rule_spec=None, seed=None):
         self.evolution_rule_l = evolution_rule_l
+        self.rule_spec = None
+        self.seed = seed
+        self.cell_random = CellRandom(seed) if seed is not None else None
+
+        self._transition_table_d = {}
+        self._rule_table_d = {}
+        self._random_choice_cnt = 0
 
-        if not self.evolution_rule_l:
+        if self.evolution_rule_l and rule_spec:
+            raise RuleSpecError('Either the rules or the rule specification can be provided.')
+
+        if rule_spec:
+            self.rule_spec = RuleSpec(rule_spec)
+            self.evolution_rule_l = [EvolutionSpecRule(self.rule_spec)]
+        elif not self.evolution_rule_l:
+            self.rule_spec = RuleSpec(self.DEFAULT_RULE_SPEC)
             self._init_all_evolution_rules()
 
+        if self.cell_random is not None:
+            for evolution_rule in self.evolution_rule_l:
+                evolution_rule.cell_random = self.cell_random
+
+    @property
+    def random_choice_cnt(self):
+        """int: Amount of random choices among more candidates made by all the rules."""
+        return self._random_choice_cnt + sum(evolution_rule.random_choice_cnt
+                                             for evolution_rule in self.evolution_rule_l)
+
+    def get_transition_table(self, species_cnt):
+        """Retrieves the transition table of the rule specification (compiled once).
+
+        Attributes:
+            species_cnt (int): The highest species identifier in the game.
+
+        Returns:
+            transition_a (array): Flags indexed by species * `RuleSpec.ROW_SIZE` + amount
+                of neighbours of the species (see `RuleSpec.compile`), None if the rules
+                have no specification.
+        """
+        if self.rule_spec is None:
+            return None
+
+        if species_cnt not in self._transition_table_d:
+            self._transition_table_d[species_cnt] = self.rule_spec.compile(species_cnt)
+
+        return self._transition_table_d[species_cnt]
+
+    @property
+    def supports_batch(self):
+        """bool: True if all the rules evaluate more cells at once, False otherwise."""
+        return all(evolution_rule.has_batch() for evolution_rule in self.evolution_rule_l)
+
+    def evolve_batch(self, species_a, neighbours_cnt_a, x_a=None, y_a=None, generation=0,
+                     species_l=None):
+        """Applies all the rules on the block of cells.
+
+        Same as `evolve_organism_by_all_rules` for each of the cells, the cell is evolved
+        by the first rule which was applied and evolved the organism, the later rules are
+        applied only on the cells which were not evolved yet.
+
+        Attributes:
+            species_a (numpy.ndarray): Species of the organisms in the cells (0 for empty).
+            neighbours_cnt_a (numpy.ndarray): Amounts of neighbours of the species by cell
+                and species (column 0 counts empty neighbours).
+            x_a (numpy.ndarray, optional): Coordinates of the cells at x axes.
+            y_a (numpy.ndarray, optional): Coordinates of the cells at y axes.
+            generation (int, optional): Generation which is evolved.
+            species_l (list, optional): Species of the labels, if the species are given
+                as labels (index + 1).
+
+        Returns:
+            species_a (numpy.ndarray): Species of the evolved organisms, 0 for the cells
+                which can not be evolved.
+        """
+        evolved_species_a = np.zeros_like(species_a)
+        position_a = np.arange(len(species_a))
+
+        for evolution_rule in self.evolution_rule_l:
+            if not len(position_a):
+                break
+
+            cell_kwargs = {'generation': generation}
+            if species_l is not None:
+                cell_kwargs['species_l'] = species_l
+            if x_a is not None:
+                cell_kwargs.update(x_a=x_a[position_a], y_a=y_a[position_a])
+
+            rule_species_a, applied_a = evolution_rule.apply_batch(
+                species_a[position_a], neighbours_cnt_a[position_a], **cell_kwargs)
+
+            evolved_a = applied_a & (rule_species_a != 0)
+            evolved_species_a[position_a[evolved_a]] = rule_species_a[evolved_a]
+            # all the rules have to be checked for the rest of the cells
+            position_a = position_a[~evolved_a]
+
+        return evolved_species_a
+
+    def get_rule_table(self, species_cnt):
+        """Retrieves the rule table of `COUNT_BASED` rule objects (probed once).
+
+        The rules are probed for every species of the cell (0 for an empty cell) and every
+        amount of neighbours of the species 1 up to `species_cnt`. Random choice among more
+        candidates is recorded, so the table keeps the candidates instead of the result.
+
+        Attributes:
+            species_cnt (int): The highest species identifier in the game.
+
+        Returns:
+            rule_table_d (dict): Species of the cell after the iteration (0 for an empty
+                cell, tuple for candidates of random choice) by species of the cell and
+                tuple of neighbours amounts of the species, None if the rules have
+                the specification or can not be probed (warning is logged).
+        """
+        if self.rule_spec is not None:
+            return None
+
+        if species_cnt not in self._rule_table_d:
+            self._rule_table_d[species_cnt] = self._build_rule_table(species_cnt)
+
+        return self._rule_table_d[species_cnt]
+
+    def choose_birth_species(self, species_candidate_l, cell=None, generation=0):
+        """Chooses randomly the species of the born organism (for the transition table).
+
+        Same as the birth rule does, the choice is made even for a single candidate.
+
+        Attributes:
+            species_candidate_l (list): Species which can give birth, ordered.
+            cell (tuple, optional): Cell (x|y) of the born organism.
+            generation (int, optional): Generation which is evolved.
+
+        Returns:
+            species (int): Species of the born organism.
+        """
+        if len(species_candidate_l) > 1:
+            self._random_choice_cnt += 1
+
+        if self.cell_random is not None and cell is not None:
+            return self.cell_random.choose(species_candidate_l, generation, cell)
+
+        return random.choice(species_candidate_l)
+
     def _init_all_evolution_rules(self):
         """Initializes all rules, if none were provided."""
         self.evolution_rule_l = [
@@ -28,7 +203,8 @@ class EvolutionRulesEngine(object):
             EvolutionBirthRule()
         ]
 
-    def evolve_organism_by_all_rules(self, organism, neighboring_organism_l, cell=()):
+    def evolve_organism_by_all_rules(self, organism, neighboring_organism_l, cell=(),
+                                     generation=0):
         """Applies all the rules on provided organism.
 
         The rules are applied on the organism one by one (same as were specified).
@@ -37,7 +213,8 @@ class EvolutionRulesEngine(object):
             organism (Organism): Organism on which the rules will be applied.
             species_occurrence_d (dict): Occurrence dict indicating occurrence
                 of species among organisms.
-            **kwargs: Keyword arguments are not used for this rule.
+            cell (tuple): Cell (x|y) of the organism.
+            generation (int, optional): Generation which is evolved.
 
         Returns:
             organism (Organism): Evolved organism which will go to other iteration.
@@ -47,21 +224,59 @@ class EvolutionRulesEngine(object):
         """
         species_occurrence_d = get_occurence_dict_by_attr(neighboring_organism_l, 'species')
 
-        for evolution_rule in self.evolution_rule_l:
-            try: 
-                evolved_organism, applied = evolution_rule.apply(organism, 
-                                                                 species_occurrence_d,
-                                                                 cell=cell)
-            except EvolutionRuleError as err:
-                # all the rules have to be checked
-                continue
-            else:
-                if evolved_organism and applied:
-                    return evolved_organism
+        evolved_organism = self._evolve_organism_by_occurrence(organism, species_occurrence_d,
+                                                               cell, generation)
+        if not evolved_organism:
+            raise EngineCanNotEvolveOrganismError(
+                'Organism can not be evolved by any of the rules.')
+
+        return evolved_organism
+
+    def evolve_organism_with_change(self, organism, neighboring_organism_l, cell=(),
+                                    generation=0):
+        """Applies all the rules on provided organism and reports the change of its cell.
+
+        Same as `evolve_organism_by_all_rules`, but the organism which can not be evolved is
+        reported as a death (or no change for an empty cell) instead of raising an error.
+
+        Attributes:
+            organism (Organism): Organism (or None) on which the rules will be applied.
+            neighboring_organism_l (list): Organisms (or None) surrounding the cell.
+            cell (tuple): Cell (x|y) of the organism.
+            generation (int, optional): Generation which is evolved.
+
+        Returns:
+            organism (Organism): Evolved organism which will go to other iteration, else None.
+            change (str): Change of the cell, one of `CHANGE_*`.
+        """
+        species_occurrence_d = get_occurence_dict_by_attr(neighboring_organism_l, 'species')
+
+        return self.evolve_organism_with_change_by_occurrence(organism, species_occurrence_d,
+                                                              cell=cell, generation=generation)
+
+    def evolve_organism_with_change_by_occurrence(self, organism, species_occurrence_d,
+                                                  cell=(), generation=0):
+        """Same as `evolve_organism_with_change`, but the neighbours are already counted.
+
+        Attributes:
+            organism (Organism): Organism (or None) on which the rules will be applied.
+            species_occurrence_d (dict): Occurrence dict indicating occurrence
+                of species among neighbours.
+            cell (tuple): Cell (x|y) of the organism.
+            generation (int, optional): Generation which is evolved.
 
-        raise EngineCanNotEvolveOrganismError('Organism can not be evolved by any of the rules.')
+        Returns:
+            organism (Organism): Evolved organism which will go to other iteration, else None.
+            change (str): Change of the cell, one of `CHANGE_*`.
+        """
+        evolved_organism = self._evolve_organism_by_occurrence(organism, species_occurrence_d,
+                                                               cell, generation)
+        if not evolved_organism:
+            return None, self.CHANGE_DEATH if organism else self.CHANGE_NONE
 
-    def evolve_organism_randomly(self, organism1, organism2):
+        return evolved_organism, self.CHANGE_NONE if organism else self.CHANGE_BIRTH
+
+    def evolve_organism_randomly(self, organism1, organism2, conflict=0):
         """Selects randomly one among two organisms.
 
         Applying the rule: `If two organisms occupy one element, one of them must
@@ -69,13 +284,142 @@ class EvolutionRulesEngine(object):
 
         Attributes:
             organism1 (Organism): Organism1 picked for selection.
-            organism2 (Organism): Organism2 picked for selection.
+            organism2 (Organism): Organism2 picked for selection (in the same cell).
+            conflict (int, optional): Number of the previous conflicts in the cell, keys
+                the choice of the seeded engine.
 
         Returns:
             organism (Organism): selected organism.
         """
+        if self.cell_random is not None:
+            return self.cell_random.choose((organism1, organism2), conflict,
+                                           (organism1.x, organism1.y),
+                                           CellRandom.STREAM_CONFLICT)
+
         return EvolutionRule.select_randomly(organism1, organism2)
 
+    def _evolve_organism_by_occurrence(self, organism, species_occurrence_d, cell,
+                                       generation=0, chooser=None):
+        """Applies all the rules on provided organism and the species of its neighbours.
+
+        Attributes:
+            organism (Organism): Organism (or None) on which the rules will be applied.
+            species_occurrence_d (dict): Occurrence dict indicating occurrence
+                of species among neighbours.
+            cell (tuple): Cell (x|y) of the organism.
+            generation (int, optional): Generation which is evolved.
+            chooser (callable, optional): Makes the random choices of the rules instead
+                (see `EvolutionRule.choose_randomly`).
+
+        Returns:
+            organism (Organism): Evolved organism which will go to other iteration, None if
+                none of the rules were applied (organism dies or is not born).
+        """
+        kwargs = {'cell': cell, 'generation': generation}
+        if chooser is not None:
+            kwargs['chooser'] = chooser
+
+        for evolution_rule in self.evolution_rule_l:
+            if evolution_rule.evaluates_directly():
+                evolved_organism, result = evolution_rule.evaluate(
+                    organism, species_occurrence_d, **kwargs)
+            else:
+                # `apply` is overriden below `evaluate`, which would not evaluate it
+                evolved_organism, result = EvolutionRule.evaluate(
+                    evolution_rule, organism, species_occurrence_d, **kwargs)
+            # all the rules have to be checked (even if the rule is not applicable)
+            if evolved_organism and result == EvolutionRule.RESULT_APPLIED:
+                return evolved_organism
+
+        return None
+
+    def _build_rule_table(self, species_cnt):
+        """Probes the rules for all the species of the cell and amounts of neighbours.
+
+        Attributes:
+            species_cnt (int): The highest species identifier in the game.
+
+        The random choices of the rules are made by the recording chooser (passed to the rules
+        as the keyword argument), so the rule objects are not changed. Surviving organism
+        has to keep its species, the world keeps the organism as it is.
+
+        Returns:
+            rule_table_d (dict): See `get_rule_table`, None if the rules can not be probed.
+        """
+        rule_name_l = [evolution_rule.__class__.__name__ for evolution_rule
+                       in self.evolution_rule_l if not evolution_rule.is_count_based()]
+        if rule_name_l:
+            logger.warning('Rules %s are not count based, every cell is evaluated by '
+                           'the rules one by one, which is much slower.', ', '.join(rule_name_l))
+            return None
+
+        # amount of the tuples of neighbours amounts (8 neighbours among species and empty)
+        neighbours_cnts_cnt = 1
+        for cnt in xrange(1, RuleSpec.NEIGHBOURS_CNT + 1):
+            neighbours_cnts_cnt = neighbours_cnts_cnt * (species_cnt + cnt) // cnt
+        if neighbours_cnts_cnt * (species_cnt + 1) > self.MAX_RULE_TABLE_SIZE:
+            logger.warning('There are too many species (%s) to probe the rules, every cell is '
+                           'evaluated by the rules one by one, which is much slower.',
+                           species_cnt)
+            return None
+
+        neighbours_cnt_l = list(self._iter_neighbours_cnts(species_cnt, RuleSpec.NEIGHBOURS_CNT))
+        rule_table_d = {}
+        candidate_l = []
+
+        def choose_randomly(species_candidate_l):
+            # the choice is recorded, the table keeps the candidates
+            candidate_l.append(tuple(species_candidate_l))
+            return species_candidate_l[0]
+
+        for species in xrange(species_cnt + 1):
+            organism = Organism(0, 0, species) if species else None
+
+            for neighbours_cnt_t in neighbours_cnt_l:
+                species_occurrence_d = dict(
+                    (neighbour_species, neighbours_cnt) for neighbour_species, neighbours_cnt
+                    in enumerate(neighbours_cnt_t, 1) if neighbours_cnt)
+                del candidate_l[:]
+
+                evolved_organism = self._evolve_organism_by_occurrence(
+                    organism, species_occurrence_d, (0, 0), chooser=choose_randomly)
+
+                if not evolved_organism:
+                    rule_table_d[(species, neighbours_cnt_t)] = 0
+                elif organism:
+                    if evolved_organism.species != species:
+                        logger.warning('Rules change the species of the surviving organism, '
+                                       'every cell is evaluated by the rules one by one, which '
+                                       'is much slower.')
+                        return None
+                    rule_table_d[(species, neighbours_cnt_t)] = evolved_organism.species
+                elif candidate_l:
+                    rule_table_d[(species, neighbours_cnt_t)] = candidate_l[-1]
+                else:
+                    rule_table_d[(species, neighbours_cnt_t)] = evolved_organism.species
+
+        return rule_table_d
+
+    @classmethod
+    def _iter_neighbours_cnts(cls, species_cnt, neighbours_cnt):
+        """Iterates over the amounts of neighbours of the species.
+
+        Attributes:
+            species_cnt (int): Amount of species.
+            neighbours_cnt (int): The highest amount of neighbours of all the species.
+
+        Returns:
+            (iterator): Tuples of neighbours amounts of the species 1 up to `species_cnt`.
+        """
+        if not species_cnt:
+            yield ()
+            return
+
+        for cnt in xrange(neighbours_cnt + 1):
+            for neighbours_cnt_t in cls._iter_neighbours_cnts(species_cnt - 1,
+                                                              neighbours_cnt - cnt):
+                yield (cnt,) + neighbours_cnt_t
+
 
 class EngineCanNotEvolveOrganismError(Exception):
     pass
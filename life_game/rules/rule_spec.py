@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+import re
+from array import array
+
+
+class RuleSpec(object):
+    """Declarative specification of the evolution rules (B3/S23 style).
+
+    The rule is made of parts separated by `/`:
+        - `B<counts>`: empty cell gives birth if there are exactly <count> neighbours
+          of one species (for any of the counts),
+        - `S<counts>`: organism survives if there are <count> neighbours of its species,
+        - `I<n>`: organism dies due to isolation if there are less than <n> neighbours
+          of its species,
+        - `O<n>`: organism dies due to overcrowding if there are more than <n> neighbours
+          of its species.
+    Organism which does not survive dies. The rule applies to all the species, the rules
+    of specific species follow after `;` prefixed by the species, e.g. `B3/S23;2:B36/S23`.
+    Birth of more species in one cell is resolved by a random choice.
+
+    The specification is compiled to a dense transition table of flags indexed by
+    species * `ROW_SIZE` + amount of neighbours of the species.
+
+    Attributes:
+        spec (str): Rule specification.
+    """
+    NEIGHBOURS_CNT = 8
+    ROW_SIZE = NEIGHBOURS_CNT + 1
+    # flags of the transition table
+    SURVIVAL = 1
+    BIRTH = 2
+
+    PART_PATTERN = re.compile(r'^([BSIO])(\d*)$', re.IGNORECASE)
+    SPECIES_PATTERN = re.compile(r'^\s*(\d+)\s*:(.*)$')
+
+    def __init__(self, spec):
+        self.spec = spec
+
+        self._rule_by_species_d = {}
+        self._default_rule = None
+        self._parse()
+
+    def __str__(self):
+        return self.spec
+
+    def compile(self, species_cnt):
+        """Compiles the specification to the transition table.
+
+        Attributes:
+            species_cnt (int): The highest species identifier in the game.
+
+        Returns:
+            transition_a (array): Flags (`SURVIVAL`|`BIRTH`) for species 0 (empty row)
+                up to `species_cnt` and every amount of neighbours.
+        """
+        transition_a = array('B', [0]) * ((species_cnt + 1) * self.ROW_SIZE)
+
+        for species in xrange(1, species_cnt + 1):
+            for neighbours_cnt in xrange(self.ROW_SIZE):
+                transition_a[species * self.ROW_SIZE + neighbours_cnt] = \
+                    self.get_flags(species, neighbours_cnt)
+
+        return transition_a
+
+    def get_flags(self, species, neighbours_cnt):
+        """Retrieves the transition flags without the table.
+
+        Attributes:
+            species (int): Species identifier.
+            neighbours_cnt (int): Amount of neighbours of the species.
+
+        Returns:
+            flags (int): `SURVIVAL` and `BIRTH` flags.
+        """
+        birth_cnt_s, survival_cnt_s = self._rule_by_species_d.get(species, self._default_rule)
+
+        flags = 0
+        if neighbours_cnt in survival_cnt_s:
+            flags |= self.SURVIVAL
+        if neighbours_cnt in birth_cnt_s:
+            flags |= self.BIRTH
+
+        return flags
+
+    def _parse(self):
+        """Parses the specification.
+
+        Raises:
+            RuleSpecError: If the specification is not valid.
+        """
+        for position, rule in enumerate(self.spec.split(';')):
+            match = self.SPECIES_PATTERN.match(rule)
+
+            if position == 0:
+                if match:
+                    raise RuleSpecError('Rule of all the species must be the first one.')
+                self._default_rule = self._parse_rule(rule)
+                continue
+
+            if not match or int(match.group(1)) < 1:
+                raise RuleSpecError('Rule `%s` must be prefixed by the species.' % rule)
+
+            species = int(match.group(1))
+            if species in self._rule_by_species_d:
+                raise RuleSpecError('Species %s has more rules.' % species)
+
+            self._rule_by_species_d[species] = self._parse_rule(match.group(2))
+
+    def _parse_rule(self, rule):
+        """Parses the rule of one or all the species.
+
+        Attributes:
+            rule (str): Rule made of parts separated by `/`.
+
+        Returns:
+            birth_cnt_s (set): Amounts of neighbours giving birth.
+            survival_cnt_s (set): Amounts of neighbours the organism survives with.
+
+        Raises:
+            RuleSpecError: If the rule is not valid.
+        """
+        value_d = {}
+
+        for part in rule.strip().split('/'):
+            match = self.PART_PATTERN.match(part.strip())
+            if not match:
+                raise RuleSpecError('Part `%s` of the rule is not valid.' % part)
+
+            kind, digits = match.group(1).upper(), match.group(2)
+            if kind in value_d:
+                raise RuleSpecError('Part `%s` is specified more times.' % kind)
+
+            if kind in 'BS':
+                value_d[kind] = set(int(digit) for digit in digits)
+                if any(cnt > self.NEIGHBOURS_CNT for cnt in value_d[kind]):
+                    raise RuleSpecError('There are at most %s neighbours.'
+                                        % self.NEIGHBOURS_CNT)
+            elif not digits:
+                raise RuleSpecError('Part `%s` needs the amount of neighbours.' % kind)
+            else:
+                value_d[kind] = int(digits)
+
+        if 'B' not in value_d or 'S' not in value_d:
+            raise RuleSpecError('Rule `%s` needs both birth and survival part.' % rule)
+
+        if 0 in value_d['B']:
+            # the birth without neighbours has no species to take
+            raise RuleSpecError('Birth needs at least one neighbour.')
+
+        survival_cnt_s = set(cnt for cnt in value_d['S']
+                             if cnt >= value_d.get('I', 0) and
+                             cnt <= value_d.get('O', self.NEIGHBOURS_CNT))
+
+        return value_d['B'], survival_cnt_s
+
+
+class RuleSpecError(Exception):
+    pass
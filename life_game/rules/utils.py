@@ -17,7 +17,7 @@ def get_occurence_dict_by_attr(object_l, attr_name):
     for object in object_l:
         if object:
             attr = getattr(object, attr_name)
-            if attr in object_attr_d.keys():
+            if attr in object_attr_d:
                 object_attr_d[attr] += 1
             else:
                 object_attr_d[attr] = 1
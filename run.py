@@ -1,9 +1,19 @@
 #!/usr/bin/env python
+import os
 import sys
+import json
+import atexit
+import signal
 
 from life_game.models.game import Game, GameRuntimeError
+from life_game.models.metrics import GameMetrics
+from life_game.batch.jobs import read_jobs, BatchJobError
+from life_game.batch.runner import BatchRunner
+from life_game.batch.ensemble import EnsembleRunner, EnsembleError
+from life_game.distributed.worker import start_local_worker, stop_local_workers, \
+    WorkerStartError
 from life_game.io_handlers.game_io_handler import GameIOHandler, \
-    IOValidationError, ReadStateError
+    IOValidationError, ReadStateError, WriteStateError
 
 EXIT_SUCCESS = 0
 EXIT_FAILURE = 1
@@ -21,13 +31,208 @@ def stop_with_success():
     sys.exit(EXIT_SUCCESS)
 
 
+def print_metrics_summary(metrics):
+    """Prints the summary of the metrics (if measured) as JSON.
+
+    Attributes:
+        metrics (GameMetrics): Metrics of the game, None if the game is not measured.
+    """
+    if metrics:
+        print '* Metrics: %s' % json.dumps(metrics.get_summary(), sort_keys=True)
+
+
+def stop_on_signal(io_handler, metrics=None):
+    """Stops the game on termination signals, the pending state is written before.
+
+    The game is stopped once the state is consistent, not while the world is iterated
+    or the state is written (see `GameIOHandler.handle_signal`).
+
+    Attributes:
+        io_handler (GameIOHandler): Object which handles game's IO operations.
+        metrics (GameMetrics, optional): Metrics whose summary is printed before.
+    """
+    def stop(signum):
+        print '* The game has been stopped by signal %s, writing the latest state. \n' % signum
+        try:
+            io_handler.flush()
+        except WriteStateError as err:
+            stop_with_error(err)
+        print_metrics_summary(metrics)
+        sys.exit(EXIT_FAILURE)
+
+    def handle_signal(signum, frame):
+        io_handler.handle_signal(lambda: stop(signum))
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, handle_signal)
+
+
+def get_world_kwargs(parsed_arguments):
+    """Builds the keyword arguments of the distributed engine (if its workers are given).
+
+    Local workers are started and they are stopped once the game exits.
+
+    Attributes:
+        parsed_arguments (argparse.Namespace): Arguments parsed by `GameIOHandler`.
+
+    Returns:
+        engine (str): Engine selected by user, the distributed one if its workers are given.
+        world_kwargs (dict): Keyword arguments of the world of the engine.
+
+    Raises:
+        IOValidationError: If the workers are given to another engine or can not be started.
+    """
+    worker_address_l = GameIOHandler.get_worker_addresses(parsed_arguments)
+    engine = parsed_arguments.engine or Game.ENGINE_AUTO
+
+    if not worker_address_l and not parsed_arguments.local_workers:
+        return engine, {}
+
+    if engine not in (Game.ENGINE_AUTO, Game.ENGINE_DISTRIBUTED):
+        raise IOValidationError('Workers can be given only to the distributed engine.')
+
+    if parsed_arguments.local_workers:
+        process_l = []
+        atexit.register(stop_local_workers, process_l)
+        try:
+            for _ in xrange(parsed_arguments.local_workers):
+                process, address = start_local_worker()
+                process_l.append(process)
+                worker_address_l.append(address)
+        except WorkerStartError as err:
+            raise IOValidationError(err.message)
+
+    world_kwargs = {'worker_address_l': worker_address_l}
+    if parsed_arguments.checkpoint_interval:
+        world_kwargs['checkpoint_interval'] = parsed_arguments.checkpoint_interval
+
+    return Game.ENGINE_DISTRIBUTED, world_kwargs
+
+
+def print_job_result(result):
+    """Prints the result of one job of the batch."""
+    if result['error']:
+        print '! %s failed: %s' % (result['name'], result['error'])
+    else:
+        print '* %s -> %s: %.3fs, %.1f iterations/s' % (
+            result['name'], result['output_file'], result['seconds'],
+            result['iterations_per_second'] or 0.0)
+
+
+def run_batch(batch_input, parsed_arguments, write_policy):
+    """Runs the games of the batch on the pool of worker processes and writes the summary.
+
+    Exits with failure status if some game failed.
+
+    Attributes:
+        batch_input (str): Path to the directory or the manifest of the games.
+        parsed_arguments (argparse.Namespace): Arguments parsed by `GameIOHandler`.
+        write_policy (WritePolicy): Write policy of every game.
+
+    Raises:
+        IOValidationError: If the options are not supported by the batch mode.
+    """
+    if parsed_arguments.worker_address_l or parsed_arguments.local_workers or \
+            parsed_arguments.trajectory_file or parsed_arguments.metrics:
+        raise IOValidationError('Workers, trajectory and metrics are not supported in batch '
+                                'mode.')
+
+    try:
+        job_l = read_jobs(batch_input, parsed_arguments.output_dir,
+                          parsed_arguments.output_format,
+                          engine=parsed_arguments.engine or Game.ENGINE_AUTO,
+                          seed=parsed_arguments.seed,
+                          detect_cycles=parsed_arguments.detect_cycles,
+                          write_policy=write_policy,
+                          pretty_print=parsed_arguments.pretty_print)
+    except BatchJobError as err:
+        raise IOValidationError(err.message)
+
+    print '* Running %d games of the batch. \n' % len(job_l)
+    summary = BatchRunner(parsed_arguments.pool_size).run(job_l, log=print_job_result)
+
+    summary_file = parsed_arguments.summary_file or \
+        os.path.join(parsed_arguments.output_dir, GameIOHandler.BATCH_SUMMARY_FILE)
+    summary_dir = os.path.dirname(summary_file)
+    if summary_dir and not os.path.isdir(summary_dir):
+        os.makedirs(summary_dir)
+    with open(summary_file, 'w') as opened_file:
+        json.dump(summary, opened_file, indent=2, sort_keys=True)
+
+    print '\n* %d of %d games finished in %.3fs, %.1f iterations/s in total.' % (
+        summary['jobs_cnt'] - summary['failed_jobs_cnt'], summary['jobs_cnt'],
+        summary['seconds'], summary['iterations_per_second'] or 0.0)
+    print '* The summary has been written to %s.' % summary_file
+
+    sys.exit(EXIT_FAILURE if summary['failed_jobs_cnt'] else EXIT_SUCCESS)
+
+
+def print_ensemble_record(record):
+    """Prints the number of the generation aggregated by the ensemble every 100 generations."""
+    if record['generation'] % 100 == 0:
+        print '* Generation %d of all the runs has been aggregated.' % record['generation']
+
+
+def run_ensemble(input_file, parsed_arguments):
+    """Runs the state of the input under many seeds and writes the aggregates.
+
+    Only the aggregates of the populations are written, not the states of the runs.
+
+    Attributes:
+        input_file (str): Path to the input file.
+        parsed_arguments (argparse.Namespace): Arguments parsed by `GameIOHandler`.
+
+    Raises:
+        IOValidationError: If the options are not supported by the ensemble mode or the state
+            can not be read.
+    """
+    if parsed_arguments.worker_address_l or parsed_arguments.local_workers or \
+            parsed_arguments.trajectory_file or parsed_arguments.metrics:
+        raise IOValidationError('Workers, trajectory and metrics are not supported in ensemble '
+                                'mode.')
+
+    try:
+        state = GameIOHandler(input_file, keep_out_file_open=False).read_state()
+        runner = EnsembleRunner(parsed_arguments.pool_size,
+                                engine=parsed_arguments.engine or Game.ENGINE_AUTO)
+    except (ReadStateError, EnsembleError) as err:
+        raise IOValidationError(err.message)
+
+    first_seed = parsed_arguments.seed if parsed_arguments.seed is not None else state.seed or 0
+    seed_l = range(first_seed, first_seed + parsed_arguments.ensemble)
+
+    print '* Running %d runs of the ensemble (seeds %d-%d). \n' % (
+        len(seed_l), seed_l[0], seed_l[-1])
+    try:
+        summary = runner.run(state, seed_l, parsed_arguments.ensemble_file,
+                             log=print_ensemble_record)
+    except EnsembleError as err:
+        stop_with_error(err)
+
+    print '\n* %d runs finished in %.3fs, %.1f generations/s in total.' % (
+        summary['runs'], summary['seconds'], summary['generations_per_second'] or 0.0)
+    print '* The aggregates have been written to %s.' % parsed_arguments.ensemble_file
+
+    sys.exit(EXIT_SUCCESS)
+
+
 if __name__ == '__main__':
     """Main method to run the game of life.
 
     Example:
     Second argument is a XML file which contains the initial state for the game.
+    Optional arguments select the write policy (every iteration is written by default).
 
         $ python run.py /path/to/input_file.xml
+        $ python run.py /path/to/input_file.xml --write-every 1000
+        $ python run.py /path/to/input_file.xml --write-in-background
+        $ python run.py /path/to/input_file.xml --metrics summary
+        $ python run.py /path/to/input_file.xml --seed 42 --engine numpy
+        $ python run.py /path/to/input_file.xml --worker host1:7001 --worker host2:7001
+        $ python run.py /path/to/input_file.xml --local-workers 4
+        $ python run.py /path/to/inputs_dir --batch --output-dir outputs --pool-size 4
+        $ python run.py /path/to/manifest.txt --batch --write-final
+        $ python run.py /path/to/input_file.xml --ensemble 64 --seed 1 --pool-size 4
 
     """
     print '* The game has started. \n'
@@ -35,10 +240,31 @@ if __name__ == '__main__':
     print '* Checking the input provided. \n'
     try:
         input_file = GameIOHandler.check_input(sys.argv)
-        io_handler = GameIOHandler(input_file)
+        parsed_arguments = GameIOHandler.parse_arguments(sys.argv)
+        write_policy = GameIOHandler.get_write_policy(parsed_arguments)
+        if parsed_arguments.batch:
+            run_batch(input_file, parsed_arguments, write_policy)
+        if parsed_arguments.ensemble:
+            run_ensemble(input_file, parsed_arguments)
+
+        # the records of the generations are built only if they are written
+        metrics = GameMetrics(generation_records=parsed_arguments.metrics ==
+                              GameIOHandler.METRICS_LINES) if parsed_arguments.metrics else None
+        metrics_file = parsed_arguments.metrics_file \
+            if parsed_arguments.metrics == GameIOHandler.METRICS_LINES else None
+        io_handler = GameIOHandler(input_file, parsed_arguments.output_file,
+                                   write_policy=write_policy,
+                                   write_in_background=parsed_arguments.write_in_background,
+                                   pretty_print=parsed_arguments.pretty_print,
+                                   trajectory_file=parsed_arguments.trajectory_file,
+                                   keyframe_interval=parsed_arguments.keyframe_interval,
+                                   metrics_file=metrics_file)
+        engine, world_kwargs = get_world_kwargs(parsed_arguments)
     except IOValidationError as err:
         stop_with_error(err)
 
+    stop_on_signal(io_handler, metrics)
+
     print '* Reading a state from the input file. \n'
     try:
         initial_state = io_handler.read_state()
@@ -46,12 +272,16 @@ if __name__ == '__main__':
         stop_with_error(err)
 
     print '* Initializing the game. \n'
-    game = Game(io_handler, initial_state)
+    game = Game(io_handler, initial_state, engine=engine,
+                detect_cycles=parsed_arguments.detect_cycles, metrics=metrics,
+                world_kwargs=world_kwargs, seed=parsed_arguments.seed)
 
     print '* Starting the game. \n'
     try:
         game.start()
     except GameRuntimeError as err:
+        print_metrics_summary(metrics)
         stop_with_error(err)
     else:
+        print_metrics_summary(metrics)
         stop_with_success()
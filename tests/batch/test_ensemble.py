@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+import json
+import random
+import shutil
+import os.path
+import tempfile
+import unittest
+
+import numpy as np
+
+from life_game.models.game import Game
+from life_game.models.state import State
+from life_game.models.organism import Organism
+from life_game.models.world import World
+from life_game.models.world_grid import WorldGrid
+from life_game.batch.ensemble import PopulationStatistics, EnsembleRunner, EnsembleError
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestPopulationStatistics(unittest.TestCase):
+
+    def setUp(self):
+        generator = np.random.RandomState(7)
+        self.population_a_l = [generator.randint(0, 5, 3).astype(float) for _ in xrange(20)]
+
+    def _build_statistics(self, population_a_l):
+        statistics = PopulationStatistics([1, 2, 3])
+        for population_a in population_a_l:
+            statistics.add(population_a)
+        return statistics
+
+    def test_add_same_as_numpy(self):
+        statistics = self._build_statistics(self.population_a_l)
+
+        self.assertEqual(statistics.runs_cnt, 20)
+        np.testing.assert_allclose(statistics.mean_a, np.mean(self.population_a_l, axis=0))
+        np.testing.assert_allclose(statistics.variance_a,
+                                   np.var(self.population_a_l, axis=0, ddof=1))
+        self.assertEqual(statistics.extinct_cnt_a.tolist(),
+                         (np.array(self.population_a_l) == 0).sum(axis=0).tolist())
+
+    def test_merge_same_as_add(self):
+        statistics = self._build_statistics(self.population_a_l)
+
+        merged_statistics = self._build_statistics(self.population_a_l[:7])
+        merged_statistics.merge(self._build_statistics(self.population_a_l[7:]))
+        merged_statistics.merge(PopulationStatistics([1, 2, 3]))
+
+        self.assertEqual(merged_statistics.runs_cnt, statistics.runs_cnt)
+        np.testing.assert_allclose(merged_statistics.mean_a, statistics.mean_a)
+        np.testing.assert_allclose(merged_statistics.m2_a, statistics.m2_a)
+        self.assertEqual(merged_statistics.extinct_cnt_a.tolist(),
+                         statistics.extinct_cnt_a.tolist())
+        self.assertEqual(merged_statistics.empty_cnt, statistics.empty_cnt)
+
+    def test_get_record(self):
+        statistics = self._build_statistics([np.array([2.0, 0.0, 0.0]),
+                                             np.array([4.0, 0.0, 0.0]),
+                                             np.array([0.0, 0.0, 0.0])])
+
+        record = statistics.get_record(5)
+
+        self.assertEqual(record['generation'], 5)
+        self.assertEqual(record['runs'], 3)
+        self.assertEqual(record['species']['1'], {'mean': 2.0, 'variance': 4.0,
+                                                  'extinction_probability': 1 / 3.0})
+        self.assertEqual(record['species']['2']['extinction_probability'], 1.0)
+        self.assertEqual(record['extinction_probability'], 1 / 3.0)
+
+
+class TestEnsembleRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.output_dir, 'ensemble.jsonl')
+
+        generator = random.Random(7)
+        self.state = State(12, 3, 10, [
+            Organism(generator.randrange(12), generator.randrange(12), generator.randint(1, 3))
+            for _ in xrange(80)])
+
+    def _read_records(self):
+        with open(self.output_file) as opened_file:
+            return [json.loads(line) for line in opened_file]
+
+    def _get_populations(self, seed):
+        world = World(WorldGrid(12, 12), list(self.state.organism_l),
+                      EvolutionRulesEngine(seed=seed))
+        world.populate_initial_organisms()
+
+        population_d_l = []
+        for generation in xrange(self.state.iterations_cnt + 1):
+            if generation:
+                world.iterate()
+            population_d = dict((species, 0) for species in (1, 2, 3))
+            for organism in world.organism_l:
+                population_d[organism.species] += 1
+            population_d_l.append(population_d)
+
+        return population_d_l
+
+    def test_run_same_as_runs_one_by_one(self):
+        seed_l = range(5)
+        logged_l = []
+
+        summary = EnsembleRunner(pool_size=2).run(self.state, seed_l, self.output_file,
+                                                  log=logged_l.append)
+        record_l = self._read_records()
+
+        self.assertEqual(record_l[0]['record'], EnsembleRunner.RECORD_ENSEMBLE)
+        self.assertEqual(record_l[0]['seeds'], seed_l)
+        self.assertEqual(record_l[0]['species'], [1, 2, 3])
+        self.assertEqual(record_l[-1], json.loads(json.dumps(summary)))
+        self.assertEqual(summary['runs'], 5)
+        self.assertEqual(record_l[1:-1], json.loads(json.dumps(logged_l)))
+
+        generation_record_l = record_l[1:-1]
+        self.assertEqual([record['generation'] for record in generation_record_l], range(11))
+
+        population_d_l_l = [self._get_populations(seed) for seed in seed_l]
+        for record, population_d_l in zip(generation_record_l, zip(*population_d_l_l)):
+            for species in (1, 2, 3):
+                population_l = [population_d[species] for population_d in population_d_l]
+                species_record = record['species'][str(species)]
+
+                self.assertAlmostEqual(species_record['mean'], np.mean(population_l))
+                self.assertAlmostEqual(species_record['variance'],
+                                       np.var(population_l, ddof=1))
+                self.assertAlmostEqual(species_record['extinction_probability'],
+                                       population_l.count(0) / 5.0)
+
+    def test_run_same_by_engines(self):
+        record_l_l = []
+        for engine in (Game.ENGINE_PYTHON, Game.ENGINE_NUMPY):
+            EnsembleRunner(pool_size=3, engine=engine).run(self.state, range(6),
+                                                           self.output_file)
+            record_l_l.append(self._read_records()[1:-1])
+
+        self.assertEqual(record_l_l[0], record_l_l[1])
+
+    def test_engine_not_supported(self):
+        with self.assertRaises(EnsembleError):
+            EnsembleRunner(engine=Game.ENGINE_TILES)
+
+    def test_run_output_file_not_valid(self):
+        with self.assertRaises(EnsembleError):
+            EnsembleRunner(pool_size=1).run(self.state, range(2),
+                                            os.path.join(self.output_dir, 'missing', 'x.jsonl'))
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+
+from life_game.models.game import Game
+from life_game.batch.jobs import read_jobs, BatchJobError
+from life_game.io_handlers.write_policy import FinalStateWritePolicy
+
+
+class TestReadJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.batch_dir = tempfile.mkdtemp()
+        for file_name in ('b.xml', 'a.life', 'notes.txt'):
+            open(os.path.join(self.batch_dir, file_name), 'w').close()
+
+    def _write_manifest(self, content):
+        manifest_file = os.path.join(self.batch_dir, 'manifest.txt')
+        with open(manifest_file, 'w') as opened_file:
+            opened_file.write(content)
+        return manifest_file
+
+    def test_read_jobs_from_directory(self):
+        job_l = read_jobs(self.batch_dir, 'out', engine=Game.ENGINE_NUMPY,
+                          write_policy=FinalStateWritePolicy())
+
+        self.assertEqual([(job.input_file, job.output_file) for job in job_l],
+                         [(os.path.join(self.batch_dir, 'a.life'), os.path.join('out', 'a.xml')),
+                          (os.path.join(self.batch_dir, 'b.xml'), os.path.join('out', 'b.xml'))])
+        self.assertEqual(job_l[0].engine, Game.ENGINE_NUMPY)
+        self.assertTrue(job_l[0].write_policy.FINAL_STATE_ONLY)
+
+    def test_read_jobs_from_manifest(self):
+        manifest_file = self._write_manifest('# games\nb.xml\n\na.life b-out.life\n')
+
+        job_l = read_jobs(manifest_file, 'out', output_format='binary')
+
+        self.assertEqual([(job.input_file, job.output_file) for job in job_l],
+                         [(os.path.join(self.batch_dir, 'b.xml'), os.path.join('out', 'b.life')),
+                          (os.path.join(self.batch_dir, 'a.life'),
+                           os.path.join(self.batch_dir, 'b-out.life'))])
+
+    def test_read_jobs_not_valid(self):
+        manifest_l = [
+            'missing.xml\n',
+            'notes.txt\n',
+            'a.life out.txt\n',
+            'a.life a.xml b.xml\n',
+            # the same output file
+            'a.life\nb.xml a.xml\n',
+            '# no games\n'
+        ]
+
+        for content in manifest_l:
+            with self.assertRaises(BatchJobError):
+                read_jobs(self._write_manifest(content), self.batch_dir)
+
+        with self.assertRaises(BatchJobError):
+            read_jobs(os.path.join(self.batch_dir, 'missing.txt'), 'out')
+
+    def test_read_jobs_engine_not_valid(self):
+        # engines which start their own processes
+        for engine in (Game.ENGINE_TILES, Game.ENGINE_DISTRIBUTED):
+            with self.assertRaises(BatchJobError):
+                read_jobs(self.batch_dir, 'out', engine=engine)
+
+    def tearDown(self):
+        shutil.rmtree(self.batch_dir)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+
+from life_game.batch.jobs import BatchJob
+from life_game.batch.runner import BatchRunner, run_job
+from life_game.io_handlers.binary_handler import BinaryHandlerMixin
+from life_game.io_handlers.write_policy import WritePolicy, FinalStateWritePolicy
+
+
+class FailingWritePolicy(WritePolicy):
+
+    def is_write_due(self, iteration):
+        raise ValueError('Iteration %d can not be written.' % iteration)
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def _build_job(self, input_file, output_name):
+        return BatchJob(input_file, os.path.join(self.output_dir, 'games', output_name),
+                        write_policy=FinalStateWritePolicy())
+
+    def test_run_job_success(self):
+        result = run_job(self._build_job('samples/test.xml', 'test.life'))
+
+        self.assertEqual(result['status'], BatchRunner.STATUS_SUCCESS)
+        self.assertEqual(result['error'], None)
+        self.assertEqual(result['iterations_cnt'], 2)
+
+        state = BinaryHandlerMixin().read_state_from_binary(result['output_file'])
+        self.assertEqual(state.iterations_cnt, 0)
+
+    def test_run_job_failure(self):
+        result = run_job(self._build_job('missing.xml', 'missing.xml'))
+
+        self.assertEqual(result['status'], BatchRunner.STATUS_FAILURE)
+        self.assertIn('missing.xml', result['error'])
+        self.assertEqual(result['iterations_cnt'], 0)
+
+    def test_run_job_unexpected_failure(self):
+        job = self._build_job('samples/test.xml', 'test.xml')
+        job.write_policy = FailingWritePolicy()
+
+        result = run_job(job)
+
+        self.assertEqual(result['status'], BatchRunner.STATUS_FAILURE)
+        self.assertTrue(result['error'].startswith('ValueError: Iteration'))
+
+        # the other jobs of the batch are run
+        summary = BatchRunner(pool_size=2).run([job, self._build_job('samples/test.xml',
+                                                                     'other.xml')])
+
+        self.assertEqual(summary['failed_jobs_cnt'], 1)
+        self.assertEqual(summary['results'][1]['status'], BatchRunner.STATUS_SUCCESS)
+
+    def test_run_job_input_not_valid(self):
+        input_file = os.path.join(self.output_dir, 'invalid.xml')
+        with open(input_file, 'w') as opened_file:
+            opened_file.write('<life><world>')
+        job_l = [self._build_job(input_file, 'invalid.life'),
+                 self._build_job('samples/test.xml', 'test.life'),
+                 self._build_job('samples/small.xml', 'small.life')]
+
+        # all the jobs are run by the same worker
+        summary = BatchRunner(pool_size=1).run(job_l)
+
+        self.assertEqual([result['status'] for result in summary['results']],
+                         [BatchRunner.STATUS_FAILURE, BatchRunner.STATUS_SUCCESS,
+                          BatchRunner.STATUS_SUCCESS])
+        # the partly written output is not left as a result
+        self.assertFalse(os.path.exists(job_l[0].output_file))
+        for job in job_l[1:]:
+            state = BinaryHandlerMixin().read_state_from_binary(job.output_file)
+            self.assertEqual(state.iterations_cnt, 0)
+
+    def test_run_keeps_order_of_jobs(self):
+        job_l = [self._build_job('samples/small.xml', 'small.xml'),
+                 self._build_job('missing.xml', 'missing.xml'),
+                 self._build_job('samples/test.xml', 'test.xml')]
+        logged_l = []
+
+        summary = BatchRunner(pool_size=2).run(job_l, log=logged_l.append)
+
+        self.assertEqual([result['name'] for result in summary['results']],
+                         ['samples/small.xml', 'missing.xml', 'samples/test.xml'])
+        self.assertEqual(sorted(result['name'] for result in logged_l),
+                         sorted(result['name'] for result in summary['results']))
+        self.assertEqual(summary['jobs_cnt'], 3)
+        self.assertEqual(summary['failed_jobs_cnt'], 1)
+        self.assertEqual(summary['iterations_cnt'],
+                         sum(result['iterations_cnt'] for result in summary['results']))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'games', 'small.xml')))
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.models.game import Game
+from benchmarks.cases import BenchmarkCase, BenchmarkMatrix, BenchmarkCaseError
+
+
+class TestBenchmarkCase(unittest.TestCase):
+
+    def test_build_state_success(self):
+        case = BenchmarkCase(Game.ENGINE_PYTHON, 20, 3, 0.25, 5)
+
+        state = case.build_state()
+
+        self.assertEqual((state.cells_cnt, state.species_cnt, state.iterations_cnt), (20, 3, 5))
+        self.assertEqual(len(state.organism_l), 100)
+        self.assertEqual(len(set((organism.x, organism.y) for organism in state.organism_l)),
+                         100)
+        self.assertTrue(all(1 <= organism.species <= 3 for organism in state.organism_l))
+
+    def test_build_state_same_by_seed(self):
+        case = BenchmarkCase(Game.ENGINE_PYTHON, 20, 3, 0.25, 5)
+
+        self.assertEqual(case.build_state().organism_l, case.build_state().organism_l)
+
+    def test_from_sample_truncated(self):
+        case = BenchmarkCase.from_sample(Game.ENGINE_PYTHON, 'samples/small.xml', 3)
+
+        state = case.build_state()
+
+        self.assertEqual(state.iterations_cnt, 3)
+        self.assertEqual((case.cells_cnt, case.species_cnt), (state.cells_cnt,
+                                                               state.species_cnt))
+        self.assertEqual(case.name, 'python/sample-small.xml/i3')
+
+
+class TestBenchmarkMatrix(unittest.TestCase):
+
+    def test_get_cases_success(self):
+        case_l = BenchmarkMatrix().get_cases([Game.ENGINE_PYTHON, Game.ENGINE_BITBOARD], [57])
+        name_l = [case.name for case in case_l]
+
+        self.assertIn('python/c57/s3/d0.3/i200', name_l)
+        self.assertIn('bitboard/c57/s1/d0.05/i200', name_l)
+        self.assertIn('python/sample-big.xml/i1000', name_l)
+        # engines of a single species
+        self.assertTrue(all(case.species_cnt == 1 for case in case_l
+                            if case.engine == Game.ENGINE_BITBOARD))
+        self.assertEqual(len(name_l), len(set(name_l)))
+
+    def test_get_cases_by_workers(self):
+        case_l = BenchmarkMatrix().get_cases([Game.ENGINE_NUMPY, Game.ENGINE_TILES], [57],
+                                             [1, 4])
+        name_l = [case.name for case in case_l]
+
+        self.assertIn('tiles-w1/c57/s1/d0.3/i200', name_l)
+        self.assertIn('tiles-w4/sample-big.xml/i1000', name_l)
+        self.assertIn('numpy/c57/s1/d0.3/i200', name_l)
+        self.assertEqual(len(name_l), len(set(name_l)))
+        self.assertEqual(case_l[-1].world_kwargs, {'workers_cnt': 4})
+
+    def test_get_iterations_cnt_bounded(self):
+        matrix = BenchmarkMatrix(BenchmarkMatrix.PROFILE_FULL)
+
+        self.assertEqual(matrix.get_iterations_cnt(57), BenchmarkMatrix.MAX_ITERATIONS_CNT)
+        self.assertEqual(matrix.get_iterations_cnt(4096), BenchmarkMatrix.MIN_ITERATIONS_CNT)
+
+    def test_not_known(self):
+        with self.assertRaises(BenchmarkCaseError):
+            BenchmarkMatrix('slow')
+
+        with self.assertRaises(BenchmarkCaseError):
+            BenchmarkMatrix().get_cases(['quantum'])
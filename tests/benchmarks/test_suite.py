@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.models.game import Game
+from benchmarks.cases import BenchmarkCase
+from benchmarks.suite import BenchmarkRunner, compare_results
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_run_python_engine_phases(self):
+        result_d = BenchmarkRunner().run([BenchmarkCase(Game.ENGINE_PYTHON, 10, 2, 0.3, 3)])
+        result = result_d['results'][0]
+
+        self.assertEqual(result['name'], 'python/c10/s2/d0.3/i3')
+        self.assertEqual(result['initial_organisms_cnt'], 30)
+        self.assertGreater(result['generations_per_second'], 0)
+        self.assertEqual(sorted(result['phase_seconds']),
+                         ['neighbours', 'populate', 'read_xml', 'rebuild', 'rules', 'update',
+                          'write_xml'])
+
+    def test_run_engine_without_phases(self):
+        result = BenchmarkRunner(repeat_cnt=2).run_case(
+            BenchmarkCase(Game.ENGINE_BITBOARD, 10, 1, 0.3, 3))
+
+        self.assertNotIn('rules', result['phase_seconds'])
+        self.assertIn('write_xml', result['phase_seconds'])
+
+
+class TestCompareResults(unittest.TestCase):
+
+    def setUp(self):
+        self.baseline_d = {'results': [
+            {'name': 'a', 'generations_per_second': 100.0,
+             'phase_seconds': {'rules': 1.0, 'rebuild': 0.001}},
+            {'name': 'b', 'generations_per_second': 100.0, 'phase_seconds': {}}
+        ]}
+
+    def _get_result_d(self, generations_per_second, rules_seconds, rebuild_seconds):
+        return {'results': [
+            {'name': 'a', 'generations_per_second': generations_per_second,
+             'phase_seconds': {'rules': rules_seconds, 'rebuild': rebuild_seconds}},
+            {'name': 'c', 'generations_per_second': 1.0, 'phase_seconds': {}}
+        ]}
+
+    def test_compare_results_within_threshold(self):
+        result_d = self._get_result_d(95.0, 1.05, 0.005)
+
+        self.assertEqual(compare_results(result_d, self.baseline_d, 0.1), [])
+
+    def test_compare_results_regression(self):
+        result_d = self._get_result_d(80.0, 1.5, 0.001)
+
+        regression_l = compare_results(result_d, self.baseline_d, 0.1)
+
+        self.assertEqual(len(regression_l), 2)
+        self.assertTrue(regression_l[0].startswith('a: 80.0 generations/s'))
+        self.assertTrue(regression_l[1].startswith('a: rules 1.500s'))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+import socket
+import unittest
+
+import numpy as np
+
+from life_game.distributed.protocol import send_message, receive_message, encode_load, \
+    decode_load, encode_step, decode_step, encode_result, decode_result, encode_stripe, \
+    decode_stripe, MESSAGE_STEP, HEADER_STRUCT, ProtocolError
+
+
+class TestProtocol(unittest.TestCase):
+
+    def setUp(self):
+        self.connection, self.peer_connection = socket.socketpair()
+        self.label_grid = np.array([[0, 1, 2], [3, 0, 300]], dtype=np.uint16)
+
+    def test_send_and_receive_message(self):
+        send_message(self.connection, MESSAGE_STEP, 'payload')
+        send_message(self.connection, MESSAGE_STEP)
+
+        self.assertEqual(receive_message(self.peer_connection), (MESSAGE_STEP, 'payload'))
+        self.assertEqual(receive_message(self.peer_connection), (MESSAGE_STEP, ''))
+
+        self.connection.close()
+        self.assertEqual(receive_message(self.peer_connection), (None, None))
+
+    def test_receive_message_closed_in_the_middle(self):
+        self.connection.sendall(HEADER_STRUCT.pack(MESSAGE_STEP, 10) + 'short')
+        self.connection.close()
+
+        with self.assertRaises(ProtocolError):
+            receive_message(self.peer_connection)
+
+    def test_encode_and_decode_load(self):
+        label_grid, label_cnt = decode_load(encode_load(self.label_grid, 301))
+
+        self.assertEqual(label_grid.tolist(), self.label_grid.tolist())
+        self.assertEqual(label_grid.dtype, np.uint16)
+        self.assertEqual(label_cnt, 301)
+
+    def test_encode_and_decode_step(self):
+        revert, choice_a, top_row, bottom_row = decode_step(
+            encode_step(False, [1, 2, 3, 0, 1, 2], None, self.label_grid[1]), 3)
+
+        self.assertFalse(revert)
+        self.assertEqual(choice_a.tolist(), [[1, 2, 3], [0, 1, 2]])
+        self.assertEqual(top_row, None)
+        self.assertEqual(bottom_row.tolist(), [3, 0, 300])
+
+        revert, choice_a, top_row, bottom_row = decode_step(
+            encode_step(True, [], self.label_grid[0], None), 3)
+
+        self.assertTrue(revert)
+        self.assertEqual(choice_a.tolist(), [])
+        self.assertEqual(top_row.tolist(), [0, 1, 2])
+        self.assertEqual(bottom_row, None)
+
+    def test_encode_and_decode_result(self):
+        tie_l = [(0, 1, [1, 2]), (1, 2, [1, 2, 3])]
+        alive, population_a, first_row, last_row, decoded_tie_l = decode_result(
+            encode_result(True, np.array([2, 1, 1, 1]), self.label_grid[0],
+                          self.label_grid[1], tie_l), 3)
+
+        self.assertTrue(alive)
+        self.assertEqual(population_a.tolist(), [2, 1, 1, 1])
+        self.assertEqual(first_row.tolist(), [0, 1, 2])
+        self.assertEqual(last_row.tolist(), [3, 0, 300])
+        self.assertEqual(decoded_tie_l, tie_l)
+
+    def test_encode_and_decode_stripe(self):
+        self.assertEqual(decode_stripe(encode_stripe(self.label_grid), 3).tolist(),
+                         self.label_grid.tolist())
+
+    def tearDown(self):
+        self.connection.close()
+        self.peer_connection.close()
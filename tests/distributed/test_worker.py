@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+import socket
+import unittest
+
+import numpy as np
+
+from life_game.distributed.worker import TileWorker, start_local_worker, stop_local_workers
+from life_game.distributed.protocol import send_message, receive_message, encode_load, \
+    encode_settle, encode_step, decode_result, decode_stripe, MESSAGE_LOAD, MESSAGE_STEP, \
+    MESSAGE_SNAPSHOT, MESSAGE_ACK, MESSAGE_RESULT, MESSAGE_STRIPE, MESSAGE_ERROR
+
+
+class TestTileWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = TileWorker()
+        # the middle rows of the 5x5 grid with a blinker at x 1..3, y 2
+        self.label_grid = np.array([[0, 0, 1, 0, 0], [0, 0, 1, 0, 0]], dtype=np.uint16)
+        self.worker.handle_message(MESSAGE_LOAD, encode_load(self.label_grid, 2))
+
+    def _step(self, top_row=None, bottom_row=None, revert=False, choice_l=(), height=5):
+        message_type, payload = self.worker.handle_message(
+            MESSAGE_STEP, encode_step(revert, list(choice_l), top_row, bottom_row))
+        self.assertEqual(message_type, MESSAGE_RESULT)
+
+        return decode_result(payload, height)
+
+    def _snapshot(self, revert=False, choice_l=(), height=5):
+        message_type, payload = self.worker.handle_message(
+            MESSAGE_SNAPSHOT, encode_settle(revert, list(choice_l)))
+        self.assertEqual(message_type, MESSAGE_STRIPE)
+
+        return decode_stripe(payload, height).tolist()
+
+    def test_step_with_halo(self):
+        alive, population_a, first_row, last_row, tie_l = self._step(
+            top_row=np.array([0, 0, 0, 0, 0]), bottom_row=np.array([0, 0, 1, 0, 0]))
+
+        self.assertTrue(alive)
+        self.assertEqual(population_a.tolist(), [7, 3])
+        self.assertEqual(first_row.tolist(), [0, 0, 0, 0, 0])
+        self.assertEqual(last_row.tolist(), [0, 1, 1, 1, 0])
+        self.assertEqual(tie_l, [])
+
+    def test_step_without_halo(self):
+        alive, population_a, _, _, _ = self._step()
+
+        # both the organisms die of isolation
+        self.assertFalse(alive)
+        self.assertEqual(population_a.tolist(), [10, 0])
+
+        self.assertEqual(self._snapshot(revert=True), self.label_grid.tolist())
+
+    def test_step_reports_ties(self):
+        self.worker.handle_message(MESSAGE_LOAD, encode_load(
+            np.array([[1, 0, 2], [1, 0, 2], [1, 0, 2]], dtype=np.uint16), 3))
+
+        _, population_a, _, _, tie_l = self._step(height=3)
+
+        self.assertEqual(tie_l, [(1, 1, [1, 2])])
+        # the cell holds the first of the species until it is settled
+        self.assertEqual(population_a.tolist(), [6, 2, 1])
+        self.assertEqual(self._snapshot(choice_l=[1, 1, 2], height=3),
+                         [[0, 0, 0], [1, 2, 2], [0, 0, 0]])
+
+    def test_handle_message_not_known(self):
+        message_type, payload = self.worker.handle_message(99, '')
+
+        self.assertEqual(message_type, MESSAGE_ERROR)
+        self.assertIn('99', payload)
+
+    def test_serve_local_worker(self):
+        process, address = start_local_worker()
+        try:
+            connection = socket.create_connection(address)
+            send_message(connection, MESSAGE_LOAD, encode_load(self.label_grid, 2))
+            self.assertEqual(receive_message(connection), (MESSAGE_ACK, ''))
+
+            send_message(connection, MESSAGE_SNAPSHOT, encode_settle(False, []))
+            message_type, payload = receive_message(connection)
+            connection.close()
+        finally:
+            stop_local_workers([process])
+
+        self.assertEqual(message_type, MESSAGE_STRIPE)
+        self.assertEqual(decode_stripe(payload, 5).tolist(), self.label_grid.tolist())
+        self.assertNotEqual(process.returncode, None)
+
+    def tearDown(self):
+        self.worker.close()
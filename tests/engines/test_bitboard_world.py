@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+import random
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.world_grid import WorldGrid
+from life_game.models.world import World, WorldInternalError
+from life_game.engines.bitboard_world import BitboardWorld
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestBitboardWorld(unittest.TestCase):
+
+    def setUp(self):
+        # blinker
+        self.original_organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+
+        self.world = self._build_world(BitboardWorld, 5, self.original_organism_l)
+
+    def _build_world(self, world_class, cells_cnt, organism_l):
+        world = world_class(WorldGrid(cells_cnt, cells_cnt), list(organism_l),
+                            EvolutionRulesEngine())
+        world.populate_initial_organisms()
+        return world
+
+    def _get_cells(self, world):
+        # organisms of the world are kept in no particular order
+        return sorted((organism.x, organism.y, organism.species) for organism in world.organism_l)
+
+    def test_populate_with_organisms_success(self):
+        self.assertEqual(self.world.species, 1)
+        self.assertEqual(self.world.row_l, [0, 4, 4, 4, 0])
+
+    def test_populate_with_organisms_more_species(self):
+        with self.assertRaises(WorldInternalError):
+            self._build_world(BitboardWorld, 5, [Organism(1, 1, 1), Organism(2, 2, 2)])
+
+    def test_iterate_success(self):
+        self.world.iterate()
+
+        self.assertEqual(self._get_cells(self.world), [(2, 1, 1), (2, 2, 1), (2, 3, 1)])
+        self.assertFalse(self.world._get_organism_at(1, 2))
+
+        self.world.iterate()
+
+        self.assertEqual(self._get_cells(self.world), [(1, 2, 1), (2, 2, 1), (3, 2, 1)])
+
+    def test_iterate_random_same_as_world(self):
+        generator = random.Random(11)
+
+        for cells_cnt, density in [(7, 0.5), (23, 0.3), (70, 0.4)]:
+            organism_l = [Organism(x, y, 3) for x in xrange(cells_cnt) for y in xrange(cells_cnt)
+                          if generator.random() < density]
+
+            world = self._build_world(World, cells_cnt, organism_l)
+            bitboard_world = self._build_world(BitboardWorld, cells_cnt, organism_l)
+
+            for _ in xrange(15):
+                world.iterate()
+                bitboard_world.iterate()
+
+                self.assertEqual(self._get_cells(bitboard_world), self._get_cells(world))
+
+    def test_iterate_no_evolution_keeps_organisms(self):
+        world = self._build_world(BitboardWorld, 5, [Organism(0, 0, 1)])
+        world.iterate()
+
+        self.assertEqual(self._get_cells(world), [(0, 0, 1)])
+
+    def test_iterate_reports_changes(self):
+        self.assertEqual(self.world.born_organism_l, [])
+
+        self.world.iterate()
+
+        self.assertEqual([str(organism) for organism in self.world.born_organism_l],
+                         ['2-1-1', '2-3-1'])
+        self.assertEqual([str(organism) for organism in self.world.dead_organism_l],
+                         ['1-2-1', '3-2-1'])
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+import random
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.world import World, WorldInternalError
+from life_game.models.world_grid import WorldGrid
+from life_game.engines.numpy_world import NumpyWorld
+from life_game.engines.distributed_world import DistributedWorld
+from life_game.distributed.worker import start_local_worker, stop_local_workers
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestDistributedWorld(unittest.TestCase):
+    WORKERS_CNT = 3
+
+    def setUp(self):
+        self.world_l = []
+        self.process_l, self.worker_address_l = [], []
+        for _ in xrange(self.WORKERS_CNT):
+            process, address = start_local_worker()
+            self.process_l.append(process)
+            self.worker_address_l.append(address)
+
+        generator = random.Random(7)
+        self.organism_l = [Organism(x, y, generator.randint(1, 3)) for x in xrange(20)
+                           for y in xrange(20) if generator.random() < 0.4]
+
+    def _build_world(self, world_class, cells_cnt, organism_l, seed=None, **kwargs):
+        world = world_class(WorldGrid(cells_cnt, cells_cnt), list(organism_l),
+                            EvolutionRulesEngine(seed=seed), **kwargs)
+        world.populate_initial_organisms()
+        self.world_l.append(world)
+        return world
+
+    def _get_cells(self, world):
+        # organisms of the world are kept in no particular order
+        return sorted((organism.x, organism.y, organism.species) for organism in world.organism_l)
+
+    def _get_generations(self, world, iterations_cnt, restart_at=None):
+        random.seed(3)
+        cells_l = []
+
+        for iteration in xrange(iterations_cnt):
+            if iteration == restart_at:
+                self.process_l[1].kill()
+                self.process_l[1].wait()
+                self.process_l[1], _ = start_local_worker(self.worker_address_l[1][1])
+
+            world.iterate()
+            cells_l.append(self._get_cells(world))
+
+        return cells_l
+
+    def test_iterate_same_as_numpy_world(self):
+        numpy_world = self._build_world(NumpyWorld, 20, self.organism_l)
+        distributed_world = self._build_world(DistributedWorld, 20, self.organism_l,
+                                              worker_address_l=self.worker_address_l)
+
+        self.assertEqual(self._get_generations(distributed_world, 20),
+                         self._get_generations(numpy_world, 20))
+        self.assertEqual(distributed_world.random_choice_cnt, numpy_world.random_choice_cnt)
+        self.assertGreater(distributed_world.random_choice_cnt, 0)
+
+        population_d = {}
+        for _, _, species in self._get_cells(numpy_world):
+            population_d[species] = population_d.get(species, 0) + 1
+        self.assertEqual(distributed_world.population_d, population_d)
+
+    def test_iterate_survives_worker_restart(self):
+        numpy_world = self._build_world(NumpyWorld, 20, self.organism_l)
+        distributed_world = self._build_world(DistributedWorld, 20, self.organism_l,
+                                              worker_address_l=self.worker_address_l,
+                                              checkpoint_interval=4)
+
+        self.assertEqual(self._get_generations(distributed_world, 20, restart_at=10),
+                         self._get_generations(numpy_world, 20))
+        self.assertEqual(distributed_world.checkpoint_generation, 20)
+
+    def test_iterate_seeded_same_as_world(self):
+        world = self._build_world(World, 20, self.organism_l, seed=11)
+        distributed_world = self._build_world(DistributedWorld, 20, self.organism_l, seed=11,
+                                              worker_address_l=self.worker_address_l,
+                                              checkpoint_interval=4)
+
+        # the replayed generations make the same choices, they are keyed by the cells
+        self.assertEqual(self._get_generations(distributed_world, 20, restart_at=10),
+                         self._get_generations(world, 20))
+        self.assertGreater(distributed_world.random_choice_cnt, 0)
+
+    def test_iterate_reports_changes(self):
+        # blinker across the border of the stripes
+        world = self._build_world(DistributedWorld, 5, [Organism(1, 2, 1), Organism(2, 2, 1),
+                                                        Organism(3, 2, 1)],
+                                  worker_address_l=self.worker_address_l)
+
+        world.iterate()
+
+        self.assertEqual([str(organism) for organism in world.born_organism_l],
+                         ['2-1-1', '2-3-1'])
+        self.assertEqual([str(organism) for organism in world.dead_organism_l],
+                         ['1-2-1', '3-2-1'])
+
+        world.iterate()
+        world.iterate()
+
+        # the previous generation was not gathered
+        self.assertEqual(world.born_organism_l, None)
+        self.assertEqual(self._get_cells(world), [(2, 1, 1), (2, 2, 1), (2, 3, 1)])
+
+    def test_iterate_no_evolution_keeps_organisms(self):
+        world = self._build_world(DistributedWorld, 5, [Organism(2, 2, 1)],
+                                  worker_address_l=self.worker_address_l)
+        world.iterate()
+        world.iterate()
+
+        self.assertEqual(self._get_cells(world), [(2, 2, 1)])
+        self.assertEqual(world.population_d, {1: 1})
+
+    def test_iterate_without_workers(self):
+        world = self._build_world(DistributedWorld, 5, [Organism(2, 2, 1)])
+
+        with self.assertRaises(WorldInternalError):
+            world.iterate()
+
+    def test_iterate_workers_not_available(self):
+        stop_local_workers(self.process_l)
+        world = self._build_world(DistributedWorld, 5, [Organism(2, 2, 1)],
+                                  worker_address_l=self.worker_address_l, connect_timeout=0.2)
+
+        with self.assertRaises(WorldInternalError):
+            world.iterate()
+
+    def tearDown(self):
+        for world in self.world_l:
+            world.close()
+
+        stop_local_workers(self.process_l)
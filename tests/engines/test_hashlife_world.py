@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+import random
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.world_grid import WorldGrid
+from life_game.models.world import WorldInternalError
+from life_game.engines.bitboard_world import BitboardWorld
+from life_game.engines.hashlife_world import HashlifeWorld, HashlifeNodeCache
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestHashlifeWorld(unittest.TestCase):
+
+    def setUp(self):
+        # glider
+        self.original_organism_l = [Organism(0, 1, 1), Organism(1, 2, 1), Organism(2, 0, 1),
+                                    Organism(2, 1, 1), Organism(2, 2, 1)]
+
+        self.world = self._build_world(HashlifeWorld, 10, self.original_organism_l)
+
+    def _build_world(self, world_class, cells_cnt, organism_l, **kwargs):
+        world = world_class(WorldGrid(cells_cnt, cells_cnt), list(organism_l),
+                            EvolutionRulesEngine(), **kwargs)
+        world.populate_initial_organisms()
+        return world
+
+    def _get_cells(self, world):
+        return [(organism.x, organism.y, organism.species) for organism in world.organism_l]
+
+    def test_populate_with_organisms_success(self):
+        self.assertEqual(self.world.root.population, 5)
+        self.assertEqual(self._get_cells(self.world), [(0, 1, 1), (1, 2, 1), (2, 0, 1),
+                                                       (2, 1, 1), (2, 2, 1)])
+        self.assertTrue(self.world._get_organism_at(1, 2))
+        self.assertFalse(self.world._get_organism_at(1, 1))
+
+    def test_populate_with_organisms_more_species(self):
+        with self.assertRaises(WorldInternalError):
+            self._build_world(HashlifeWorld, 5, [Organism(1, 1, 1), Organism(2, 2, 2)])
+
+    def test_advance_glider_success(self):
+        # glider moves by one cell diagonally every four iterations
+        self.world.advance(8)
+
+        self.assertEqual(self._get_cells(self.world), [(2, 3, 1), (3, 4, 1), (4, 2, 1),
+                                                       (4, 3, 1), (4, 4, 1)])
+
+    def test_advance_glider_stops_at_border(self):
+        # glider turns into a block in the corner of the grid
+        bitboard_world = self._build_world(BitboardWorld, 10, self.original_organism_l)
+        bitboard_world.advance(100)
+        self.world.advance(100)
+
+        self.assertEqual(self._get_cells(self.world), self._get_cells(bitboard_world))
+        self.assertEqual(len(self.world.organism_l), 4)
+
+    def test_advance_random_same_as_bitboard_world(self):
+        generator = random.Random(5)
+
+        for cells_cnt in (3, 8, 21, 40):
+            organism_l = [Organism(x, y, 1) for x in xrange(cells_cnt) for y in xrange(cells_cnt)
+                          if generator.random() < 0.4]
+
+            for iterations_cnt in (1, 6, 37, 300):
+                bitboard_world = self._build_world(BitboardWorld, cells_cnt, organism_l)
+                hashlife_world = self._build_world(HashlifeWorld, cells_cnt, organism_l)
+
+                bitboard_world.advance(iterations_cnt)
+                hashlife_world.advance(iterations_cnt)
+
+                self.assertEqual(self._get_cells(hashlife_world), self._get_cells(bitboard_world))
+
+    def test_advance_no_evolution_keeps_organisms(self):
+        # organisms die in the second iteration, the world stays as after the first one
+        organism_l = [Organism(0, 0, 1), Organism(0, 1, 1), Organism(2, 0, 1)]
+        world = self._build_world(HashlifeWorld, 6, organism_l)
+        world.advance(1000)
+
+        self.assertEqual(self._get_cells(world), [(1, 0, 1), (1, 1, 1)])
+
+    def test_advance_with_small_cache(self):
+        world = self._build_world(HashlifeWorld, 10, self.original_organism_l, cache_size=16)
+        world.advance(8)
+
+        self.assertEqual(self._get_cells(world), [(2, 3, 1), (3, 4, 1), (4, 2, 1),
+                                                  (4, 3, 1), (4, 4, 1)])
+        self.assertTrue(len(world.node_cache) <= 16)
+        self.assertTrue(len(world.evolution_cache) <= 16)
+
+
+class TestHashlifeNodeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = HashlifeNodeCache(4)
+
+    def test_get_success(self):
+        self.cache.set('a', 1)
+
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('b'), None)
+
+    def test_set_evicts_not_used_entries(self):
+        for key in 'abcde':
+            self.cache.set(key, key)
+
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.get('c'), 'c')
+        self.assertEqual(self.cache.get('e'), 'e')
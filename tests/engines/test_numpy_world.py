@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+import random
+import unittest
+
+import numpy as np
+
+from life_game.models.organism import Organism
+from life_game.models.organism_store import LabelGridStore
+from life_game.models.world_grid import WorldGrid
+from life_game.models.world import World, WorldInternalError
+from life_game.engines.numpy_world import NumpyWorld
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestNumpyWorld(unittest.TestCase):
+
+    def setUp(self):
+        self.original_organism_l = [
+            Organism(2, 0, 1), Organism(1, 1, 1), Organism(2, 1, 1), Organism(3, 1, 2),
+            Organism(1, 2, 2), Organism(2, 2, 2), Organism(3, 2, 2), Organism(0, 3, 2),
+            Organism(1, 3, 2), Organism(3, 3, 2)
+        ]
+
+        self.world = self._build_world(NumpyWorld, 5, self.original_organism_l)
+
+    def _build_world(self, world_class, cells_cnt, organism_l, seed=None):
+        world = world_class(WorldGrid(cells_cnt, cells_cnt), list(organism_l),
+                            EvolutionRulesEngine(seed=seed))
+        world.populate_initial_organisms()
+        return world
+
+    def _get_cells(self, world):
+        # organisms of the world are kept in no particular order
+        return sorted((organism.x, organism.y, organism.species) for organism in world.organism_l)
+
+    def test_populate_with_organisms_success(self):
+        self.assertEqual(len(self.world.organism_l), 10)
+        self.assertEqual(self.world.species_l, [1, 2])
+        self.assertEqual(self.world.label_grid.sum(), 17)
+
+    def test_populate_with_label_grid_without_copy(self):
+        label_grid = np.zeros((5, 5), dtype=np.uint16)
+        for organism in self.original_organism_l:
+            label_grid[organism.x, organism.y] = organism.species
+        label_grid.flags.writeable = False
+
+        world = NumpyWorld(WorldGrid(5, 5), LabelGridStore(label_grid), EvolutionRulesEngine())
+        world.populate_initial_organisms()
+
+        self.assertTrue(world.label_grid is label_grid)
+        self.assertEqual(world.species_l, [1, 2])
+
+        for _ in xrange(3):
+            world.iterate()
+            self.world.iterate()
+
+        self.assertEqual(self._get_cells(world), self._get_cells(self.world))
+
+    def test_populate_with_label_grid_relabeled(self):
+        label_grid = np.zeros((5, 5), dtype=np.uint16)
+        label_grid[1, 1], label_grid[2, 3] = 300, 7
+
+        world = NumpyWorld(WorldGrid(5, 5), LabelGridStore(label_grid), EvolutionRulesEngine())
+        world.populate_initial_organisms()
+
+        self.assertEqual(world.species_l, [7, 300])
+        self.assertEqual(self._get_cells(world), [(1, 1, 300), (2, 3, 7)])
+        self.assertEqual(label_grid[1, 1], 300)
+
+        with self.assertRaises(WorldInternalError):
+            NumpyWorld(WorldGrid(4, 4), LabelGridStore(label_grid),
+                       EvolutionRulesEngine()).populate_initial_organisms()
+
+    def test_populate_with_organisms_not_existing_organisms_provided(self):
+        with self.assertRaises(WorldInternalError):
+            self._build_world(NumpyWorld, 5, [Organism(100, -20, 1), Organism(1, -10, 2)])
+
+    def test_iterate_success(self):
+        self.world.iterate()
+
+        self.assertEqual(len(self.world.organism_l), 12)
+        self.assertEqual(self.world._get_organism_at(1, 0).species, 1)
+        self.assertTrue(self.world._get_organism_at(4, 2))
+        self.assertTrue(self.world._get_organism_at(3, 1))
+        self.assertFalse(self.world._get_organism_at(2, 2))
+
+    def test_iterate_same_as_world(self):
+        world = self._build_world(World, 5, self.original_organism_l)
+
+        for _ in xrange(5):
+            world.iterate()
+            self.world.iterate()
+
+            self.assertEqual(self._get_cells(self.world), self._get_cells(world))
+
+    def test_iterate_random_single_species_same_as_world(self):
+        generator = random.Random(7)
+        organism_l = [Organism(x, y, 1) for x in xrange(20) for y in xrange(20)
+                      if generator.random() < 0.35]
+
+        world = self._build_world(World, 20, organism_l)
+        numpy_world = self._build_world(NumpyWorld, 20, organism_l)
+
+        for _ in xrange(30):
+            world.iterate()
+            numpy_world.iterate()
+
+            self.assertEqual(self._get_cells(numpy_world), self._get_cells(world))
+
+    def test_iterate_seeded_same_as_world(self):
+        generator = random.Random(7)
+        organism_l = [Organism(generator.randrange(20), generator.randrange(20),
+                               generator.randint(1, 4)) for _ in xrange(300)]
+
+        world = self._build_world(World, 20, organism_l, seed=11)
+        numpy_world = self._build_world(NumpyWorld, 20, organism_l, seed=11)
+        # initial conflicts are resolved by the seed as well
+        self.assertEqual(self._get_cells(numpy_world), self._get_cells(world))
+
+        for _ in xrange(20):
+            # the choices do not depend on the random module
+            random.seed(1)
+            world.iterate()
+            random.seed(2)
+            numpy_world.iterate()
+
+            self.assertEqual(self._get_cells(numpy_world), self._get_cells(world))
+
+        self.assertGreater(numpy_world.random_choice_cnt, 0)
+
+    def test_iterate_birth_chosen_randomly(self):
+        # both species have three organisms around the cell 1|1
+        organism_l = [Organism(0, 0, 1), Organism(1, 0, 1), Organism(2, 0, 1),
+                      Organism(0, 2, 2), Organism(1, 2, 2), Organism(2, 2, 2)]
+        world = self._build_world(NumpyWorld, 3, organism_l)
+
+        world.iterate()
+
+        self.assertIn(world._get_organism_at(1, 1).species, [1, 2])
+
+    def test_iterate_no_evolution_keeps_organisms(self):
+        world = self._build_world(NumpyWorld, 5, [Organism(2, 2, 1)])
+        world.iterate()
+
+        self.assertEqual(self._get_cells(world), [(2, 2, 1)])
+
+    def test_iterate_reports_changes(self):
+        world = self._build_world(NumpyWorld, 5, [Organism(1, 2, 1), Organism(2, 2, 1),
+                                                  Organism(3, 2, 1)])
+        self.assertEqual(world.born_organism_l, [])
+
+        world.iterate()
+
+        self.assertEqual([str(organism) for organism in world.born_organism_l],
+                         ['2-1-1', '2-3-1'])
+        self.assertEqual([str(organism) for organism in world.dead_organism_l],
+                         ['1-2-1', '3-2-1'])
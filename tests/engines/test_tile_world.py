@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+import random
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.world_grid import WorldGrid
+from life_game.engines.numpy_world import NumpyWorld
+from life_game.engines.tile_world import TileWorld
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestTileWorld(unittest.TestCase):
+
+    def setUp(self):
+        self.world_l = []
+
+    def _build_world(self, world_class, cells_cnt, organism_l, seed=None, **kwargs):
+        world = world_class(WorldGrid(cells_cnt, cells_cnt), list(organism_l),
+                            EvolutionRulesEngine(seed=seed), **kwargs)
+        world.populate_initial_organisms()
+        self.world_l.append(world)
+        return world
+
+    def _get_cells(self, world):
+        return [(organism.x, organism.y, organism.species) for organism in world.organism_l]
+
+    def test_stripes_cover_grid(self):
+        world = self._build_world(TileWorld, 10, [Organism(1, 1, 1)], workers_cnt=3)
+
+        self.assertEqual(world.stripe_l, [(0, 3), (3, 6), (6, 10)])
+        # at most one worker per row
+        world = self._build_world(TileWorld, 2, [Organism(1, 1, 1)], workers_cnt=3)
+        self.assertEqual(world.workers_cnt, 2)
+
+    def test_iterate_same_as_numpy_world(self):
+        generator = random.Random(7)
+        organism_l = [Organism(x, y, generator.randint(1, 3)) for x in xrange(20)
+                      for y in xrange(20) if generator.random() < 0.4]
+
+        numpy_world = self._build_world(NumpyWorld, 20, organism_l)
+        tile_world = self._build_world(TileWorld, 20, organism_l, workers_cnt=3)
+
+        for _ in xrange(20):
+            state = random.getstate()
+            numpy_world.iterate()
+            # births of more species are chosen in the same order
+            random.setstate(state)
+            tile_world.iterate()
+
+            self.assertEqual(self._get_cells(tile_world), self._get_cells(numpy_world))
+            self.assertEqual(tile_world.random_choice_cnt, numpy_world.random_choice_cnt)
+
+        self.assertGreater(tile_world.random_choice_cnt, 0)
+
+    def test_iterate_seeded_same_as_numpy_world(self):
+        generator = random.Random(7)
+        organism_l = [Organism(x, y, generator.randint(1, 3)) for x in xrange(20)
+                      for y in xrange(20) if generator.random() < 0.4]
+
+        numpy_world = self._build_world(NumpyWorld, 20, organism_l, seed=11)
+        tile_world = self._build_world(TileWorld, 20, organism_l, seed=11, workers_cnt=3)
+
+        for _ in xrange(20):
+            # the choices do not depend on the random module
+            random.seed(1)
+            numpy_world.iterate()
+            random.seed(2)
+            tile_world.iterate()
+
+            self.assertEqual(self._get_cells(tile_world), self._get_cells(numpy_world))
+
+        self.assertGreater(tile_world.random_choice_cnt, 0)
+
+    def test_iterate_reports_changes(self):
+        # blinker across the border of the stripes
+        world = self._build_world(TileWorld, 5, [Organism(1, 2, 1), Organism(2, 2, 1),
+                                                 Organism(3, 2, 1)], workers_cnt=2)
+
+        world.iterate()
+
+        self.assertEqual([str(organism) for organism in world.born_organism_l],
+                         ['2-1-1', '2-3-1'])
+        self.assertEqual([str(organism) for organism in world.dead_organism_l],
+                         ['1-2-1', '3-2-1'])
+
+        world.iterate()
+
+        self.assertEqual(self._get_cells(world), [(1, 2, 1), (2, 2, 1), (3, 2, 1)])
+
+    def test_iterate_no_evolution_keeps_organisms(self):
+        world = self._build_world(TileWorld, 5, [Organism(2, 2, 1)], workers_cnt=2)
+        world.iterate()
+
+        self.assertEqual(self._get_cells(world), [(2, 2, 1)])
+
+    def test_populate_starts_workers(self):
+        world = self._build_world(TileWorld, 5, [Organism(2, 2, 1)], workers_cnt=2)
+
+        # before the first iteration
+        self.assertEqual(len(world._process_l), 2)
+        self.assertTrue(all(process.is_alive() for process in world._process_l))
+
+    def test_close_stops_workers(self):
+        world = self._build_world(TileWorld, 5, [Organism(2, 2, 1)], workers_cnt=2)
+        world.iterate()
+        process_l = list(world._process_l)
+
+        world.close()
+
+        self.assertFalse(any(process.is_alive() for process in process_l))
+
+    def tearDown(self):
+        for world in self.world_l:
+            world.close()
@@ -1,4 +1,6 @@
 #!/usr/bin/env python
+import os
+import shutil
 import unittest
 import subprocess
 
@@ -12,6 +14,92 @@ class TestRun(unittest.TestCase):
 
         self.assertEqual(exit_status, self.EXIT_SUCCESS)
 
+    def test_run_write_final_success(self):
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--write-final'])
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+
+    def test_run_binary_output_success(self):
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--output-file',
+                                       'test-run.life'])
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+
+        exit_status = subprocess.call(['python', 'run.py', 'test-run.life', '--output-file',
+                                       'test-run-2.life'])
+        os.remove('test-run.life')
+        os.remove('test-run-2.life')
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+
+    def test_run_metrics_success(self):
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--metrics',
+                                       'lines', '--metrics-file', 'test-run.jsonl'])
+        os.remove('test-run.jsonl')
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+
+    def test_run_local_workers_success(self):
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--local-workers',
+                                       '2', '--checkpoint-interval', '1'])
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+
+    def test_run_tiles_write_in_background_success(self):
+        # workers are forked while the thread of the background writer exists
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--engine',
+                                       'tiles', '--write-in-background'])
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+
+    def test_run_workers_of_other_engine_not_valid(self):
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--engine',
+                                       'numpy', '--worker', 'localhost:7001'])
+
+        self.assertEqual(exit_status, self.EXIT_FAILURE)
+
+    def test_run_batch_success(self):
+        output_dir = 'test-run-batch'
+        exit_status = subprocess.call(['python', 'run.py', 'samples', '--batch', '--write-final',
+                                       '--output-dir', output_dir, '--pool-size', '2'])
+        output_file_l = sorted(os.listdir(output_dir))
+        shutil.rmtree(output_dir)
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+        self.assertEqual(output_file_l, ['big.xml', 'small.xml', 'summary.json', 'test.xml'])
+
+    def test_run_batch_input_not_valid(self):
+        exit_status = subprocess.call(['python', 'run.py', 'README.md', '--batch'])
+
+        self.assertEqual(exit_status, self.EXIT_FAILURE)
+
+    def test_run_batch_engine_not_valid(self):
+        output_dir = 'test-run-batch-tiles'
+        exit_status = subprocess.call(['python', 'run.py', 'samples', '--batch', '--engine',
+                                       'tiles', '--output-dir', output_dir, '--write-final'])
+
+        self.assertEqual(exit_status, self.EXIT_FAILURE)
+        # rejected before any game is run
+        self.assertFalse(os.path.exists(output_dir))
+
+    def test_run_ensemble_success(self):
+        ensemble_file = 'test-run-ensemble.jsonl'
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--ensemble', '4',
+                                       '--ensemble-file', ensemble_file, '--pool-size', '2'])
+        with open(ensemble_file) as opened_file:
+            line_l = opened_file.readlines()
+        os.remove(ensemble_file)
+
+        self.assertEqual(exit_status, self.EXIT_SUCCESS)
+        # ensemble record, generations 0 up to 2 and the summary
+        self.assertEqual(len(line_l), 5)
+
+    def test_run_write_every_not_valid(self):
+        exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', '--write-every',
+                                       '-1'])
+
+        self.assertEqual(exit_status, self.EXIT_FAILURE)
+
     def test_run_wrong_number_of_arguments(self):
         exit_status = subprocess.call(['python', 'run.py', 'samples/test.xml', 'extra_argument'])
 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import threading
+import unittest
+
+from life_game.models.state import State
+from life_game.models.organism import Organism
+from life_game.io_handlers.background_writer import BackgroundStateWriter
+
+
+class TestBackgroundStateWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.written_l = []
+        self.writer = BackgroundStateWriter(
+            lambda state, iteration: self.written_l.append(iteration))
+
+    def test_take_snapshot_success(self):
+        organism = Organism(1, 2, 1)
+        state = State(5, 2, 3, [organism])
+
+        snapshot = self.writer.take_snapshot(state, 2)
+        organism.x = 4
+
+        self.assertEqual(snapshot.iterations_cnt, 2)
+        self.assertEqual([(o.x, o.y, o.species) for o in snapshot.organism_l], [(1, 2, 1)])
+        with self.assertRaises(AttributeError):
+            snapshot.organism_l[0].x = 4
+
+        self.writer.close()
+
+    def test_submit_success(self):
+        self.writer.submit(None, 2)
+        self.writer.wait()
+        self.writer.submit(None, 1)
+        self.writer.close()
+
+        self.assertEqual(self.written_l, [2, 1])
+
+    def test_submit_coalesces_pending_states(self):
+        started, release = threading.Event(), threading.Event()
+
+        def write_slowly(state, iteration):
+            started.set()
+            release.wait()
+            self.written_l.append(iteration)
+
+        self.writer.close()
+        self.writer = BackgroundStateWriter(write_slowly)
+
+        self.writer.submit(None, 3)
+        started.wait()
+        # the writer is busy, only the newest of the pending states is kept
+        self.writer.submit(None, 2)
+        self.writer.submit(None, 1)
+        release.set()
+        self.writer.close()
+
+        self.assertEqual(self.written_l, [3, 1])
+        self.assertEqual(self.writer.coalesced_cnt, 1)
+
+    def test_submit_raises_error_of_previous_write(self):
+        def write_with_error(state, iteration):
+            raise ValueError('disk is full')
+
+        self.writer.close()
+        self.writer = BackgroundStateWriter(write_with_error)
+
+        self.writer.submit(None, 2)
+        with self.assertRaises(ValueError):
+            self.writer.wait()
+
+        self.writer.close()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+import os
+import unittest
+from tempfile import NamedTemporaryFile
+
+from life_game.models.state import State
+from life_game.models.organism import Organism
+from life_game.models.organism_store import LabelGridStore
+from life_game.io_handlers.binary_handler import BinaryHandlerMixin, BinaryFileError
+
+
+class TestBinaryHandlerMixin(unittest.TestCase):
+
+    def setUp(self):
+        self.binary_handler = BinaryHandlerMixin()
+        self.original_state = State(5, 4, 3, [Organism(3, 2, 1), Organism(0, 4, 300),
+                                              Organism(3, 1, 2)])
+
+        with NamedTemporaryFile(suffix='.life', delete=False) as test_file:
+            self.test_file = test_file.name
+
+    def _get_cells(self, state):
+        return [(organism.x, organism.y, organism.species) for organism in state.organism_l]
+
+    def test_write_and_read_state_success(self):
+        self.binary_handler.write_state_to_binary(self.test_file, self.original_state, 2)
+
+        state = self.binary_handler.read_state_from_binary(self.test_file)
+
+        self.assertEqual(state.cells_cnt, 5)
+        self.assertEqual(state.species_cnt, 4)
+        self.assertEqual(state.iterations_cnt, 2)
+        self.assertEqual(self._get_cells(state), [(0, 4, 300), (3, 1, 2), (3, 2, 1)])
+        self.assertEqual(os.path.getsize(self.test_file), 24 + 5 * 5 * 2)
+
+    def test_write_state_in_place(self):
+        with open(self.test_file, 'w+b') as output_file:
+            self.binary_handler.write_state_to_binary(output_file, self.original_state, 2)
+            self.binary_handler.write_state_to_binary(
+                output_file, State(5, 4, 3, [Organism(1, 1, 1)]), 1)
+
+        state = self.binary_handler.read_state_from_binary(self.test_file)
+
+        self.assertEqual(state.iterations_cnt, 1)
+        self.assertEqual(self._get_cells(state), [(1, 1, 1)])
+
+    def test_read_label_grid_without_copy(self):
+        self.binary_handler.write_state_to_binary(self.test_file, self.original_state, 2)
+
+        cells_cnt, species_cnt, iteration, label_grid = \
+            self.binary_handler.read_label_grid_from_binary(self.test_file)
+
+        self.assertEqual((cells_cnt, species_cnt, iteration), (5, 4, 2))
+        self.assertEqual(label_grid.shape, (5, 5))
+        self.assertEqual(label_grid[0, 4], 300)
+        self.assertFalse(label_grid.flags.owndata)
+        self.assertFalse(label_grid.flags.writeable)
+
+    def test_read_state_without_building_organisms(self):
+        self.binary_handler.write_state_to_binary(self.test_file, self.original_state, 2)
+
+        state = self.binary_handler.read_state_from_binary(self.test_file)
+
+        self.assertTrue(isinstance(state.organism_l, LabelGridStore))
+        self.assertFalse(state.organism_l.label_grid.flags.owndata)
+        self.assertTrue(state.is_valid())
+        self.assertEqual(state.organism_l._organism_store, None)
+
+        # the label grid of the state is written as it is
+        with NamedTemporaryFile(suffix='.life') as other_file:
+            self.binary_handler.write_state_to_binary(other_file.name, state, 1)
+            other_state = self.binary_handler.read_state_from_binary(other_file.name)
+
+        self.assertEqual(state.organism_l._organism_store, None)
+        self.assertEqual(self._get_cells(other_state), self._get_cells(state))
+
+    def test_read_state_not_valid(self):
+        with open(self.test_file, 'wb') as output_file:
+            output_file.write('<?xml version="1.0"?><life></life>')
+
+        with self.assertRaises(BinaryFileError):
+            self.binary_handler.read_state_from_binary(self.test_file)
+
+        with self.assertRaises(BinaryFileError):
+            self.binary_handler.read_state_from_binary('/not/existing/file.life')
+
+    def test_write_state_organism_outside_grid(self):
+        state = State(5, 1, 3, [Organism(5, 2, 1)])
+
+        with self.assertRaises(BinaryFileError):
+            self.binary_handler.write_state_to_binary(self.test_file, state, 1)
+
+    def tearDown(self):
+        os.remove(self.test_file)
@@ -5,8 +5,11 @@ from StringIO import StringIO
 
 from life_game.models.state import State
 from life_game.models.organism import Organism
+from life_game.io_handlers.xml_handler import XMLFileError
 from life_game.io_handlers.game_io_handler import GameIOHandler, IOValidationError, \
-    ReadStateError
+    ReadStateError, WriteStateError
+from life_game.io_handlers.write_policy import EveryIterationWritePolicy, \
+    FinalStateWritePolicy, EveryNIterationsWritePolicy, IntervalWritePolicy, OnExitWritePolicy
 
 
 class TestGameIOHandler(unittest.TestCase):
@@ -34,6 +37,14 @@ class TestGameIOHandler(unittest.TestCase):
 
         self.assertEqual(input_file, original_file)
 
+    def test_check_input_file_format(self):
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.check_input(['run.py', 'README.md'])
+
+        self.assertEqual(GameIOHandler.get_file_format('samples/test.xml'), 'xml')
+        self.assertEqual(GameIOHandler.get_file_format('checkpoint.LIFE'), 'binary')
+        self.assertEqual(GameIOHandler.get_file_format('README.md'), None)
+
     def test_check_input_file_wrong_number_of_arguments(self):
         arguments = ['run.py', 'test.xml', 'extra_argument']
 
@@ -103,6 +114,231 @@ class TestGameIOHandler(unittest.TestCase):
 
         self.clean()
 
+    def test_parse_arguments_success(self):
+        arguments = ['run.py', 'samples/test.xml', '--write-every', '10']
+
+        parsed_arguments = GameIOHandler.parse_arguments(arguments)
+
+        self.assertEqual(parsed_arguments.input_file, 'samples/test.xml')
+        self.assertEqual(parsed_arguments.write_every, 10)
+        self.assertFalse(parsed_arguments.write_final)
+        self.assertFalse(parsed_arguments.write_in_background)
+        self.assertTrue(parsed_arguments.pretty_print)
+        self.assertEqual(parsed_arguments.trajectory_file, None)
+        self.assertEqual(parsed_arguments.seed, None)
+        self.assertFalse(parsed_arguments.detect_cycles)
+
+        parsed_arguments = GameIOHandler.parse_arguments(arguments + ['--seed', '42',
+                                                                     '--detect-cycles'])
+        self.assertEqual(parsed_arguments.seed, 42)
+        self.assertTrue(parsed_arguments.detect_cycles)
+
+    def test_write_and_read_binary_state(self):
+        binary_file = 'test-ioout.life'
+        self.io_handler = GameIOHandler(self.input_file, binary_file)
+
+        self.io_handler.write_state(self.original_state, 2)
+        self.io_handler.write_state(self.original_state, 1)
+        self.io_handler.clean()
+
+        state = self.io_handler.read_state(binary_file)
+
+        self.assertEqual(state.iterations_cnt, 1)
+        self.assertEqual([(o.x, o.y, o.species) for o in state.organism_l],
+                         [(3, 1, 2), (3, 2, 1)])
+
+        os.remove(binary_file)
+
+    def test_parse_arguments_not_valid(self):
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--write-every', 'often'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--write-every', '0'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--write-final',
+                                           '--write-on-exit'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--output-file', 'out.txt'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--keyframe-interval', '0'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--seed', '-1'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--ensemble', '0'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'samples', '--batch', '--ensemble', '2'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--worker', 'localhost'])
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.parse_arguments(['run.py', 'test.xml', '--worker', 'localhost:7001',
+                                           '--local-workers', '2'])
+
+    def test_check_input_batch_success(self):
+        input_file = GameIOHandler.check_input(['run.py', 'samples', '--batch'])
+
+        self.assertEqual(input_file, 'samples')
+
+        with self.assertRaises(IOValidationError):
+            GameIOHandler.check_input(['run.py', 'samples', '--batch', '--pool-size', '0'])
+
+    def test_get_worker_addresses_success(self):
+        parsed_arguments = GameIOHandler.parse_arguments(
+            ['run.py', 'test.xml', '--worker', 'localhost:7001', '--worker', '10.0.0.2:7002'])
+
+        self.assertEqual(GameIOHandler.get_worker_addresses(parsed_arguments),
+                         [('localhost', 7001), ('10.0.0.2', 7002)])
+
+    def test_get_write_policy_success(self):
+        write_policy_by_arguments = [
+            ([], EveryIterationWritePolicy),
+            (['--write-final'], FinalStateWritePolicy),
+            (['--write-every', '5'], EveryNIterationsWritePolicy),
+            (['--write-interval', '0.5'], IntervalWritePolicy),
+            (['--write-on-exit'], OnExitWritePolicy)
+        ]
+
+        for arguments, write_policy_class in write_policy_by_arguments:
+            parsed_arguments = GameIOHandler.parse_arguments(['run.py', 'test.xml'] + arguments)
+            write_policy = GameIOHandler.get_write_policy(parsed_arguments)
+
+            self.assertEqual(type(write_policy), write_policy_class)
+
+    def test_flush_pending_state(self):
+        self.io_handler = GameIOHandler(self.input_file, self.OUT_FILE,
+                                        write_policy=FinalStateWritePolicy())
+
+        self.assertFalse(self.io_handler.is_write_due(2))
+        self.io_handler.defer_state(lambda: self.original_state, 2)
+        self.io_handler.clean()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 2)
+        self.assertEqual(len(state.organism_l), 2)
+
+        self.clean()
+
+    def test_write_state_drops_pending_state(self):
+        self.io_handler = GameIOHandler(self.input_file, self.OUT_FILE)
+
+        self.io_handler.defer_state(lambda: self.fail('Pending state must not be built.'), 2)
+        self.io_handler.write_state(self.original_state, 1)
+        self.io_handler.clean()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 1)
+
+        self.clean()
+
+    def test_write_state_keeps_pending_state_on_error(self):
+        self.io_handler = GameIOHandler(self.input_file, self.OUT_FILE)
+
+        def write_state_to_xml(output_file, state, iteration, **kwargs):
+            raise XMLFileError('disk is full')
+        original_write_state_to_xml = self.io_handler.write_state_to_xml
+        self.io_handler.write_state_to_xml = write_state_to_xml
+
+        self.io_handler.defer_state(lambda: self.original_state, 2)
+        with self.assertRaises(WriteStateError):
+            self.io_handler.write_state(self.original_state, 1)
+
+        self.io_handler.write_state_to_xml = original_write_state_to_xml
+        self.io_handler.clean()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 2)
+
+        self.clean()
+
+    def test_handle_signal_deferred(self):
+        handled_l = []
+
+        self.io_handler.defer_signals()
+        self.io_handler.defer_signals()
+        self.io_handler.handle_signal(lambda: handled_l.append(1))
+        self.io_handler.release_signals()
+
+        self.assertEqual(handled_l, [])
+
+        self.io_handler.release_signals()
+
+        self.assertEqual(handled_l, [1])
+
+        self.io_handler.handle_signal(lambda: handled_l.append(2))
+
+        self.assertEqual(handled_l, [1, 2])
+
+    def test_handle_signal_while_writing(self):
+        self.io_handler = GameIOHandler(self.input_file, self.OUT_FILE)
+        write_state_to_xml = self.io_handler.write_state_to_xml
+        handled_l = []
+
+        def write_state_to_xml_with_signal(output_file, state, iteration, **kwargs):
+            # the second signal arrives in the middle of writing
+            self.io_handler.handle_signal(lambda: handled_l.append(iteration))
+            self.assertEqual(handled_l, [])
+            write_state_to_xml(output_file, state, iteration, **kwargs)
+        self.io_handler.write_state_to_xml = write_state_to_xml_with_signal
+
+        self.io_handler.write_state(self.original_state, 1)
+
+        self.assertEqual(handled_l, [1])
+
+        self.io_handler.clean()
+        self.clean()
+
+    def test_log_generation_not_valid(self):
+        self.io_handler.trajectory_file = 'test-io.trj'
+        self.io_handler.open_trajectory(5, 3)
+
+        with self.assertRaises(WriteStateError):
+            self.io_handler.log_generation(0, lambda: [Organism(1, 1, 70000)], None, None)
+
+        self.io_handler.trajectory_writer.close()
+        for trajectory_file in ('test-io.trj', 'test-io.trj.idx'):
+            os.remove(trajectory_file)
+
+    def test_write_state_in_background(self):
+        self.io_handler = GameIOHandler(self.input_file, self.OUT_FILE, write_in_background=True)
+
+        self.io_handler.write_state(self.original_state, 1)
+        # the state is snapshotted, later changes of organisms are not written
+        self.original_state.organism_l[0].x = 0
+        self.io_handler.clean()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 1)
+        self.assertEqual([(o.x, o.y, o.species) for o in state.organism_l],
+                         [(3, 2, 1), (3, 1, 2)])
+
+        self.clean()
+
+    def test_write_state_in_background_error(self):
+        self.io_handler = GameIOHandler(self.input_file, self.OUT_FILE, write_in_background=True)
+
+        def write_state_to_xml(output_file, state, iteration, **kwargs):
+            raise XMLFileError('disk is full')
+        self.io_handler.write_state_to_xml = write_state_to_xml
+
+        self.io_handler.write_state(self.original_state, 1)
+
+        with self.assertRaises(WriteStateError):
+            self.io_handler.clean()
+
+        self.clean()
+
     def clean(self):
         try:
             os.remove(self.OUT_FILE)
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+import os
+import json
+import unittest
+
+from life_game.io_handlers.metrics_writer import MetricsWriter
+
+
+class TestMetricsWriter(unittest.TestCase):
+    METRICS_FILE = 'test-metrics.jsonl'
+
+    def test_write_record_as_line(self):
+        writer = MetricsWriter(self.METRICS_FILE)
+        writer.write_record({'type': 'generation', 'generation': 1, 'population': {1: 3}})
+        writer.write_record({'type': 'summary', 'generations': 1})
+        writer.close()
+
+        with open(self.METRICS_FILE) as metrics_file:
+            record_l = [json.loads(line) for line in metrics_file]
+
+        self.assertEqual(record_l, [{'type': 'generation', 'generation': 1,
+                                     'population': {'1': 3}},
+                                    {'type': 'summary', 'generations': 1}])
+
+    def tearDown(self):
+        os.remove(self.METRICS_FILE)
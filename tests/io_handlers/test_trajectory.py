@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+import os
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.world_grid import WorldGrid
+from life_game.models.world import World
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+from life_game.io_handlers.trajectory import TrajectoryWriter, TrajectoryReader, \
+    TrajectoryError
+
+
+class TestTrajectory(unittest.TestCase):
+    TRAJECTORY_FILE = 'test-trajectory.trj'
+
+    def setUp(self):
+        # glider next to a blinker of another species
+        organism_l = [Organism(0, 1, 1), Organism(1, 2, 1), Organism(2, 0, 1),
+                      Organism(2, 1, 1), Organism(2, 2, 1),
+                      Organism(7, 1, 2), Organism(7, 2, 2), Organism(7, 3, 2)]
+
+        self.world = World(WorldGrid(10, 10), organism_l, EvolutionRulesEngine())
+        self.world.populate_initial_organisms()
+
+        self.writer = TrajectoryWriter(self.TRAJECTORY_FILE, 10, 2, keyframe_interval=4)
+
+    def _get_cells(self, organism_l):
+        return sorted((organism.x, organism.y, organism.species) for organism in organism_l)
+
+    def _write_generations(self, generations_cnt):
+        cells_l = []
+
+        for generation in xrange(generations_cnt + 1):
+            if generation:
+                self.world.iterate()
+                born_organism_l, dead_organism_l = \
+                    self.world.born_organism_l, self.world.dead_organism_l
+            else:
+                born_organism_l, dead_organism_l = None, None
+
+            self.writer.append(generation, lambda: self.world.organism_l, born_organism_l,
+                               dead_organism_l)
+            cells_l.append(self._get_cells(self.world.organism_l))
+
+        self.writer.close()
+
+        return cells_l
+
+    def test_read_generation_success(self):
+        cells_l = self._write_generations(10)
+        reader = TrajectoryReader(self.TRAJECTORY_FILE)
+
+        self.assertEqual((reader.cells_cnt, reader.species_cnt), (10, 2))
+        # the generations are read in random order
+        for generation in (7, 0, 10, 3, 4, 1):
+            state = reader.read_generation(generation)
+
+            self.assertEqual(state.iterations_cnt, generation)
+            self.assertEqual(self._get_cells(state.organism_l), cells_l[generation])
+
+        reader.close()
+
+    def test_append_writes_keyframes(self):
+        self._write_generations(10)
+        reader = TrajectoryReader(self.TRAJECTORY_FILE)
+
+        self.assertEqual(reader._keyframe_generation_l, [0, 4, 8])
+
+        reader.close()
+
+    def test_append_skipped_generations(self):
+        self.writer.append(0, lambda: self.world.organism_l, None, None)
+        self.world.advance(3)
+        # the changes are of the last iteration only, keyframe must be written
+        self.writer.append(3, lambda: self.world.organism_l, self.world.born_organism_l,
+                           self.world.dead_organism_l)
+        self.writer.close()
+
+        reader = TrajectoryReader(self.TRAJECTORY_FILE)
+
+        self.assertEqual(reader._keyframe_generation_l, [0, 3])
+        self.assertEqual(self._get_cells(reader.read_generation(3).organism_l),
+                         self._get_cells(self.world.organism_l))
+        with self.assertRaises(TrajectoryError):
+            reader.read_generation(2)
+
+        reader.close()
+
+    def test_append_organisms_out_of_range(self):
+        self.writer.append(0, lambda: self.world.organism_l, None, None)
+
+        with self.assertRaises(TrajectoryError):
+            self.writer.append(1, lambda: self.world.organism_l, [Organism(70000, 1, 1)], [])
+
+        # nothing of the failed record is written
+        self.world.iterate()
+        self.writer.append(1, lambda: self.world.organism_l, self.world.born_organism_l,
+                           self.world.dead_organism_l)
+        self.writer.close()
+
+        reader = TrajectoryReader(self.TRAJECTORY_FILE)
+
+        self.assertEqual(self._get_cells(reader.read_generation(1).organism_l),
+                         self._get_cells(self.world.organism_l))
+
+        reader.close()
+
+    def test_read_generation_not_in_trajectory(self):
+        self._write_generations(2)
+        reader = TrajectoryReader(self.TRAJECTORY_FILE)
+
+        with self.assertRaises(TrajectoryError):
+            reader.read_generation(3)
+
+        reader.close()
+
+    def tearDown(self):
+        for trajectory_file in (self.TRAJECTORY_FILE,
+                                self.TRAJECTORY_FILE + TrajectoryWriter.INDEX_EXTENSION):
+            os.remove(trajectory_file)
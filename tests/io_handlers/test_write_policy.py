@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.io_handlers.write_policy import WritePolicy, EveryIterationWritePolicy, \
+    FinalStateWritePolicy, EveryNIterationsWritePolicy, IntervalWritePolicy, OnExitWritePolicy
+
+
+class TestWritePolicy(unittest.TestCase):
+
+    def test_base_policy_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            WritePolicy().is_write_due(1)
+
+    def test_every_iteration(self):
+        write_policy = EveryIterationWritePolicy()
+
+        self.assertTrue(all(write_policy.is_write_due(i) for i in xrange(10)))
+        self.assertFalse(write_policy.FINAL_STATE_ONLY)
+
+    def test_final_state(self):
+        write_policy = FinalStateWritePolicy()
+
+        self.assertFalse(write_policy.is_write_due(3))
+        self.assertTrue(write_policy.is_write_due(0))
+        self.assertTrue(write_policy.FINAL_STATE_ONLY)
+
+    def test_every_n_iterations(self):
+        write_policy = EveryNIterationsWritePolicy(3)
+
+        self.assertEqual([i for i in xrange(10, -1, -1) if write_policy.is_write_due(i)],
+                         [9, 6, 3, 0])
+
+    def test_interval(self):
+        write_policy = IntervalWritePolicy(3600)
+
+        self.assertFalse(write_policy.is_write_due(5))
+        self.assertTrue(write_policy.is_write_due(0))
+
+        write_policy = IntervalWritePolicy(0)
+
+        self.assertTrue(write_policy.is_write_due(5))
+
+    def test_on_exit(self):
+        write_policy = OnExitWritePolicy()
+
+        self.assertFalse(write_policy.is_write_due(3))
+        self.assertTrue(write_policy.is_write_due(0))
+        self.assertFalse(write_policy.FINAL_STATE_ONLY)
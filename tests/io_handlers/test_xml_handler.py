@@ -1,8 +1,11 @@
 #!/usr/bin/env python
+import random
 import unittest
 from StringIO import StringIO
 from tempfile import NamedTemporaryFile
 
+from lxml import etree
+
 from life_game.models.state import State
 from life_game.models.organism import Organism
 from life_game.io_handlers.xml_handler import XMLHandlerMixin, XMLFileError
@@ -37,6 +40,16 @@ class TestXMLHandlerMixin(unittest.TestCase):
         self.assertEqual(organism.y, 0)
         self.assertEqual(organism.species, 2)
 
+    def test_read_state_from_xml_seed(self):
+        state = self.xml_handler.read_state_from_xml(self.input_file)
+        self.assertEqual(state.seed, None)
+
+        xml_string = self.xml_string.replace('<iterations>3</iterations>',
+                                             '<iterations>3</iterations><seed>42</seed>')
+        state = self.xml_handler.read_state_from_xml(StringIO(xml_string))
+        self.assertEqual(state.seed, 42)
+        self.assertEqual(state.iterations_cnt, 3)
+
     def test_read_state_from_xml_not_valid(self):
         self.xml_string = self.xml_string[:20]
         self.input_file = StringIO(self.xml_string)
@@ -60,6 +73,13 @@ class TestXMLHandlerMixin(unittest.TestCase):
         with self.assertRaises(XMLFileError):
             self.xml_handler.read_state_from_xml(self.input_file)
 
+    def test_read_state_from_xml_organism_out_of_range(self):
+        self.xml_string = self.xml_string.replace('<x_pos>4</x_pos>', '<x_pos>-1</x_pos>')
+        self.input_file = StringIO(self.xml_string)
+
+        with self.assertRaises(XMLFileError):
+            self.xml_handler.read_state_from_xml(self.input_file)
+
     def test_write_state_to_xml_success(self):
         original_state = State(5, 4, 3, [Organism(3, 2, 1), Organism(3, 1, 2)])
 
@@ -74,6 +94,20 @@ class TestXMLHandlerMixin(unittest.TestCase):
             self.assertEqual(state.species_cnt, original_state.species_cnt)
             self.assertEqual(state.iterations_cnt, original_state.iterations_cnt)
 
+    def test_write_state_to_xml_same_as_element_tree(self):
+        generator = random.Random(3)
+        organism_l = [Organism(generator.randint(0, 999), generator.randint(0, 999),
+                               generator.randint(1, 9)) for _ in xrange(10000)]
+
+        for state in (State(1000, 9, 7, organism_l), State(5, 1, 7, [])):
+            for pretty_print in (True, False):
+                output_file = StringIO()
+                self.xml_handler.write_state_to_xml(output_file, state, 2,
+                                                    pretty_print=pretty_print)
+
+                self.assertEqual(output_file.getvalue(),
+                                 self._write_element_tree(state, 2, pretty_print))
+
     def test_write_state_to_xml_file_does_not_exist(self):
         state = State(5, 4, 3, [Organism(3, 2, 1), Organism(3, 1, 2)])
 
@@ -81,3 +115,24 @@ class TestXMLHandlerMixin(unittest.TestCase):
 
         with self.assertRaises(XMLFileError):
             self.xml_handler.write_state_to_xml(output_file, state, 1)
+
+    def _write_element_tree(self, state, iteration, pretty_print):
+        # reference serialization by lxml element tree
+        life = etree.Element('life')
+
+        world = etree.SubElement(life, 'world')
+        for tag, value in (('cells', state.cells_cnt), ('species', state.species_cnt),
+                           ('iterations', iteration)):
+            etree.SubElement(world, tag).text = str(value)
+
+        organisms = etree.SubElement(life, 'organisms')
+        for organism in state.organism_l:
+            organism_element = etree.SubElement(organisms, 'organism')
+            etree.SubElement(organism_element, 'x_pos').text = str(organism.x)
+            etree.SubElement(organism_element, 'y_pos').text = str(organism.y)
+            etree.SubElement(organism_element, 'species').text = str(organism.species)
+
+        output_file = StringIO()
+        etree.ElementTree(life).write(output_file, xml_declaration=True, encoding='utf-8',
+                                      pretty_print=pretty_print)
+        return output_file.getvalue()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.world_grid import WorldGrid
+from life_game.models.world import World
+from life_game.models.cycle_detector import CycleDetector
+from life_game.engines.numpy_world import NumpyWorld
+from life_game.engines.hashlife_world import HashlifeWorld
+from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
+
+
+class TestCycleDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.cycle_detector = CycleDetector()
+
+    def _build_world(self, world_class, cells_cnt, organism_l):
+        world = world_class(WorldGrid(cells_cnt, cells_cnt), list(organism_l),
+                            EvolutionRulesEngine())
+        world.populate_initial_organisms()
+        return world
+
+    def _find_period(self, world, iterations_cnt):
+        self.cycle_detector.reset(world)
+
+        for _ in xrange(iterations_cnt):
+            world.iterate()
+            period = self.cycle_detector.update(world)
+            if period:
+                return period
+
+        return None
+
+    def test_update_still_life(self):
+        organism_l = [Organism(1, 1, 1), Organism(1, 2, 1), Organism(2, 1, 1), Organism(2, 2, 1)]
+        world = self._build_world(World, 5, organism_l)
+
+        self.assertEqual(self._find_period(world, 5), 1)
+        self.assertEqual(self.cycle_detector.iteration, 1)
+
+    def test_update_oscillator(self):
+        # blinker of species 2 next to a block of species 1
+        organism_l = [Organism(1, 2, 2), Organism(2, 2, 2), Organism(3, 2, 2),
+                      Organism(6, 6, 1), Organism(6, 7, 1), Organism(7, 6, 1), Organism(7, 7, 1)]
+
+        for world_class in (World, NumpyWorld):
+            world = self._build_world(world_class, 9, organism_l)
+
+            self.assertEqual(self._find_period(world, 5), 2)
+            self.assertEqual(self.cycle_detector.iteration, 2)
+
+    def test_update_without_known_changes(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        world = self._build_world(HashlifeWorld, 5, organism_l)
+
+        self.assertEqual(self._find_period(world, 5), 2)
+
+    def test_update_no_cycle(self):
+        # glider does not repeat the state until it stops in the corner
+        organism_l = [Organism(0, 1, 1), Organism(1, 2, 1), Organism(2, 0, 1),
+                      Organism(2, 1, 1), Organism(2, 2, 1)]
+        world = self._build_world(World, 20, organism_l)
+
+        self.assertEqual(self._find_period(world, 20), None)
+
+    def test_update_not_trusted_after_random_choice(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        world = self._build_world(World, 5, organism_l)
+        self.cycle_detector.reset(world)
+
+        world.iterate()
+        self.assertEqual(self.cycle_detector.update(world), None)
+
+        # pretend the rules made a random choice in the second iteration
+        world.rules_engine.evolution_rule_l[-1].random_choice_cnt += 1
+        world.iterate()
+        self.assertEqual(self.cycle_detector.update(world), None)
+
+        world.iterate()
+        self.assertEqual(self.cycle_detector.update(world), None)
+
+        world.iterate()
+        self.assertEqual(self.cycle_detector.update(world), 2)
+
+    def test_update_period_longer_than_window(self):
+        self.cycle_detector = CycleDetector(window_size=1)
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        world = self._build_world(World, 5, organism_l)
+
+        self.assertEqual(self._find_period(world, 10), None)
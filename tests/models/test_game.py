@@ -1,11 +1,22 @@
 #!/usr/bin/env python
 import os
+import json
+import random
 import unittest
 
 from life_game.models.game import Game, GameRuntimeError
 from life_game.models.state import State
 from life_game.models.organism import Organism
+from life_game.models.world import World
+from life_game.models.metrics import GameMetrics
+from life_game.engines.bitboard_world import BitboardWorld
+from life_game.engines.hashlife_world import HashlifeWorld
+from life_game.distributed.worker import start_local_worker, stop_local_workers
+from life_game.io_handlers.xml_handler import XMLFileError
 from life_game.io_handlers.game_io_handler import GameIOHandler
+from life_game.io_handlers.trajectory import TrajectoryReader
+from life_game.io_handlers.write_policy import FinalStateWritePolicy, \
+    EveryNIterationsWritePolicy
 
 
 class TestGame(unittest.TestCase):
@@ -34,6 +45,248 @@ class TestGame(unittest.TestCase):
         self.assertEqual(len(state.organism_l), 14)
         # tests for concrete organisms are in test_world.py
 
+    def test_start_numpy_engine_success(self):
+        self.game = Game(self.io_handler, self.initial_state, engine=Game.ENGINE_NUMPY)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_tiles_engine_success(self):
+        self.game = Game(self.io_handler, self.initial_state, engine=Game.ENGINE_TILES)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_seeded_same_by_engines(self):
+        generator = random.Random(7)
+        organism_l = [Organism(x, y, generator.randint(1, 3)) for x in xrange(20)
+                      for y in xrange(20) if generator.random() < 0.4]
+        # the seed of the state is overridden by the seed of the game
+        state = State(20, 3, 15, organism_l, seed=3)
+
+        cells_l = []
+        for engine, seed in ((Game.ENGINE_PYTHON, None), (Game.ENGINE_NUMPY, None),
+                             (Game.ENGINE_PYTHON, 5)):
+            io_handler = GameIOHandler('dummy.xml', self.OUT_FILE,
+                                       write_policy=FinalStateWritePolicy())
+            random.seed(len(cells_l))
+            Game(io_handler, state, engine=engine, seed=seed).start()
+            cells_l.append([str(organism) for organism
+                            in io_handler.read_state(self.OUT_FILE).organism_l])
+
+        self.assertEqual(cells_l[1], cells_l[0])
+        self.assertNotEqual(cells_l[2], cells_l[0])
+
+    def test_start_distributed_engine_success(self):
+        process_l, worker_address_l = [], []
+        try:
+            for _ in xrange(2):
+                process, address = start_local_worker()
+                process_l.append(process)
+                worker_address_l.append(address)
+
+            self.game = Game(self.io_handler, self.initial_state,
+                             engine=Game.ENGINE_DISTRIBUTED,
+                             world_kwargs={'worker_address_l': worker_address_l})
+            self.game.start()
+        finally:
+            stop_local_workers(process_l)
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_distributed_engine_without_workers(self):
+        self.game = Game(self.io_handler, self.initial_state, engine=Game.ENGINE_DISTRIBUTED)
+
+        with self.assertRaises(GameRuntimeError):
+            self.game.start()
+
+    def test_start_bitboard_engine_success(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        self.game = Game(self.io_handler, State(5, 1, 3, organism_l))
+
+        self.assertEqual(self.game._get_world_class(), BitboardWorld)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual([(organism.x, organism.y) for organism in state.organism_l],
+                         [(2, 1), (2, 2), (2, 3)])
+
+    def test_start_auto_engine_by_loaded_species(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 2), Organism(3, 2, 1)]
+        self.game = Game(self.io_handler, State(5, 1, 3, organism_l))
+
+        self.assertEqual(self.game._get_world_class(), World)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+
+    def test_start_final_state_only_success(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        self.game = Game(self.io_handler, State(5, 1, 1001, organism_l), final_state_only=True)
+
+        self.assertEqual(self.game._get_world_class(), HashlifeWorld)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual([(organism.x, organism.y) for organism in state.organism_l],
+                         [(2, 1), (2, 2), (2, 3)])
+
+    def test_start_final_state_only_same_as_every_iteration(self):
+        self.game = Game(self.io_handler, self.initial_state, final_state_only=True)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_cycle_skips_remaining_iterations(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        self.game = Game(self.io_handler, State(5, 1, 10 ** 9 + 1, organism_l),
+                         engine=Game.ENGINE_PYTHON, detect_cycles=True)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual([(organism.x, organism.y) for organism in state.organism_l],
+                         [(2, 1), (2, 2), (2, 3)])
+
+    def test_start_without_cycle_detection(self):
+        self.game = Game(self.io_handler, self.initial_state, detect_cycles=False)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_write_every_n_iterations(self):
+        self.io_handler = GameIOHandler('dummy.xml', self.OUT_FILE,
+                                        write_policy=EveryNIterationsWritePolicy(2))
+        saved_iteration_l = []
+        write_state = self.io_handler.write_state
+        self.io_handler.write_state = lambda state, iteration: \
+            saved_iteration_l.append(iteration) or write_state(state, iteration)
+
+        self.initial_state.iterations_cnt = 5
+        self.game = Game(self.io_handler, self.initial_state, detect_cycles=False)
+        self.game.start()
+
+        self.assertEqual(saved_iteration_l, [4, 2, 0])
+
+    def test_start_final_state_only_from_write_policy(self):
+        self.io_handler = GameIOHandler('dummy.xml', self.OUT_FILE,
+                                        write_policy=FinalStateWritePolicy())
+        self.game = Game(self.io_handler, self.initial_state)
+
+        self.assertTrue(self.game.final_state_only)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_write_in_background(self):
+        self.io_handler = GameIOHandler('dummy.xml', self.OUT_FILE, write_in_background=True)
+        self.game = Game(self.io_handler, self.initial_state)
+        self.game.start()
+
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(state.iterations_cnt, 0)
+        self.assertEqual(len(state.organism_l), 14)
+
+    def test_start_write_in_background_error(self):
+        self.io_handler = GameIOHandler('dummy.xml', self.OUT_FILE, write_in_background=True)
+
+        def write_state_to_xml(output_file, state, iteration, **kwargs):
+            raise XMLFileError('disk is full')
+        self.io_handler.write_state_to_xml = write_state_to_xml
+
+        self.game = Game(self.io_handler, self.initial_state)
+
+        with self.assertRaises(GameRuntimeError):
+            self.game.start()
+
+    def test_start_with_trajectory(self):
+        trajectory_file = 'test-out.trj'
+        self.io_handler = GameIOHandler('dummy.xml', self.OUT_FILE,
+                                        trajectory_file=trajectory_file, keyframe_interval=2)
+        self.initial_state.iterations_cnt = 5
+        self.game = Game(self.io_handler, self.initial_state, detect_cycles=False)
+        self.game.start()
+
+        reader = TrajectoryReader(trajectory_file)
+        state = self.io_handler.read_state(self.OUT_FILE)
+
+        self.assertEqual(len(reader.read_generation(0).organism_l), 10)
+        self.assertEqual(len(reader.read_generation(2).organism_l), 14)
+        self.assertEqual([(o.x, o.y, o.species) for o in reader.read_generation(5).organism_l],
+                         [(o.x, o.y, o.species) for o in state.organism_l])
+
+        reader.close()
+        for file_path in (trajectory_file, trajectory_file + '.idx'):
+            os.remove(file_path)
+
+    def test_start_with_metrics(self):
+        metrics_file = 'test-out.jsonl'
+        self.io_handler = GameIOHandler('dummy.xml', self.OUT_FILE, metrics_file=metrics_file)
+        self.initial_state.iterations_cnt = 3
+        self.game = Game(self.io_handler, self.initial_state, engine=Game.ENGINE_PYTHON,
+                         detect_cycles=False, metrics=GameMetrics())
+        self.game.start()
+
+        with open(metrics_file) as opened_file:
+            record_l = [json.loads(line) for line in opened_file]
+        os.remove(metrics_file)
+
+        self.assertEqual([record['generation'] for record in record_l[:-1]], [1, 2, 3])
+        self.assertEqual(sum(record_l[0]['population'].values()),
+                         10 + record_l[0]['births'] - record_l[0]['deaths'])
+        self.assertIn(GameMetrics.PHASE_RULES, record_l[0]['phase_seconds'])
+
+        summary = record_l[-1]
+        self.assertEqual(summary['type'], GameMetrics.RECORD_SUMMARY)
+        self.assertEqual(summary['generations'], 3)
+        self.assertEqual(sum(summary['population'].values()),
+                         len(self.io_handler.read_state(self.OUT_FILE).organism_l))
+        self.assertIn(GameMetrics.PHASE_POPULATE, summary['phase_seconds'])
+
+    def test_start_final_state_only_with_metrics(self):
+        organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        self.game = Game(self.io_handler, State(5, 1, 1001, organism_l), final_state_only=True,
+                         metrics=GameMetrics())
+        self.game.start()
+
+        summary = self.game.metrics.get_summary()
+
+        self.assertEqual(summary['generations'], 1001)
+        self.assertEqual(summary['population'], {1: 3})
+        self.assertEqual(self.game.metrics.latency_histogram.count, 1)
+
+    def test_start_unknown_engine(self):
+        self.game = Game(self.io_handler, self.initial_state, engine='unknown')
+
+        with self.assertRaises(GameRuntimeError):
+            self.game.start()
+
     def test_start_not_existing_organisms_provided(self):
         self.initial_state.organism_l = [Organism(100, -20, 1), Organism(1, -10, 2)]
         self.game = Game(self.io_handler, self.initial_state)
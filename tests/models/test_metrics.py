@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.models.organism import Organism
+from life_game.models.metrics import GameMetrics, LatencyHistogram
+
+
+class TestGameMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = GameMetrics()
+        self.metrics.start()
+        self.metrics.count_population([Organism(0, 0, 1), Organism(0, 1, 1), Organism(1, 1, 2)])
+
+    def test_end_generation_by_changes(self):
+        self.metrics.start_generation()
+        self.metrics.add_phase(GameMetrics.PHASE_EVOLVE, 0.5)
+        self.metrics.add_phase(GameMetrics.PHASE_EVOLVE, 0.25)
+
+        record = self.metrics.end_generation(1, [Organism(2, 2, 2)], [Organism(0, 0, 1)], None)
+
+        self.assertEqual(record['generation'], 1)
+        self.assertEqual(record['phase_seconds'], {GameMetrics.PHASE_EVOLVE: 0.75})
+        self.assertEqual(record['population'], {1: 1, 2: 2})
+        self.assertEqual((record['births'], record['deaths']), (1, 1))
+
+    def test_end_generation_changes_not_known(self):
+        self.metrics.start_generation()
+
+        record = self.metrics.end_generation(10, None, None, lambda: [Organism(3, 3, 2)])
+
+        # extinct species is kept
+        self.assertEqual(record['population'], {1: 0, 2: 1})
+        self.assertEqual((record['births'], record['deaths']), (None, None))
+
+    def test_phase_out_of_generation_counts_to_totals(self):
+        self.metrics.add_phase(GameMetrics.PHASE_POPULATE, 1.0)
+        self.metrics.start_generation()
+
+        record = self.metrics.end_generation(1, [], [], None)
+
+        self.assertEqual(record['phase_seconds'], {})
+        self.assertEqual(self.metrics.phase_seconds_d, {GameMetrics.PHASE_POPULATE: 1.0})
+
+    def test_end_generation_without_records(self):
+        self.metrics = GameMetrics(generation_records=False)
+        self.metrics.count_population([Organism(0, 0, 1)])
+        self.metrics.start_generation()
+        self.metrics.add_phase(GameMetrics.PHASE_EVOLVE, 0.5)
+
+        self.assertEqual(self.metrics.end_generation(1, [Organism(2, 2, 2)], [], None), None)
+        self.assertEqual(self.metrics.population_d, {1: 1, 2: 1})
+        self.assertEqual(self.metrics.phase_seconds_d, {GameMetrics.PHASE_EVOLVE: 0.5})
+        self.assertEqual(self.metrics.latency_histogram.count, 1)
+
+    def test_get_summary_success(self):
+        for generation in xrange(1, 5):
+            self.metrics.start_generation()
+            self.metrics.end_generation(generation, [Organism(2, generation, 1)], [], None)
+        self.metrics.latency_histogram = LatencyHistogram()
+        for latency in (4, 1, 3, 2):
+            self.metrics.latency_histogram.add(latency)
+        self.metrics.stop()
+
+        summary = self.metrics.get_summary()
+
+        self.assertEqual(summary['generations'], 4)
+        self.assertEqual(sorted(summary['latency_seconds']), ['max', 'p50', 'p90', 'p99'])
+        self.assertAlmostEqual(summary['latency_seconds']['p50'], 2,
+                               delta=2 * LatencyHistogram.RELATIVE_ERROR)
+        self.assertEqual([summary['latency_seconds'][key] for key in ('p90', 'p99', 'max')],
+                         [4, 4, 4])
+        self.assertEqual(summary['population'], {1: 6, 2: 1})
+        self.assertEqual((summary['births'], summary['deaths']), (4, 0))
+        self.assertGreater(summary['generations_per_second'], 0)
+        self.assertGreater(summary['peak_rss_kb'], 0)
+
+    def test_latency_histogram_bounded_error(self):
+        latency_histogram = LatencyHistogram()
+        latency_l = [0.0, 1e-7] + [1.5 ** power * 1e-5 for power in xrange(40)]
+        for latency in latency_l:
+            latency_histogram.add(latency)
+
+        self.assertEqual(latency_histogram.count, len(latency_l))
+        self.assertEqual(len(latency_histogram.bucket_cnt_a), LatencyHistogram.BUCKETS_CNT)
+        self.assertEqual(latency_histogram.max_latency, max(latency_l))
+        for percentile in (10, 50, 90, 99):
+            rank = int(-(-percentile * len(latency_l) // 100))
+            latency = sorted(latency_l)[rank - 1]
+            self.assertLessEqual(abs(latency_histogram.get_percentile(percentile) - latency),
+                                 max(latency * LatencyHistogram.RELATIVE_ERROR * 1.0001,
+                                     LatencyHistogram.MIN_LATENCY))
+        self.assertEqual(LatencyHistogram().get_percentile(50), None)
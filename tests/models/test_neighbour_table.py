@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.models.neighbour_table import NeighbourTable
+
+
+class TestNeighbourTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = NeighbourTable(3, 4)
+
+    def _get_cells(self, index):
+        return sorted((neighbour_index // 4, neighbour_index % 4)
+                      for neighbour_index in self.table.get_neighbour_indices(index)
+                      if neighbour_index != self.table.outside_index)
+
+    def test_get_neighbour_indices_success(self):
+        # corner, border and middle cell
+        self.assertEqual(self._get_cells(0), [(0, 1), (1, 0), (1, 1)])
+        self.assertEqual(self._get_cells(2 * 4 + 1),
+                         [(1, 0), (1, 1), (1, 2), (2, 0), (2, 2)])
+        self.assertEqual(self._get_cells(1 * 4 + 1),
+                         [(0, 0), (0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)])
+
+    def test_outside_slots(self):
+        outside_index_l = [neighbour_index
+                           for neighbour_index in self.table.get_neighbour_indices(0)
+                           if neighbour_index == self.table.outside_index]
+
+        self.assertEqual(self.table.outside_index, 12)
+        self.assertEqual(len(outside_index_l), 5)
+        self.assertEqual(len(self.table.index_a), 12 * NeighbourTable.NEIGHBOURS_CNT)
+
+    def test_neighbours_cnt_success(self):
+        self.assertEqual(self.table.neighbours_cnt_a[0], 3)
+        self.assertEqual(self.table.neighbours_cnt_a[2 * 4 + 1], 5)
+        self.assertEqual(self.table.neighbours_cnt_a[1 * 4 + 1], 8)
+
+    def test_get_shares_table(self):
+        table = NeighbourTable.get(5, 7)
+
+        self.assertIs(NeighbourTable.get(5, 7), table)
+        self.assertIsNot(NeighbourTable.get(7, 5), table)
+
+    def test_get_keeps_recent_sizes_only(self):
+        table = NeighbourTable.get(5, 7)
+
+        for size in xrange(NeighbourTable.CACHE_SIZE):
+            NeighbourTable.get(10 + size, 10)
+
+        self.assertIsNot(NeighbourTable.get(5, 7), table)
+
+    def test_get_does_not_keep_large_tables(self):
+        cache_max_cells = NeighbourTable.CACHE_MAX_CELLS
+        NeighbourTable.CACHE_MAX_CELLS = 30
+        try:
+            table = NeighbourTable.get(5, 7)
+            self.assertIsNot(NeighbourTable.get(5, 7), table)
+            self.assertIs(NeighbourTable.get(5, 6), NeighbourTable.get(5, 6))
+        finally:
+            NeighbourTable.CACHE_MAX_CELLS = cache_max_cells
+
+    def test_build_by_rows_same_as_at_once(self):
+        build_rows = NeighbourTable.BUILD_ROWS
+        NeighbourTable.BUILD_ROWS = 2
+        try:
+            table = NeighbourTable(5, 4)
+        finally:
+            NeighbourTable.BUILD_ROWS = build_rows
+
+        self.assertEqual(table.index_a, NeighbourTable(5, 4).index_a)
+        self.assertEqual(table.neighbours_cnt_a, NeighbourTable(5, 4).neighbours_cnt_a)
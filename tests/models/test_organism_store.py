@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+import unittest
+
+import numpy as np
+
+from life_game.models.organism import Organism
+from life_game.models.organism_store import OrganismStore, LabelGridStore, iter_cells, \
+    get_species, OrganismStoreError
+
+
+class TestOrganismStore(unittest.TestCase):
+
+    def setUp(self):
+        self.organism_l = [Organism(0, 1, 2), Organism(1, 1, 1), Organism(3, 0, 1)]
+        self.organism_store = OrganismStore(self.organism_l)
+
+    def _get_cells(self, organism_l):
+        return [(organism.x, organism.y, organism.species) for organism in organism_l]
+
+    def test_iterate_success(self):
+        self.assertEqual(len(self.organism_store), 3)
+        self.assertEqual(self._get_cells(self.organism_store), self._get_cells(self.organism_l))
+        self.assertEqual(list(iter_cells(self.organism_store)), [(0, 1, 2), (1, 1, 1), (3, 0, 1)])
+
+    def test_getitem_success(self):
+        organism = self.organism_store[-1]
+
+        self.assertEqual((organism.x, organism.y, organism.species), (3, 0, 1))
+        self.assertEqual(self._get_cells(self.organism_store[1:]), [(1, 1, 1), (3, 0, 1)])
+
+        # organisms are views, the store does not change
+        organism.x = 2
+        self.assertEqual(self.organism_store[-1].x, 3)
+
+    def test_label_grid_store_success(self):
+        label_grid = np.zeros((4, 3), dtype=np.uint16)
+        for x, y, species in iter_cells(self.organism_store):
+            label_grid[x, y] = species
+        label_grid_store = LabelGridStore(label_grid)
+
+        self.assertEqual(len(label_grid_store), 3)
+        self.assertEqual(get_species(label_grid_store), set([1, 2]))
+        # the organisms are not built until they are used
+        self.assertEqual(label_grid_store._organism_store, None)
+
+        self.assertEqual(label_grid_store, self.organism_store)
+        self.assertEqual(self._get_cells(label_grid_store[1:]), [(1, 1, 1), (3, 0, 1)])
+        self.assertEqual(get_species(self.organism_l), set([1, 2]))
+
+    def test_label_grid_store_count_species_by_rows(self):
+        label_grid = np.zeros((600, 2), dtype=np.uint16)
+        label_grid[5, 0], label_grid[300, 1], label_grid[599, 0] = 1, 7, 7
+        label_grid_store = LabelGridStore(label_grid)
+
+        self.assertEqual(label_grid_store.count_species().tolist(), [1197, 1, 0, 0, 0, 0, 0, 2])
+        self.assertEqual(label_grid_store.get_species(), set([1, 7]))
+
+    def test_equal_by_organisms(self):
+        self.assertEqual(self.organism_store, list(self.organism_l))
+        self.assertEqual(OrganismStore(), [])
+        self.assertNotEqual(self.organism_store, self.organism_l[:2])
+        self.assertNotEqual(self.organism_store, None)
+
+    def test_from_arrays_success(self):
+        organism_store = OrganismStore.from_arrays(np.array([0, 1, 3]), np.array([1, 1, 0]),
+                                                   [2, 1, 1])
+
+        self.assertEqual(organism_store, self.organism_store)
+
+    def test_from_arrays_out_of_range(self):
+        with self.assertRaises(OrganismStoreError):
+            OrganismStore.from_arrays(np.array([0, 70000]), np.array([1, 1]), [2, 1])
+        with self.assertRaises(OrganismStoreError):
+            OrganismStore.from_arrays(np.array([0, 1]), np.array([1, 1]), [2, -1])
+
+    def test_append_out_of_range(self):
+        with self.assertRaises(OrganismStoreError):
+            self.organism_store.append(Organism(-1, 0, 1))
+        with self.assertRaises(OrganismStoreError):
+            OrganismStore.from_cells([(0, 0, 1), (0, 65536, 1)])
+
+        # arrays stay parallel
+        self.assertEqual(list(self.organism_store.iter_cells()),
+                         [(0, 1, 2), (1, 1, 1), (3, 0, 1)])
+
+    def test_replace_organisms_success(self):
+        organism_store = self.organism_store.replace_organisms(
+            [Organism(2, 2, 1), Organism(0, 0, 1)], [Organism(1, 1, 1), Organism(2, 0, 1)])
+
+        # the store is updated in place, born organisms take the slots of the dead ones
+        self.assertIs(organism_store, self.organism_store)
+        self.assertEqual(list(organism_store.iter_cells()),
+                         [(0, 1, 2), (2, 2, 1), (3, 0, 1), (0, 0, 1)])
+
+        # the last organism is moved to the slot of the dead one
+        self.organism_store.replace_organisms([], [Organism(0, 1, 2), Organism(3, 0, 1)])
+        self.assertEqual(list(self.organism_store.iter_cells()), [(0, 0, 1), (2, 2, 1)])
+
+        # the species of the cell is changed
+        self.organism_store.replace_organisms([Organism(2, 2, 3)], [Organism(2, 2, 1)])
+        self.assertEqual(list(self.organism_store.iter_cells()), [(0, 0, 1), (2, 2, 3)])
+
+    def test_replace_organisms_not_valid(self):
+        organism_store = OrganismStore(self.organism_l)
+
+        with self.assertRaises(OrganismStoreError):
+            organism_store.replace_organisms([Organism(65536, 2, 7)], [Organism(1, 1, 1)])
+
+        # the store is not changed
+        self.assertEqual(list(organism_store.iter_cells()),
+                         [(0, 1, 2), (1, 1, 1), (3, 0, 1)])
+
+    def test_get_ordered(self):
+        organism_store = OrganismStore(self.organism_l[::-1])
+        organism_store.replace_organisms(OrganismStore([Organism(65535, 2, 7)]), [])
+
+        self.assertEqual(list(organism_store.get_ordered().iter_cells()),
+                         [(0, 1, 2), (1, 1, 1), (3, 0, 1), (65535, 2, 7)])
+
+        ordered_store = OrganismStore.from_cells([(0, 1, 2), (1, 1, 1)])
+        self.assertIs(ordered_store.get_ordered(), ordered_store)
+
+    def test_organism_without_dict(self):
+        with self.assertRaises(AttributeError):
+            Organism(0, 0, 1).age = 1
+
+    def test_organism_hashed_by_value(self):
+        organism = Organism(0, 0, 1)
+        organism_s = set([organism, Organism(0, 0, 1), Organism(0, 0, 2)])
+
+        self.assertEqual(len(organism_s), 2)
+        # equal views of the same cell are the same key
+        self.assertIn(Organism(0, 0, 1), organism_s)
+        self.assertEqual({organism: 1}[Organism(0, 0, 1)], 1)
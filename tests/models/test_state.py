@@ -21,3 +21,9 @@ class TestState(unittest.TestCase):
 
         self.assertFalse(state_without_organisms.is_valid())
         self.assertFalse(state_without_species.is_valid())
+
+    def test_state_seed_is_valid(self):
+        organism_l = [Organism(3, 2, 1)]
+
+        self.assertTrue(State(5, 4, 3, organism_l, seed=0).is_valid())
+        self.assertFalse(State(5, 4, 3, organism_l, seed=-1).is_valid())
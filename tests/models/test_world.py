@@ -1,12 +1,25 @@
 #!/usr/bin/env python
+import random
 import unittest
 
 from life_game.models.organism import Organism
 from life_game.models.world_grid import WorldGrid
 from life_game.models.world import World, WorldInternalError
+from life_game.rules.base import EvolutionRule
+from life_game.rules.evolution_rules import EvolutionSurvivalRule, EvolutionIsolationRule, \
+    EvolutionOvercrowdingRule, EvolutionBirthRule
 from life_game.rules.evolution_rules_engine import EvolutionRulesEngine
 
 
+class TableBirthRule(EvolutionBirthRule):
+    # evaluated through the rule table, not in batches
+    apply_batch = EvolutionRule.apply_batch
+
+
+class PerCellBirthRule(TableBirthRule):
+    COUNT_BASED = False
+
+
 class TestWorld(unittest.TestCase):
  
     def setUp(self):
@@ -109,3 +122,165 @@ class TestWorld(unittest.TestCase):
         self.assertEqual(self.world.organism_l, [])
         self.assertEqual(len(self.world.organism_l), 0)
         self.assertEqual(len(self.world._get_all_organisms()), 0)
+
+    def test_iterate_tracks_active_cells(self):
+        self.world.organism_l = [Organism(1, 2, 1), Organism(2, 2, 1), Organism(3, 2, 1)]
+        self.world.populate_initial_organisms()
+        self.assertEqual(self.world.active_cell_s, None)
+
+        self.world.iterate()
+
+        self.assertEqual(self.world.active_cell_s, set([(1, 2), (3, 2), (2, 1), (2, 3)]))
+        self.assertEqual([str(organism) for organism in self.world.born_organism_l],
+                         ['2-1-1', '2-3-1'])
+        self.assertEqual([str(organism) for organism in self.world.dead_organism_l],
+                         ['1-2-1', '3-2-1'])
+        self.assertEqual(sorted((organism.x, organism.y) for organism in self.world.organism_l),
+                         [(2, 1), (2, 2), (2, 3)])
+
+    def test_iterate_still_life_has_no_active_cells(self):
+        self.world.organism_l = [Organism(1, 1, 1), Organism(1, 2, 1), Organism(2, 1, 1),
+                                 Organism(2, 2, 1)]
+        self.world.populate_initial_organisms()
+        self.world.iterate()
+        self.world.iterate()
+
+        self.assertEqual(self.world.active_cell_s, set())
+        self.assertEqual(len(self.world.organism_l), 4)
+
+    def test_iterate_same_as_full_scan(self):
+        generator = random.Random(3)
+        organism_l = [Organism(x, y, 1) for x in xrange(15) for y in xrange(15)
+                      if generator.random() < 0.4]
+
+        world = World(WorldGrid(15, 15), list(organism_l), EvolutionRulesEngine())
+        full_scan_world = World(WorldGrid(15, 15), list(organism_l), EvolutionRulesEngine())
+        world.populate_initial_organisms()
+        full_scan_world.populate_initial_organisms()
+
+        for _ in xrange(25):
+            world.iterate()
+            # all the cells are evaluated if there are no active cells known
+            full_scan_world.active_cell_s = None
+            full_scan_world.iterate()
+
+            self.assertEqual([str(organism) for organism in world.organism_l],
+                             [str(organism) for organism in full_scan_world.organism_l])
+
+    def _build_rules_engines(self, seed=None):
+        return [
+            # batch of the predefined rules
+            EvolutionRulesEngine(seed=seed),
+            # transition table of the specification
+            EvolutionRulesEngine(rule_spec=EvolutionRulesEngine.DEFAULT_RULE_SPEC, seed=seed),
+            # rule table of probed rules
+            EvolutionRulesEngine([EvolutionSurvivalRule(), EvolutionIsolationRule(),
+                                  EvolutionOvercrowdingRule(), TableBirthRule()], seed=seed),
+            # rule objects one by one
+            EvolutionRulesEngine([EvolutionSurvivalRule(), EvolutionIsolationRule(),
+                                  EvolutionOvercrowdingRule(), PerCellBirthRule()], seed=seed)
+        ]
+
+    def test_iterate_same_by_all_evaluations(self):
+        generator = random.Random(5)
+        organism_l = [Organism(x, y, generator.randint(1, 3)) for x in xrange(15)
+                      for y in xrange(15) if generator.random() < 0.5]
+        rules_engine_l = self._build_rules_engines()
+
+        world_l = [World(WorldGrid(15, 15), list(organism_l), rules_engine)
+                   for rules_engine in rules_engine_l]
+        for world in world_l:
+            world.populate_initial_organisms()
+
+        self.assertTrue(rules_engine_l[0].supports_batch)
+        self.assertFalse(rules_engine_l[1].supports_batch)
+        self.assertTrue(rules_engine_l[2].get_rule_table(3))
+        self.assertEqual(rules_engine_l[3].get_rule_table(3), None)
+
+        for iteration in xrange(25):
+            # all the worlds have to make the same random choices
+            for world in world_l:
+                random.seed(iteration)
+                world.iterate()
+
+            for world in world_l[1:]:
+                self.assertEqual(world.organism_l, world_l[0].organism_l)
+
+        self.assertTrue(world_l[0].random_choice_cnt)
+        for world in world_l[1:]:
+            self.assertEqual(world.random_choice_cnt, world_l[0].random_choice_cnt)
+
+    def test_iterate_seeded_same_by_all_evaluations(self):
+        generator = random.Random(5)
+        organism_l = [Organism(x, y, generator.randint(1, 3)) for x in xrange(15)
+                      for y in xrange(15) if generator.random() < 0.5]
+
+        world_l = [World(WorldGrid(15, 15), list(organism_l), rules_engine)
+                   for rules_engine in self._build_rules_engines(seed=7)]
+        for world in world_l:
+            world.populate_initial_organisms()
+
+        for iteration in xrange(25):
+            # the choices do not depend on the random module
+            for index, world in enumerate(world_l):
+                random.seed(iteration * len(world_l) + index)
+                world.iterate()
+
+            for world in world_l[1:]:
+                self.assertEqual(world.organism_l, world_l[0].organism_l)
+
+        self.assertTrue(world_l[0].random_choice_cnt)
+        self.assertEqual(world_l[0].generation, 25)
+
+    def test_populate_with_organisms_seeded(self):
+        organism_l = [Organism(x, y, species) for x in xrange(5) for y in xrange(5)
+                      for species in (1, 2, 3)]
+
+        def get_populated_cells(seed):
+            world = World(WorldGrid(5, 5), list(organism_l), EvolutionRulesEngine(seed=seed))
+            world.populate_initial_organisms()
+            return [str(organism) for organism in world.organism_l]
+
+        cells_l = get_populated_cells(7)
+
+        self.assertEqual(len(cells_l), 25)
+        self.assertEqual(get_populated_cells(7), cells_l)
+        self.assertNotEqual(get_populated_cells(8), cells_l)
+
+    def test_iterate_by_sparse_species(self):
+        generator = random.Random(5)
+        organism_l = [Organism(x, y, generator.randint(1, 2)) for x in xrange(15)
+                      for y in xrange(15) if generator.random() < 0.5]
+        sparse_organism_l = [Organism(organism.x, organism.y, organism.species * 30000)
+                             for organism in organism_l]
+
+        world = World(WorldGrid(15, 15), organism_l, EvolutionRulesEngine(seed=7))
+        sparse_world_l = [World(WorldGrid(15, 15), list(sparse_organism_l), rules_engine)
+                          for rules_engine in self._build_rules_engines(seed=7)]
+        for populated_world in [world] + sparse_world_l:
+            populated_world.populate_initial_organisms()
+
+        for _ in xrange(10):
+            world.iterate()
+            for sparse_world in sparse_world_l:
+                sparse_world.iterate()
+
+                self.assertEqual([(organism.x, organism.y, organism.species * 30000)
+                                  for organism in world.organism_l],
+                                 [(organism.x, organism.y, organism.species)
+                                  for organism in sparse_world.organism_l])
+
+        self.assertTrue(world.random_choice_cnt)
+        for sparse_world in sparse_world_l:
+            # only the planes of the present species are kept
+            self.assertEqual(sparse_world.species_l, [30000, 60000])
+            self.assertEqual(sorted(sparse_world.world_grid._neighbours_cnt_a_d), [30000, 60000])
+
+    def test_iterate_by_rule_spec(self):
+        # every organism survives and the cells with one neighbour give birth
+        world = World(WorldGrid(5, 5), [Organism(2, 2, 1)],
+                      EvolutionRulesEngine(rule_spec='B1/S012345678'))
+        world.populate_initial_organisms()
+        world.iterate()
+
+        self.assertEqual(len(world.organism_l), 9)
@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 import unittest
 
-from life_game.models.world_grid import WorldGrid, WorldGridCoordinatesError
+from life_game.models.world_grid import WorldGrid, WorldGridCoordinatesError, \
+    WorldGridSpeciesError
 from life_game.models.organism import Organism
 
 
@@ -112,3 +113,149 @@ class TestWorldGrid(unittest.TestCase):
 
         with self.assertRaises(WorldGridCoordinatesError):
             self.world_grid.get_neighboring_cells_at(20, 22)
+
+    def test_update_organisms_success(self):
+        self.world_grid.set_organism(self.organism)
+        born_organism = Organism(3, 3, 2)
+
+        self.world_grid.update_organisms([born_organism], [self.organism])
+
+        self.assertEqual(self.world_grid.get_organism_at(0, 2), None)
+        self.assertEqual(self.world_grid.get_organism_at(3, 3), born_organism)
+
+    def test_update_organisms_wrong_coordinates(self):
+        with self.assertRaises(WorldGridCoordinatesError):
+            self.world_grid.update_organisms([], [self.organism_out_x])
+
+        with self.assertRaises(WorldGridCoordinatesError):
+            self.world_grid.update_organisms([self.organism_wrong_y], [])
+
+    def test_update_organisms_not_valid_keeps_grid(self):
+        self.world_grid.set_organism(self.organism)
+
+        with self.assertRaises(WorldGridCoordinatesError):
+            self.world_grid.update_organisms([Organism(1, 1, 1), self.organism_out_y],
+                                             [self.organism])
+
+        self.assertEqual(self.world_grid.get_organisms(), [self.organism])
+
+    def test_set_organism_wrong_species(self):
+        with self.assertRaises(WorldGridSpeciesError):
+            self.world_grid.set_organism(Organism(1, 1, 0))
+
+        with self.assertRaises(WorldGridSpeciesError):
+            self.world_grid.set_organism(Organism(1, 1, WorldGrid.MAX_SPECIES + 1))
+
+    def test_get_neighboring_organisms_at_unchecked_success(self):
+        organism_l = [Organism(0, 0, 1), Organism(1, 0, 2), Organism(1, 1, 1), Organism(3, 3, 1)]
+        self.world_grid.set_organisms(organism_l)
+
+        neighboring_organism_l = self.world_grid.get_neighboring_organisms_at_unchecked(0, 1)
+
+        self.assertEqual(sorted(neighboring_organism_l,
+                                key=lambda organism: (organism.x, organism.y)),
+                         organism_l[:3])
+        self.assertEqual(self.world_grid.get_neighboring_organisms_at_unchecked(3, 3), [])
+
+    def test_get_organisms_ordered(self):
+        organism_l = [Organism(3, 0, 1), Organism(0, 3, 2), Organism(0, 1, 1)]
+        self.world_grid.set_organisms(organism_l)
+
+        self.assertEqual(self.world_grid.get_organisms(),
+                         [Organism(0, 1, 1), Organism(0, 3, 2), Organism(3, 0, 1)])
+
+    def test_grid_view(self):
+        self.world_grid.set_organism(self.organism)
+
+        self.assertEqual(self.world_grid.grid[0][2], self.organism)
+        self.assertEqual(self.world_grid.grid[-4][-2], self.organism)
+        self.assertEqual([len(column) for column in self.world_grid.grid], [4, 4, 4, 4])
+        self.assertEqual(list(self.world_grid.grid[1]), [None] * 4)
+        with self.assertRaises(IndexError):
+            self.world_grid.grid[0][4]
+
+    def test_update_organisms_in_place(self):
+        self.world_grid.set_organism(self.organism)
+        species_a = self.world_grid.species_a
+
+        self.world_grid.update_organisms([Organism(3, 3, 2)], [self.organism])
+
+        self.assertIs(self.world_grid.species_a, species_a)
+        self.assertEqual(self.world_grid.get_organisms(), [Organism(3, 3, 2)])
+
+    def test_rebuild_empties_grid(self):
+        self.world_grid.set_organism(self.organism)
+        species_a = self.world_grid.species_a
+        neighbours_cnt_a = self.world_grid.get_neighbours_cnt_plane(self.organism.species)
+
+        self.world_grid.rebuild()
+
+        # the buffers are cleared in place
+        self.assertIs(self.world_grid.species_a, species_a)
+        self.assertIs(self.world_grid.get_neighbours_cnt_plane(self.organism.species),
+                      neighbours_cnt_a)
+        self.assertEqual(self.world_grid.get_organisms(), [])
+        self.assertEqual(sum(neighbours_cnt_a), 0)
+
+    def _get_neighbours_cnts(self, species):
+        neighbours_cnt_a = self.world_grid.get_neighbours_cnt_plane(species)
+
+        return [[neighbours_cnt_a[x * 4 + y] for y in xrange(4)] for x in xrange(4)]
+
+    def test_neighbours_cnt_plane_by_set_and_remove(self):
+        self.world_grid.set_organisms([Organism(0, 0, 1), Organism(1, 1, 1), Organism(3, 3, 2)])
+
+        self.assertEqual(self._get_neighbours_cnts(1),
+                         [[1, 2, 1, 0], [2, 1, 1, 0], [1, 1, 1, 0], [0, 0, 0, 0]])
+        self.assertEqual(self._get_neighbours_cnts(2),
+                         [[0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 1, 1], [0, 0, 1, 0]])
+
+        self.world_grid.remove_organism(Organism(1, 1, 1))
+
+        self.assertEqual(self._get_neighbours_cnts(1),
+                         [[0, 1, 0, 0], [1, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+
+    def test_neighbours_cnt_plane_by_overwriting(self):
+        self.world_grid.set_organism(Organism(1, 1, 1))
+        self.world_grid.set_organism(Organism(1, 1, 2))
+        # setting the same species again does not count it twice
+        self.world_grid.set_organism(Organism(1, 1, 2))
+
+        self.assertEqual(sum(self.world_grid.get_neighbours_cnt_plane(1)), 0)
+        self.assertEqual(sum(self.world_grid.get_neighbours_cnt_plane(2)), 8)
+
+    def test_neighbours_cnt_plane_by_update_organisms(self):
+        self.world_grid.set_organism(self.organism)
+
+        self.world_grid.update_organisms([Organism(3, 3, 1)], [self.organism])
+
+        self.assertEqual(self._get_neighbours_cnts(1),
+                         [[0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 1, 1], [0, 0, 1, 0]])
+
+    def test_neighbour_table_built_on_first_use(self):
+        self.world_grid.set_organisms([Organism(0, 0, 1), Organism(1, 1, 2)])
+        self.world_grid.update_organisms([Organism(3, 3, 1)], [Organism(0, 0, 1)])
+
+        # nothing reads the neighbours, e.g. the world grid of the engines
+        self.assertIs(self.world_grid._neighbour_table, None)
+        self.assertEqual(self.world_grid.get_neighboring_cells_at(3, 3),
+                         [(2, 3), (3, 2), (2, 2)])
+        self.assertIsNot(self.world_grid._neighbour_table, None)
+
+    def test_neighbours_cnt_plane_counted_on_request(self):
+        self.world_grid.set_organisms([Organism(0, 0, 1), Organism(1, 1, 1), Organism(3, 3, 2)])
+        self.assertEqual(self._get_neighbours_cnts(1),
+                         [[1, 2, 1, 0], [2, 1, 1, 0], [1, 1, 1, 0], [0, 0, 0, 0]])
+
+        # the requested plane is updated incrementally, the other one is counted afterwards
+        self.world_grid.update_organisms([Organism(2, 2, 2)], [Organism(1, 1, 1)])
+        self.assertEqual(self._get_neighbours_cnts(1),
+                         [[0, 1, 0, 0], [1, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+        self.assertEqual(self._get_neighbours_cnts(2),
+                         [[0, 0, 0, 0], [0, 1, 1, 1], [0, 1, 1, 2], [0, 1, 2, 1]])
+
+    def test_neighbours_cnt_plane_not_counting_outside(self):
+        self.world_grid.set_organisms([Organism(0, 0, 1), Organism(3, 3, 1)])
+
+        self.assertEqual(self.world_grid.get_neighbours_cnt_plane(1)[16], 0)
+        self.assertEqual(sum(self.world_grid.get_neighbours_cnt_plane(1)), 6)
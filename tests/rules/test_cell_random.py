@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+import unittest
+
+import numpy as np
+
+from life_game.rules.cell_random import CellRandom, CellRandomError
+
+
+class TestCellRandom(unittest.TestCase):
+
+    def setUp(self):
+        self.cell_random = CellRandom(42)
+
+    def test_get_index_in_range(self):
+        for candidates_cnt in xrange(1, 9):
+            index_l = [self.cell_random.get_index(candidates_cnt, 0, x, 0) for x in xrange(200)]
+
+            self.assertTrue(all(0 <= index < candidates_cnt for index in index_l))
+            # all the candidates are chosen
+            self.assertEqual(set(index_l), set(xrange(candidates_cnt)))
+
+    def test_get_index_same_for_same_key(self):
+        index_l = [self.cell_random.get_index(5, 3, x, y) for x in xrange(10) for y in xrange(10)]
+
+        self.assertEqual(index_l, [CellRandom(42).get_index(5, 3, x, y)
+                                   for x in xrange(10) for y in xrange(10)])
+
+    def test_get_index_differs_by_key(self):
+        def get_index_l(cell_random, counter, stream=CellRandom.STREAM_BIRTH):
+            return [cell_random.get_index(8, counter, x, y, stream)
+                    for x in xrange(10) for y in xrange(10)]
+
+        index_l = get_index_l(self.cell_random, 0)
+
+        self.assertNotEqual(get_index_l(CellRandom(43), 0), index_l)
+        self.assertNotEqual(get_index_l(self.cell_random, 1), index_l)
+        self.assertNotEqual(get_index_l(self.cell_random, 0, CellRandom.STREAM_CONFLICT),
+                            index_l)
+
+    def test_get_indexes_same_as_get_index(self):
+        generator = np.random.RandomState(7)
+        x_a = generator.randint(0, 5000, 1000)
+        y_a = generator.randint(0, 5000, 1000)
+        candidates_cnt_a = generator.randint(1, 9, 1000)
+
+        index_a = self.cell_random.get_indexes(candidates_cnt_a, 11, x_a, y_a)
+
+        self.assertEqual(index_a.tolist(), [
+            self.cell_random.get_index(int(candidates_cnt), 11, int(x), int(y))
+            for candidates_cnt, x, y in zip(candidates_cnt_a, x_a, y_a)])
+
+    def test_choose(self):
+        candidate_l = ['a', 'b', 'c']
+        index = self.cell_random.get_index(3, 2, 4, 5)
+
+        self.assertEqual(self.cell_random.choose(candidate_l, 2, (4, 5)), candidate_l[index])
+
+    def test_seed_not_valid(self):
+        with self.assertRaises(CellRandomError):
+            CellRandom(-1)
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 import unittest
 
+import numpy as np
+
 from life_game.models.organism import Organism
+from life_game.rules.base import EvolutionRule, EvolutionRuleError
 from life_game.rules.evolution_rules import EvolutionSurvivalRule, EvolutionIsolationRule, \
-    EvolutionOvercrowdingRule, EvolutionBirthRule, EvolutionRuleError
+    EvolutionOvercrowdingRule, EvolutionBirthRule
 
 
 class TestEvolutionRules(unittest.TestCase):
@@ -129,3 +132,101 @@ class TestEvolutionRules(unittest.TestCase):
             organism, applied = self.birth_rule.apply(self.original_organism,
                                                       self.species_occurrence_d,
                                                       cell=(1, 1))
+
+    def test_birth_rule_counts_random_choices(self):
+        organism, applied = self.birth_rule.apply(None, {1: 3, 2: 3}, cell=(1, 1))
+        self.assertTrue(applied)
+        self.assertIn(organism.species, [1, 2])
+        self.assertEqual(self.birth_rule.random_choice_cnt, 1)
+
+        # single candidate is not a random choice
+        self.birth_rule.apply(None, {1: 3, 2: 2}, cell=(1, 1))
+        self.assertEqual(self.birth_rule.random_choice_cnt, 1)
+
+    def test_apply_batch_same_as_apply(self):
+        species_a = np.array([1, 2, 0, 3, 0, 1])
+        neighbours_cnt_a = np.array([[0, 1, 0, 3], [0, 5, 3, 0], [0, 3, 0, 3],
+                                     [0, 2, 0, 6], [0, 0, 2, 1], [0, 2, 3, 0]])
+
+        for evolution_rule in (self.survival_rule, self.isolation_rule,
+                               self.overcrowding_rule, self.birth_rule):
+            # the birth takes the last candidate, the same for both methods
+            evolution_rule.choose_randomly = lambda candidate_l, **kwargs: candidate_l[-1]
+            evolved_species_a, applied_a = evolution_rule.apply_batch(species_a,
+                                                                      neighbours_cnt_a)
+
+            for cell_position, species in enumerate(species_a):
+                organism = Organism(0, cell_position, species) if species else None
+                species_occurrence_d = dict(
+                    (neighbour_species, cnt) for neighbour_species, cnt
+                    in enumerate(neighbours_cnt_a[cell_position]) if neighbour_species and cnt)
+                try:
+                    evolved_organism, applied = evolution_rule.apply(
+                        organism, species_occurrence_d, cell=(0, cell_position))
+                except EvolutionRuleError:
+                    evolved_organism, applied = None, False
+
+                self.assertEqual(applied_a[cell_position], applied)
+                if applied:
+                    self.assertEqual(evolved_species_a[cell_position],
+                                     evolved_organism.species if evolved_organism else 0)
+
+    def test_evaluate_without_error(self):
+        organism, result = self.birth_rule.evaluate(self.original_organism,
+                                                    self.species_occurrence_d)
+        self.assertEqual((organism, result), (None, EvolutionRule.RESULT_NOT_APPLICABLE))
+
+        organism, result = self.survival_rule.evaluate(self.original_organism,
+                                                       self.species_occurrence_d)
+        self.assertEqual((organism, result),
+                         (self.original_organism, EvolutionRule.RESULT_APPLIED))
+
+        organism, result = self.isolation_rule.evaluate(self.original_organism,
+                                                        self.species_occurrence_d)
+        self.assertEqual((organism, result),
+                         (self.original_organism, EvolutionRule.RESULT_NOT_APPLIED))
+
+    def test_apply_derived_from_evaluate(self):
+        class EvaluatedRule(EvolutionRule):
+            def evaluate(self, organism, species_occurrence_d, **kwargs):
+                if organism:
+                    return None, self.RESULT_NOT_APPLICABLE
+                return None, self.RESULT_NOT_APPLIED
+
+        with self.assertRaises(EvolutionRuleError):
+            EvaluatedRule().apply(self.original_organism, self.species_occurrence_d)
+
+        self.assertEqual(EvaluatedRule().apply(None, self.species_occurrence_d), (None, False))
+
+    def test_has_batch_by_reference_behaviour(self):
+        class ImmortalRule(EvolutionSurvivalRule):
+            def apply(self, organism, species_occurrence_d, **kwargs):
+                return organism, bool(organism)
+
+        class BatchImmortalRule(ImmortalRule):
+            def apply_batch(self, species_a, neighbours_cnt_a, **kwargs):
+                return species_a, species_a != 0
+
+        self.assertTrue(EvolutionSurvivalRule.has_batch())
+        # the batch of the parent would skip the overriden `apply`
+        self.assertFalse(ImmortalRule.has_batch())
+        self.assertTrue(BatchImmortalRule.has_batch())
+        self.assertFalse(EvolutionRule.has_batch())
+
+    def test_evaluate_derived_from_apply(self):
+        class AppliedRule(EvolutionRule):
+            def apply(self, organism, species_occurrence_d, **kwargs):
+                if organism:
+                    raise EvolutionRuleError('Not applicable - organism must not exist.')
+                return None, True
+
+        self.assertEqual(AppliedRule().evaluate(self.original_organism, {}),
+                         (None, EvolutionRule.RESULT_NOT_APPLICABLE))
+        self.assertEqual(AppliedRule().evaluate(None, {}),
+                         (None, EvolutionRule.RESULT_APPLIED))
+
+        with self.assertRaises(NotImplementedError):
+            EvolutionRule().evaluate(None, {})
+
+        with self.assertRaises(NotImplementedError):
+            EvolutionRule().apply(None, {})
@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 import unittest
 
+import numpy as np
+
 from life_game.models.organism import Organism
+from life_game.rules.evolution_rules import EvolutionSurvivalRule, EvolutionBirthRule
 from life_game.rules.evolution_rules_engine import EvolutionRulesEngine, \
     EngineCanNotEvolveOrganismError
+from life_game.rules.rule_spec import RuleSpecError
  
 
 class TestEvolutionRulesEngine(unittest.TestCase):
@@ -25,3 +29,172 @@ class TestEvolutionRulesEngine(unittest.TestCase):
 
         with self.assertRaises(EngineCanNotEvolveOrganismError):
             self.rules_engine.evolve_organism_by_all_rules(None, self.species_occurrence_d)
+
+    def test_evolve_organism_with_change_survival(self):
+        organism, change = self.rules_engine.evolve_organism_with_change(
+            self.original_organism, self.neighboring_organism_l)
+
+        self.assertEqual(organism, self.original_organism)
+        self.assertEqual(change, EvolutionRulesEngine.CHANGE_NONE)
+
+    def test_evolve_organism_with_change_birth(self):
+        organism, change = self.rules_engine.evolve_organism_with_change(
+            None, self.neighboring_organism_l, cell=(0, 1))
+
+        self.assertEqual((organism.x, organism.y, organism.species), (0, 1, 1))
+        self.assertEqual(change, EvolutionRulesEngine.CHANGE_BIRTH)
+
+    def test_evolve_organism_with_change_death(self):
+        organism, change = self.rules_engine.evolve_organism_with_change(
+            self.original_organism, self.neighboring_organism_l[:1])
+
+        self.assertEqual(organism, None)
+        self.assertEqual(change, EvolutionRulesEngine.CHANGE_DEATH)
+
+    def test_evolve_organism_with_change_nothing(self):
+        organism, change = self.rules_engine.evolve_organism_with_change(None, [])
+
+        self.assertEqual(organism, None)
+        self.assertEqual(change, EvolutionRulesEngine.CHANGE_NONE)
+
+    def test_rule_spec_evolves_organisms(self):
+        rules_engine = EvolutionRulesEngine(rule_spec='B2/S1')
+
+        organism = rules_engine.evolve_organism_by_all_rules(self.original_organism,
+                                                             self.neighboring_organism_l[:1])
+        self.assertEqual(organism, self.original_organism)
+
+        organism, change = rules_engine.evolve_organism_with_change(
+            None, self.neighboring_organism_l[:2], cell=(0, 1))
+        self.assertEqual((organism.x, organism.y, organism.species), (0, 1, 1))
+        self.assertEqual(change, EvolutionRulesEngine.CHANGE_BIRTH)
+
+        organism, change = rules_engine.evolve_organism_with_change(
+            self.original_organism, self.neighboring_organism_l)
+        self.assertEqual(change, EvolutionRulesEngine.CHANGE_DEATH)
+
+    def test_get_transition_table(self):
+        transition_a = self.rules_engine.get_transition_table(2)
+
+        self.assertEqual(len(transition_a), 27)
+        self.assertIs(self.rules_engine.get_transition_table(2), transition_a)
+        self.assertEqual(EvolutionRulesEngine([EvolutionSurvivalRule()]).get_transition_table(2),
+                         None)
+
+    def test_rules_and_rule_spec_not_valid(self):
+        with self.assertRaises(RuleSpecError):
+            EvolutionRulesEngine([EvolutionSurvivalRule()], rule_spec='B3/S23')
+
+        with self.assertRaises(RuleSpecError):
+            EvolutionRulesEngine(rule_spec='B3')
+
+    def test_evolve_batch_success(self):
+        species_a = np.array([1, 1, 0, 0])
+        neighbours_cnt_a = np.array([[0, 2, 0], [0, 5, 0], [0, 3, 0], [0, 2, 1]])
+
+        self.assertTrue(self.rules_engine.supports_batch)
+        self.assertEqual(self.rules_engine.evolve_batch(species_a, neighbours_cnt_a).tolist(),
+                         [1, 0, 1, 0])
+        self.assertFalse(EvolutionRulesEngine(rule_spec='B3/S23').supports_batch)
+
+    def test_choose_birth_species_seeded_by_cell(self):
+        rules_engine = EvolutionRulesEngine(seed=3)
+        cell_l = [(x, y) for x in xrange(6) for y in xrange(6)]
+
+        species_l = [rules_engine.choose_birth_species([1, 2, 3], cell=cell, generation=4)
+                     for cell in cell_l]
+        reversed_species_l = [rules_engine.choose_birth_species([1, 2, 3], cell=cell,
+                                                                generation=4)
+                              for cell in reversed(cell_l)]
+
+        # the choices do not depend on the order of the cells
+        self.assertEqual(reversed_species_l[::-1], species_l)
+        self.assertEqual(set(species_l), set([1, 2, 3]))
+        self.assertEqual(rules_engine.random_choice_cnt, 72)
+
+    def test_seeded_rules_same_as_choose_birth_species(self):
+        rules_engine = EvolutionRulesEngine(seed=3)
+
+        for x in xrange(10):
+            organism, change = rules_engine.evolve_organism_with_change_by_occurrence(
+                None, {1: 3, 2: 3}, cell=(x, 1), generation=2)
+
+            self.assertEqual(change, EvolutionRulesEngine.CHANGE_BIRTH)
+            self.assertEqual(organism.species, rules_engine.choose_birth_species(
+                [1, 2], cell=(x, 1), generation=2))
+
+    def test_evolve_organism_randomly_seeded(self):
+        organism1, organism2 = Organism(1, 1, 1), Organism(1, 1, 2)
+
+        species_l = [EvolutionRulesEngine(seed=3).evolve_organism_randomly(
+            organism1, organism2, conflict).species for conflict in xrange(20)]
+
+        self.assertEqual(species_l, [EvolutionRulesEngine(seed=3).evolve_organism_randomly(
+            organism1, organism2, conflict).species for conflict in xrange(20)])
+        self.assertEqual(set(species_l), set([1, 2]))
+
+    def test_get_rule_table_probes_rules(self):
+        rules_engine = EvolutionRulesEngine([EvolutionSurvivalRule(), EvolutionBirthRule()])
+        rule_table_d = rules_engine.get_rule_table(2)
+
+        # empty cell and both species, neighbours of two species up to eight in total
+        self.assertEqual(len(rule_table_d), 3 * 45)
+        self.assertEqual(rule_table_d[(1, (2, 5))], 1)
+        self.assertEqual(rule_table_d[(1, (1, 3))], 0)
+        self.assertEqual(rule_table_d[(0, (3, 1))], (1,))
+        self.assertEqual(rule_table_d[(0, (3, 3))], (1, 2))
+        self.assertEqual(rule_table_d[(0, (2, 2))], 0)
+        # probing does not count the random choices
+        self.assertEqual(rules_engine.random_choice_cnt, 0)
+        self.assertIs(rules_engine.get_rule_table(2), rule_table_d)
+
+    def test_get_rule_table_does_not_change_rules(self):
+        birth_rule = EvolutionBirthRule()
+        rule_d = dict(birth_rule.__dict__)
+
+        # rule objects shared by more engines
+        EvolutionRulesEngine([EvolutionSurvivalRule(), birth_rule]).get_rule_table(2)
+        rule_table_d = EvolutionRulesEngine([birth_rule]).get_rule_table(2)
+
+        self.assertEqual(birth_rule.__dict__, rule_d)
+        self.assertEqual(rule_table_d[(0, (3, 3))], (1, 2))
+
+    def test_get_rule_table_species_changed(self):
+        class MutationRule(EvolutionSurvivalRule):
+            def evaluate(self, organism, species_occurrence_d, **kwargs):
+                if organism:
+                    return Organism(organism.x, organism.y, 3 - organism.species), \
+                        self.RESULT_APPLIED
+                return None, self.RESULT_NOT_APPLICABLE
+
+        rules_engine = EvolutionRulesEngine([MutationRule(), EvolutionBirthRule()])
+
+        self.assertEqual(rules_engine.get_rule_table(2), None)
+
+    def test_evolve_by_overriden_apply(self):
+        class ImmortalRule(EvolutionSurvivalRule):
+            def apply(self, organism, species_occurrence_d, **kwargs):
+                return organism, True
+
+        rules_engine = EvolutionRulesEngine([ImmortalRule(), EvolutionBirthRule()])
+
+        self.assertFalse(ImmortalRule.evaluates_directly())
+        self.assertFalse(ImmortalRule.is_count_based())
+        self.assertEqual(rules_engine.evolve_organism_with_change_by_occurrence(
+            self.original_organism, {}), (self.original_organism, 'none'))
+        self.assertFalse(rules_engine.supports_batch)
+        self.assertEqual(rules_engine.get_rule_table(2), None)
+
+    def test_get_rule_table_not_count_based(self):
+        class NeighbourCellRule(EvolutionBirthRule):
+            COUNT_BASED = False
+
+        rules_engine = EvolutionRulesEngine([EvolutionSurvivalRule(), NeighbourCellRule()])
+
+        self.assertEqual(rules_engine.get_rule_table(2), None)
+        self.assertEqual(self.rules_engine.get_rule_table(2), None)
+
+    def test_get_rule_table_too_many_species(self):
+        rules_engine = EvolutionRulesEngine([EvolutionSurvivalRule(), EvolutionBirthRule()])
+
+        self.assertEqual(rules_engine.get_rule_table(12), None)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+import unittest
+
+from life_game.rules.rule_spec import RuleSpec, RuleSpecError
+
+
+class TestRuleSpec(unittest.TestCase):
+
+    def _get_cnts(self, rule_spec, species, flag):
+        return [neighbours_cnt for neighbours_cnt in xrange(RuleSpec.ROW_SIZE)
+                if rule_spec.get_flags(species, neighbours_cnt) & flag]
+
+    def test_parse_success(self):
+        rule_spec = RuleSpec('B3/S23')
+
+        self.assertEqual(self._get_cnts(rule_spec, 1, RuleSpec.BIRTH), [3])
+        self.assertEqual(self._get_cnts(rule_spec, 1, RuleSpec.SURVIVAL), [2, 3])
+
+    def test_parse_isolation_and_overcrowding(self):
+        rule_spec = RuleSpec('B3/S012345/I2/O4')
+
+        self.assertEqual(self._get_cnts(rule_spec, 1, RuleSpec.SURVIVAL), [2, 3, 4])
+
+    def test_parse_species_rules(self):
+        rule_spec = RuleSpec('b3/s23; 2:B36/S2')
+
+        self.assertEqual(self._get_cnts(rule_spec, 1, RuleSpec.BIRTH), [3])
+        self.assertEqual(self._get_cnts(rule_spec, 2, RuleSpec.BIRTH), [3, 6])
+        self.assertEqual(self._get_cnts(rule_spec, 2, RuleSpec.SURVIVAL), [2])
+
+    def test_parse_not_valid(self):
+        for spec in ('', 'B3', 'S23', 'B3/S23/X1', 'B3/S29', 'B03/S23', 'B3/S23/I',
+                     'B3/B2/S23', '2:B3/S23', 'B3/S23;B2/S2', 'B3/S23;0:B2/S2',
+                     'B3/S23;2:B2/S2;2:B3/S3'):
+            with self.assertRaises(RuleSpecError):
+                RuleSpec(spec)
+
+    def test_compile_success(self):
+        transition_a = RuleSpec('B3/S23;2:B2/S').compile(2)
+
+        self.assertEqual(len(transition_a), 3 * RuleSpec.ROW_SIZE)
+        # empty row, species 1 and species 2
+        self.assertEqual(list(transition_a[:RuleSpec.ROW_SIZE]), [0] * RuleSpec.ROW_SIZE)
+        self.assertEqual(list(transition_a[RuleSpec.ROW_SIZE:2 * RuleSpec.ROW_SIZE]),
+                         [0, 0, 1, 3, 0, 0, 0, 0, 0])
+        self.assertEqual(list(transition_a[2 * RuleSpec.ROW_SIZE:]),
+                         [0, 0, 2, 0, 0, 0, 0, 0, 0])